@@ -9,10 +9,8 @@ import sys
 
 import appdirs
 
-from hangupsbot import (
-    config,
-    version,
-)
+from hangupsbot import version
+from hangupsbot.imports import ImportTimer
 
 
 def configure_logging(args):
@@ -24,6 +22,12 @@ def configure_logging(args):
     log configuration.
     """
 
+    # pylint: disable=import-outside-toplevel
+    from hangupsbot import (
+        config,
+        logs,
+    )
+
     log_level = "DEBUG" if args.debug else "INFO"
 
     logging_config = {
@@ -36,6 +40,9 @@ def configure_logging(args):
             "default": {
                 "format": "%(asctime)s %(levelname)s %(name)s: %(message)s",
             },
+            "json": {
+                "()": "hangupsbot.logs.JsonFormatter",
+            },
         },
         "handlers": {
             "console": {
@@ -45,14 +52,18 @@ def configure_logging(args):
                 "formatter": "service" if args.service else "default",
             },
             "file": {
-                "class": "logging.FileHandler",
+                "class": "logging.handlers.RotatingFileHandler",
                 "filename": args.log,
+                "maxBytes": 50 * 1024 * 1024,
+                "backupCount": 3,
                 "level": "DEBUG",
                 "formatter": "default",
             },
             "file_warnings": {
-                "class": "logging.FileHandler",
+                "class": "logging.handlers.RotatingFileHandler",
                 "filename": args.log.rsplit(".", 1)[0] + "_warnings.log",
+                "maxBytes": 10 * 1024 * 1024,
+                "backupCount": 3,
                 "level": "WARNING",
                 "formatter": "default",
             },
@@ -80,6 +91,12 @@ def configure_logging(args):
             # our `hangups.Client.on_disconnect` event
             "hangups.channel": {"level": "ERROR"},
         },
+        # custom entry: write the records in a background thread, records
+        #  get dropped once `size` records are pending
+        "queue": {
+            "enabled": True,
+            "size": logs.DEFAULT_QUEUE_SIZE,
+        },
     }
 
     # Temporarily bring in the configuration file, just so we can configure
@@ -95,7 +112,10 @@ def configure_logging(args):
         if boot_config.exists(["logging.system"]):
             logging_config = boot_config["logging.system"]
 
+    queue_config = logging_config.get("queue") or {}
     logging.config.dictConfig(logging_config)
+    if queue_config.get("enabled", True):
+        logs.setup_queue(queue_config.get("size", logs.DEFAULT_QUEUE_SIZE))
 
 
 def main():
@@ -177,12 +197,16 @@ def main():
         except (OSError, IOError) as err:
             sys.exit(_("Failed to copy default config file: %s") % err)
 
-    configure_logging(args)
+    # measure the import of the core and its dependencies
+    with ImportTimer() as import_timer:
+        configure_logging(args)
 
-    # performance optimization: do not import the core until command arguments
-    #  are fully parsed and sub commands like --help and --version are processed
-    # pylint: disable=import-outside-toplevel
-    from hangupsbot.core import HangupsBot
+        # performance optimization: do not import the core until command
+        #  arguments are fully parsed and sub commands like --help and
+        #  --version are processed
+        # pylint: disable=import-outside-toplevel
+        from hangupsbot.core import HangupsBot
+    import_timer.log_summary()
 
     # initialise the bot
     bot = HangupsBot(args.cookies, args.config, args.memory, args.retries)
@@ -3,6 +3,7 @@
 import asyncio
 import logging
 import re
+import time
 
 import hangups
 
@@ -54,6 +55,8 @@ class CommandDispatcher(BotMixin, TrackingMixin):
         self.register_arg_preprocessor_group = (
             self._arguments_parser.register_preprocessor_group)
 
+        self.profiler = None  # utils.profiler.Profiler, set in .setup()
+
     async def clear(self):
         """drop all commands"""
         self.commands.clear()
@@ -71,7 +74,12 @@ class CommandDispatcher(BotMixin, TrackingMixin):
 
     def setup(self):
         """extended init"""
+        # NOTE: `hangupsbot.utils` imports the commands via the parsers
+        # pylint:disable=cyclic-import,import-outside-toplevel
+        from hangupsbot.utils.profiler import PROFILER
+
         self.bot.config.set_defaults(DEFAULT_CONFIG)
+        self.profiler = PROFILER
 
     def register_tags(self, command_name, tags):
         if isinstance(tags, str):
@@ -210,6 +218,9 @@ class CommandDispatcher(BotMixin, TrackingMixin):
             'command run %s: %r %r %r',
             id(args), args, kwargs, event
         )
+        profiler = self.profiler
+        started = (time.monotonic()
+                   if profiler is not None and profiler.enabled else None)
         try:
             result = await asyncio.wait_for(
                 coro(bot, event, *args[1:], **kwargs),
@@ -266,6 +277,15 @@ class CommandDispatcher(BotMixin, TrackingMixin):
             else:
                 return result
 
+        finally:
+            if started is not None:
+                # use the module path of the plugin tracking
+                module_path = coro.__module__
+                if module_path.startswith('hangupsbot.'):
+                    module_path = module_path[len('hangupsbot.'):]
+                profiler.record('command', module_path, command_name,
+                                time.monotonic() - started, args=(event,))
+
         await bot.coro_send_message(conv_id, text, context=context)
 
     def register(self, *args, admin=False, tags=None, final=False, name=None):
@@ -1,4 +1,5 @@
 # TODO(das7pad) refactor needed
+import html
 import logging
 
 from hangupsbot import plugins
@@ -7,15 +8,54 @@ from hangupsbot.commands import (
     command,
 )
 from hangupsbot.sinks import aiohttp_list
+from hangupsbot.utils.profiler import PROFILER
 
 
 logger = logging.getLogger(__name__)
 
+# in seconds
+DEFAULT_CAPTURE_DURATION = 30
+MAX_CAPTURE_DURATION = 600
+
 
 def _initialise():
     pass  # prevents commands from being automatically added
 
 
+def _get_load_duration(timings):
+    """get the time a plugin spent loading, without the wait for requirements
+
+    Args:
+        timings (dict): the durations in seconds, keys: 'import', 'wait' and
+            'initialise'
+
+    Returns:
+        float: the duration of the import and the initialisation in seconds
+    """
+    return timings.get('import', 0) + timings.get('initialise', 0)
+
+
+def _format_timings(timings):
+    """get a summary of the load durations of a plugin
+
+    Args:
+        timings (dict): the durations in seconds, keys: 'import', 'wait' and
+            'initialise'
+
+    Returns:
+        str: the total and the individual durations in milliseconds, the wait
+            for requirements is listed separately
+    """
+    parts = ['{} {:.0f}ms'.format(step, timings[step] * 1000)
+             for step in ('import', 'initialise') if step in timings]
+    text = '{:.0f}ms ({})'.format(_get_load_duration(timings) * 1000,
+                                  ', '.join(parts))
+    if timings.get('wait'):
+        text += ', waited {:.0f}ms for requirements'.format(
+            timings['wait'] * 1000)
+    return text
+
+
 def function_name(func):
     try:
         # standard function
@@ -46,6 +86,11 @@ def plugininfo(dummy0, dummy1, *args):
             continue
         lines.append("<b>[ {} ]</b>".format(plugin["metadata"]["module.path"]))
 
+        # load durations
+        if plugin.get("timings"):
+            lines.append("<b>loaded in:</b> {}".format(
+                _format_timings(plugin["timings"])))
+
         # admin commands
         if plugin["commands"]["admin"]:
             lines.append("<b>admin commands:</b> <pre>{}</pre>".format(
@@ -117,6 +162,157 @@ def plugininfo(dummy0, dummy1, *args):
     return message
 
 
+@command.register(admin=True)
+def pluginstartup(dummy0, dummy1, *args):
+    """list the plugins that took the longest to load
+
+    Plugins load concurrently, the time a plugin waited for its requirements
+    overlaps with the load of other plugins and is listed separately.
+
+    Args:
+        dummy0 (hangupsbot.core.HangupsBot): unused
+        dummy1 (hangupsbot.event.ConversationEvent): unused
+        args (str): optional, the number of plugins to list, defaults to 10
+
+    Returns:
+        str: the plugins sorted by the duration of their import and
+            initialisation
+    """
+    limit = int(args[0]) if args and args[0].isdigit() else 10
+
+    loaded = sorted(
+        ((_get_load_duration(plugin["timings"]), module_path,
+          plugin["timings"])
+         for module_path, plugin in plugins.tracking.list.items()
+         if plugin.get("timings")),
+        key=lambda entry: entry[0], reverse=True)
+    if not loaded:
+        return _("nothing to display")
+
+    lines = [_("<b>{} plugins, {:.2f}s spent loading, {:.2f}s waiting for "
+               "requirements, slowest:</b>").format(
+                   len(loaded), sum(entry[0] for entry in loaded),
+                   sum(entry[2].get('wait', 0) for entry in loaded))]
+    for dummy, module_path, timings in loaded[:limit]:
+        lines.append("... <b>{}</b>: {}".format(module_path,
+                                               _format_timings(timings)))
+    return "\n".join(lines)
+
+
+def _format_latency(summary):
+    """get a short summary of recorded durations
+
+    Args:
+        summary (dict): see `utils.workers.LatencyStats.summary()`
+
+    Returns:
+        str: the percentiles and the maximum in milliseconds
+    """
+    return "p50 {:.0f}ms, p95 {:.0f}ms, max {:.0f}ms, {} calls".format(
+        summary['p50'] * 1000, summary['p95'] * 1000, summary['max'] * 1000,
+        summary['count'])
+
+
+def _start_capture(args):
+    """start a cProfile capture
+
+    Args:
+        args (tuple[str]): optional, the duration in seconds
+
+    Returns:
+        str: a status message
+    """
+    duration = (int(args[0]) if args and args[0].isdigit()
+                else DEFAULT_CAPTURE_DURATION)
+    duration = min(max(duration, 1), MAX_CAPTURE_DURATION)
+    if not PROFILER.start_capture(duration):
+        return _("a capture is already running")
+    return _("capture started, get the result with <b>profile report</b> "
+             "in {}s").format(duration)
+
+
+def _get_capture_report():
+    """get the result of the last cProfile capture
+
+    Returns:
+        str: the escaped report or a status message
+    """
+    if PROFILER.capturing:
+        return _("the capture is still running")
+    if PROFILER.capture_report is None:
+        return _("no capture available")
+    return "<pre>{}</pre>".format(
+        html.escape(PROFILER.capture_report.strip(), quote=False))
+
+
+def _list_durations(action):
+    """list the recorded durations per handler or per plugin
+
+    Args:
+        action (str): 'plugins' or the number of handlers to list
+
+    Returns:
+        str: the status of the profiler and the slowest entries
+
+    Raises:
+        Help: invalid arguments
+    """
+    if action == 'plugins':
+        entries = sorted(PROFILER.by_plugin().items(),
+                         key=lambda entry: entry[1]['p95'], reverse=True)
+        lines = ["... <b>{}</b>: {}".format(module_path,
+                                            _format_latency(summary))
+                 for module_path, summary in entries]
+    elif action.isdigit():
+        lines = []
+        for key, summary in PROFILER.slowest(int(action)):
+            lines.append("... <b>{}</b> {}.{}: {}".format(
+                *key, _format_latency(summary)))
+    else:
+        raise Help(_('Check Arguments'))
+
+    header = _("<b>profiler is {}, slow threshold {}s</b>").format(
+        'on' if PROFILER.enabled else 'off', PROFILER.slow_threshold)
+    if not lines:
+        lines = [_("nothing to display")]
+    return "\n".join([header] + lines)
+
+
+@command.register(admin=True)
+def profile(dummy0, dummy1, *args):
+    """list the slowest handlers and commands or toggle the profiler
+
+    Args:
+        dummy0 (hangupsbot.core.HangupsBot): unused
+        dummy1 (hangupsbot.event.ConversationEvent): unused
+        args (str): optional, one of
+            <number> of handlers to list, defaults to 10
+            'plugins' to list the plugins by their 95th percentile
+            'on'/'off' to toggle the timing
+            'reset' to drop the recorded durations
+            'capture [<seconds>]' to run cProfile for a time window
+            'report' to show the result of the last capture
+
+    Returns:
+        str: the command output
+    """
+    action = args[0].lower() if args else '10'
+
+    if action in ('on', 'off'):
+        PROFILER.enabled = action == 'on'
+        message = _("profiler is {}").format(action)
+    elif action == 'reset':
+        PROFILER.reset()
+        message = _("dropped the recorded durations")
+    elif action == 'capture':
+        message = _start_capture(args[1:])
+    elif action == 'report':
+        message = _get_capture_report()
+    else:
+        message = _list_durations(action)
+    return message
+
+
 def _compose_load_message(module_path, result):
     """get a formatted message
 
@@ -17,6 +17,13 @@ from datetime import datetime
 
 import hangups.event
 
+from hangupsbot import metrics
+
+
+SAVE_SECONDS = metrics.histogram(
+    'hangupsbot_json_save_seconds', 'duration of a json dump per file',
+    ('file',))
+
 
 class Config(collections.MutableMapping):
     """Configuration JSON storage class
@@ -39,6 +46,7 @@ class Config(collections.MutableMapping):
         self._timer_save = None
         self.on_reload = hangups.event.Event('%s reload' % name)
         self.logger = logging.getLogger(name)
+        self._save_seconds = SAVE_SECONDS.labels(os.path.basename(path))
 
     @property
     def _changed(self):
@@ -249,6 +257,7 @@ class Config(collections.MutableMapping):
                 file.write(self._last_dump)
 
         interval = time.time() - start_time
+        self._save_seconds.observe(interval)
         self.logger.info("%s write %s", self.filename, interval)
 
     def flush(self):
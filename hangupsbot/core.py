@@ -25,8 +25,12 @@ from hangupsbot.hangups_conversation import (
     HangupsConversation,
     HangupsConversationList,
 )
+from hangupsbot.scheduler import Scheduler
+from hangupsbot.sinks import metrics as metrics_sink
 from hangupsbot.sync.handler import SyncHandler
 from hangupsbot.sync.sending_queue import AsyncQueue
+from hangupsbot.utils import http
+from hangupsbot.utils.profiler import PROFILER
 
 
 logger = logging.getLogger(__name__)
@@ -49,6 +53,26 @@ DEFAULT_CONFIG = {
 
     # number of threads for parallel execution
     "max_threads": 10,
+
+    # connections of the shared http pool, see `utils.http`
+    "http_connection_limit": 100,
+    "http_connection_limit_per_host": 10,
+    # in seconds
+    "http_timeout": 30,
+    # count
+    "http_cache_size": 512,
+
+    # serve metrics at http://{metrics_host}:{metrics_port}/metrics,
+    #  collection is disabled without a port
+    "metrics_host": "127.0.0.1",
+    "metrics_port": None,
+    # in seconds
+    "metrics_lag_interval": 1,
+
+    # time handlers and commands, see `/bot profile`
+    "profiler_enabled": False,
+    # in seconds
+    "profiler_slow_threshold": 1,
 }
 
 
@@ -79,6 +103,7 @@ class HangupsBot:
         self.tags = None  # tagging.Tags
         self.conversations = None  # permamem.ConversationMemory
         self.sync = None  # sync.handler.SyncHandler
+        self.scheduler = None  # scheduler.Scheduler
 
         self._locales = {}
 
@@ -330,8 +355,13 @@ class HangupsBot:
         await plugins.unload_all(self)
         await plugins.tracking.clear()
         await command.clear()
+        metrics_sink.close()
+        PROFILER.stop_capture()
         await sinks.aiohttp_servers.clear()
+        await http.POOL.close()
 
+        if self.scheduler is not None:
+            await self.scheduler.close()
         if self.sync is not None:
             await self.sync.close()
         if self._handlers is not None:
@@ -616,6 +646,13 @@ class HangupsBot:
 
         await self._handlers.setup(self._conv_list)
 
+        # persistent jobs wait for the plugins to register their handlers
+        self.scheduler = Scheduler()
+        self.scheduler.setup()
+
+        metrics_sink.start(self)
+        PROFILER.configure(self.config)
+
         await plugins.load(self, "sync")
         await plugins.load(self, "commands.plugincontrol")
         await plugins.load(self, "commands.alias")
@@ -4,12 +4,16 @@ import asyncio
 import inspect
 import logging
 import shlex
+import time
 import uuid
 
 import hangups
 import hangups.parsers
 
-from hangupsbot import plugins
+from hangupsbot import (
+    metrics,
+    plugins,
+)
 from hangupsbot.base_models import BotMixin
 from hangupsbot.commands import command
 from hangupsbot.event import (
@@ -19,10 +23,17 @@ from hangupsbot.event import (
 )
 from hangupsbot.exceptions import HangupsBotExceptions
 from hangupsbot.utils.cache import Cache
+from hangupsbot.utils.profiler import PROFILER
 
 
 logger = logging.getLogger(__name__)
 
+EVENTS = metrics.counter(
+    'hangupsbot_events', 'events handled per pluggable', ('pluggable',))
+PLUGGABLE_SECONDS = metrics.histogram(
+    'hangupsbot_pluggable_seconds',
+    'duration of all handlers of a pluggable per event', ('pluggable',))
+
 
 class EventHandler(BotMixin):
     """Handle Hangups conversation events"""
@@ -42,6 +53,9 @@ class EventHandler(BotMixin):
             "watermark": [],
         }
 
+        # pluggable name -> (events counter, duration histogram)
+        self._metrics = {}
+
         # timeout for messages to be received for reprocessing: 6hours
         receive_timeout = 60 * 60 * 6
 
@@ -95,8 +109,9 @@ class EventHandler(BotMixin):
         current_plugin = plugins.tracking.current
         self.pluggables[pluggable].append(
             (function, priority, current_plugin["metadata"], expected, names))
-        # sort by priority
-        self.pluggables[pluggable].sort(key=lambda tup: tup[1])
+        # sort by priority, plugins that load concurrently keep their order
+        self.pluggables[pluggable].sort(
+            key=lambda tup: (tup[1], tup[2].get("load.order", 0)))
         plugins.tracking.register_handler(function, pluggable, priority)
 
     def register_context(self, context):
@@ -325,6 +340,7 @@ class EventHandler(BotMixin):
             message = "%s: %s.%s %s" % (
                 name, meta['module.path'], function.__name__, id(args)
             )
+            started = time.monotonic() if PROFILER.enabled else None
             try:
                 # a function may use not all args or kwargs, filter here
                 positional = (
@@ -361,21 +377,35 @@ class EventHandler(BotMixin):
                     message, args, kwargs
                 )
                 logger.exception('%s: handler error', message)
-
+            finally:
+                if started is not None:
+                    PROFILER.record(name, meta['module.path'],
+                                    function.__name__,
+                                    time.monotonic() - started, args=args)
+
+        handlers = self.pluggables[name].copy()
+        bound = self._metrics.get(name)
+        if bound is None:
+            bound = self._metrics[name] = (EVENTS.labels(name),
+                                           PLUGGABLE_SECONDS.labels(name))
+        counter, histogram = bound
+        counter.inc()
+        start = time.monotonic()
         try:
             if kwargs.pop('_run_concurrent_', False):
                 await asyncio.gather(
                     *[_run_single_handler(function, meta, expected, names)
                       for function, dummy, meta, expected, names
-                      in self.pluggables[name].copy()])
+                      in handlers])
                 return
 
-            for (function, dummy, meta, expected, names
-                 ) in self.pluggables[name].copy():
+            for function, dummy, meta, expected, names in handlers:
                 await _run_single_handler(function, meta, expected, names)
 
         except HangupsBotExceptions.SuppressAllHandlers:
             pass
+        finally:
+            histogram.observe(time.monotonic() - start)
 
     async def _handle_event(self, conv_event):
         """Handle conversation events
@@ -1,7 +1,5 @@
 """enhanced hangups conversation that supports a fallback to cached data"""
-import asyncio
 import logging
-import random
 import time
 
 import hangups
@@ -10,10 +8,17 @@ from hangups import hangouts_pb2
 from hangupsbot.base_models import BotMixin
 from hangupsbot.sync.parser import MessageSegmentHangups
 from hangupsbot.utils.cache import Cache
+from hangupsbot.utils.rate_limit import RateLimiter
 
 
 logger = logging.getLogger(__name__)
 
+# (rate, burst) for all sent messages and for messages per conversation
+RATE_LIMITS = {
+    'global': (10, 20),
+    'conv': (2, 5),
+}
+
 
 class HangupsConversation(hangups.conversation.Conversation, BotMixin):
     """Conversation with fallback to permamem
@@ -22,6 +27,8 @@ class HangupsConversation(hangups.conversation.Conversation, BotMixin):
         see `hangups.conversation.Conversation`
     """
     _cache = Cache(default_timeout=60 * 60, name='Event Id Storage')
+    _rate_limiter = RateLimiter(*RATE_LIMITS['global'], limits=RATE_LIMITS,
+                                name='hangouts')
 
     @classmethod
     def register_cache(cls):
@@ -225,7 +232,10 @@ class HangupsConversation(hangups.conversation.Conversation, BotMixin):
 
         request = hangouts_pb2.SendChatMessageRequest(**kwargs)
 
+        rate_limit_key = ('conv', self.id_)
         for retry in range(5):
+            # failed attempts back off before the next one
+            await self._rate_limiter.acquire('global', rate_limit_key)
             try:
                 await self._client.send_chat_message(request)
             except hangups.NetworkError as err:
@@ -248,16 +258,18 @@ class HangupsConversation(hangups.conversation.Conversation, BotMixin):
                         'send_message failed %s: %r',
                         id(err), err
                     )
+                    # the next message should not wait for this one
+                    self._rate_limiter.reset(rate_limit_key)
                 else:
                     logger.info(
                         'send_message failed %s: %r',
                         id(err), err
                     )
+                    self._rate_limiter.back_off(rate_limit_key)
             else:
+                self._rate_limiter.succeeded(rate_limit_key)
                 break
 
-            await asyncio.sleep(random.randint(1, 5))
-
 
 class HangupsConversationList(hangups.conversation.ConversationList, BotMixin):
     conv_cls = HangupsConversation
@@ -0,0 +1,191 @@
+"""import heavy dependencies on first use and measure import times"""
+__author__ = 'das7pad@outlook.com'
+
+import importlib
+import importlib.abc
+import logging
+import sys
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+class LazyModule:
+    """a placeholder for a module that gets imported on first attribute access
+
+    Usage: `Image = LazyModule('PIL.Image')` at module level and use `Image`
+    like the module, e.g. `Image.open(...)`.
+
+    Args:
+        name (str): the absolute module path
+    """
+    __slots__ = ('_name', '_module')
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def load(self):
+        """import the module if not already done
+
+        Returns:
+            module: the imported module
+
+        Raises:
+            ImportError: the module is not available
+        """
+        if self._module is None:
+            start = time.monotonic()
+            self._module = importlib.import_module(self._name)
+            logger.debug('imported %s on first use in %.3fs',
+                         self._name, time.monotonic() - start)
+        return self._module
+
+    @property
+    def loaded(self):
+        """check whether the module got imported already
+
+        Returns:
+            bool: True if the module is available without an import
+        """
+        return self._module is not None or self._name in sys.modules
+
+    def __getattr__(self, name):
+        return getattr(self.load(), name)
+
+    def __repr__(self):
+        return '<%s %r%s>' % (self.__class__.__name__, self._name,
+                              '' if self._module is None else ' (loaded)')
+
+
+class _TimedLoader:
+    """wrap a loader to measure the execution time of a module
+
+    Args:
+        loader (importlib.abc.Loader): the original loader
+        timer (ImportTimer): the collector of the timings
+    """
+    __slots__ = ('_loader', '_timer')
+
+    def __init__(self, loader, timer):
+        self._loader = loader
+        self._timer = timer
+
+    def create_module(self, spec):
+        """delegate the module creation to the original loader"""
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        """execute the module with the original loader and track the time
+
+        Args:
+            module (module): the new module
+        """
+        # restore the original loader for resource lookups and reloads
+        module.__loader__ = module.__spec__.loader = self._loader
+        self._timer.enter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._timer.exit(module.__name__)
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+
+class ImportTimer(importlib.abc.MetaPathFinder):
+    """measure the time spent in each module import, like `-X importtime`
+
+    Usage: `with ImportTimer() as timer: import x` and `timer.summary()`.
+
+    The time of a module excludes the time spent in nested imports.
+    """
+    __slots__ = ('timings', '_stack')
+
+    def __init__(self):
+        self.timings = {}  # module name -> (self time, cumulative time)
+        self._stack = []  # [start, time in nested imports]
+
+    def __enter__(self):
+        sys.meta_path.insert(0, self)
+        return self
+
+    def __exit__(self, *dummys):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, fullname, path, target=None):
+        """find the spec with the remaining finders and time its loader
+
+        Args:
+            fullname (str): the absolute module path
+            path (list): the search locations of the parent package
+            target (module): a module that gets reloaded
+
+        Returns:
+            importlib.machinery.ModuleSpec: the spec or None if the remaining
+                finders should handle the import without a timer
+        """
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            if not hasattr(spec.loader, 'exec_module'):
+                # namespace packages and legacy loaders
+                return None
+            spec.loader = _TimedLoader(spec.loader, self)
+            return spec
+        return None
+
+    def enter(self):
+        """start the timer for a module"""
+        self._stack.append([time.monotonic(), 0.])
+
+    def exit(self, name):
+        """stop the timer for a module
+
+        Args:
+            name (str): the absolute module path
+        """
+        start, nested = self._stack.pop()
+        cumulative = time.monotonic() - start
+        if self._stack:
+            self._stack[-1][1] += cumulative
+        self.timings[name] = (cumulative - nested, cumulative)
+
+    def summary(self, limit=10):
+        """sum up the time per top level package
+
+        Args:
+            limit (int): the number of packages to include
+
+        Returns:
+            list[tuple[str, float, int]]: package name, time in seconds and the
+                number of imported modules, sorted by time, slowest first
+        """
+        packages = {}
+        for name, (self_time, dummy) in self.timings.items():
+            package = name.split('.', 1)[0]
+            total, count = packages.get(package, (0., 0))
+            packages[package] = (total + self_time, count + 1)
+        ranking = sorted(((name, total, count)
+                          for name, (total, count) in packages.items()),
+                         key=lambda entry: entry[1], reverse=True)
+        return ranking[:limit]
+
+    def log_summary(self, limit=10):
+        """log the total import time and the slowest packages on debug level
+
+        Args:
+            limit (int): the number of packages to include
+        """
+        total = sum(self_time for self_time, dummy in self.timings.values())
+        logger.info('imported %s modules in %.3fs', len(self.timings), total)
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
+        for name, duration, count in self.summary(limit):
+            logger.debug('import time %.3fs %s (%s modules)',
+                         duration, name, count)
@@ -0,0 +1,190 @@
+"""write log records in a background thread"""
+__author__ = 'das7pad@outlook.com'
+
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUEUE_SIZE = 10000
+
+_STATE = {
+    'handler': None,
+    'listener': None,
+}
+
+_FORMATTER = logging.Formatter()
+
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """queue records for a listener thread, drop records on a full queue
+
+    The message is merged with its arguments and the exception is formatted
+    in the logging thread, the listener thread only writes the records.
+    Dropped records are counted and reported once the queue has space again.
+
+    Args:
+        queue_ (queue.Queue): a bounded queue
+    """
+
+    def __init__(self, queue_):
+        super().__init__(queue_)
+        self.dropped = 0
+        self.queued = 0
+        self._unreported = 0
+
+    def prepare(self, record):
+        """merge the args into the message and format the exception
+
+        The record is shared with the other handlers, queue a copy.
+
+        Args:
+            record (logging.LogRecord): the record to queue
+
+        Returns:
+            logging.LogRecord: a copy without references to args/tracebacks
+        """
+        msg = record.getMessage()
+        record = copy.copy(record)
+        record.msg = msg
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = _FORMATTER.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        """add a record to the queue, count it as dropped on a full queue
+
+        Args:
+            record (logging.LogRecord): a prepared record
+        """
+        if self._unreported:
+            report = logging.makeLogRecord({
+                'name': __name__,
+                'levelno': logging.WARNING,
+                'levelname': logging.getLevelName(logging.WARNING),
+                'msg': 'logging queue was full, dropped %s records' % (
+                    self._unreported),
+            })
+            try:
+                self.queue.put_nowait(report)
+            except queue.Full:
+                pass
+            else:
+                self._unreported = 0
+
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            self._unreported += 1
+        else:
+            self.queued += 1
+
+
+class BlockingQueueListener(logging.handlers.QueueListener):
+    """a listener that waits for space in the queue to stop"""
+
+    def enqueue_sentinel(self):
+        """queue the stop signal after the pending records"""
+        self.queue.put(self._sentinel)
+
+
+class JsonFormatter(logging.Formatter):
+    """format a record as a single line json object
+
+    usage in a `logging.system` config:
+    `{"()": "hangupsbot.logs.JsonFormatter"}` as formatter
+    """
+
+    def format(self, record):
+        """serialize the record
+
+        Args:
+            record (logging.LogRecord): the record to format
+
+        Returns:
+            str: a json object with the keys time, level, logger, message and
+                optional exception and stack
+        """
+        entry = {
+            'time': self.formatTime(record, self.datefmt),
+            'created': record.created,
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        if record.stack_info:
+            entry['stack'] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str)
+
+
+def setup_queue(size=DEFAULT_QUEUE_SIZE):
+    """move the handlers of the root logger into a background thread
+
+    The handlers keep their level, formatter and filters. The listener is
+    stopped on exit after the pending records are written.
+
+    Args:
+        size (int): maximum number of pending records, 0 for no limit
+
+    Returns:
+        BoundedQueueHandler: the new handler of the root logger or None if
+            the root logger has no handler
+    """
+    root = logging.getLogger()
+    handlers = list(root.handlers)
+    if not handlers:
+        return None
+
+    queue_ = queue.Queue(size)
+    handler = BoundedQueueHandler(queue_)
+    listener = BlockingQueueListener(queue_, *handlers,
+                                     respect_handler_level=True)
+    for handler_ in handlers:
+        root.removeHandler(handler_)
+    root.addHandler(handler)
+    listener.start()
+    atexit.register(stop_queue)
+
+    _STATE['handler'] = handler
+    _STATE['listener'] = listener
+    logger.debug('logging via a queue for %s handlers', len(handlers))
+    return handler
+
+
+def stop_queue():
+    """write the pending records and stop the listener thread"""
+    listener = _STATE['listener']
+    if listener is None:
+        return
+    _STATE['listener'] = None
+    listener.stop()
+
+
+def get_stats():
+    """get the counters of the logging queue
+
+    Returns:
+        dict: the number of `queued`, `dropped` and `pending` records, empty
+            if the logging queue is not active
+    """
+    handler = _STATE['handler']
+    if handler is None:
+        return {}
+    return {
+        'queued': handler.queued,
+        'dropped': handler.dropped,
+        'pending': handler.queue.qsize(),
+    }
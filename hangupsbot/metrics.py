@@ -0,0 +1,425 @@
+"""collect counters, gauges and histograms in the Prometheus text format"""
+__author__ = 'das7pad@outlook.com'
+
+import bisect
+import logging
+import math
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (.005, .01, .025, .05, .1, .25, .5, 1., 2.5, 5., 10.)
+
+# metric name -> family
+_REGISTRY = {}
+
+
+class _Child:
+    """base for a metric with bound label values
+
+    Collection is disabled by default, see `set_enabled`.
+    """
+    __slots__ = ()
+    enabled = False
+
+
+class CounterChild(_Child):
+    """a monotonic counter"""
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount=1):
+        """increase the counter
+
+        Args:
+            amount (int): a positive number
+        """
+        if self.enabled:
+            self.value += amount
+
+    def samples(self):
+        """get the current value
+
+        Returns:
+            list[tuple[str, dict, float]]: suffix, extra labels and value
+        """
+        return [('_total', {}, self.value)]
+
+
+class GaugeChild(_Child):
+    """a value that may go up and down"""
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0
+
+    def set(self, value):
+        """replace the current value
+
+        Args:
+            value (float): the new value
+        """
+        if self.enabled:
+            self.value = value
+
+    def inc(self, amount=1):
+        """increase the value
+
+        Args:
+            amount (float): a positive or negative number
+        """
+        if self.enabled:
+            self.value += amount
+
+    def samples(self):
+        """get the current value
+
+        Returns:
+            list[tuple[str, dict, float]]: suffix, extra labels and value
+        """
+        return [('', {}, self.value)]
+
+
+class HistogramChild(_Child):
+    """count observations per bucket
+
+    Args:
+        buckets (tuple[float]): sorted upper bounds of the buckets
+    """
+    __slots__ = ('_buckets', '_counts', 'count', 'sum')
+
+    def __init__(self, buckets):
+        self._buckets = buckets
+        self._counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.
+
+    def observe(self, value):
+        """record a value
+
+        Args:
+            value (float): e.g. a duration in seconds
+        """
+        if self.enabled:
+            self._counts[bisect.bisect_left(self._buckets, value)] += 1
+            self.count += 1
+            self.sum += value
+
+    def samples(self):
+        """get the cumulative bucket counts, the sum and the count
+
+        Returns:
+            list[tuple[str, dict, float]]: suffix, extra labels and value
+        """
+        samples = []
+        cumulative = 0
+        for bound, count in zip(self._buckets + (math.inf,), self._counts):
+            cumulative += count
+            samples.append(('_bucket', {'le': _format_value(bound)},
+                            cumulative))
+        samples.append(('_sum', {}, self.sum))
+        samples.append(('_count', {}, self.count))
+        return samples
+
+
+class Family:
+    """a metric with label names, bind label values with `.labels()`
+
+    Args:
+        name (str): the metric name, e.g. `hangupsbot_events`
+        documentation (str): the help text
+        type_ (str): 'counter', 'gauge' or 'histogram'
+        labelnames (tuple[str]): names of the labels
+        buckets (tuple[float]): upper bounds for histogram buckets
+    """
+    __slots__ = ('name', 'documentation', 'type', 'labelnames', '_buckets',
+                 '_children')
+
+    _CHILDREN = {
+        'counter': CounterChild,
+        'gauge': GaugeChild,
+    }
+
+    def __init__(self, name, documentation, type_, *, labelnames=(),
+                 buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.type = type_
+        self.labelnames = tuple(labelnames)
+        self._buckets = tuple(sorted(float(bound) for bound in buckets))
+        self._children = {}
+
+    def labels(self, *values):
+        """get the metric for the given label values
+
+        Bind the result once and reuse it on the hot path.
+
+        Args:
+            values (str): a value per label name, strings only
+
+        Returns:
+            mixed: the bound metric, a `CounterChild`, `GaugeChild` or
+                `HistogramChild` instance
+
+        Raises:
+            ValueError: the number of values does not match the label names
+        """
+        child = self._children.get(values)
+        if child is not None:
+            return child
+
+        if len(values) != len(self.labelnames):
+            raise ValueError('%s: expected %s label values, got %r' % (
+                self.name, len(self.labelnames), values))
+
+        if self.type == 'histogram':
+            child = HistogramChild(self._buckets)
+        else:
+            child = self._CHILDREN[self.type]()
+        self._children[values] = child
+        return child
+
+    def collect(self):
+        """get the samples of all bound metrics
+
+        Returns:
+            list[tuple[str, dict, float]]: metric name, labels and value
+        """
+        samples = []
+        for values, child in list(self._children.items()):
+            labels = dict(zip(self.labelnames, values))
+            for suffix, extra, value in child.samples():
+                samples.append((self.name + suffix, dict(labels, **extra),
+                                value))
+        return samples
+
+
+class CallbackFamily:
+    """a gauge or counter with values from a callback, evaluated on each
+    collection
+
+    Args:
+        name (str): the metric name
+        documentation (str): the help text
+        callback (callable): returns a number for a metric without labels or
+            a dict: label value (str or tuple of str) -> number
+        labelnames (tuple[str]): names of the labels
+        type_ (str): 'gauge' or 'counter' for monotonic values
+    """
+    __slots__ = ('name', 'documentation', 'type', 'labelnames', 'callback')
+
+    def __init__(self, name, documentation, callback, labelnames=(), *,
+                 type_='gauge'):
+        self.name = name
+        self.documentation = documentation
+        self.type = type_
+        self.labelnames = tuple(labelnames)
+        self.callback = callback
+
+    def collect(self):
+        """get the current values from the callback
+
+        Returns:
+            list[tuple[str, dict, float]]: metric name, labels and value
+        """
+        try:
+            values = self.callback()
+        except Exception:  # pylint: disable=broad-except
+            logger.exception('%s: callback failed', self.name)
+            return []
+
+        name = self.name + '_total' if self.type == 'counter' else self.name
+        if not isinstance(values, dict):
+            return [(name, {}, values)]
+
+        samples = []
+        for label_values, value in values.items():
+            if not isinstance(label_values, tuple):
+                label_values = (label_values,)
+            samples.append((name, dict(zip(self.labelnames, label_values)),
+                            value))
+        return samples
+
+
+def _register(family):
+    """add a metric to the registry, reuse an existing one on module reloads
+
+    Args:
+        family (mixed): a new `Family` or `CallbackFamily` instance
+
+    Returns:
+        mixed: the registered metric, `family` or the existing instance
+
+    Raises:
+        ValueError: the name is registered with another type or labels
+    """
+    existing = _REGISTRY.get(family.name)
+    if existing is None:
+        _REGISTRY[family.name] = family
+        return family
+
+    if (existing.type != family.type
+            or existing.labelnames != family.labelnames
+            or type(existing) is not type(family)):
+        raise ValueError('%s: already registered as %s%r' % (
+            family.name, existing.type, existing.labelnames))
+
+    if isinstance(family, CallbackFamily):
+        existing.callback = family.callback
+    return existing
+
+
+def counter(name, documentation, labelnames=()):
+    """get a counter, the `_total` suffix is added on output
+
+    Args:
+        name (str): the metric name
+        documentation (str): the help text
+        labelnames (tuple[str]): names of the labels
+
+    Returns:
+        Family: bind the label values with `.labels(...)`
+    """
+    return _register(Family(name, documentation, 'counter',
+                            labelnames=labelnames))
+
+
+def gauge(name, documentation, labelnames=()):
+    """get a gauge
+
+    Args:
+        name (str): the metric name
+        documentation (str): the help text
+        labelnames (tuple[str]): names of the labels
+
+    Returns:
+        Family: bind the label values with `.labels(...)`
+    """
+    return _register(Family(name, documentation, 'gauge',
+                            labelnames=labelnames))
+
+
+def histogram(name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+    """get a histogram
+
+    Args:
+        name (str): the metric name
+        documentation (str): the help text
+        labelnames (tuple[str]): names of the labels
+        buckets (tuple[float]): upper bounds of the buckets
+
+    Returns:
+        Family: bind the label values with `.labels(...)`
+    """
+    return _register(Family(name, documentation, 'histogram',
+                            labelnames=labelnames, buckets=buckets))
+
+
+def gauge_callback(name, documentation, callback, labelnames=()):
+    """register a gauge that is read from a callback on collection
+
+    Args:
+        name (str): the metric name
+        documentation (str): the help text
+        callback (callable): see `CallbackFamily`
+        labelnames (tuple[str]): names of the labels
+
+    Returns:
+        CallbackFamily: the registered metric
+    """
+    return _register(CallbackFamily(name, documentation, callback,
+                                    labelnames))
+
+
+def counter_callback(name, documentation, callback, labelnames=()):
+    """register a counter that is read from a callback on collection
+
+    The `_total` suffix is added on output.
+
+    Args:
+        name (str): the metric name
+        documentation (str): the help text
+        callback (callable): see `CallbackFamily`, the values must not
+            decrease
+        labelnames (tuple[str]): names of the labels
+
+    Returns:
+        CallbackFamily: the registered metric
+    """
+    return _register(CallbackFamily(name, documentation, callback,
+                                    labelnames, type_='counter'))
+
+
+def set_enabled(enabled):
+    """toggle the collection of counters, gauges and histograms
+
+    Args:
+        enabled (bool): True to record values
+    """
+    _Child.enabled = bool(enabled)
+
+
+def is_enabled():
+    """check whether values are recorded
+
+    Returns:
+        bool: True if the collection is enabled
+    """
+    return _Child.enabled
+
+
+def _format_value(value):
+    """format a number for the text format
+
+    Args:
+        value (float): the number
+
+    Returns:
+        str: the formatted number
+    """
+    if value == math.inf:
+        return '+Inf'
+    if value == -math.inf:
+        return '-Inf'
+    if isinstance(value, float) and value.is_integer():
+        return '%.1f' % value
+    return repr(value)
+
+
+def _escape(value):
+    """escape a label value
+
+    Args:
+        value (str): the raw value
+
+    Returns:
+        str: the escaped value
+    """
+    return (str(value).replace('\\', r'\\').replace('\n', r'\n')
+            .replace('"', r'\"'))
+
+
+def render():
+    """get all metrics in the Prometheus text format
+
+    Returns:
+        str: the exposition, version 0.0.4
+    """
+    lines = []
+    for name, family in sorted(_REGISTRY.items()):
+        if family.type == 'counter':
+            name += '_total'
+        lines.append('# HELP %s %s' % (
+            name, family.documentation.replace('\\', r'\\')
+            .replace('\n', r'\n')))
+        lines.append('# TYPE %s %s' % (name, family.type))
+        for sample_name, labels, value in family.collect():
+            if labels:
+                sample_name += '{%s}' % ','.join(
+                    '%s="%s"' % (key, _escape(label))
+                    for key, label in labels.items())
+            lines.append('%s %s' % (sample_name, _format_value(value)))
+    lines.append('')
+    return '\n'.join(lines)
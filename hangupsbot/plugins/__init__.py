@@ -10,6 +10,7 @@ import logging
 import os
 import re
 import sys
+import time
 
 from hangupsbot import utils
 from hangupsbot.base_models import (
@@ -18,6 +19,7 @@ from hangupsbot.base_models import (
 )
 from hangupsbot.commands import command
 from hangupsbot.sinks import aiohttp_terminate
+from hangupsbot.utils.http import HttpClient
 
 
 logger = logging.getLogger(__name__)
@@ -52,30 +54,56 @@ class Protected(utils.FormatBaseException):
     _template = _('Tried to load the plugin "%s" which is marked as protected')
 
 
+def _current_task():
+    """get the running task
+
+    Returns:
+        asyncio.Task: the task or None if called outside of a task
+    """
+    try:
+        return asyncio.Task.current_task()
+    except RuntimeError:
+        # no event loop in the current thread
+        return None
+
+
 class Tracker(BotMixin):
     """used by the plugin loader to keep track of loaded commands
     designed to accommodate the dual command registration model (via function or
     decorator)
+
+    A registration belongs to the task that started it, plugins may load
+    concurrently in separate tasks. Calls from outside of a loading task
+    extend the latest started registration.
+
+    Each start gets a `load.order` in its metadata, handlers with the same
+    priority run in this order regardless of the order the loads finish.
     """
 
     def __init__(self):
         self.list = {}
-        self._current = {}
-        self._running = False
-        self.reset()
+        self._registrations = {}  # asyncio.Task -> registration
+        self._load_order = 0
+        self._idle = self._new_registration()
         TrackingMixin.set_tracking(self)
 
     async def clear(self):
         """clear all entries"""
+        self._registrations.clear()
         self.reset()
         for plugin_data in self.list.values():
             for task in plugin_data["asyncio.task"]:
                 task.cancel()
         self.list.clear()
 
-    def reset(self):
-        """clear the entries of the current plugin registration"""
-        self._current = {
+    @staticmethod
+    def _new_registration():
+        """get an empty registration
+
+        Returns:
+            dict: the registration structure of a plugin
+        """
+        return {
             "commands": {
                 "admin": [],
                 "user": [],
@@ -90,46 +118,100 @@ class Tracker(BotMixin):
             "asyncio.task": [],
             "aiohttp.web": [],
             "aiohttp.session": [],
+            "timings": {},
         }
 
+    def _get_key(self):
+        """get the key of the registration for the caller
+
+        Returns:
+            asyncio.Task: the current or latest loading task, None if idle
+        """
+        task = _current_task()
+        if task in self._registrations:
+            return task
+        keys = list(self._registrations)
+        return keys[-1] if keys else None
+
+    def _get_current(self):
+        """get the registration for the caller
+
+        Returns:
+            dict: the registration, see `._new_registration()` for details
+        """
+        return self._registrations.get(self._get_key(), self._idle)
+
+    def reset(self):
+        """clear the entries of the current plugin registration"""
+        key = self._get_key()
+        if key is None:
+            self._idle = self._new_registration()
+        else:
+            self._registrations[key] = self._new_registration()
+
+    def next_load_order(self):
+        """reserve the position of a plugin in the handler lists
+
+        Returns:
+            int: a position after all previously reserved ones
+        """
+        self._load_order += 1
+        return self._load_order
+
     async def start(self, metadata):
         """start gathering new plugin functionality, extend existing data
 
         Args:
-            metadata (dict): required keys: 'module' and 'module.path'
+            metadata (dict): required keys: 'module' and 'module.path',
+                optional: 'load.order', see `.next_load_order()`
         """
-        waited = 0
-        while self._running and waited < 100:
-            await asyncio.sleep(0.1)
-            waited += 1
-
-        self.end()  # cleanup from recent run
-        self._running = True
+        metadata.setdefault("load.order", self.next_load_order())
+        task = _current_task()
+        for key in list(self._registrations):
+            if key is task or key is not None and key.done():
+                # cleanup from recent run
+                self._end(key)
 
         module_path = metadata['module.path']
 
         if module_path in self.list:
             # extend the last registration
-            self._current = self.list[module_path]
+            registration = self.list[module_path]
+        else:
+            registration = self._new_registration()
 
         # overwrite the metadata for the current run
-        self._current["metadata"] = metadata
+        registration["metadata"] = metadata
+        self._registrations[task] = registration
 
     @property
     def current(self):
         """merge admin and user plugins and return the current registration
 
         Returns:
-            dict: gathered data of the current plugin, see .reset() for details
+            dict: gathered data of the current plugin, see
+                `._new_registration()` for details
         """
-        self._current["commands"]["all"] = list(
-            set(self._current["commands"]["admin"] +
-                self._current["commands"]["user"]))
-        return self._current
+        current = self._get_current()
+        current["commands"]["all"] = list(
+            set(current["commands"]["admin"] +
+                current["commands"]["user"]))
+        return current
 
     def end(self):
         """save the current module data and register tagged commands"""
-        current_module = self.current
+        self._end(self._get_key())
+
+    def _end(self, key):
+        """save the module data of a registration and register tagged commands
+
+        Args:
+            key (asyncio.Task): the key of the registration, None if idle
+        """
+        current_module = self._registrations.pop(key, self._idle)
+        current_module["commands"]["all"] = list(
+            set(current_module["commands"]["admin"] +
+                current_module["commands"]["user"]))
         if not current_module['metadata']:
             # empty plugin data, last run is already finished
             return
@@ -149,14 +231,12 @@ class Tracker(BotMixin):
                     # priories admin-linked tags if both exist
                     break
 
-        self.reset()  # remove current data from the registration
-        self._running = False
-
     def register_command(self, type_, command_names, tags=None):
         """call during plugin init to register commands"""
-        current_commands = self._current["commands"][type_]
+        current = self._get_current()
+        current_commands = current["commands"][type_]
         current_commands.extend([item.lower() for item in command_names])
-        self._current["commands"][type_] = list(set(current_commands))
+        current["commands"][type_] = list(set(current_commands))
 
         user_setting = self.bot.config.get_option('plugins.tags.auto-register')
         if user_setting is None:
@@ -188,13 +268,13 @@ class Tracker(BotMixin):
             recursive_tag_format(command_tags,
                                  command=command_name,
                                  type=type_,
-                                 plugin=self._current["metadata"]["module"])
+                                 plugin=current["metadata"]["module"])
 
             self.register_tags(type_, command_name, command_tags)
 
     def register_tags(self, type_, command_name, tags):
         """add a tagged command to the plugin tracking"""
-        commands_tagged = self._current["commands"]["tagged"]
+        commands_tagged = self._get_current()["commands"]["tagged"]
         commands_tagged.setdefault(command_name, {})
         commands_tagged[command_name].setdefault(type_, set())
 
@@ -210,7 +290,7 @@ class Tracker(BotMixin):
 
     def register_handler(self, function, pluggable, priority):
         """see module method"""
-        self._current["handlers"].append((function, pluggable, priority))
+        self._get_current()["handlers"].append((function, pluggable, priority))
 
     def register_shared(self, identifier, objectref):
         """track a registered shared
@@ -219,21 +299,23 @@ class Tracker(BotMixin):
             identifier (str): a unique identifier for the objectref
             objectref (mixed): the shared object
         """
-        self._current["shared"].append((identifier, objectref))
+        self._get_current()["shared"].append((identifier, objectref))
 
     def register_aiohttp_web(self, group):
         """track the group(name) of an aiohttp listener"""
-        if group not in self._current["aiohttp.web"]:
-            self._current["aiohttp.web"].append(group)
+        groups = self._get_current()["aiohttp.web"]
+        if group not in groups:
+            groups.append(group)
 
     def register_asyncio_task(self, task):
         """add a single asyncio.Task to the plugin tracking"""
-        self._current["asyncio.task"].append(task)
+        self._get_current()["asyncio.task"].append(task)
 
     def register_arg_preprocessor_group(self, name):
         """add a argument preprocessor to the plugin tracking"""
-        if name not in self._current["commands"]["argument.preprocessors"]:
-            self._current["commands"]["argument.preprocessors"].append(name)
+        groups = self._get_current()["commands"]["argument.preprocessors"]
+        if name not in groups:
+            groups.append(name)
 
     def register_aiohttp_session(self, session):
         """register a session that will be closed on plugin unload
@@ -241,7 +323,7 @@ class Tracker(BotMixin):
         Args:
             session (aiohttp.ClientSession): a session to track
         """
-        self._current["aiohttp.session"].append(session)
+        self._get_current()["aiohttp.session"].append(session)
 
 
 tracking = Tracker()  # pylint:disable=invalid-name
@@ -333,6 +415,21 @@ def register_shared(identifier, objectref):
     tracking.bot.register_shared(identifier, objectref)
 
 
+def register_job_handler(name, handler):
+    """register a handler for jobs of the scheduler
+
+    signature: handler(bot, payload)
+
+    Args:
+        name (str): a unique identifier for the handler, e.g. `plugin.job`
+        handler (callable): coroutine function, see doc body for footprint
+
+    Raises:
+        ValueError: the handler is not a coroutine function
+    """
+    tracking.bot.scheduler.register_handler(name, handler)
+
+
 def start_asyncio_task(coro, *args, **kwargs):
     """start an async callable and track its execution
 
@@ -376,6 +473,20 @@ def register_aiohttp_session(session):
     tracking.register_aiohttp_session(session)
 
 
+def get_http_client(headers=None):
+    """get a client for the shared connection pool, closed on plugin unload
+
+    Args:
+        headers (dict): default headers for each request
+
+    Returns:
+        hangupsbot.utils.http.HttpClient: a new client
+    """
+    client = HttpClient(headers=headers)
+    tracking.register_aiohttp_session(client)
+    return client
+
+
 # plugin loader
 
 def retrieve_all_plugins(plugin_path=None, must_start_with=None,
@@ -513,27 +624,157 @@ def get_configured_plugins(bot):
     return plugin_list
 
 
-async def load_user_plugins(bot):
-    """loads all user plugins
+class LoadPlan:
+    """load plugins concurrently, a plugin waits for its requirements
+
+    A plugin module may declare requirements that need to be available before
+    its `_initialise` runs:
+        `REQUIRED_PLUGINS`: module paths, e.g. `('sync', 'plugins.image')`
+        `REQUIRED_SHARED`: identifiers of shared objects, e.g.
+            `('dnd.user_check',)`
+
+    Required plugins outside of the plan need to be loaded already. Waiting
+    plugins continue once every pending plugin of the plan is waiting, e.g. on
+    a dependency cycle or on a shared object that no plugin registers.
+
+    The positions in the handler lists are reserved in the order of the
+    plan, handlers with the same priority run in this order like with a
+    sequential load. Other registrations, e.g. commands and shared objects,
+    happen in the order the plugins finish their initialisation; a plugin
+    that extends or overrides the registration of another plugin needs to
+    declare it as requirement.
 
     Args:
         bot (hangupsbot.core.HangupsBot): the running instance
-
-    Raises:
-        CancelledError: shutdown in progress
+        module_paths (list[str]): the plugins to load, in the order of imports
     """
-    plugin_list = get_configured_plugins(bot)
+    __slots__ = ('_bot', '_module_paths', '_load_order', '_pending',
+                 '_waiting', '_changed')
+
+    def __init__(self, bot, module_paths):
+        self._bot = bot
+        self._module_paths = list(dict.fromkeys(module_paths))
+        self._load_order = {module_path: tracking.next_load_order()
+                            for module_path in self._module_paths}
+        self._pending = set(self._module_paths)
+        self._waiting = set()
+        self._changed = asyncio.Condition()
+
+    async def run(self):
+        """load all plugins of the plan
+
+        Raises:
+            CancelledError: shutdown in progress
+        """
+        await asyncio.gather(*(self._load(module_path)
+                               for module_path in self._module_paths))
+
+    async def _load(self, module_path):
+        """load a single plugin and release the waiting plugins
+
+        Args:
+            module_path (str): python import style relative to the main script
 
-    for module in plugin_list:
-        module_path = "plugins.{}".format(module)
+        Raises:
+            CancelledError: shutdown in progress
+        """
         try:
-            await load(bot, module_path)
+            await load(self._bot, module_path, plan=self)
         except asyncio.CancelledError:
             logger.warning('plugin load for %r got cancelled',
                            module_path)
             raise
         except Exception:  # pylint: disable=broad-except
             logger.exception(module_path)
+        finally:
+            self._pending.discard(module_path)
+            await self._notify()
+
+    async def _notify(self):
+        """wake the waiting plugins to check their requirements"""
+        async with self._changed:
+            self._changed.notify_all()
+
+    def _get_missing(self, required_plugins, required_shared):
+        """get the requirements that are not available yet
+
+        Args:
+            required_plugins (tuple[str]): module paths of required plugins
+            required_shared (tuple[str]): identifiers of shared objects
+
+        Returns:
+            list[str]: the missing plugins and shared objects
+        """
+        missing = [module_path for module_path in required_plugins
+                   if module_path in self._pending]
+        missing.extend(identifier for identifier in required_shared
+                       if identifier not in self._bot.shared)
+        return missing
+
+    def get_load_order(self, module_path):
+        """get the reserved position of a plugin in the handler lists
+
+        Args:
+            module_path (str): python import style relative to the main script
+
+        Returns:
+            int: the position, see `Tracker.next_load_order()`
+        """
+        return self._load_order[module_path]
+
+    async def wait_for_requirements(self, module_path, module):
+        """wait for the required plugins and shared objects of a module
+
+        Args:
+            module_path (str): python import style relative to the main script
+            module (module): the imported plugin module
+        """
+        required_plugins = tuple(getattr(module, 'REQUIRED_PLUGINS', ()))
+        required_shared = tuple(getattr(module, 'REQUIRED_SHARED', ()))
+
+        unknown = [path for path in required_plugins
+                   if path not in self._pending and path not in tracking.list]
+        if unknown:
+            logger.warning('%s: required plugins are not loaded: %s',
+                           module_path, unknown)
+
+        if not self._get_missing(required_plugins, required_shared):
+            return
+
+        self._waiting.add(module_path)
+        # the plan may be stalled now
+        await self._notify()
+        try:
+            async with self._changed:
+                await self._changed.wait_for(
+                    lambda: (not self._get_missing(required_plugins,
+                                                   required_shared)
+                             or self._waiting >= self._pending))
+        finally:
+            self._waiting.discard(module_path)
+
+        missing = self._get_missing(required_plugins, required_shared)
+        if missing:
+            logger.warning('%s: continue without %s', module_path, missing)
+
+
+async def load_user_plugins(bot):
+    """loads all user plugins
+
+    Args:
+        bot (hangupsbot.core.HangupsBot): the running instance
+
+    Raises:
+        CancelledError: shutdown in progress
+    """
+    plugin_list = get_configured_plugins(bot)
+
+    start = time.monotonic()
+    plan = LoadPlan(bot, ["plugins.{}".format(module)
+                          for module in plugin_list])
+    await plan.run()
+    logger.info('loaded %s plugins in %.2fs',
+                len(plugin_list), time.monotonic() - start)
 
 
 async def unload_all(bot):
@@ -570,13 +811,17 @@ def _is_protected_module(module_name):
     return bool(PROTECTED_MODULES.fullmatch(module_name))
 
 
-async def load(bot, module_path, module_name=None):
+async def load(bot, module_path, module_name=None, plan=None):
     """loads a single plugin-like object as identified by module_path
 
+    The durations of the import, the wait for requirements and the
+    initialisation are tracked in the `timings` of the plugin registration.
+
     Args:
         bot (hangupsbot.core.HangupsBot): the running instance
         module_path (str): python import style relative to the main script
         module_name (str): custom name
+        plan (LoadPlan): optional, wait for the requirements of the plugin
 
     Returns:
         bool: True if the plugin was loaded successfully
@@ -593,14 +838,27 @@ async def load(bot, module_path, module_name=None):
 
     module_name = module_name or module_path.split(".")[-1]
 
-    await tracking.start({"module": module_name, "module.path": module_path})
+    metadata = {"module": module_name, "module.path": module_path}
+    if plan is not None:
+        metadata["load.order"] = plan.get_load_order(module_path)
+    await tracking.start(metadata)
+    timings = tracking.current["timings"]
 
-    if not load_module(module_path):
+    start = time.monotonic()
+    loaded = load_module(module_path)
+    timings["import"] = time.monotonic() - start
+    if not loaded:
         tracking.end()
         await unload(bot, module_path)
         return False
 
     real_module_path = 'hangupsbot.' + module_path
+    if plan is not None:
+        start = time.monotonic()
+        await plan.wait_for_requirements(module_path,
+                                         sys.modules[real_module_path])
+        timings["wait"] = time.monotonic() - start
+
     setattr(sys.modules[real_module_path], 'print', utils.print_to_logger)
     if hasattr(sys.modules[real_module_path], "hangups_shim"):
         logger.error(
@@ -614,6 +872,7 @@ async def load(bot, module_path, module_name=None):
     candidate_commands = []
 
     # gather functions and run optional callable _initialise or _initialize
+    start = time.monotonic()
     try:
         for function_name, the_function in public_functions:
             if function_name not in ("_initialise", "_initialize"):
@@ -644,6 +903,8 @@ async def load(bot, module_path, module_name=None):
         tracking.end()
         await unload(bot, module_path)
         return False
+    finally:
+        timings["initialise"] = time.monotonic() - start
 
     # register filtered functions
     # tracking.current and the CommandDispatcher might be out of sync if a
@@ -740,6 +1001,7 @@ async def unload(bot, module_path):
     bot._handlers.deregister_plugin(module_path)
     # pylint:enable=protected-access
     bot.sync.deregister_plugin(module_path)
+    bot.scheduler.deregister_plugin(module_path)
 
     shared = plugin["shared"]
     for shared_def in shared:
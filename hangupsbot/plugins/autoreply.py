@@ -1,4 +1,5 @@
 # TODO(das7pad): refactor needed
+import asyncio
 import json
 import logging
 import random
@@ -13,6 +14,11 @@ from hangupsbot.sync import event as sync_events
 
 logger = logging.getLogger(__name__)
 
+_RE_BACKREFERENCE = re.compile(r"\\[1-9]|\(\?P=")
+
+# (conv_id, merge) -> RuleSet
+_CACHE = {}
+
 HELP = {
     "autoreply": _(
         "adds or removes an autoreply.\nFormat:\nadd:\n {bot_cmd} autoreply add"
@@ -30,20 +36,20 @@ def _initialise(bot):
         "autoreply",
     ])
     plugins.register_help(HELP)
+    plugins.start_asyncio_task(_watch_config)
     bot.config.set_defaults({"autoreplies_enabled": True})
 
 
 async def _handle_autoreply(bot, event):
     config_autoreplies = bot.get_config_suboption(event.conv.id_,
                                                   'autoreplies_enabled')
-    tagged_autoreplies = "autoreplies-enable" in bot.tags.useractive(
-        event.user_id.chat_id, event.conv.id_)
+    user_tags = bot.tags.useractive(event.user_id.chat_id, event.conv.id_)
+    tagged_autoreplies = "autoreplies-enable" in user_tags
 
     if not (config_autoreplies or tagged_autoreplies):
         return
 
-    if "autoreplies-disable" in bot.tags.useractive(event.user_id.chat_id,
-                                                    event.conv.id_):
+    if "autoreplies-disable" in user_tags:
         logger.debug("explicitly disabled by tag for %s %s",
                      event.user_id.chat_id, event.conv_id)
         return
@@ -62,9 +68,84 @@ async def _handle_autoreply(bot, event):
     else:
         raise RuntimeError("unhandled event type")
 
+    rules = _get_rules(bot, event.conv_id)
+    for sentences in rules.match(event.text or "", event_type):
+        if isinstance(sentences, list):
+            message = random.choice(sentences)
+        else:
+            message = sentences
+
+        await send_reply(bot, event, message)
+
+
+def _get_fingerprint(value):
+    """get a cheap identifier for a config entry
+
+    `autoreply add|remove` and `config append|remove` change the length of the
+    list, `config set` replaces the list object. A config reload swaps the
+    content in place and is handled by `_clear_cache`.
+
+    Args:
+        value (mixed): the config entry
+
+    Returns:
+        mixed: a value that changes with the entry
+    """
+    if isinstance(value, list):
+        return id(value), len(value)
+    return value
+
+
+def _merge_rules(rules_local, rules_global):
+    """add the global rules without overlapping triggers to the conv rules
+
+    Args:
+        rules_local (list): the per-conversation autoreplies
+        rules_global (list): the global autoreplies
+
+    Returns:
+        list: a new list with the per-conversation rules first
+    """
+    rules = list(rules_local or ())
+    if not rules_global:
+        return rules
+
+    def _freeze(entries):
+        return {frozenset([frozenset(x) if isinstance(x, list) else x,
+                           frozenset(y) if isinstance(y, list) else y])
+                for x, y in entries}
+
+    # If the global settings loaded from get_config_suboption then we have
+    # them twice and don't need them, so can be ignored.
+    if _freeze(rules_global) == _freeze(rules):
+        return rules
+
+    # Iterate through each of the triggers in the global list and if they
+    # match any of the triggers in the conv list then discard them.
+    # Per-conv triggers take precedent.
+    for kwds_gbl, sentences_gbl in rules_global:
+        for kwds_lcl, dummy in rules_local or ():
+            if type(kwds_gbl) is type(kwds_lcl) is list and (
+                    set(kwds_gbl) & set(kwds_lcl)):
+                break
+        else:
+            rules.append([kwds_gbl, sentences_gbl])
+    return rules
+
+
+def _get_rules(bot, conv_id):
+    """get the compiled autoreplies of a conversation
+
+    Args:
+        bot (hangupsbot.core.HangupsBot): the running instance
+        conv_id (str): conversation identifier
+
+    Returns:
+        RuleSet: the cached or a new rule set
+    """
     # get_config_suboption returns the conv specific autoreply settings. If
     # none set, it returns the global settings.
-    autoreplies_list = bot.get_config_suboption(event.conv_id, 'autoreplies')
+    rules_local = bot.get_config_suboption(conv_id, 'autoreplies')
 
     # option to merge per-conversation and global autoreplies, by:
     # * tagging a conversation with "autoreplies-merge" explicitly or by
@@ -74,70 +155,37 @@ async def _handle_autoreply(bot, event):
     #  conversation
     # (by default per-conversation autoreplies replaces global autoreplies
     # settings completely)
+    merge = bool("autoreplies-merge" in bot.tags.convactive(conv_id)
+                 or bot.config.get_option('autoreplies.merge'))
+    rules_global = bot.config.get_option('autoreplies') if merge else None
+
+    # a changed merge tag selects a different entry
+    key = (conv_id, merge)
+    source = (_get_fingerprint(rules_local), _get_fingerprint(rules_global))
+    rules = _CACHE.get(key)
+    if rules is None or rules.source != source:
+        rules = _CACHE[key] = RuleSet(
+            _merge_rules(rules_local, rules_global), source)
+    return rules
 
-    tagged_autoreplies_merge = "autoreplies-merge" in bot.tags.convactive(
-        event.conv_id)
-    config_autoreplies_merge = bot.config.get_option(
-        'autoreplies.merge') or False
-
-    if tagged_autoreplies_merge or config_autoreplies_merge:
-
-        # load any global settings as well
-        autoreplies_list_global = bot.config.get_option('autoreplies')
-
-        # If the global settings loaded from get_config_suboption then we now
-        # have them twice and don't need them, so can be ignored.
-        if (autoreplies_list_global
-                and ({frozenset([frozenset(x) if isinstance(x, list) else x,
-                                 frozenset(y) if isinstance(y, list) else y])
-                      for x, y in autoreplies_list_global}
-                     != {frozenset([frozenset(x) if isinstance(x, list) else x,
-                                    frozenset(y) if isinstance(y, list) else y])
-                         for x, y in autoreplies_list})):
-
-            add_to_autoreplies = []
-
-            # If the two are different, then iterate through each of the
-            # triggers in the global list and if they
-            # match any of the triggers in the conv list then discard them.
-            # Any remaining at the end of the loop are added to the first list
-            #  to form a consolidated list
-            # of per-conv and global triggers & replies, with per-conv taking
-            # precedent.
-
-            # Loop through list of global triggers e.g. ["hi","hello","hey"],
-            # ["baf","BAF"].
-            for kwds_gbl, sentences_gbl in autoreplies_list_global:
-                overlap = False
-                for kwds_lcl, dummy in autoreplies_list:
-                    if type(kwds_gbl) is type(kwds_lcl) is list and (
-                            set(kwds_gbl) & set(kwds_lcl)):
-                        overlap = True
-                        break
-                if not overlap:
-                    add_to_autoreplies.extend([[kwds_gbl, sentences_gbl]])
-
-            # Extend original list with non-discarded entries.
-            autoreplies_list.extend(add_to_autoreplies)
-
-    if autoreplies_list:
-        for kwds, sentences in autoreplies_list:
-
-            if isinstance(sentences, list):
-                message = random.choice(sentences)
-            else:
-                message = sentences
 
-            if isinstance(kwds, list):
-                for trigger in kwds:
-                    if _words_in_text(trigger, event.text) or trigger == "*":
-                        logger.info("matched chat: %s", trigger)
-                        await send_reply(bot, event, message)
-                        break
+def _clear_cache():
+    """drop all compiled rules, e.g. after a config reload"""
+    _CACHE.clear()
 
-            elif event_type == kwds:
-                logger.info("matched event: %s", kwds)
-                await send_reply(bot, event, message)
+
+async def _watch_config(bot):
+    """clear the cache on config reload until the plugin is unloaded
+
+    Args:
+        bot (hangupsbot.core.HangupsBot): the running instance
+    """
+    bot.config.on_reload.add_observer(_clear_cache)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        bot.config.on_reload.remove_observer(_clear_cache)
+        _clear_cache()
 
 
 async def send_reply(bot, event, message):
@@ -210,17 +258,112 @@ async def send_reply(bot, event, message):
     return True
 
 
-def _words_in_text(word, text):
-    """Return True if word is in text"""
+def _get_expression(trigger):
+    """get the regex for a trigger that matches only whole words
 
-    if word.startswith("regex:"):
-        word = word[6:]
+    Args:
+        trigger (str): plain text or a regex with the prefix `regex:`
+
+    Returns:
+        str: the regex
+    """
+    if trigger.startswith("regex:"):
+        word = trigger[6:]
     else:
-        word = re.escape(word)
+        word = re.escape(trigger)
+
+    return r"(?<!\w)" + word + r"(?!\w)"
+
+
+class RuleSet:
+    """compiled autoreplies, finds all matching rules in one pass
 
-    regex = r"(?<!\w)" + word + r"(?!\w)"
+    The triggers of all rules are combined into a single regex with a named
+    group per rule. A scan without match rules out every trigger. After a
+    match, the remaining rules are checked with their own regex, as matches
+    of other rules at the same position or overlapping it are not reported.
 
-    return bool(re.search(regex, text, re.IGNORECASE))
+    Args:
+        rules (list): pairs of triggers and replies, see `autoreplies`
+        source (mixed): the fingerprint of the config entries
+    """
+    __slots__ = ('source', '_replies', '_wildcard', '_events', '_patterns',
+                 '_separate', '_combined')
+
+    def __init__(self, rules, source=None):
+        self.source = source
+        self._replies = []
+        # rule indices that match any text
+        self._wildcard = set()
+        # event type -> rule indices
+        self._events = {}
+        # rule index -> compiled regex of all triggers
+        self._patterns = {}
+        # rule indices that can not be part of the combined regex
+        self._separate = []
+        self._combined = None
+
+        parts = []
+        for index, (triggers, replies) in enumerate(rules):
+            self._replies.append(replies)
+            if not isinstance(triggers, list):
+                self._events.setdefault(triggers, []).append(index)
+                continue
+            if "*" in triggers:
+                self._wildcard.add(index)
+                continue
+            if not triggers:
+                continue
+
+            expression = "|".join("(?:%s)" % _get_expression(trigger)
+                                  for trigger in triggers)
+            try:
+                self._patterns[index] = re.compile(expression, re.IGNORECASE)
+            except re.error as err:
+                logger.warning("invalid trigger in %r: %s", triggers, err)
+                continue
+
+            if _RE_BACKREFERENCE.search(expression):
+                # group numbers change in the combined regex
+                self._separate.append(index)
+            else:
+                parts.append("(?P<rule%d>%s)" % (index, expression))
+
+        if not parts:
+            return
+        try:
+            self._combined = re.compile("|".join(parts), re.IGNORECASE)
+        except re.error as err:
+            # e.g. a group name of a regex trigger is used twice
+            logger.info("can not combine triggers: %s", err)
+            self._separate = sorted(self._patterns)
+
+    def match(self, text, event_type):
+        """get the replies of all matching rules in config order
+
+        Args:
+            text (str): the message text
+            event_type (str): 'MESSAGE', 'JOIN', 'LEAVE' or 'RENAME'
+
+        Returns:
+            list: the replies of each matching rule
+        """
+        indices = set(self._wildcard)
+        indices.update(self._events.get(event_type, ()))
+
+        candidates = list(self._separate)
+        if self._combined is not None:
+            found = {int(match.lastgroup[4:])
+                     for match in self._combined.finditer(text)}
+            if found:
+                indices.update(found)
+                candidates.extend(index for index in self._patterns
+                                  if index not in found)
+
+        patterns = self._patterns
+        indices.update(index for index in candidates
+                       if index not in indices and patterns[index].search(text))
+        return [self._replies[index] for index in sorted(indices)]
 
 
 def autoreply(bot, event, *args):
@@ -243,12 +386,14 @@ def autoreply(bot, event, *args):
         if isinstance(value, list):
             value.append(json.loads(argument))
             bot.config.save()
+            _clear_cache()
         else:
             html = "Append failed on non-list"
     elif cmd == 'remove':
         if isinstance(value, list):
             value.remove(json.loads(argument))
             bot.config.save()
+            _clear_cache()
         else:
             html = "Remove failed on non-list"
 
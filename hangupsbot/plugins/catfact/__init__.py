@@ -7,12 +7,15 @@ from hangupsbot import plugins
 
 logger = logging.getLogger(__name__)
 
+_INTERNAL = {"http": None}
+
 HELP = {
     'catfact': _('get catfacts'),
 }
 
 
 def _initialise():
+    _INTERNAL["http"] = plugins.get_http_client()
     plugins.register_user_command([
         "catfact",
     ])
@@ -23,11 +26,8 @@ async def catfact(dummy0, dummy1, *args):
     number = args[0] if args and args[0].isdigit() else 1
     url = "https://catfact.ninja/facts?limit={}".format(number)
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                response.raise_for_status()
-                raw = await response.json()
-                facts = [fact['fact'] for fact in raw['data']]
+        raw = await _INTERNAL["http"].get_json(url)
+        facts = [fact['fact'] for fact in raw['data']]
     except (aiohttp.ClientError, KeyError) as err:
         text = "Unable to get catfacts right now"
         logger.info('catfact %s: %r', id(args), args)
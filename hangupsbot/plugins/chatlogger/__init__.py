@@ -0,0 +1,201 @@
+"""log conversations to disk, one file per conversation
+
+config:
+    'chatlogger.path': directory for the logs, required
+    'chatlogger.format': 'text', 'json' for json lines or 'both'
+    'chatlogger.max_open_files': limit for open file handles
+    'chatlogger.flush_interval': seconds between two writes to disk
+    'chatlogger.rotate_size': rotate a log above this size in MiB, 0 to disable
+    'chatlogger.rotate_daily': toggle to start a new log file each day
+    'chatlogger.compress': toggle to gzip rotated log files
+"""
+import json
+import logging
+import pathlib
+
+import hangups
+
+from hangupsbot import plugins
+
+from .writer import LogWriter
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONFIG = {
+    'chatlogger.format': 'text',
+    'chatlogger.max_open_files': 32,
+    'chatlogger.flush_interval': 1,
+    'chatlogger.rotate_size': 0,
+    'chatlogger.rotate_daily': False,
+    'chatlogger.compress': False,
+}
+
+FORMATS = ('text', 'json', 'both')
+
+
+def _initialise(bot):
+    bot.config.set_defaults(DEFAULT_CONFIG)
+    file_writer = FileWriter(bot)
+
+    if file_writer.initialised:
+        for writer in file_writer.writers:
+            plugins.start_asyncio_task(writer.run)
+        plugins.register_handler(file_writer.on_membership_change, "membership")
+        plugins.register_handler(file_writer.on_rename, "rename")
+        plugins.register_handler(file_writer.on_chat_message, "allmessages")
+
+
+class FileWriter:
+    paths = []
+    initialised = False
+
+    def __init__(self, bot):
+        self.paths = []
+        self.writers = []
+        self.initialised = False
+
+        chatlogger_path = bot.config.get_option('chatlogger.path')
+        if chatlogger_path:
+            self.paths.append(chatlogger_path)
+
+        self.paths = list(set(self.paths))
+
+        log_format = bot.config['chatlogger.format']
+        if log_format not in FORMATS:
+            logger.warning('invalid format %r, expected one of %r',
+                           log_format, FORMATS)
+            log_format = 'text'
+        self.text = log_format in ('text', 'both')
+        self.json = log_format in ('json', 'both')
+
+        for path in self.paths:
+            directory = pathlib.Path(path)  # type: pathlib.Path
+            if not directory.exists():
+                try:
+                    directory.mkdir(parents=True, exist_ok=True)
+                except OSError as err:
+                    logger.warning(
+                        'create path %r failed: %r',
+                        path, err
+                    )
+                    continue
+
+            self.writers.append(LogWriter(
+                path,
+                max_open=bot.config['chatlogger.max_open_files'],
+                flush_interval=bot.config['chatlogger.flush_interval'],
+                max_size=int(bot.config['chatlogger.rotate_size'] * 2 ** 20),
+                daily=bot.config['chatlogger.rotate_daily'],
+                compress=bot.config['chatlogger.compress'],
+            ))
+            logger.info("stored in: %s", path)
+
+        if self.writers:
+            self.initialised = True
+
+    def _append_to_file(self, conversation_id, text, record):
+        """queue a log entry for each configured path and format
+
+        Args:
+            conversation_id (str): the conversation identifier
+            text (str): the entry in the text format
+            record (dict): the entry for the json lines format
+        """
+        line = None
+        if self.json:
+            line = json.dumps(record, ensure_ascii=False) + "\n"
+        for writer in self.writers:
+            if self.text:
+                writer.write(conversation_id + ".txt", text)
+            if line is not None:
+                writer.write(conversation_id + ".jsonl", line)
+
+    @staticmethod
+    def _get_record(bot, event, type_, **kwargs):
+        """get the common fields of a json log entry
+
+        Args:
+            bot (hangupsbot.core.HangupsBot): the running instance
+            event (hangupsbot.event.ConversationEvent): a message container
+            type_ (str): the event type
+            kwargs (dict): additional fields
+
+        Returns:
+            dict: the log entry
+        """
+        record = {
+            'type': type_,
+            'timestamp': event.timestamp.isoformat(),
+            'conv_id': event.conv_id,
+            'conv_name': bot.conversations.get_name(event.conv),
+            'user_id': event.user_id.chat_id,
+            'user_name': event.user.full_name,
+        }
+        record.update(kwargs)
+        return record
+
+    def on_chat_message(self, bot, event):
+        event_timestamp = event.timestamp
+
+        conversation_id = event.conv_id
+        conversation_name = bot.conversations.get_name(event.conv)
+        conversation_text = event.text
+
+        user_full_name = event.user.full_name
+
+        text = "--- {}\n{} :: {}\n{}\n".format(conversation_name,
+                                               event_timestamp, user_full_name,
+                                               conversation_text)
+        record = self._get_record(bot, event, 'message',
+                                  text=conversation_text)
+
+        self._append_to_file(conversation_id, text, record)
+
+    def on_membership_change(self, bot, event):
+        event_timestamp = event.timestamp
+
+        conversation_id = event.conv_id
+        conversation_name = bot.conversations.get_name(event.conv)
+
+        user_full_name = event.user.full_name
+
+        event_users = [event.conv.get_user(user_id) for user_id
+                       in event.conv_event.participant_ids]
+        names = ', '.join([user.full_name for user in event_users])
+
+        if event.conv_event.type_ == hangups.MEMBERSHIP_CHANGE_TYPE_JOIN:
+            text = "--- {}\n{} :: {}\nADDED: {}\n".format(conversation_name,
+                                                          event_timestamp,
+                                                          user_full_name, names)
+            type_ = 'join'
+        else:
+            text = "--- {}\n{}\n{} left \n".format(conversation_name,
+                                                   event_timestamp, names)
+            type_ = 'leave'
+        record = self._get_record(
+            bot, event, type_,
+            participants=[user.full_name for user in event_users])
+
+        self._append_to_file(conversation_id, text, record)
+
+    def on_rename(self, bot, event):
+        event_timestamp = event.timestamp
+
+        conversation_id = event.conv_id
+        conversation_name = bot.conversations.get_name(event.conv)
+
+        user_full_name = event.user.full_name
+
+        text = (
+            "--- {conv}\n"
+            "{time} :: {user}\n"
+            "CONVERSATION RENAMED: {conv}\n"
+        ).format(
+            conv=conversation_name,
+            time=event_timestamp,
+            user=user_full_name,
+        )
+        record = self._get_record(bot, event, 'rename')
+
+        self._append_to_file(conversation_id, text, record)
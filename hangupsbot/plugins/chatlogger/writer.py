@@ -0,0 +1,148 @@
+"""buffered log writer with rotation, file access runs in a worker thread"""
+__author__ = 'das7pad@outlook.com'
+
+import collections
+import datetime
+import gzip
+import logging
+import os
+import shutil
+
+from hangupsbot.utils.workers import BatchWorker
+
+
+logger = logging.getLogger(__name__)
+
+
+class LogWriter(BatchWorker):
+    """append text to log files in batches
+
+    Writes are collected on the event loop and flushed periodically in a
+    single worker thread, which keeps the order per file. The least recently
+    used file handles are closed above `max_open` open files.
+
+    A log file is rotated once it exceeds `max_size` bytes or, with `daily`
+    set, on the first write of a new day. The rotated segment is renamed to
+    `<name>.<timestamp><suffix>` and is optionally compressed with gzip.
+
+    Args:
+        directory (str): location of the log files
+        max_open (int): limit for open file handles
+        flush_interval (float): time in seconds between two flushes
+        max_size (int): size in bytes to rotate a file at, 0 to disable
+        daily (bool): toggle to rotate the files once per day
+        compress (bool): toggle to gzip the rotated segments
+    """
+    __slots__ = ('_directory', '_max_open', '_max_size', '_daily',
+                 '_compress', '_handles')
+
+    def __init__(self, directory, *, max_open=32, flush_interval=1.,
+                 max_size=0, daily=False, compress=False):
+        super().__init__(flush_interval)
+        self._directory = directory
+        self._max_open = max(1, max_open)
+        self._max_size = max_size
+        self._daily = daily
+        self._compress = compress
+        self._pending = collections.OrderedDict()
+        # filename -> (file object, date of the current segment)
+        self._handles = collections.OrderedDict()
+
+    def write(self, filename, text):
+        """queue text for a log file
+
+        Args:
+            filename (str): name of the log file inside the directory
+            text (str): the content to append
+        """
+        self._pending.setdefault(filename, []).append(text)
+
+    def close(self):
+        """write the queued text and close all files, blocks until done"""
+        super().close()
+        while self._handles:
+            self._handles.popitem()[1][0].close()
+
+    def _take_pending(self):
+        """swap the queued text
+
+        Returns:
+            collections.OrderedDict: filename -> list of strings
+        """
+        pending = self._pending
+        self._pending = collections.OrderedDict()
+        return pending
+
+    def _flush(self, pending):
+        """append the text to the files, runs in the worker thread
+
+        Args:
+            pending (collections.OrderedDict): filename -> list of strings
+        """
+        for filename, chunks in pending.items():
+            text = ''.join(chunks)
+            try:
+                file = self._get_handle(filename, len(text))
+                file.write(text)
+                file.flush()
+            except OSError as err:
+                logger.error('write to %r failed: %r', filename, err)
+
+    def _get_handle(self, filename, size):
+        """get an open file, rotate it if necessary
+
+        Args:
+            filename (str): name of the log file inside the directory
+            size (int): number of bytes that are about to be written
+
+        Returns:
+            io.TextIOWrapper: a file opened for appending
+
+        Raises:
+            OSError: the file could not be opened
+        """
+        path = os.path.join(self._directory, filename)
+        today = datetime.date.today()
+        entry = self._handles.pop(filename, None)
+        if entry is None:
+            file = open(path, 'a')
+            started = today
+            if file.tell():
+                started = datetime.date.fromtimestamp(os.path.getmtime(path))
+        else:
+            file, started = entry
+
+        if file.tell() and (
+                (self._max_size and file.tell() + size > self._max_size)
+                or (self._daily and started != today)):
+            file.close()
+            self._rotate(path)
+            file = open(path, 'a')
+            started = today
+
+        self._handles[filename] = (file, started)
+        while len(self._handles) > self._max_open:
+            self._handles.popitem(last=False)[1][0].close()
+        return file
+
+    def _rotate(self, path):
+        """move a full log file aside and compress it if configured
+
+        Args:
+            path (str): location of the log file
+        """
+        base, suffix = os.path.splitext(path)
+        stamp = datetime.datetime.now().strftime('%Y%m%d-%H%M%S')
+        target = '%s.%s%s' % (base, stamp, suffix)
+        index = 0
+        while os.path.exists(target) or os.path.exists(target + '.gz'):
+            index += 1
+            target = '%s.%s-%d%s' % (base, stamp, index, suffix)
+        os.rename(path, target)
+
+        if not self._compress:
+            return
+        with open(target, 'rb') as source, \
+                gzip.open(target + '.gz', 'wb') as compressed:
+            shutil.copyfileobj(source, compressed)
+        os.remove(target)
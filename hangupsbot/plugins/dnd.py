@@ -7,6 +7,9 @@ from hangupsbot import plugins
 
 logger = logging.getLogger(__name__)
 
+# chat_id -> unix timestamp of the expiry, mirrors the entries in memory
+_EXPIRIES = {}
+
 HELP = {
     'dnd': _('allow users to toggle DND for ALL conversations '
              '(i.e. no @mentions)\n{bot_cmd} dnd [<timeout in hours>]\n'
@@ -18,6 +21,11 @@ def _initialise(bot):
     _reusable = functools.partial(_user_has_dnd, bot)
     functools.update_wrapper(_reusable, _user_has_dnd)
     plugins.register_shared('dnd.user_check', _reusable)
+    _reusable_many = functools.partial(_users_have_dnd, bot)
+    functools.update_wrapper(_reusable_many, _users_have_dnd)
+    plugins.register_shared('dnd.user_check_many', _reusable_many)
+    plugins.register_job_handler('dnd.expire', _expire_dnd)
+    _load_expiries(bot)
     plugins.register_user_command([
         "dnd",
     ])
@@ -44,11 +52,15 @@ def dnd(bot, event, *args):
     donotdisturb = bot.memory["donotdisturb"]
     if initiator_chat_id in donotdisturb:
         del donotdisturb[initiator_chat_id]
+        _EXPIRIES.pop(initiator_chat_id, None)
+        bot.scheduler.cancel(_get_job_id(initiator_chat_id))
     else:
         donotdisturb[initiator_chat_id] = {
             "created": time.time(),
             "expiry": seconds_to_expire,
         }
+        _schedule_expiry(bot, initiator_chat_id,
+                         donotdisturb[initiator_chat_id])
 
     bot.memory["donotdisturb"] = donotdisturb
     bot.memory.save()
@@ -60,26 +72,92 @@ def dnd(bot, event, *args):
     return "global DND toggled OFF for {}".format(event.user.full_name)
 
 
-def _expire_dnds(bot):
-    _dict = {}
-    donotdisturb = bot.memory.get("donotdisturb")
-    for user_id in donotdisturb:
-        metadata = donotdisturb[user_id]
-        time_expiry = metadata["created"] + metadata["expiry"]
-        if time.time() < time_expiry:
-            _dict[user_id] = metadata
-
-    if len(_dict) < len(donotdisturb):
-        # some entries expired
-        bot.memory.set_by_path(["donotdisturb"], _dict)
-        bot.memory.save()
-
-
-def _user_has_dnd(bot, user_id):
-    user_has_dnd = False
-    if bot.memory.exists(["donotdisturb"]):
-        _expire_dnds(bot)  # expire records prior to check
-        donotdisturb = bot.memory.get('donotdisturb')
-        if user_id in donotdisturb:
-            user_has_dnd = True
-    return user_has_dnd
+def _get_job_id(chat_id):
+    """get the scheduler job id for the expiry of a DND
+
+    Args:
+        chat_id (str): G+ user id
+
+    Returns:
+        str: the job identifier
+    """
+    return 'dnd:%s' % chat_id
+
+
+def _schedule_expiry(bot, chat_id, metadata):
+    """track the expiry of a DND and schedule its removal
+
+    Args:
+        bot (hangupsbot.core.HangupsBot): the running instance
+        chat_id (str): G+ user id
+        metadata (dict): the DND entry with the keys "created" and "expiry"
+    """
+    due = metadata["created"] + metadata["expiry"]
+    _EXPIRIES[chat_id] = due
+    bot.scheduler.schedule(
+        'dnd.expire', payload={"chat_id": chat_id,
+                               "created": metadata["created"]},
+        due=due, job_id=_get_job_id(chat_id))
+
+
+def _load_expiries(bot):
+    """index the DND entries from memory, add missing expiry jobs
+
+    Args:
+        bot (hangupsbot.core.HangupsBot): the running instance
+    """
+    _EXPIRIES.clear()
+    if not bot.memory.exists(["donotdisturb"]):
+        return
+    for chat_id, metadata in bot.memory["donotdisturb"].items():
+        if bot.scheduler.get_job(_get_job_id(chat_id)) is None:
+            _schedule_expiry(bot, chat_id, metadata)
+        else:
+            _EXPIRIES[chat_id] = metadata["created"] + metadata["expiry"]
+
+
+async def _expire_dnd(bot, payload):
+    """remove an expired DND
+
+    Args:
+        bot (hangupsbot.core.HangupsBot): the running instance
+        payload (dict): "chat_id" and "created" timestamp of the DND entry
+    """
+    path = ["donotdisturb", payload["chat_id"]]
+    if not bot.memory.exists(path):
+        return
+    if bot.memory.get_by_path(path)["created"] != payload["created"]:
+        # the DND got toggled meanwhile
+        return
+    bot.memory.pop_by_path(path)
+    _EXPIRIES.pop(payload["chat_id"], None)
+    # the scheduler saves the memory once the job completed
+
+
+def _user_has_dnd(dummy, user_id):
+    """check the DND status of a user
+
+    Args:
+        dummy (hangupsbot.core.HangupsBot): the running instance
+        user_id (str): G+ user id
+
+    Returns:
+        bool: True if the user has an active DND, otherwise False
+    """
+    # the expiry job may be pending still
+    return _EXPIRIES.get(user_id, 0) > time.time()
+
+
+def _users_have_dnd(dummy, user_ids):
+    """check the DND status of multiple users
+
+    Args:
+        dummy (hangupsbot.core.HangupsBot): the running instance
+        user_ids (iterable[str]): G+ user ids
+
+    Returns:
+        set[str]: the user ids with an active DND
+    """
+    now = time.time()
+    return {user_id for user_id in user_ids
+            if _EXPIRIES.get(user_id, 0) > now}
@@ -17,6 +17,10 @@ from hangupsbot import plugins
 logger = logging.getLogger(__name__)
 _INTERNAL = {}
 
+# in seconds, both apis have a daily request limit
+ADDRESS_CACHE_TIMEOUT = 86400
+WEATHER_CACHE_TIMEOUT = 600
+
 HELP = {
     'setweatherlocation': _('Sets the Lat Long default coordinates for this '
                             'hangout when polling for weather data\n'
@@ -42,6 +46,7 @@ def _initialize(bot):
     api_key = bot.config.get_option('forecast_api_key')
     if api_key:
         _INTERNAL['forecast_api_key'] = api_key
+        _INTERNAL['http'] = plugins.get_http_client()
         plugins.register_user_command([
             'weather',
             'forecast',
@@ -149,11 +154,13 @@ async def _lookup_address(location):
     google_map_url = 'https://maps.googleapis.com/maps/api/geocode/json'
     payload = {'address': location}
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(google_map_url,
-                                   params=payload) as response:
-                response.raise_for_status()
-                raw = await response.json()
+        raw = await _INTERNAL['http'].get_json(
+            google_map_url,
+            params=payload,
+            cache_ttl=ADDRESS_CACHE_TIMEOUT,
+            # skip errors like `OVER_QUERY_LIMIT` and empty results
+            cacheable=lambda body: body.get('status') == 'OK',
+        )
     except aiohttp.ClientError as err:
         logger.info('lookup_address %s: %r', id(payload), location)
         logger.error('lookup_address %s: request failed: %r', id(payload), err)
@@ -183,10 +190,10 @@ async def _lookup_weather(coordinates):
                                                 coordinates['lat'],
                                                 coordinates['lng'])
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(forecast_io_url) as response:
-                response.raise_for_status()
-                raw = await response.json()
+        raw = await _INTERNAL['http'].get_json(
+            forecast_io_url,
+            cache_ttl=WEATHER_CACHE_TIMEOUT,
+        )
     except aiohttp.ClientError as err:
         logger.info('lookup_weather %s: %r', id(err), coordinates)
         logger.error('lookup_weather %s: request failed: %r', id(err), err)
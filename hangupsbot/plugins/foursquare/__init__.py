@@ -9,6 +9,11 @@ from hangupsbot.commands import Help
 
 logger = logging.getLogger(__name__)
 
+_INTERNAL = {"http": None}
+
+# in seconds
+CACHE_TIMEOUT = 3600
+
 HELP = {
     'foursquareid': _('Set the Foursquare API key for the bot\n'
                       '  Get one from https://foursquare.com/oauth'),
@@ -29,6 +34,7 @@ HELP = {
 
 
 def _initialise():
+    _INTERNAL["http"] = plugins.get_http_client()
     plugins.register_admin_command([
         "foursquareid",
         "foursquaresecret",
@@ -85,10 +91,7 @@ async def get_places(location, client_id, secret, section=None):
         return None
 
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                response.raise_for_status()
-                data = await response.json()
+        data = await _INTERNAL["http"].get_json(url, cache_ttl=CACHE_TIMEOUT)
     except aiohttp.ClientError as err:
         logger.info('get_places %s: %r', id(err), location)
         logger.error('get_places %s: failed: %r', id(err), err)
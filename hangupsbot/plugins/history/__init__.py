@@ -0,0 +1,198 @@
+"""searchable message history
+
+Messages of conversations with history enabled are stored in a sqlite
+database next to the memory file, off-the-record conversations are skipped.
+
+config:
+    'history.path': custom location of the database
+    'history.flush_interval': seconds between two batch inserts
+"""
+__author__ = 'das7pad@outlook.com'
+
+import datetime
+import html
+import logging
+import os
+
+from hangupsbot import plugins
+from hangupsbot.commands import Help
+
+from .store import (
+    HistoryStore,
+    Message,
+)
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONFIG = {
+    'history.path': None,
+    'history.flush_interval': 2,
+}
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+# characters per result
+MAX_TEXT_LENGTH = 200
+DATE_FORMAT = '%Y-%m-%d'
+
+HELP = {
+    'search': _('search the message history\n'
+                '{bot_cmd} search [conv:<conv id>|here] [user:<chat id>] '
+                '[since:<YYYY-MM-DD>] [until:<YYYY-MM-DD>] [limit:<number>] '
+                '<keywords>\n'
+                'example: <i>{bot_cmd} search here since:2018-01-31 '
+                'lunch</i>'),
+}
+
+_INTERNAL = {'store': None}
+
+
+def _initialise(bot):
+    """open the store, register the ingestion and the command
+
+    Args:
+        bot (hangupsbot.core.HangupsBot): the running instance
+    """
+    bot.config.set_defaults(DEFAULT_CONFIG)
+    path = bot.config['history.path'] or os.path.join(
+        os.path.dirname(os.path.abspath(bot.memory.filename)), 'history.db')
+    logger.info('stored in: %s', path)
+
+    store = HistoryStore(path, bot.config['history.flush_interval'])
+    _INTERNAL['store'] = store
+    plugins.start_asyncio_task(store.run)
+    plugins.register_handler(_ingest, 'allmessages')
+    plugins.register_admin_command([
+        'search',
+    ])
+    plugins.register_help(HELP)
+
+
+def _history_enabled(bot, conv_id):
+    """check the permamem history flag of a conversation
+
+    Args:
+        bot (hangupsbot.core.HangupsBot): the running instance
+        conv_id (str): conversation identifier
+
+    Returns:
+        bool: False if the conversation is off the record
+    """
+    try:
+        return bot.conversations[conv_id]['history']
+    except KeyError:
+        return True
+
+
+def _ingest(bot, event):
+    """queue a message for the store
+
+    Args:
+        bot (hangupsbot.core.HangupsBot): the running instance
+        event (hangupsbot.event.ConversationEvent): a message container
+    """
+    if not event.text or not _history_enabled(bot, event.conv_id):
+        return
+
+    _INTERNAL['store'].add(Message(
+        conv_id=event.conv_id,
+        chat_id=event.user_id.chat_id,
+        user_name=event.user.full_name,
+        timestamp=event.timestamp.timestamp(),
+        text=event.text,
+    ))
+
+
+def _parse_date(value, end_of_day=False):
+    """parse a date argument
+
+    Args:
+        value (str): date in the format YYYY-MM-DD
+        end_of_day (bool): toggle to get the last second of the day
+
+    Returns:
+        float: unix timestamp
+
+    Raises:
+        ValueError: invalid date format
+    """
+    date = datetime.datetime.strptime(value, DATE_FORMAT)
+    if end_of_day:
+        date += datetime.timedelta(days=1, microseconds=-1)
+    return date.timestamp()
+
+
+def _parse_query(event, args):
+    """split the command arguments into filters and keywords
+
+    Args:
+        event (hangupsbot.event.ConversationEvent): a message container
+        args (tuple[str]): the command arguments
+
+    Returns:
+        dict: kwargs for `HistoryStore.search`
+
+    Raises:
+        ValueError: invalid filter value
+    """
+    query = {'keywords': [], 'limit': DEFAULT_LIMIT}
+    for arg in args:
+        key, dummy, value = arg.partition(':')
+        key = key.lower()
+        if not value or key not in ('conv', 'user', 'since', 'until',
+                                    'limit'):
+            query['keywords'].append(arg)
+        elif key == 'conv':
+            query['conv_id'] = event.conv_id if value == 'here' else value
+        elif key == 'user':
+            query['chat_id'] = value
+        elif key == 'since':
+            query['since'] = _parse_date(value)
+        elif key == 'until':
+            query['until'] = _parse_date(value, end_of_day=True)
+        else:
+            query['limit'] = min(MAX_LIMIT, max(1, int(value)))
+    return query
+
+
+async def search(bot, event, *args):
+    """search the message history
+
+    Args:
+        bot (hangupsbot.core.HangupsBot): the running instance
+        event (hangupsbot.event.ConversationEvent): a message container
+        args (str): filters and keywords, see HELP for details
+
+    Returns:
+        str: the results
+
+    Raises:
+        Help: no arguments given
+    """
+    if not args:
+        raise Help()
+
+    try:
+        query = _parse_query(event, args)
+    except ValueError as err:
+        return _('invalid query: %s') % err
+
+    results = await _INTERNAL['store'].search(**query)
+    if not results:
+        return _('no messages found')
+
+    lines = [_('<b>{count} message(s) found:</b>').format(count=len(results))]
+    for message in results:
+        text = message.text
+        if len(text) > MAX_TEXT_LENGTH:
+            text = text[:MAX_TEXT_LENGTH] + '...'
+        lines.append('<b>{conv}</b> {time} {user}: {text}'.format(
+            conv=html.escape(bot.conversations.get_name(message.conv_id,
+                                                        message.conv_id)),
+            time=datetime.datetime.fromtimestamp(
+                message.timestamp).strftime('%Y-%m-%d %H:%M'),
+            user=html.escape(message.user_name or message.chat_id),
+            text=html.escape(text),
+        ))
+    return '\n'.join(lines)
@@ -0,0 +1,203 @@
+"""sqlite backed message store with a full text index"""
+__author__ = 'das7pad@outlook.com'
+
+import asyncio
+import logging
+import sqlite3
+from collections import namedtuple
+
+from hangupsbot.utils.workers import BatchWorker
+
+
+logger = logging.getLogger(__name__)
+
+# preferred full text search modules, fall back to LIKE queries without one
+FTS_MODULES = ('fts5', 'fts4')
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS messages ('
+    ' id INTEGER PRIMARY KEY,'
+    ' conv_id TEXT NOT NULL,'
+    ' chat_id TEXT NOT NULL,'
+    ' user_name TEXT,'
+    ' timestamp REAL NOT NULL,'
+    ' text TEXT NOT NULL)',
+    'CREATE INDEX IF NOT EXISTS messages_by_conv'
+    ' ON messages (conv_id, timestamp)',
+    'CREATE INDEX IF NOT EXISTS messages_by_user'
+    ' ON messages (chat_id, timestamp)',
+)
+
+Message = namedtuple('Message',
+                     ('conv_id', 'chat_id', 'user_name', 'timestamp', 'text'))
+
+
+class HistoryStore(BatchWorker):
+    """store messages in batches and search them, all queries run in a thread
+
+    Args:
+        path (str): location of the database, ':memory:' for tests
+        flush_interval (float): time in seconds between two batch inserts
+    """
+    __slots__ = ('_path', '_connection', '_fts')
+
+    def __init__(self, path, flush_interval=2.):
+        super().__init__(flush_interval)
+        self._path = path
+        self._pending = []
+        self._connection = None
+        self._fts = None
+
+    def add(self, message):
+        """queue a message for the next batch
+
+        Args:
+            message (Message): the message to store
+        """
+        self._pending.append(message)
+
+    async def search(self, keywords=(), *, conv_id=None, chat_id=None,
+                     since=None, until=None, limit=10):
+        """find messages, the newest first
+
+        Args:
+            keywords (iterable[str]): words that must appear in the text
+            conv_id (str): limit the results to a conversation
+            chat_id (str): limit the results to a user
+            since (float): unix timestamp of the oldest message
+            until (float): unix timestamp of the newest message
+            limit (int): maximum number of results
+
+        Returns:
+            list[Message]: the matching messages
+        """
+        filters = tuple(
+            (column, operator, value)
+            for column, operator, value in (('conv_id', '=', conv_id),
+                                            ('chat_id', '=', chat_id),
+                                            ('timestamp', '>=', since),
+                                            ('timestamp', '<=', until))
+            if value is not None)
+        return await asyncio.get_event_loop().run_in_executor(
+            self._executor, self._search, self._take_pending(),
+            tuple(keywords), filters, limit)
+
+    def close(self):
+        """insert the queued messages and close the database"""
+        super().close()
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _take_pending(self):
+        """swap the queued messages
+
+        Returns:
+            list[Message]: the messages of the next batch
+        """
+        pending = self._pending
+        self._pending = []
+        return pending
+
+    def _connect(self):
+        """open the database and create the tables
+
+        Returns:
+            sqlite3.Connection: the open database
+        """
+        if self._connection is not None:
+            return self._connection
+
+        # the access is serialized by the single worker thread
+        connection = sqlite3.connect(self._path, check_same_thread=False)
+        for statement in SCHEMA:
+            connection.execute(statement)
+        for module in FTS_MODULES:
+            try:
+                connection.execute(
+                    'CREATE VIRTUAL TABLE IF NOT EXISTS messages_%s'
+                    ' USING %s(text)' % (module, module))
+            except sqlite3.OperationalError:
+                continue
+            self._fts = 'messages_' + module
+            break
+        else:
+            logger.warning('no full text search available, using LIKE')
+        connection.commit()
+        self._connection = connection
+        return connection
+
+    def _flush(self, pending):
+        """store a batch of messages
+
+        Args:
+            pending (list[Message]): the messages to store
+        """
+        if not pending:
+            return
+        connection = self._connect()
+        with connection:
+            for message in pending:
+                cursor = connection.execute(
+                    'INSERT INTO messages'
+                    ' (conv_id, chat_id, user_name, timestamp, text)'
+                    ' VALUES (?, ?, ?, ?, ?)', message)
+                if self._fts is not None:
+                    connection.execute(
+                        'INSERT INTO %s (rowid, text) VALUES (?, ?)'
+                        % self._fts, (cursor.lastrowid, message.text))
+
+    def _search(self, pending, keywords, filters, limit):
+        """insert pending messages and run a query
+
+        Args:
+            pending (list[Message]): messages that are not inserted yet
+            keywords (tuple[str]): words that must appear in the text
+            filters (tuple[tuple[str, str, mixed]]): column, operator and
+                value of each condition
+            limit (int): maximum number of results
+
+        Returns:
+            list[Message]: the matching messages
+        """
+        self._flush(pending)
+        connection = self._connect()
+
+        conditions = []
+        args = []
+        for column, operator, value in filters:
+            conditions.append('%s %s ?' % (column, operator))
+            args.append(value)
+
+        if keywords and self._fts is not None:
+            conditions.append(
+                'id IN (SELECT rowid FROM %s WHERE %s MATCH ?)'
+                % (self._fts, self._fts))
+            # quoted terms, implicit AND
+            args.append(' '.join('"%s"' % keyword.replace('"', '""')
+                                 for keyword in keywords))
+        else:
+            for keyword in keywords:
+                conditions.append("text LIKE ? ESCAPE '\\'")
+                args.append('%' + _escape_like(keyword) + '%')
+
+        query = ('SELECT conv_id, chat_id, user_name, timestamp, text'
+                 ' FROM messages')
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        query += ' ORDER BY timestamp DESC LIMIT ?'
+        args.append(limit)
+        return [Message(*row) for row in connection.execute(query, args)]
+
+
+def _escape_like(text):
+    """escape the wildcards of a LIKE pattern
+
+    Args:
+        text (str): a literal search term
+
+    Returns:
+        str: the term with escaped `%`, `_` and `\\`
+    """
+    return (text.replace('\\', '\\\\')
+            .replace('%', '\\%').replace('_', '\\_'))
@@ -15,11 +15,12 @@ from hangupsbot import plugins
 
 logger = logging.getLogger(__name__)
 
-_EXTERNALS = {"bot": None}
+_EXTERNALS = {"bot": None, "http": None}
 
 
 def _initialise(bot):
     _EXTERNALS["bot"] = bot
+    _EXTERNALS["http"] = plugins.get_http_client()
     plugins.register_shared('image_validate_link', image_validate_link)
     plugins.register_shared('image_upload_single', image_upload_single)
     plugins.register_shared('image_upload_raw', image_upload_raw)
@@ -89,50 +90,50 @@ async def image_upload_single(image_uri):
     filename = os.path.basename(image_uri)
     logger.info("fetching %s", filename)
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.request('get', image_uri) as res:
-                content_type = res.headers['Content-Type']
-
-                # must be True if valid image, can contain additional directives
-                image_handling = False
-
-                # image handling logic for specific image types
-                #  - if necessary, guess by extension
-
-                if content_type.startswith('image/'):
-                    if content_type == "image/webp":
-                        image_handling = "image_convert_to_png"
-                    else:
-                        image_handling = "standard"
-
-                elif content_type == "application/octet-stream":
-                    # guess the type from the extension
-                    ext = filename.split(".")[-1].lower()
-
-                    if (ext in
-                            ("jpg", "jpeg", "jpe", "jif", "jfif", "gif", "png")):
-                        image_handling = "standard"
-                    elif ext == "webp":
-                        image_handling = "image_convert_to_png"
-
-                if image_handling:
-                    raw = await res.read()
-                    if image_handling != "standard":
-                        try:
-                            results = await getattr(sys.modules[__name__],
-                                                    image_handling)(raw)
-                            if results:
-                                # allow custom handlers to fail gracefully
-                                raw = results
-                        except Exception:  # pylint: disable=broad-except
-                            # unhandled Exception from custom image handler
-                            logger.exception("custom image handler failed: %s",
-                                             image_handling)
+        session = _EXTERNALS["http"].session
+        async with session.get(image_uri) as res:
+            content_type = res.headers['Content-Type']
+
+            # must be True if valid image, can contain additional directives
+            image_handling = False
+
+            # image handling logic for specific image types
+            #  - if necessary, guess by extension
+
+            if content_type.startswith('image/'):
+                if content_type == "image/webp":
+                    image_handling = "image_convert_to_png"
                 else:
-                    logger.warning(
-                        "not image/image-like, filename=%s, headers=%s",
-                        filename, res.headers)
-                    return False
+                    image_handling = "standard"
+
+            elif content_type == "application/octet-stream":
+                # guess the type from the extension
+                ext = filename.split(".")[-1].lower()
+
+                if (ext in
+                        ("jpg", "jpeg", "jpe", "jif", "jfif", "gif", "png")):
+                    image_handling = "standard"
+                elif ext == "webp":
+                    image_handling = "image_convert_to_png"
+
+            if image_handling:
+                raw = await res.read()
+                if image_handling != "standard":
+                    try:
+                        results = await getattr(sys.modules[__name__],
+                                                image_handling)(raw)
+                        if results:
+                            # allow custom handlers to fail gracefully
+                            raw = results
+                    except Exception:  # pylint: disable=broad-except
+                        # unhandled Exception from custom image handler
+                        logger.exception("custom image handler failed: %s",
+                                         image_handling)
+            else:
+                logger.warning(
+                    "not image/image-like, filename=%s, headers=%s",
+                    filename, res.headers)
+                return False
 
     except aiohttp.ClientError as exc:
         logger.warning("failed to get %r - %r", filename, exc)
@@ -15,10 +15,14 @@ HELP = {
               'grabs a random meme when none provided'),
 }
 
-_EXTERNALS = {"running": False}
+_EXTERNALS = {"running": False, "http": None}
+
+# in seconds
+SEARCH_CACHE_TIMEOUT = 600
 
 
 def _initialise():
+    _EXTERNALS["http"] = plugins.get_http_client()
     plugins.register_user_command([
         "meme",
     ])
@@ -40,18 +44,12 @@ async def meme(bot, event, *args):
         url_api = ('http://version1.api.memegenerator.net/Instances_Search?q='
                    + "+".join(parameters) + '&pageIndex=0&pageSize=25')
 
-        async with aiohttp.ClientSession() as session:
-            async with session.request('get', url_api) as api_request:
-                results = await api_request.json()
+        results = await _EXTERNALS["http"].get_json(
+            url_api, cache_ttl=SEARCH_CACHE_TIMEOUT)
 
         if results['result']:
             url_image = random.choice(results['result'])['instanceImageUrl']
 
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url_image) as response:
-                    response.raise_for_status()
-                    image_data = await response.read()
-
             filename = os.path.basename(url_image)
             segments = [hangups.ChatMessageSegment(
                 url_image, hangups.hangouts_pb2.SEGMENT_TYPE_LINK,
@@ -63,6 +61,7 @@ async def meme(bot, event, *args):
                                                  url_image)
             except KeyError:
                 logger.warning('image plugin not loaded - using legacy code')
+                image_data = await _EXTERNALS["http"].get_bytes(url_image)
                 photo_id = await bot.upload_image(image_data, filename=filename)
 
             await bot.coro_send_message(event.conv_id, segments,
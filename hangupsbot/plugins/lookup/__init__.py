@@ -8,12 +8,18 @@ from hangupsbot.utils import unicode_to_ascii
 
 logger = logging.getLogger(__name__)
 
+_INTERNAL = {"http": None}
+
+# in seconds, short to pick up edits of the spreadsheet
+CACHE_TIMEOUT = 60
+
 HELP = {
     'lookup': _('find keywords in a specified spreadsheet'),
 }
 
 
 def _initialise():
+    _INTERNAL["http"] = plugins.get_http_client()
     plugins.register_user_command([
         "lookup",
     ])
@@ -47,10 +53,8 @@ async def lookup(bot, event, *args):
                  event.user.full_name, event.user_id.chat_id, keyword)
 
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(spreadsheet_url) as response:
-                response.raise_for_status()
-                html = await response.text()
+        html = await _INTERNAL["http"].get_text(
+            spreadsheet_url, cache_ttl=CACHE_TIMEOUT)
     except aiohttp.ClientError as err:
         logger.info('request %s: %r', id(args), spreadsheet_url)
         logger.error('request %s: failed: %r', id(args), err)
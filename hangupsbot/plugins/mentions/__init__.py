@@ -1,5 +1,9 @@
 """notify user about mentions in attending chats via 1on1 or pushbullet"""
 
+import asyncio
+import bisect
+import collections
+import functools
 import logging
 import re
 
@@ -32,6 +36,13 @@ EASTER_EGGS = {
 _NICKS = {}
 _NICKS_INVERSE = {}
 
+# conv_id -> NameIndex of the last seen user list
+_INDEXES = {}
+
+# number of users that are alerted at the same time, the messages are rate
+#  limited by the hangouts conversations
+ALERT_CONCURRENCY = 10
+
 HELP = {
     'mention': _('alert a @mentioned user'),
 
@@ -236,16 +247,23 @@ async def mention(bot, event, *args):
     exact_fragment_matches = []
     mention_list = []
 
+    index = _get_index(event.conv_id, users_in_chat)
+
     nickname_chat_id = _NICKS_INVERSE.get(username_lower)
     if (nickname_chat_id is not None
             and nickname_chat_id not in event.notified_users
-            and any(user.id_.chat_id == nickname_chat_id
-                    for user in users_in_chat)):
+            and nickname_chat_id in index):
         exact_nickname_matches.append(bot.get_hangups_user(nickname_chat_id))
         # skip the handling of the user list as we got an exact match
-        users_in_chat = []
+        positions = []
+    elif username_lower == "all":
+        positions = range(len(index.users))
+    else:
+        positions = index.find(username_lower)
 
-    for user in users_in_chat:
+    candidates = []
+    for position in positions:
+        user = index.users[position]
         user_chat_id = user.id_.chat_id
 
         if user_chat_id in event.notified_users:
@@ -254,47 +272,39 @@ async def mention(bot, event, *args):
                  debug=True)
             continue
 
-        u_full = user.full_name
-
-        _normalised_full_lower = remove_accents(u_full.upper()).lower()
+        logger.debug("user %s (%s) is present", user.full_name, user_chat_id)
 
-        if (username_lower == "all" or
-
-                username_lower in u_full.replace(" ", "").lower() or
-                username_lower in _normalised_full_lower.replace(" ", "") or
-
-                username_lower in u_full.replace(" ", "_").lower() or
-                username_lower in _normalised_full_lower.replace(" ", "_")):
+        if user.is_self:
+            # bot cannot be @mentioned
+            _log("suppressing bot mention by {full} ({chat})", event,
+                 debug=True)
+            continue
 
-            logger.debug("user %s (%s) is present", u_full, user_chat_id)
+        if user_chat_id == event.user_id.chat_id:
+            if noisy_mention_test:
+                # self mention requested
+                _log("noisy_mention_test with @self for {full} ({chat})",
+                     event, debug=True)
+                mention_list.append(user)
+            continue
 
-            if user.is_self:
-                # bot cannot be @mentioned
-                _log("suppressing bot mention by {full} ({chat})", event,
-                     debug=True)
-                continue
+        candidates.append(position)
 
-            if user_chat_id == event.user_id.chat_id:
-                if noisy_mention_test:
-                    # self mention requested
-                    _log("noisy_mention_test with @self for {full} ({chat})",
-                         event, debug=True)
-                    mention_list.append(user)
-                continue
+    users_with_dnd = _get_users_with_dnd(
+        bot, {index.users[position].id_.chat_id for position in candidates})
 
-            if (bot.memory.exists(["donotdisturb"]) and
-                    "dnd.user_check" in bot.shared):
-                if bot.call_shared("dnd.user_check", user_chat_id):
-                    logger.info("suppressing @mention for %s (%s)", u_full,
-                                user_chat_id)
-                    user_tracking["ignored"].append(u_full)
-                    continue
+    for position in candidates:
+        user = index.users[position]
+        if user.id_.chat_id in users_with_dnd:
+            logger.info("suppressing @mention for %s (%s)", user.full_name,
+                        user.id_.chat_id)
+            user_tracking["ignored"].append(user.full_name)
+            continue
 
-            if (username_lower in u_full.lower().split() or
-                    username_lower in _normalised_full_lower.split()):
-                exact_fragment_matches.append(user)
+        if index.is_fragment(position, username_lower):
+            exact_fragment_matches.append(user)
 
-            mention_list.append(user)
+        mention_list.append(user)
 
     if len(exact_nickname_matches) == 1:
         # prioritise exact nickname matches
@@ -345,75 +355,24 @@ async def mention(bot, event, *args):
         return  # SHORT-CIRCUIT
 
     source_name = event.user.get_displayname(event.conv_id, text_only=True)
-    text = event.text
-
-    # send @mention alerts
-    for user in mention_list:
-        user_chat_id = user.id_.chat_id
-        alert_via_1on1 = True
-
-        # pushbullet integration
-        pushbullet_config = bot.user_memory_get(user_chat_id, "pushbullet")
-        if (pushbullet_config is not None and
-                pushbullet_config["api"] is not None):
-            try:
-                api = PushBullet(pushbullet_config["api"])
-                push = api.push_link(
-                    title=_("{} mentioned you in {}").format(
-                        source_name, conv_title),
-                    body=text,
-                    url='https://hangouts.google.com/chat/{}'.format(
-                        event.conv_id))
-                if isinstance(push, tuple):
-                    # backward-compatibility for pushbullet library < 0.8.0
-                    success = push[0]
-                elif isinstance(push, dict):
-                    success = True
-                else:
-                    logger.info('PushBullet %s: %r', id(push), push)
-                    logger.error(
-                        'PushBullet %s: invalid data structure',
-                        id(push)
-                    )
-                    success = False
-            except Exception:  # pushbullet part - pylint:disable=broad-except
-                logger.exception("pushbullet error")
-                success = False
 
-            if success:
-                user_tracking["mentioned"].append(user.full_name)
-                logger.info("%s (%s) alerted via pushbullet",
-                            user.full_name, user_chat_id)
-                alert_via_1on1 = False  # disable 1on1 alert
-            else:
-                user_tracking["failed"]["pushbullet"].append(user.full_name)
-                logger.info("pushbullet alert failed for %s (%s)",
-                            user.full_name, user_chat_id)
+    if username_lower == "all":
+        template = _("<b>{}</b> @mentioned ALL in <i>{}</i> :\n{}")
+    else:
+        template = _("<b>{}</b> @mentioned you in <i>{}</i> :\n{}")
+    alert = functools.partial(
+        _alert_user, bot, event, asyncio.Semaphore(ALERT_CONCURRENCY),
+        source_name=source_name, conv_title=conv_title,
+        text=template.format(source_name, conv_title, event.text))
 
-        if alert_via_1on1:
-            # send alert with 1on1 conversation
-            conv_1on1 = await bot.get_1to1(
-                user_chat_id, context={'initiator_convid': event.conv_id})
-            if username_lower == "all":
-                template = _("<b>{}</b> @mentioned ALL in <i>{}</i> :\n{}")
-            else:
-                template = _("<b>{}</b> @mentioned you in <i>{}</i> :\n{}")
-            if conv_1on1:
-                await bot.coro_send_message(
-                    conv_1on1, template.format(source_name, conv_title, text))
-                event.notified_users.add(user_chat_id)
+    # send @mention alerts
+    results = await asyncio.gather(*[alert(user) for user in mention_list])
+    for user, outcomes in zip(mention_list, results):
+        for outcome in outcomes:
+            if outcome == "mentioned":
                 user_tracking["mentioned"].append(user.full_name)
-                logger.info("%s (%s) alerted via 1on1 (%s)", user.full_name,
-                            user_chat_id, conv_1on1.id_)
             else:
-                user_tracking["failed"]["one2one"].append(user.full_name)
-                if bot.get_config_suboption(event.conv_id, 'mentionerrors'):
-                    await bot.coro_send_message(
-                        event.conv, _("@mention didn't work for <b>{}</b>. User"
-                                      " must say something to me first."
-                                      ).format(user.full_name))
-                logger.info("user %s (%s) could not be alerted via 1on1",
-                            user.full_name, user_chat_id)
+                user_tracking["failed"][outcome].append(user.full_name)
 
     if noisy_mention_test:
         lines = [_("<b>@mentions:</b>")]
@@ -440,6 +399,218 @@ async def mention(bot, event, *args):
         await bot.coro_send_message(event.conv, '<br>'.join(lines))
 
 
+class NameIndex:
+    """lookup for the attending users of a conversation by their names
+
+    A term matches a user if it is part of the full name without spaces or
+    with underscores instead of spaces, case-insensitive and with or without
+    accents. All name variants are joined into a single string, so a lookup
+    is one substring search instead of a comparison per user.
+
+    Args:
+        users (list): `hangups.user.User` or `sync.user.SyncUser` instances
+    """
+    __slots__ = ('users', '_size', '_chat_ids', '_names', '_offsets',
+                 '_fragments')
+    SEPARATOR = '\x00'
+
+    def __init__(self, users):
+        self.users = users
+        self._size = len(users)
+        self._chat_ids = set()
+        self._offsets = []
+        # fragment of a name -> positions of the users
+        self._fragments = collections.defaultdict(set)
+
+        names = []
+        offset = 0
+        for position, user in enumerate(users):
+            self._chat_ids.add(user.id_.chat_id)
+            full_lower = user.full_name.lower()
+            normalised = remove_accents(user.full_name.upper()).lower()
+            for fragment in full_lower.split() + normalised.split():
+                self._fragments[fragment].add(position)
+
+            name = self.SEPARATOR.join((
+                full_lower.replace(" ", ""), normalised.replace(" ", ""),
+                full_lower.replace(" ", "_"), normalised.replace(" ", "_")))
+            names.append(name)
+            self._offsets.append(offset)
+            offset += len(name) + len(self.SEPARATOR)
+        self._names = self.SEPARATOR.join(names)
+
+    def __contains__(self, chat_id):
+        return chat_id in self._chat_ids
+
+    def is_current(self, users):
+        """check whether the index was built from the given user list
+
+        Args:
+            users (list): the current user list of the conversation
+
+        Returns:
+            bool: True if the index is up to date, otherwise False
+        """
+        return self.users is users and self._size == len(users)
+
+    def find(self, term):
+        """get the users that match a term
+
+        Args:
+            term (str): lower case search term
+
+        Returns:
+            list[int]: positions of the matching users in `.users`
+        """
+        if not self.users or self.SEPARATOR in term:
+            return []
+
+        positions = []
+        found = self._names.find(term)
+        while found != -1:
+            position = bisect.bisect_right(self._offsets, found) - 1
+            positions.append(position)
+            if position + 1 == self._size:
+                break
+            # continue with the next user
+            found = self._names.find(term, self._offsets[position + 1])
+        return positions
+
+    def is_fragment(self, position, term):
+        """check whether a term is a full part of the name of a user
+
+        Args:
+            position (int): position of the user in `.users`
+            term (str): lower case search term
+
+        Returns:
+            bool: True if one of the name parts equals the term
+        """
+        return position in self._fragments.get(term, ())
+
+
+def _get_index(conv_id, users):
+    """get the name index for the current user list of a conversation
+
+    The sync handler caches the user list per conversation and drops it on
+    membership changes, a new list object invalidates the index.
+
+    Args:
+        conv_id (str): conversation identifier
+        users (list): the current user list of the conversation
+
+    Returns:
+        NameIndex: the cached or a new index
+    """
+    index = _INDEXES.get(conv_id)
+    if index is None or not index.is_current(users):
+        index = _INDEXES[conv_id] = NameIndex(users)
+    return index
+
+
+def _get_users_with_dnd(bot, chat_ids):
+    """check the DND status of multiple users at once
+
+    Args:
+        bot (hangupsbot.core.HangupsBot): the running instance
+        chat_ids (set[str]): G+ user ids
+
+    Returns:
+        set[str]: the chat ids of users with an active DND
+    """
+    if (not chat_ids or not bot.memory.exists(["donotdisturb"]) or
+            "dnd.user_check_many" not in bot.shared):
+        return set()
+    return bot.call_shared("dnd.user_check_many", chat_ids)
+
+
+def _push_link(api_key, title, body, url):
+    """send a link via pushbullet, blocking
+
+    Args:
+        api_key (str): the pushbullet api key of the user
+        title (str): the title of the push
+        body (str): the text of the push
+        url (str): the link target
+
+    Returns:
+        bool: True if the push was sent, otherwise False
+    """
+    try:
+        push = PushBullet(api_key).push_link(title=title, body=body, url=url)
+        if isinstance(push, tuple):
+            # backward-compatibility for pushbullet library < 0.8.0
+            return push[0]
+        if isinstance(push, dict):
+            return True
+        logger.info('PushBullet %s: %r', id(push), push)
+        logger.error('PushBullet %s: invalid data structure', id(push))
+    except Exception:  # pushbullet part - pylint:disable=broad-except
+        logger.exception("pushbullet error")
+    return False
+
+
+async def _alert_user(bot, event, semaphore, user, *, source_name, conv_title,
+                      text):
+    """alert a mentioned user via pushbullet or the 1on1 with the bot
+
+    Args:
+        bot (hangupsbot.core.HangupsBot): the running instance
+        event (hangupsbot.sync.event.SyncEvent): the message with the mention
+        semaphore (asyncio.Semaphore): limits the concurrent alerts
+        user (hangups.user.User): the mentioned user
+        source_name (str): the name of the mentioning user
+        conv_title (str): the title of the conversation
+        text (str): the alert message for the 1on1
+
+    Returns:
+        list[str]: outcomes for the statistics, "mentioned", "pushbullet" or
+            "one2one" for failed alerts
+    """
+    outcomes = []
+    user_chat_id = user.id_.chat_id
+    async with semaphore:
+        # pushbullet integration
+        pushbullet_config = bot.user_memory_get(user_chat_id, "pushbullet")
+        if (pushbullet_config is not None and
+                pushbullet_config["api"] is not None):
+            success = await asyncio.get_event_loop().run_in_executor(
+                None, _push_link, pushbullet_config["api"],
+                _("{} mentioned you in {}").format(source_name, conv_title),
+                event.text,
+                'https://hangouts.google.com/chat/{}'.format(event.conv_id))
+
+            if success:
+                logger.info("%s (%s) alerted via pushbullet",
+                            user.full_name, user_chat_id)
+                outcomes.append("mentioned")
+                return outcomes
+
+            logger.info("pushbullet alert failed for %s (%s)",
+                        user.full_name, user_chat_id)
+            outcomes.append("pushbullet")
+
+        # send alert with 1on1 conversation
+        conv_1on1 = await bot.get_1to1(
+            user_chat_id, context={'initiator_convid': event.conv_id})
+        if conv_1on1:
+            await bot.coro_send_message(conv_1on1, text)
+            event.notified_users.add(user_chat_id)
+            outcomes.append("mentioned")
+            logger.info("%s (%s) alerted via 1on1 (%s)", user.full_name,
+                        user_chat_id, conv_1on1.id_)
+        else:
+            outcomes.append("one2one")
+            if bot.get_config_suboption(event.conv_id, 'mentionerrors'):
+                await bot.coro_send_message(
+                    event.conv, _("@mention didn't work for <b>{}</b>. User"
+                                  " must say something to me first."
+                                  ).format(user.full_name))
+            logger.info("user %s (%s) could not be alerted via 1on1",
+                        user.full_name, user_chat_id)
+    return outcomes
+
+
 def pushbulletapi(bot, event, *args):
     """allow users to configure pushbullet integration with api key"""
 
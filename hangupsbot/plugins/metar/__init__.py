@@ -19,6 +19,11 @@ from hangupsbot import plugins
 
 logger = logging.getLogger(__name__)
 
+_INTERNAL = {"http": None}
+
+# in seconds, reports are issued at most every half hour
+CACHE_TIMEOUT = 300
+
 HELP = {
     'metar': _('Display the current METAR weather report for the supplied '
                'ICAO airport code.\n'
@@ -35,6 +40,7 @@ HELP = {
 
 
 def _initialize():
+    _INTERNAL["http"] = plugins.get_http_client()
     plugins.register_user_command([
         'metar',
         'taf',
@@ -48,10 +54,8 @@ async def _api_lookup(target, station):
                "=3&mostRecent=true&stationString={1}").format(target, station)
     logger.debug('api call %s: url %r', id(api_url), api_url)
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(api_url) as response:
-                response.raise_for_status()
-                raw_text = await response.text()
+        raw_text = await _INTERNAL["http"].get_text(
+            api_url, cache_ttl=CACHE_TIMEOUT)
     except aiohttp.ClientError as err:
         if not logger.isEnabledFor(logging.DEBUG):
             # add context
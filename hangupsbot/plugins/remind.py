@@ -1,5 +1,4 @@
 """schedule a reminder in a public or private conversation"""
-import asyncio
 
 from hangupsbot import plugins
 from hangupsbot.commands import Help
@@ -17,7 +16,8 @@ HELP = {
 
 
 def _initialise():
-    """register the commands and their help entries"""
+    """register the commands, the reminder job and the help entries"""
+    plugins.register_job_handler("remind.reminder", _reminder)
     plugins.register_user_command([
         "remindme",
         "remindall",
@@ -68,7 +68,7 @@ async def remindme(bot, event, *args):
     if not conv_1on1:
         return _("%s, chat with me in a private chat first") % full_name
 
-    asyncio.ensure_future(_reminder(bot, conv_1on1, delay, args))
+    _schedule(bot, conv_1on1.id_, delay, args)
 
     return _("Private reminder for <b>{}</b> in {}m").format(full_name, args[0])
 
@@ -89,23 +89,32 @@ async def remindall(bot, event, *args):
     """
     delay = _get_delay(args)
 
-    asyncio.ensure_future(_reminder(bot, event.conv_id, delay, args))
+    _schedule(bot, event.conv_id, delay, args)
 
     return _("Public reminder in {}m").format(args[0])
 
 
-async def _reminder(bot, conv_id, delay, args):
-    """detached execution of a remind/remindall request
+def _schedule(bot, conv_id, delay, args):
+    """add a persistent reminder job
 
     Args:
         bot (hangupsbot.core.HangupsBot): the running instance
         conv_id (str): Hangouts conversation identifier
-        delay (float): time in seconds to sleep before sending the reminder
-        args (tuple): reminder text
+        delay (float): time in seconds to wait before sending the reminder
+        args (tuple): delay and reminder text
     """
-    try:
-        await asyncio.sleep(delay)
-    except asyncio.CancelledError:
-        return
-    await bot.coro_send_message(conv_id,
-                                _("<b>Reminder:</b> ") + " ".join(args[1:]))
+    bot.scheduler.schedule("remind.reminder", delay, {
+        "conv_id": conv_id,
+        "text": " ".join(args[1:]),
+    })
+
+
+async def _reminder(bot, payload):
+    """send a scheduled reminder
+
+    Args:
+        bot (hangupsbot.core.HangupsBot): the running instance
+        payload (dict): the target "conv_id" and the reminder "text"
+    """
+    await bot.coro_send_message(payload["conv_id"],
+                                _("<b>Reminder:</b> ") + payload["text"])
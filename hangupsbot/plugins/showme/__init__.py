@@ -37,7 +37,6 @@ import io
 import logging
 import time
 
-import aiohttp
 import hangups
 
 from hangupsbot import plugins
@@ -45,6 +44,8 @@ from hangupsbot import plugins
 
 logger = logging.getLogger(__name__)
 
+_INTERNAL = {"http": None}
+
 HELP = {
     'showme': _('Retrieve images from showme sources by saying:\n'
                 ' {bot_cmd} showme SOURCE\n'
@@ -62,6 +63,7 @@ def _initialize(bot):
         bot (hangupsbot.core.HangupsBot): the running instance
     """
     if bot.config.get_option("showme") is not None:
+        _INTERNAL["http"] = plugins.get_http_client()
         plugins.register_user_command([
             "showme",
         ])
@@ -80,9 +82,8 @@ async def _send_source(bot, event, name, img_link):
         img_link (str): url to a shared web cam
     """
     logger.info("Getting %s", img_link)
-    async with aiohttp.ClientSession() as session:
-        async with session.request("get", img_link) as res:
-            raw = await res.read()
+    async with _INTERNAL["http"].session.get(img_link) as res:
+        raw = await res.read()
     content_type = res.headers['Content-Type']
     logger.info("\tContent-type: %s", content_type)
     ext = content_type.split('/')[1]
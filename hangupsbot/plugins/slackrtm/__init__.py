@@ -75,6 +75,9 @@ from .storage import (
 
 logger = logging.getLogger(__name__)
 
+# load after the sync core, see `plugins.LoadPlan`
+REQUIRED_PLUGINS = ('sync',)
+
 
 def _initialise(bot):
     """migrate data, start SlackRTMs and register commands
@@ -81,6 +81,47 @@ CACHE_UPDATE_TEAM = (
     'team_domain_changed',
 )
 
+# events that are applied to the cache without api requests
+CACHE_EVENTS_MEMBER_JOIN = (
+    'channel_join',
+    'group_join',
+    'member_joined_channel',
+)
+CACHE_EVENTS_MEMBER_LEAVE = (
+    'channel_leave',
+    'group_leave',
+    'member_left_channel',
+)
+CACHE_EVENTS_RENAME = (
+    'channel_rename',
+    'group_rename',
+    'group_name',
+)
+# event type -> (attribute, value) for the referenced conversation
+CACHE_EVENTS_FLAGS = {
+    'channel_archive': ('is_archived', True),
+    'channel_unarchive': ('is_archived', False),
+    'group_archive': ('is_archived', True),
+    'group_unarchive': ('is_archived', False),
+    'group_open': ('is_open', True),
+    'group_close': ('is_open', False),
+}
+
+# number of items per request for the cursor paginated `*.list` methods
+CACHE_PAGE_SIZE = 200
+
+# seconds until the cached users of a channel are created again, membership
+# and profile events invalidate them earlier
+MEMBER_CACHE_TIMEOUT = 600
+
+# entries of the cached users and conversations in the persisted directory
+DIRECTORY_USER_KEYS = (
+    'id', 'name', 'real_name', 'deleted', 'is_bot', 'image_original', '1on1',
+)
+DIRECTORY_CONVERSATION_KEYS = (
+    'id', 'name', 'members', 'is_archived', 'is_open', 'is_member',
+)
+
 # message type / subtype
 MESSAGE_TYPES_TO_SKIP = (
     'file_created', 'file_public', 'file_change',
@@ -90,8 +131,14 @@ MESSAGE_TYPES_TO_SKIP = (
 MESSAGE_SUBTYPES_MEMBERSHIP_JOIN = ('channel_join', 'group_join')
 MESSAGE_SUBTYPES_MEMBERSHIP_LEAVE = ('channel_leave', 'group_leave')
 
+# maximum length of coalesced messages in the sending queues
+SLACK_MESSAGE_LIMIT = 4000
+
+# (rate, burst) per api method and per channel, other methods use the default
+# the channel limit applies to `chat.postMessage` calls into the same channel
+DEFAULT_RATE_LIMIT = (10, 20)
 RATE_LIMITS = {
-    method: (60, 3, 1.25, 0.6)[tier-1]
+    method: ((1 / 60, 1 / 3, 1 / 1.25, 1 / 0.6)[tier-1], 1)
     for method, tier in {
         'channels.history': 3,
         'channels.kick': 3,
@@ -107,3 +154,7 @@ RATE_LIMITS = {
         'users.list': 2,
     }.items()
 }
+RATE_LIMITS['channel'] = (1, 3)
+
+# seconds, applied if the `Retry-After` header holds no number
+DEFAULT_RETRY_AFTER = 30
@@ -1,6 +1,7 @@
 """core to handle message syncing and handle base requests from commands"""
 
 import asyncio
+import collections
 import json
 import logging
 import time
@@ -9,16 +10,34 @@ import aiohttp
 
 from hangupsbot import plugins
 from hangupsbot.base_models import BotMixin
+from hangupsbot.sync.sending_queue import (
+    AsyncQueueCache,
+    TextMerger,
+)
 from hangupsbot.sync.user import SyncUser
 from hangupsbot.sync.utils import get_sync_config_entry
+from hangupsbot.utils.cache import Cache
+from hangupsbot.utils.rate_limit import RateLimiter
+from hangupsbot.utils.workers import OrderedWorkers
 from .commands_slack import slack_command_handler
 from .constants import (
+    CACHE_EVENTS_FLAGS,
+    CACHE_EVENTS_MEMBER_JOIN,
+    CACHE_EVENTS_MEMBER_LEAVE,
+    CACHE_EVENTS_RENAME,
+    CACHE_PAGE_SIZE,
     CACHE_UPDATE_CHANNELS,
     CACHE_UPDATE_CHANNELS_HIDDEN,
     CACHE_UPDATE_GROUPS,
     CACHE_UPDATE_GROUPS_HIDDEN,
     CACHE_UPDATE_TEAM,
     CACHE_UPDATE_USERS,
+    DEFAULT_RATE_LIMIT,
+    DEFAULT_RETRY_AFTER,
+    DIRECTORY_CONVERSATION_KEYS,
+    DIRECTORY_USER_KEYS,
+    MEMBER_CACHE_TIMEOUT,
+    SLACK_MESSAGE_LIMIT,
     SYSTEM_MESSAGES,
     RATE_LIMITS,
 )
@@ -37,7 +56,6 @@ from .message import SlackMessage
 from .parsers import (
     SLACK_STYLE,
 )
-from .sending_queue import SlackMessageQueueCache
 from .storage import (
     migrate_on_domain_change,
 )
@@ -74,6 +92,13 @@ class SlackRTM(BotMixin):
         self.slack_domain = sink_config.get('domain')
         self.conversations = {}
         self.users = {}
+        self._directory_updated = 0
+        self._directory_refresh = None
+        self._pending_lookups = set()
+        self._sync_index = None
+        self._cache_members = Cache(MEMBER_CACHE_TIMEOUT,
+                                    name='slackrtm channel members',
+                                    increase_on_access=False)
         self.my_uid = ''
         self.my_bid = None
         self.identifier = None
@@ -81,7 +106,10 @@ class SlackRTM(BotMixin):
         self.team = {}
         self.command_prefixes = tuple()
         self._cache_sending_queue = None
-        self._api_call_history = {method: 0 for method in RATE_LIMITS}
+        self.event_workers = None
+        self._rate_limiter = RateLimiter(*DEFAULT_RATE_LIMIT,
+                                         limits=RATE_LIMITS,
+                                         name='slackrtm')
 
     @property
     def config(self):
@@ -160,13 +188,20 @@ class SlackRTM(BotMixin):
         async def _build_cache(login_data):
             """set the team; fetch users, channels and groups
 
+            The cached directory of a reconnect or a recent directory of the
+            last run is served right away. The rtm events of the
+            disconnected period are lost, the directory is revalidated in
+            the background.
+
             Args:
                 login_data (dict): slack-api response of `rtm.connect`, which
                     contains the team data in the entry `team`
             """
             self.team = login_data['team']
-            await asyncio.gather(*(self.update_cache(name) for name in
-                                   ('users', 'channels', 'groups', 'ims')))
+            if self._directory_updated or self._load_directory():
+                self._revalidate_directory()
+                return
+            await self._refresh_directory()
 
         async def _set_self_user_and_ids(login_data):
             """set the bot user and bot id to filter messages
@@ -212,7 +247,14 @@ class SlackRTM(BotMixin):
         hard_reset = 0
         while hard_reset < self.bot.config.get_option('slackrtm.retries'):
             self._session = aiohttp.ClientSession()
+            self.event_workers = OrderedWorkers(
+                self._handle_slack_message,
+                self.bot.config.get_option('slackrtm.concurrency'),
+                name='slackrtm',
+                max_queued=self.bot.config.get_option(
+                    'slackrtm.max_queued_events'))
             self.bot.config.on_reload.add_observer(self.rebuild_base)
+            self.bot.memory.on_reload.add_observer(self._reset_sync_index)
             try:
                 await asyncio.sleep(hard_reset * 10)
                 hard_reset += 1
@@ -234,7 +276,10 @@ class SlackRTM(BotMixin):
                             'websocket closed gracefully, reconnecting'
                         )
                         hard_reset = 1
+                    self.logger.info('event stats: %r',
+                                     self.event_workers.stats())
                     login_data = await _login()
+                    await _build_cache(login_data)
 
             except asyncio.CancelledError:
                 return
@@ -254,7 +299,13 @@ class SlackRTM(BotMixin):
                 self.logger.exception('core error')
             finally:
                 self.logger.debug('unloading')
+                await self.event_workers.close()
+                if self._directory_refresh is not None:
+                    self._directory_refresh.cancel()
+                self._save_directory()
                 self.bot.config.on_reload.remove_observer(self.rebuild_base)
+                self.bot.memory.on_reload.remove_observer(
+                    self._reset_sync_index)
                 if self._cache_sending_queue is not None:
                     await self._cache_sending_queue.stop(5)
                 try:
@@ -361,9 +412,12 @@ class SlackRTM(BotMixin):
                                            self.slack_domain))
 
         migrate_on_domain_change(self, old_domain)
+        self._reset_sync_index()
 
-        self._cache_sending_queue = SlackMessageQueueCache(
-            self.identifier, _send_message, bot=self.bot)
+        self._cache_sending_queue = AsyncQueueCache(
+            self.identifier, _send_message, bot=self.bot,
+            merge=TextMerger('text', SLACK_MESSAGE_LIMIT,
+                             exclusive=('attachments',)))
 
         await _register_handler()
 
@@ -397,20 +451,12 @@ class SlackRTM(BotMixin):
         self._tracker += 1
         self.logger.debug('api_call %s: (%r, %r)', tracker, method, kwargs)
 
-        if 'delay' in kwargs:
-            delay = kwargs.pop('delay')
-        else:
-            delay = 0
-        if method in RATE_LIMITS:
-            last_call = self._api_call_history[method]
-            now = time.time()
-            back_off = RATE_LIMITS[method] - (now - last_call)
-            delay = max(back_off, delay)
-            self._api_call_history[method] = now + delay
-
+        keys = (method,)
+        if method == 'chat.postMessage':
+            keys += (('channel', kwargs['channel']),)
+        delay = await self._rate_limiter.acquire(*keys)
         if delay > 0:
             self.logger.debug('api_call %s: delayed by %ss', tracker, delay)
-            await asyncio.sleep(delay)
 
         parsed = None
         try:
@@ -423,6 +469,7 @@ class SlackRTM(BotMixin):
                 parsed = await resp.json()
                 self.logger.debug('api_call %s: %r', tracker, parsed)
                 if parsed.get('ok'):
+                    self._rate_limiter.succeeded(method)
                     return parsed
                 error = parsed.get('error', '')
                 if 'auth' in error:
@@ -434,15 +481,11 @@ class SlackRTM(BotMixin):
             try:
                 delay = int(resp.headers['Retry-After'])
             except ValueError:
-                delay = 30
-
-            if method in RATE_LIMITS:
-                # propagate the rate limit immediately
-                last_call = self._api_call_history[method]
-                now = time.time()
-                self._api_call_history[method] = max(last_call, now) + delay
+                delay = DEFAULT_RETRY_AFTER
 
-            return await self.api_call(method, delay=delay, **kwargs)
+            # propagate the rate limit immediately, the retry waits for it
+            self._rate_limiter.back_off(method, delay)
+            return await self.api_call(method, **kwargs)
         except (aiohttp.ClientError, ValueError, RuntimeError) as err:
             self.logger.info(
                 'api_call %s: failed with %r, method=%s, kwargs=%s, parsed=%s',
@@ -517,26 +560,39 @@ class SlackRTM(BotMixin):
     async def update_cache(self, type_):
         """update the cached data from api-source
 
+        The `*.list` methods are paginated, all pages are fetched.
+
         Args:
             type_ (str): 'users', 'groups', 'channels', 'team', 'ims'
+
+        Returns:
+            list[dict]: the fetched items, None for the team or on failure
         """
         method = ('team.info' if type_ == 'team' else
                   'im.list' if type_ == 'ims' else type_ + '.list')
-        try:
-            response = await self.api_call(method)
-        except SlackAPIError as err:
-            self.logger.error(
-                'cache update for %r failed: %r',
-                type_, err
-            )
-            return
-
         data_key = 'members' if type_ == 'users' else type_
-        data = response[data_key]
+        kwargs = {} if type_ == 'team' else {'limit': CACHE_PAGE_SIZE}
 
-        if type_ == 'team':
-            self.team = data
-            return
+        data = []
+        while True:
+            try:
+                response = await self.api_call(method, **kwargs)
+            except SlackAPIError as err:
+                self.logger.error(
+                    'cache update for %r failed: %r',
+                    type_, err
+                )
+                return None
+
+            if type_ == 'team':
+                self.team = response[data_key]
+                return None
+
+            data.extend(response[data_key])
+            cursor = response.get('response_metadata', {}).get('next_cursor')
+            if not cursor:
+                break
+            kwargs['cursor'] = cursor
 
         if type_ == 'ims':
             # store ims bidirectional for faster lookups in `get_slack1on1`
@@ -548,10 +604,234 @@ class SlackRTM(BotMixin):
 
         storage = self.users if type_ == 'users' else self.conversations
         for item in data:
-            if item['id'] in storage:
-                storage[item['id']].update(item)
+            self._store_item(storage, item)
+        self._cache_members.clear()
+        return data
+
+    async def _refresh_directory(self):
+        """fetch the directory and apply the changes to the cached items
+
+        Cached users and conversations that are missing in a complete fetch
+        got deleted meanwhile. A partial fetch keeps them.
+        """
+        users, channels, groups, ims = await asyncio.gather(
+            *(self.update_cache(type_)
+              for type_ in ('users', 'channels', 'groups', 'ims')))
+        if None in (users, channels, groups, ims):
+            self.logger.warning('the directory is incomplete, retrying on the '
+                                'next connect')
+            return
+
+        known_users = {item['id'] for item in users}
+        known_users.update(item['user'] for item in ims)
+        known_users.add(self.my_uid)
+        known_conversations = {item['id']
+                               for item in channels + groups + ims}
+        for storage, known in ((self.users, known_users),
+                               (self.conversations, known_conversations)):
+            for item_id in set(storage) - known:
+                storage.pop(item_id)
+        self._cache_members.clear()
+
+        self._directory_updated = time.time()
+        self._save_directory()
+
+    def _revalidate_directory(self):
+        """refresh the served directory in the background"""
+        if self._directory_refresh is not None:
+            self._directory_refresh.cancel()
+        self._directory_refresh = asyncio.ensure_future(
+            self._refresh_directory())
+
+    @staticmethod
+    def _store_item(storage, item):
+        """add an item to the cache or update the cached entry
+
+        Args:
+            storage (dict): `.users` or `.conversations`
+            item (dict): slack user or conversation object with an `id`
+        """
+        if item['id'] in storage:
+            storage[item['id']].update(item)
+        else:
+            storage[item['id']] = item
+
+    def _lookup_item(self, item_id):
+        """fetch a single user or conversation that is missing in the cache
+
+        Concurrent lookups of the same item are merged.
+
+        Args:
+            item_id (str): slack user or conversation identifier
+        """
+        async def _lookup():
+            """perform the api-call and store the result"""
+            if item_id[0] in 'UW':
+                method, data_key, storage = 'users.info', 'user', self.users
+                kwargs = {'user': item_id}
+            elif item_id[0] == 'G':
+                method, data_key = 'groups.info', 'group'
+                storage = self.conversations
+                kwargs = {'channel': item_id}
+            else:
+                method, data_key = 'channels.info', 'channel'
+                storage = self.conversations
+                kwargs = {'channel': item_id}
+
+            try:
+                response = await self.api_call(method, **kwargs)
+                self._store_item(storage, response[data_key])
+                self._cache_members.clear()
+            except (SlackAPIError, KeyError) as err:
+                self.logger.error('lookup of %s failed: %r', item_id, err)
+            finally:
+                self._pending_lookups.discard(item_id)
+
+        if item_id[0] == 'D' or item_id in self._pending_lookups:
+            # ims are cached with the `im.list` on start
+            return
+        self._pending_lookups.add(item_id)
+        asyncio.ensure_future(_lookup())
+
+    def _update_members(self, channel, user, joined):
+        """add or remove a user from the cached members of a channel
+
+        Args:
+            channel (str): channel or group identifier
+            user (str): user_id
+            joined (bool): True to add the user, False to remove the user
+        """
+        if channel not in self.conversations:
+            self._lookup_item(channel)
+            return
+
+        members = self.conversations[channel].setdefault('members', [])
+        if joined and user not in members:
+            members.append(user)
+        elif not joined and user in members:
+            members.remove(user)
+        self._cache_members.pop(channel, None)
+
+    async def _apply_cache_event(self, event_type, reply):
+        """apply the changes of an rtm event to the cache
+
+        Events with an incomplete payload trigger an update of all entries
+        of the type.
+
+        Args:
+            event_type (str): see https://api.slack.com/rtm for details
+            reply (dict): the rtm event
+
+        Returns:
+            bool: True if the event changed the cache, otherwise False
+        """
+        if event_type in CACHE_UPDATE_TEAM:
+            await self.update_cache('team')
+            await self.rebuild_base()
+            return True
+
+        if event_type in CACHE_UPDATE_USERS:
+            user = reply.get('user')
+            if isinstance(user, dict) and 'id' in user:
+                self._store_item(self.users, user)
             else:
-                storage[item['id']] = item
+                await self.update_cache('users')
+            return True
+
+        if event_type in CACHE_UPDATE_CHANNELS:
+            type_ = 'channels'
+        elif event_type in CACHE_UPDATE_GROUPS:
+            type_ = 'groups'
+        else:
+            return False
+
+        channel = reply.get('channel')
+        if isinstance(channel, dict) and 'id' in channel:
+            # created or renamed
+            self._store_item(self.conversations, channel)
+            return True
+
+        if not isinstance(channel, str):
+            await self.update_cache(type_)
+
+        elif event_type in CACHE_EVENTS_MEMBER_JOIN and 'user' in reply:
+            self._update_members(channel, reply['user'], joined=True)
+
+        elif event_type in CACHE_EVENTS_MEMBER_LEAVE and 'user' in reply:
+            self._update_members(channel, reply['user'], joined=False)
+
+        elif event_type in CACHE_EVENTS_RENAME and 'name' in reply:
+            self._store_item(self.conversations,
+                             {'id': channel, 'name': reply['name']})
+
+        elif event_type in CACHE_EVENTS_FLAGS:
+            key, value = CACHE_EVENTS_FLAGS[event_type]
+            self._store_item(self.conversations, {'id': channel, key: value})
+
+        elif event_type == 'channel_deleted':
+            self.conversations.pop(channel, None)
+
+        else:
+            await self.update_cache(type_)
+        return True
+
+    def _load_directory(self):
+        """restore the users and conversations from a recent directory
+
+        Returns:
+            bool: True if the cache is up to date, otherwise False
+        """
+        max_age = 3600 * self.bot.config.get_option(
+            'slackrtm.directory_max_age')
+        path = ['slackrtm', self.team.get('domain'), 'directory']
+        if not self.bot.memory.exists(path):
+            return False
+
+        directory = self.bot.memory.get_by_path(path)
+        if time.time() - directory.get('updated', 0) >= max_age:
+            return False
+
+        for storage, key in ((self.users, 'users'),
+                             (self.conversations, 'conversations')):
+            for item in directory.get(key, {}).values():
+                self._store_item(storage, dict(item))
+        self._directory_updated = directory['updated']
+        self.logger.info('loaded the directory from %s',
+                         time.ctime(self._directory_updated))
+        return True
+
+    def _save_directory(self):
+        """persist a snapshot of the cached users and conversations"""
+        if not self._directory_updated or not self.team.get('domain'):
+            return
+
+        path = ['slackrtm', self.team['domain']]
+        if not self.bot.memory.exists(path):
+            return
+
+        def _strip(storage, keys):
+            """pick the relevant entries of cached items
+
+            Args:
+                storage (dict): `.users` or `.conversations`
+                keys (tuple[str]): entries to keep
+
+            Returns:
+                dict: item id -> stripped item
+            """
+            return {
+                item_id: {key: item[key] for key in keys if key in item}
+                for item_id, item in storage.items()
+                if 'id' in item
+            }
+
+        self.bot.memory.set_by_path(path + ['directory'], {
+            'updated': self._directory_updated,
+            'users': _strip(self.users, DIRECTORY_USER_KEYS),
+            'conversations': _strip(self.conversations,
+                                    DIRECTORY_CONVERSATION_KEYS),
+        })
+        self.bot.memory.save()
 
     def get_channel_users(self, channel):
         """get the user names and real names of users attending a given channel
@@ -587,8 +867,8 @@ class SlackRTM(BotMixin):
             mixed: dict with user data or the default value
         """
         if user not in self.users:
-            self.logger.debug('user %s not found, reloading users', user)
-            asyncio.ensure_future(self.update_cache('users'))
+            self.logger.debug('user %s not found, fetching it', user)
+            self._lookup_item(user)
             return default
         return self.users[user].get(key, default)
 
@@ -604,9 +884,8 @@ class SlackRTM(BotMixin):
             dict: requested channel entry or the default value
         """
         if channel not in self.conversations:
-            type_ = 'channels' if channel.startswith('C') else 'groups'
-            self.logger.debug('%s not found, reloading %s', channel, type_)
-            asyncio.ensure_future(self.update_cache(type_))
+            self.logger.debug('%s not found, fetching it', channel)
+            self._lookup_item(channel)
             return default
         return self.conversations[channel].get(key, default)
 
@@ -671,13 +950,43 @@ class SlackRTM(BotMixin):
         Returns:
             list[dict]: each has two keys `channelid` and `hangoutid`
         """
-        syncs = []
-        for sync in self.syncs:
-            if channelid == sync['channelid']:
-                syncs.append(sync)
-            elif hangoutid == sync['hangoutid']:
-                syncs.append(sync)
-        return syncs
+        syncs, dummy, by_channel, by_hangout = self._get_sync_index()
+        positions = by_channel.get(channelid, [])
+        if hangoutid in by_hangout:
+            # keep the order of the memory entry
+            positions = sorted(set(positions).union(by_hangout[hangoutid]))
+        return [syncs[position] for position in positions]
+
+    def _get_sync_index(self):
+        """get the syncs indexed by channel and by hangout
+
+        The index is rebuild on changes of the memory entry, including
+        changes to single syncs.
+
+        Returns:
+            tuple: the syncs (list[dict]), their channel and hangout pairs
+                (tuple) and two dicts, channel id -> positions,
+                hangout id -> positions
+        """
+        syncs = self.syncs
+        pairs = tuple((sync['channelid'], sync['hangoutid']) for sync in syncs)
+        index = self._sync_index
+        if index is not None and index[0] is syncs and index[1] == pairs:
+            return index
+
+        by_channel = collections.defaultdict(list)
+        by_hangout = collections.defaultdict(list)
+        for position, sync in enumerate(syncs):
+            by_channel[sync['channelid']].append(position)
+            by_hangout[sync['hangoutid']].append(position)
+
+        index = self._sync_index = (syncs, pairs,
+                                    dict(by_channel), dict(by_hangout))
+        return index
+
+    def _reset_sync_index(self):
+        """drop the sync index after changes to the syncs"""
+        self._sync_index = None
 
     def config_syncto(self, channel, hangoutid):
         """add a new sync to the memory
@@ -689,13 +998,14 @@ class SlackRTM(BotMixin):
         Raises:
             AlreadySyncingError: the sync already exists
         """
-        for sync in self.syncs:
-            if sync['channelid'] == channel and sync['hangoutid'] == hangoutid:
+        for sync in self.get_syncs(channelid=channel):
+            if sync['hangoutid'] == hangoutid:
                 raise AlreadySyncingError
 
         new_sync = {'channelid': channel, 'hangoutid': hangoutid}
         self.logger.info('adding sync: %s', new_sync)
         self.syncs.append(new_sync)
+        self._reset_sync_index()
         self.bot.memory.save()
 
     def config_disconnect(self, channel, hangoutid):
@@ -709,13 +1019,14 @@ class SlackRTM(BotMixin):
             NotSyncingError: the sync does not exists
         """
         sync = None
-        for sync in self.syncs:
-            if sync['channelid'] == channel and sync['hangoutid'] == hangoutid:
+        for sync in self.get_syncs(channelid=channel):
+            if sync['hangoutid'] == hangoutid:
                 self.logger.info('removing running sync: %s', sync)
                 self.syncs.remove(sync)
         if not sync:
             raise NotSyncingError
 
+        self._reset_sync_index()
         self.bot.memory.save()
 
     async def _process_websocket(self, url):
@@ -763,9 +1074,10 @@ class SlackRTM(BotMixin):
                         self.logger.error('websocket error: %s', msg)
                         break
 
-                    await self._handle_slack_message(reply)
+                    await self.event_workers.put(self._get_event_lane(reply),
+                                                 reply)
 
-                    # valid response handled, leave fail-state
+                    # valid response queued, leave fail-state
                     soft_reset = 0
                 else:
                     # gracefully stopped
@@ -777,6 +1089,26 @@ class SlackRTM(BotMixin):
         # can not connect or permanent websocket read error
         return 1
 
+    @staticmethod
+    def _get_event_lane(reply):
+        """get the key of the worker that handles a given rtm event
+
+        Events are handled in order per channel, this includes the cache
+        updates of a channel. Events without a channel, e.g. user changes,
+        share a separate lane.
+
+        Args:
+            reply (dict): response from slack
+
+        Returns:
+            str: a channel identifier or `None` for events without a channel
+        """
+        channel = reply.get('channel')
+        if isinstance(channel, dict):
+            # `channel_created` and similar events contain the channel object
+            channel = channel.get('id')
+        return channel if isinstance(channel, str) else None
+
     async def _handle_slack_message(self, reply):
         """parse and forward a response from slack
 
@@ -793,21 +1125,16 @@ class SlackRTM(BotMixin):
             Returns:
                 bool: True if the reply triggered an update only
             """
-            if event_type in CACHE_UPDATE_USERS:
-                await self.update_cache('users')
-            elif event_type in CACHE_UPDATE_CHANNELS:
-                await self.update_cache('channels')
-                return event_type in CACHE_UPDATE_CHANNELS_HIDDEN
-            elif event_type in CACHE_UPDATE_GROUPS:
-                await self.update_cache('groups')
-                return event_type in CACHE_UPDATE_GROUPS_HIDDEN
-            elif event_type in SYSTEM_MESSAGES:
+            if event_type in SYSTEM_MESSAGES:
                 return True
-            elif event_type in CACHE_UPDATE_TEAM:
-                await self.update_cache('team')
-                await self.rebuild_base()
-            else:
+            if not await self._apply_cache_event(event_type, reply):
                 return False
+            # names, pictures or members changed
+            self._cache_members.clear()
+            if event_type in CACHE_UPDATE_CHANNELS:
+                return event_type in CACHE_UPDATE_CHANNELS_HIDDEN
+            if event_type in CACHE_UPDATE_GROUPS:
+                return event_type in CACHE_UPDATE_GROUPS_HIDDEN
             return True
 
         self.logger.debug(
@@ -994,21 +1321,40 @@ class SlackRTM(BotMixin):
         """
         users = []
         for sync in self.get_syncs(hangoutid=conv_id):
-            channel = sync['channelid']
-            channel_users = ((self._get_channel_data(channel, 'user'),)
-                             if channel[0] == 'D' else
-                             self._get_channel_data(channel, 'members'))
-
-            for user_id in channel_users:
-                sync_user = SlackUser(self, user_id=user_id, channel=channel)
-                if sync_user.is_self:
-                    # exclude the bot user
-                    continue
+            for sync_user in self._get_channel_members(sync['channelid']):
                 if profilesync_only and sync_user.id_.chat_id == 'sync':
                     continue
                 users.append(sync_user)
         return users
 
+    def _get_channel_members(self, channel):
+        """get the members of a channel from cache or create them
+
+        Args:
+            channel (str): channel, group or dm identifier
+
+        Returns:
+            list[user.SlackUser]: the members without the bot user
+        """
+        members = self._cache_members.get(channel)
+        if members is not None:
+            return members
+
+        channel_users = ((self._get_channel_data(channel, 'user'),)
+                         if channel[0] == 'D' else
+                         self._get_channel_data(channel, 'members', ()))
+
+        members = []
+        for user_id in channel_users:
+            sync_user = SlackUser(self, user_id=user_id, channel=channel)
+            if sync_user.is_self:
+                # exclude the bot user
+                continue
+            members.append(sync_user)
+
+        self._cache_members.add(channel, members)
+        return members
+
     async def _handle_user_kick(self, dummy, conv_id, user):
         """kick a user from all synced channels for a given conversation
 
@@ -1047,12 +1393,11 @@ class SlackRTM(BotMixin):
                     method, err
                 )
             else:
+                self._update_members(channel, user.usr_id, joined=False)
                 # do not overwrite an error state
                 if kicked is not False:
                     kicked = True
 
-        await self.update_cache('groups')
-        await self.update_cache('channels')
         return kicked
 
     async def _handle_profilesync(self, platform, remote_user, conv_1on1,
@@ -1068,6 +1413,9 @@ class SlackRTM(BotMixin):
         if platform != self.identifier:
             return
 
+        # the user objects contain the profilesync
+        self._cache_members.clear()
+
         slack_user_id = remote_user
         if split_1on1s:
             # delete an existing sync
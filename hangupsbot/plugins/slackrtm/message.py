@@ -8,6 +8,7 @@ import emoji
 from hangupsbot.base_models import BotMixin
 from hangupsbot.sync.event import SyncReply
 from hangupsbot.sync.parser import get_formatted
+from hangupsbot.sync.reply_tracker import ReplyTracker
 from .constants import (
     MESSAGE_SUBTYPES_MEMBERSHIP_JOIN,
     MESSAGE_SUBTYPES_MEMBERSHIP_LEAVE,
@@ -109,6 +110,22 @@ def parse_text(slackrtm, text):
     return segments, image_url
 
 
+def get_message_id(timestamp):
+    """convert a message timestamp into a numeric message id
+
+    Args:
+        timestamp (str): `ts` of a message like '1500000000.000100' or the
+            same value without a dot as used in message links
+
+    Returns:
+        int: the timestamp in microseconds or 0 for an invalid timestamp
+    """
+    try:
+        return int(str(timestamp).replace('.', ''))
+    except ValueError:
+        return 0
+
+
 class SlackMessage(BotMixin):
     """parse the response from slack to form a message for syncing
 
@@ -120,7 +137,7 @@ class SlackMessage(BotMixin):
         IgnoreMessage: the message should not be synced
         ParseError: the message content could not be parsed
     """
-    _last_messages = {}
+    _last_messages = ReplyTracker('slackrtm')
 
     def __init__(self, slackrtm, reply):
         if reply['type'] in MESSAGE_TYPES_TO_SKIP:
@@ -228,22 +245,16 @@ class SlackMessage(BotMixin):
             headers={'Authorization': 'Bearer ' + slackrtm.api_key})
 
     @classmethod
-    def track_message(cls, bot, channel_tag, reply):
+    def track_message(cls, dummy, channel_tag, reply):
         """add a message id to the last message and delete old items
 
         Args:
-            bot (hangupsbot.core.HangupsBot): the running instance
+            dummy (hangupsbot.core.HangupsBot): the running instance
             channel_tag (str): identifier for a channel of a slack team
             reply (dict): message response from slack
         """
-        timestamp = reply.get('ts') or 0
-        messages = cls._last_messages.setdefault(channel_tag, [])
-
-        messages.append(int(float(timestamp)))
-        messages.sort(reverse=True)
-        for i in range(2 * bot.config['sync_reply_spam_offset'],
-                       len(messages)):
-            messages.pop(i)
+        cls._last_messages.track(channel_tag,
+                                 get_message_id(reply.get('ts') or 0))
 
     async def get_sync_reply(self, slackrtm, reply):
         """get the 'real' reply to a message or thread
@@ -319,12 +330,8 @@ class SlackMessage(BotMixin):
             return None
 
         channel_tag = '%s:%s' % (slackrtm.identifier, self.channel)
-        messages = self._last_messages.get(channel_tag)
-        try:
-            offset = messages.index(int(float(timestamp)))
-        except ValueError:
-            messages.append(int(float(timestamp)))
-            offset = None
+        offset = self._last_messages.get_offset(channel_tag,
+                                                get_message_id(timestamp))
 
         return SyncReply(identifier=channel_tag, user=r_user, text=r_text,
                          image=image, offset=offset)
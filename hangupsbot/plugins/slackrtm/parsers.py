@@ -52,6 +52,7 @@ TOKENS_SLACK = [
 
 class SlackMessageParser(MessageParser):
     """message parser for slack markdown"""
+    TOKEN_CHARS = dict(MessageParser.TOKEN_CHARS, slack='*_`~<')
 
     def __init__(self):
         super().__init__(TOKENS_SLACK + Tokens.basic)
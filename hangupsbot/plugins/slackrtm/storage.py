@@ -21,6 +21,18 @@ DEFAULT_CONFIG = {
 
     # retry limit for repeated failed connections
     'slackrtm.retries': 10,
+
+    # number of channels with messages that are handled concurrently per team,
+    # messages of a single channel are handled in order
+    'slackrtm.concurrency': 10,
+
+    # number of events that are queued per team until the websocket reading
+    # pauses
+    'slackrtm.max_queued_events': 1000,
+
+    # hours until the persisted user and channel directory of a team expires,
+    # a recent one is served on start and revalidated in the background
+    'slackrtm.directory_max_age': 24,
 }
 
 DEFAULT_MEMORY = {
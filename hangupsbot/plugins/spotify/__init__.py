@@ -29,6 +29,8 @@ from .youtube import get_title_from_youtube
 
 logger = logging.getLogger(__name__)
 
+_INTERNAL = {"http": None}
+
 _DETECT_LINKS = re.compile(
     (r"(https?://)?([a-z0-9.]*?\.)?"
      "(youtube.com/|youtu.be/|soundcloud.com/|spotify.com/track/)"
@@ -98,6 +100,7 @@ def _initialise(bot):
         bot.config.set_by_path(config_path, real_path)
         bot.config.save()
 
+    _INTERNAL["http"] = plugins.get_http_client()
     plugins.register_handler(_watch_for_music_link, "message")
     plugins.register_user_command([
         "spotify",
@@ -141,7 +144,7 @@ async def _watch_for_music_link(bot, event):
             success = add_to_playlist(bot, event, track)
         else:
             if "youtube" in link or "youtu.be" in link:
-                query = get_title_from_youtube(link)
+                query = await get_title_from_youtube(_INTERNAL["http"], link)
             elif "soundcloud" in link:
                 query = get_title_from_soundcloud(bot, link)
             else:
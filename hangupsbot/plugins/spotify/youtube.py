@@ -15,6 +15,9 @@ _YOUTUBE_TITLE = re.compile(r'<title>([^<]+?) - [^<-]+</title>')
 _YOUTUBE_ID = re.compile(
     r"^.*(youtu.be/|v/|u/\w/|embed/|watch\?v=|&v=)([^#&?]*).*")
 
+# in seconds
+CACHE_TIMEOUT = 86400
+
 
 def _log_error(url, err):
     if not logger.isEnabledFor(logging.DEBUG):
@@ -22,10 +25,11 @@ def _log_error(url, err):
     logger.error("%s: %s", id(url), err)
 
 
-async def get_title_from_youtube(url):
+async def get_title_from_youtube(http, url):
     """get the title of a youtube video
 
     Args:
+        http (hangupsbot.utils.http.HttpClient): client for the request
         url (str): the video URI
 
     Returns:
@@ -42,10 +46,7 @@ async def get_title_from_youtube(url):
     url = 'https://www.youtube.com/watch?v=%s' % video_id
 
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                response.raise_for_status()
-                blob = await response.text()
+        blob = await http.get_text(url, cache_ttl=CACHE_TIMEOUT)
     except aiohttp.ClientError as err:
         _log_error(url, err)
         return None
@@ -9,6 +9,7 @@ from hangupsbot import (
     plugins,
 )
 from hangupsbot.sync.event import SyncEvent
+from hangupsbot.utils.keywords import KeywordMatcher
 
 
 logger = logging.getLogger(__name__)
@@ -22,8 +23,10 @@ USER_NOTE_START_1ON1 = _(
 )
 
 # Cache to keep track of what keywords are being watched.
-# _KEYWORDS is indexed with a users chat_id, _GLOBAL_KEYWORDS by keyword
-_KEYWORDS = {}
+# _KEYWORDS matches user chat_ids, _GLOBAL_MATCHER conversation aliases,
+# _GLOBAL_KEYWORDS is indexed by keyword and mirrors the memory entry
+_KEYWORDS = KeywordMatcher()
+_GLOBAL_MATCHER = KeywordMatcher()
 _GLOBAL_KEYWORDS = {}
 
 MENTION_TEMPLATE = (
@@ -67,6 +70,7 @@ _DEFAULT_MEMORY = {
     'hosubscribe': {},
 }
 _RE_UNESCAPE = re.compile(r'\\()')
+_RE_UNESCAPE_CHAR = re.compile(r'\\(.)', re.DOTALL)
 
 
 def _initialise(bot):
@@ -139,8 +143,42 @@ def _populate_keywords(bot):
     for user_chat_id in bot.memory.get_option("user_data"):
         user_keywords = bot.user_memory_get(user_chat_id, 'keywords')
         if user_keywords:
-            _KEYWORDS[user_chat_id] = re.compile(r'|'.join(user_keywords))
+            _set_user_keywords(user_chat_id, user_keywords)
     _GLOBAL_KEYWORDS.update(bot.memory['hosubscribe'])
+    for keyword, conversations in _GLOBAL_KEYWORDS.items():
+        for alias in conversations:
+            _GLOBAL_MATCHER.add(keyword, alias)
+    _KEYWORDS.rebuild()
+    _GLOBAL_MATCHER.rebuild()
+
+
+def _parse_regex(regex):
+    """get the keyword from an escaped regex as stored in memory
+
+    Args:
+        regex (str): the output of `_escape_keyword`
+
+    Returns:
+        tuple[str, bool]: the keyword and a flag for word boundaries
+    """
+    boundary = (len(regex) > 4
+                and regex.startswith(r'\b') and regex.endswith(r'\b'))
+    if boundary:
+        regex = regex[2:-2]
+    return _RE_UNESCAPE_CHAR.sub(r'\1', regex), boundary
+
+
+def _set_user_keywords(chat_id, user_keywords):
+    """replace the keywords of a user in the matcher
+
+    Args:
+        chat_id (str): G+ id of the user
+        user_keywords (list[str]): escaped regex, see `_escape_keyword`
+    """
+    _KEYWORDS.remove_subscriber(chat_id)
+    for regex in user_keywords:
+        keyword, boundary = _parse_regex(regex)
+        _KEYWORDS.add(keyword, chat_id, boundary)
 
 
 def _is_ignored_command(event):
@@ -172,20 +210,34 @@ def _handle_keyword(bot, event, dummy, include_event_user=False):
     event_text = re.sub(r"\s+", " ", event.text).lower()
     if event.conv_event.attachments:
         event_text.replace(event.conv_event.attachments[0], '').strip('\n')
+    matches_by_user = _KEYWORDS.match(event_text)
+    if not matches_by_user:
+        return
+
+    targets = []
     for user in users_in_chat:
         chat_id = user.id_.chat_id
         if (not include_event_user and
                 chat_id in event.notified_users):
             # user is part of event or already got mentioned for this event
             continue
-        if chat_id not in _KEYWORDS:
-            continue
-        user_phrases = _KEYWORDS[chat_id]
-        matches = set(user_phrases.findall(event_text))
-
+        matches = matches_by_user.get(chat_id)
         if not matches:
             continue
         event.notified_users.add(user.id_.chat_id)
+        targets.append((user, matches))
+
+    try:
+        users_with_dnd = bot.call_shared(
+            "dnd.user_check_many",
+            {user.id_.chat_id for user, dummy in targets})
+    except KeyError:
+        users_with_dnd = set()
+
+    for user, matches in targets:
+        if user.id_.chat_id in users_with_dnd:
+            logger.info("%s (%s) has dnd", user.full_name, user.id_.chat_id)
+            continue
         asyncio.ensure_future(
             _send_notification(bot, event, matches, user))
 
@@ -211,16 +263,13 @@ def _handle_once(bot, event):
         event_text.replace(event.conv_event.attachments[0], '').strip('\n')
     previous_targets = event.previous_targets.union(event.targets)
 
-    for keyword, conversations in _GLOBAL_KEYWORDS.copy().items():
-        if keyword not in event_text:
-            continue
-        for alias in conversations:
-            conv_id = bot.call_shared('alias2convid', alias) or alias
+    for alias, keywords in _GLOBAL_MATCHER.match(event_text).items():
+        conv_id = bot.call_shared('alias2convid', alias) or alias
 
-            if 'hangouts:' + conv_id in previous_targets:
-                # received the message already
-                continue
-            matches[conv_id] = keyword
+        if 'hangouts:' + conv_id in previous_targets:
+            # received the message already
+            continue
+        matches[conv_id] = min(keywords)
 
     user = bot.sync.get_sync_user(user_id=bot.user_self()['chat_id'])
     kwargs = dict(identifier='hangouts:%s' % event.conv_id, user=user, title='',
@@ -256,15 +305,6 @@ async def _send_notification(bot, event, matches, user):
                        user.full_name, user.id_.chat_id)
         return
 
-    try:
-        user_has_dnd = bot.call_shared("dnd.user_check", user.id_.chat_id)
-    except KeyError:
-        user_has_dnd = False
-
-    if user_has_dnd:
-        logger.info("%s (%s) has dnd", user.full_name, user.id_.chat_id)
-        return
-
     phrases = '</b>", "<b>'.join(matches)
     template = MENTION_TEMPLATE % (phrases, event.display_title)
     raw_text = event.get_formatted_text(template='{text}', style='internal')
@@ -344,7 +384,7 @@ async def subscribe(bot, event, *args):
             return _("Already subscribed to '{}'!").format(keyword)
 
         user_keywords.append(regex)
-        _KEYWORDS[chat_id] = re.compile(r'|'.join(user_keywords))
+        _set_user_keywords(chat_id, user_keywords)
 
         # Save to file
         bot.user_memory_set(chat_id, 'keywords', user_keywords)
@@ -388,16 +428,13 @@ def unsubscribe(bot, event, *args):
         lines = [_("Unsubscribing all keywords:")]
         lines += [repr(_unescape_regex(entry)) for entry in user_keywords]
         text = '\n'.join(lines)
-        _KEYWORDS.pop(chat_id)
+        _KEYWORDS.remove_subscriber(chat_id)
         user_keywords = []
 
     elif regex in user_keywords:
         text = _("Unsubscribing from keyword '{}'").format(keyword)
         user_keywords.remove(regex)
-        if user_keywords:
-            _KEYWORDS[chat_id] = re.compile(r'|'.join(user_keywords))
-        else:
-            _KEYWORDS.pop(chat_id)
+        _set_user_keywords(chat_id, user_keywords)
 
     else:
         return _('keyword "%s" not found') % keyword
@@ -454,12 +491,14 @@ def global_subscribe(bot, event, *args):
                                                        keyword=keyword)
 
         current.append(alias)
+        _GLOBAL_MATCHER.add(keyword, alias)
         text = _('These conversation will receive messages containing '
                  '"{keyword}":\n{conv_ids}').format(keyword=keyword,
                                                     conv_ids=', '.join(current))
 
     elif keyword != 'show':
         _GLOBAL_KEYWORDS[keyword] = [alias]
+        _GLOBAL_MATCHER.add(keyword, alias)
         text = _('The conversation "{alias}" is the only one with a subscribe '
                  'on "{keyword}"').format(alias=alias, keyword=keyword)
 
@@ -512,6 +551,7 @@ def global_unsubscribe(bot, event, *args):
                  ).format(alias=alias, keyword=keyword)
 
     _GLOBAL_KEYWORDS[keyword].remove(alias)
+    _GLOBAL_MATCHER.remove(keyword, alias)
 
     if not _GLOBAL_KEYWORDS[keyword]:
         # cleanup
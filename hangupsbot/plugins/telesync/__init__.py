@@ -13,6 +13,7 @@ from hangupsbot import (
     commands,
     plugins,
 )
+from hangupsbot.sync.image import get_data_size
 from hangupsbot.sync.parser import get_formatted
 
 
@@ -44,6 +45,9 @@ HELP = {
 
 logger = logging.getLogger(__name__)
 
+# load after the sync core, see `plugins.LoadPlan`
+REQUIRED_PLUGINS = ('sync',)
+
 
 async def _initialise(bot):
     """init bot for telesync, create and start a TelegramBot, register handler
@@ -128,6 +132,14 @@ def setup_config(bot):
             # number of repeated low level-errors until the message loop dies
             'message_loop_retries': 5,
 
+            # number of chats with updates that are handled concurrently,
+            # updates of a single chat are handled in order
+            'message_loop_concurrency': 10,
+
+            # number of fetched updates that wait for their handling until
+            # the polling pauses
+            'message_loop_max_queued': 1000,
+
             # remind the user on the pending sync every n hours
             'profilesync_reminder': 36,
 
@@ -453,6 +465,8 @@ async def _handle_profilesync(bot, platform, remote_user, conv_1on1,
     if platform != 'telesync':
         return
     tg_chat_id = remote_user
+    # the cached user objects contain the profilesync
+    bot.tg_bot.clear_chat_users()
 
     path_tg2ho = ['telesync', 'tg2ho', tg_chat_id]
     path_ho2tg = ['telesync', 'ho2tg', conv_1on1]
@@ -570,29 +584,16 @@ async def _handle_conv_user(bot, conv_id, profilesync_only):
     Returns:
         list[user.User]: users participating in this conversation
     """
-    path = ['telesync', 'ho2tg', conv_id]
     tg_bot = bot.tg_bot
-    if not bot.memory.exists(path):
+    tg_chat_ids = tg_bot.get_tg_targets(conv_id)
+    if not tg_chat_ids:
         # no sync is set
         return []
 
-    requests = []
-    for chat_id in bot.memory.get_by_path(path):
-        path = ['telesync', 'chat_data', chat_id, 'user']
-        if not bot.memory.exists(path):
-            continue
-        requests.extend((user_id, chat_id)
-                        for user_id in bot.memory.get_by_path(path))
-
-    if not requests:
-        return []
-
-    all_users = await asyncio.gather(*[tg_bot.get_tg_user(user_id=user_id,
-                                                          chat_id=chat_id,
-                                                          gpluslink=False)
-                                       for user_id, chat_id in requests])
+    chat_users = await asyncio.gather(*[tg_bot.get_chat_users(chat_id)
+                                        for chat_id in tg_chat_ids])
 
-    return [user for user in all_users
+    return [user for users in chat_users for user in users
             if not profilesync_only or user.id_.chat_id != 'sync']
 
 
@@ -606,7 +607,7 @@ async def _send_media(*, tg_bot, event, tg_chat_id, chat_tag,
         tg_chat_id (str): telegram chat identifier
         chat_tag (str): identifier to receive config entries of the chat
         image (hangupsbot.sync.image.SyncImage): media data wrapper
-        image_data (io.BytesIO): the resized image data
+        image_data (hangupsbot.sync.image.ImageData): the resized image data
         filename (str): file name of the image
 
     Returns:
@@ -629,7 +630,7 @@ async def _send_media(*, tg_bot, event, tg_chat_id, chat_tag,
 
     logger.info(
         'sending media %s: org size: %s',
-        id(image), len(image_data.getbuffer())
+        id(image), get_data_size(image_data)
     )
     try:
         if filename.endswith(('gif', 'mp4', 'avi')):
@@ -680,13 +681,8 @@ async def _handle_message(bot, event):
         bot (hangupsbot.core.HangupsBot): the running instance
         event (hangupsbot.sync.event.SyncEvent): a message wrapper
     """
-    if not bot.memory.exists(['telesync', 'ho2tg', event.conv_id]):
-        # no sync is set
-        return
-
     tg_bot = bot.tg_bot
-
-    tg_chat_ids = bot.memory.get_by_path(['telesync', 'ho2tg', event.conv_id])
+    tg_chat_ids = tg_bot.get_tg_targets(event.conv_id)
     for tg_chat_id in tg_chat_ids:
         chat_tag = 'telesync:%s' % tg_chat_id
 
@@ -731,11 +727,7 @@ async def _handle_membership_change(bot, event):
         bot (hangupsbot.core.HangupsBot): the running instance
         event (hangupsbot.sync.event.SyncEventMembership): a data wrapper
     """
-    if not bot.memory.exists(['telesync', 'ho2tg', event.conv_id]):
-        # no sync is set
-        return
-
-    tg_chat_ids = bot.memory.get_by_path(['telesync', 'ho2tg', event.conv_id])
+    tg_chat_ids = bot.tg_bot.get_tg_targets(event.conv_id)
     for tg_chat_id in tg_chat_ids:
         chat_tag = 'telesync:%s' % tg_chat_id
 
@@ -5,7 +5,6 @@ import asyncio
 import io
 import json
 import logging
-import random
 import time
 
 import aiohttp
@@ -18,7 +17,13 @@ from telepot.loop import _extract_message
 from hangupsbot import plugins
 from hangupsbot.base_models import BotMixin
 from hangupsbot.sync.parser import get_formatted
-from hangupsbot.sync.sending_queue import AsyncQueueCache
+from hangupsbot.sync.sending_queue import (
+    AsyncQueueCache,
+    TextMerger,
+)
+from hangupsbot.utils.cache import Cache
+from hangupsbot.utils.rate_limit import RateLimiter
+from hangupsbot.utils.workers import OrderedWorkers
 from .commands_tg import (
     RESTRICT_OPTIONS,
     command_add_admin,
@@ -78,6 +83,24 @@ PERMANENT_SERVER_ERROR = telepot.exception.TelegramError(
     {}
 )
 
+# maximum length of a text message, also applies to coalesced messages
+TELEGRAM_MESSAGE_LIMIT = 4095
+
+# (rate, burst) for all api requests, messages per chat and the periodic
+# profile updates, which could likely end in a rate limit otherwise
+RATE_LIMITS = {
+    'global': (30, 30),
+    'chat': (1, 3),
+    'profile': (1 / 15, 1),
+}
+
+# memory path of updates that were fetched but not handled before a stop
+UNCONFIRMED_UPDATES_PATH = ['telesync', 'unconfirmed_updates']
+
+# seconds until the cached users of a chat are created again, membership
+# changes and profile updates invalidate them earlier
+MEMBER_CACHE_TIMEOUT = 600
+
 _RESTRICT_USERS_FAILED = _('<b>WARNING</b>: Rights for {names} in TG '
                            '<i>{chat_name}</i> could <b>not</b> be restricted, '
                            'please check manually!')
@@ -96,9 +119,16 @@ class TelegramBot(telepot.aio.Bot, BotMixin):
         api_key = self.config('api_key', False)
         super().__init__(api_key)
 
-        self._cache_sending_queue = AsyncQueueCache('telesync', self._send_html,
-                                                    bot=ho_bot)
+        self._cache_sending_queue = AsyncQueueCache(
+            'telesync', self._send_html, bot=ho_bot,
+            merge=TextMerger(1, TELEGRAM_MESSAGE_LIMIT))
         self._cache_sending_queue.start()
+        self._rate_limiter = RateLimiter(*RATE_LIMITS['global'],
+                                         limits=RATE_LIMITS, name='telesync')
+        self.update_workers = None
+        self._cache_members = Cache(MEMBER_CACHE_TIMEOUT,
+                                    name='telesync chat members',
+                                    increase_on_access=False)
 
         self._commands = {
             '/whoami': command_whoami,
@@ -159,18 +189,34 @@ class TelegramBot(telepot.aio.Bot, BotMixin):
             id(tracker), method, params, files, kwargs,
         )
 
+        if method == 'getUpdates':
+            # long polling, a separate key keeps the polling off the sending
+            #  limits and still applies a back off
+            keys = ('updates',)
+        elif (method.startswith('send') and isinstance(params, dict)
+              and 'chat_id' in params):
+            keys = ('global', ('chat', params['chat_id']))
+        else:
+            keys = ('global',)
+
         while retry <= limit:
             delay = 0
             try:
-                return await super()._api_request(
+                await self._rate_limiter.acquire(*keys)
+                result = await super()._api_request(
                     method=method,
                     params=params,
                     files=files,
                     **kwargs
                 )
-            except telepot.exception.TooManyRequestsError:
+                self._rate_limiter.succeeded(keys[-1])
+                return result
+            except telepot.exception.TooManyRequestsError as err:
                 msg = 'too many requests!'
-                delay = 30
+                retry_after = (err.json or {}).get(
+                    'parameters', {}).get('retry_after')
+                # the next attempt waits for the back off
+                delay = self._rate_limiter.back_off(keys[-1], retry_after)
 
             except telepot.exception.BadHTTPResponse as err:
                 msg = self._get_error_message(err, err.status, err.text)
@@ -194,7 +240,8 @@ class TelegramBot(telepot.aio.Bot, BotMixin):
                 'api request %s: %s/%s failed: %r',
                 id(tracker), retry, limit, msg
             )
-            await asyncio.sleep(delay or max(2 ** retry, 30))
+            if not delay:
+                await asyncio.sleep(max(2 ** retry, 30))
 
         logger.error(
             'api request %s: failed %s times. Last error: %r',
@@ -301,6 +348,70 @@ class TelegramBot(telepot.aio.Bot, BotMixin):
         queue = self._cache_sending_queue.get(tg_chat_id)
         return queue.schedule(tg_chat_id, html)
 
+    def get_ho_targets(self, tg_chat_id):
+        """get the conversations that a telegram chat is synced to
+
+        Args:
+            tg_chat_id (str): telegram chat identifier
+
+        Returns:
+            tuple[list[str], bool]: the conversation ids and a boolean that is
+                True for a channel sync
+        """
+        memory = self.bot.memory
+        tg2ho = memory.get_by_path(['telesync', 'tg2ho'])
+        if tg_chat_id in tg2ho:
+            return tg2ho[tg_chat_id], False
+        channel2ho = memory.get_by_path(['telesync', 'channel2ho'])
+        return channel2ho.get(tg_chat_id, []), True
+
+    def get_tg_targets(self, conv_id):
+        """get the telegram chats that a conversation is synced to
+
+        Args:
+            conv_id (str): hangouts conversation identifier
+
+        Returns:
+            list[str]: telegram chat identifiers
+        """
+        return self.bot.memory.get_by_path(['telesync', 'ho2tg']).get(conv_id,
+                                                                      [])
+
+    async def get_chat_users(self, tg_chat_id):
+        """get the known members of a telegram chat from cache or create them
+
+        Args:
+            tg_chat_id (str): telegram chat identifier
+
+        Returns:
+            list[user.User]: the members of the chat
+        """
+        users = self._cache_members.get(tg_chat_id)
+        if users is not None:
+            return users
+
+        path = ['telesync', 'chat_data', tg_chat_id, 'user']
+        if not self.bot.memory.exists(path):
+            return []
+
+        users = await asyncio.gather(*[
+            self.get_tg_user(user_id=user_id, chat_id=tg_chat_id,
+                             gpluslink=False)
+            for user_id in tuple(self.bot.memory.get_by_path(path))])
+        self._cache_members.add(tg_chat_id, users)
+        return users
+
+    def clear_chat_users(self, tg_chat_id=None):
+        """drop cached members of a chat or of all chats
+
+        Args:
+            tg_chat_id (str): telegram chat identifier, None for all chats
+        """
+        if tg_chat_id is None:
+            self._cache_members.clear()
+        else:
+            self._cache_members.pop(tg_chat_id, None)
+
     async def get_tg_user(self, user_id, chat_id=None, gpluslink=False,
                           use_cache=True):
         """get a User matching the user_id in a chat with chat_id
@@ -343,6 +454,7 @@ class TelegramBot(telepot.aio.Bot, BotMixin):
                         remove_user = 'status: %s' % response.get('status')
 
                 if remove_user:
+                    self._cache_members.pop(str(chat_id), None)
                     logger.info(
                         'memory cleanup %s: '
                         'remove user %s from chat %s with reason %r',
@@ -630,21 +742,14 @@ class TelegramBot(telepot.aio.Bot, BotMixin):
         Args:
             msg (message.Message): a message wrapper
         """
-        bot = self.bot
-        chat_id = msg.chat_id
-        if bot.memory.exists(['telesync', 'tg2ho', chat_id]):
-            ho_conv_ids = bot.memory.get_by_path(['telesync', 'tg2ho', chat_id])
-
-        elif bot.memory.exists(['telesync', 'channel2ho', chat_id]):
-            ho_conv_ids = bot.memory.get_by_path(
-                ['telesync', 'channel2ho', chat_id])
-
-            msg.user.is_self = True
-
-        else:
+        ho_conv_ids, is_channel = self.get_ho_targets(msg.chat_id)
+        if not ho_conv_ids:
             # no sync target set for this chat
             return
 
+        if is_channel:
+            msg.user.is_self = True
+
         if msg.image_info is not None:
             image = await self.get_image(*msg.image_info)
         else:
@@ -673,10 +778,11 @@ class TelegramBot(telepot.aio.Bot, BotMixin):
             msg (message.Message): a message wrapper
         """
         bot = self.bot
-        if not bot.memory.exists(['telesync', 'tg2ho', msg.chat_id]):
+        ho_conv_ids, is_channel = self.get_ho_targets(msg.chat_id)
+        if not ho_conv_ids or is_channel:
             # no sync target set for this chat
             return
-        ho_conv_ids = bot.memory.get_by_path(['telesync', 'tg2ho', msg.chat_id])
+        self._cache_members.pop(msg.chat_id, None)
 
         if 'new_chat_members' in msg:
             raw_users = msg['new_chat_members']
@@ -829,7 +935,8 @@ class TelegramBot(telepot.aio.Bot, BotMixin):
         sleep for x hours after each update run
         x determined by telesync config entry 'profile_update_interval'
 
-        this could likely end in a rate limit, delay each query by 10-20 seconds
+        this could likely end in a rate limit, the queries are throttled by the
+        'profile' rate limit
         """
         memory = self.bot.memory
 
@@ -842,12 +949,14 @@ class TelegramBot(telepot.aio.Bot, BotMixin):
                 return False
 
             updated_users.add(chat_id)
+            await self._rate_limiter.acquire('profile')
             logger.debug(
                 'profile update %s: user %s | chat %s',
                 timestamp, user_id, chat_id
             )
             await self.get_tg_user(user_id=user_id, chat_id=chat_id,
                                    use_cache=False)
+            self._cache_members.pop(chat_id, None)
             return True
 
         try:
@@ -862,8 +971,7 @@ class TelegramBot(telepot.aio.Bot, BotMixin):
                 )
                 for chat_id, data in chat_data.items():
                     for user_id in tuple(data.get('user', ())):
-                        if await update_user(chat_id, user_id):
-                            await asyncio.sleep(random.randint(10, 20))
+                        await update_user(chat_id, user_id)
                 logger.debug(
                     'profile update %s: finished',
                     timestamp
@@ -890,7 +998,8 @@ class TelegramBot(telepot.aio.Bot, BotMixin):
             for example for the chat with id 123:
             "conversations"->"telesync:123"->"enable_membership_check" = 1
 
-        this could likely end in a rate limit, delay each query by 10-20 seconds
+        this could likely end in a rate limit, the queries are throttled by the
+        'profile' rate limit
         """
         chat_path = ['telesync', 'chat_data']
         try:
@@ -913,10 +1022,10 @@ class TelegramBot(telepot.aio.Bot, BotMixin):
                             # the user left the chat
                             continue
 
+                        await self._rate_limiter.acquire('profile')
                         await self.get_tg_user(user_id=user_id,
                                                chat_id=chat_id,
                                                use_cache=False)
-                        await asyncio.sleep(random.randint(10, 20))
 
                 self.bot.memory.save()
                 await asyncio.sleep(
@@ -929,6 +1038,12 @@ class TelegramBot(telepot.aio.Bot, BotMixin):
     async def _message_loop(self):
         """long polling for updates and handle errors gracefully
 
+        Fetching an update confirms all previous updates to Telegram. The
+        updates that are not handled yet are written to the memory before
+        the next fetch, once per poll, and handled again on the next start.
+        The delivery is at-least-once: after a crash an update may be handled
+        twice. A full backlog of unhandled updates pauses the polling.
+
         Raises:
             UnauthorizedError: API-token invalid
             CancelledError: plugin unload in progress
@@ -976,31 +1091,120 @@ class TelegramBot(telepot.aio.Bot, BotMixin):
                 # valid message received and handled, exit fail-state
                 _reset_error_count()
 
+        def _get_chat_key(update):
+            """get the identifier of the chat that an `Update` belongs to
+
+            Args:
+                update (dict): see `https://core.telegram.org/bots/api#update`
+
+            Returns:
+                int: the chat id or None for updates without a chat
+            """
+            try:
+                return _extract_message(update)[1]['chat']['id']
+            except Exception:  # pylint:disable=broad-except
+                return None
+
+        def _get_offset():
+            """get the id of the next update to fetch
+
+            Returns:
+                int: the update id or None if no update was received yet
+            """
+            if dispatched is None:
+                return None
+            return dispatched + 1
+
+        async def _dispatch(update):
+            """queue an `Update` for the worker of its chat
+
+            Args:
+                update (dict): see `https://core.telegram.org/bots/api#update`
+
+            Raises:
+                CancelledError: plugin unload in progress
+            """
+            nonlocal dispatched
+            update_id = update['update_id']
+            dispatched = update_id
+            pending[update_id] = update
+            future = await self.update_workers.put(_get_chat_key(update),
+                                                   update)
+            future.add_done_callback(
+                lambda dummy: pending.pop(update_id, None))
+
+        def _store_pending():
+            """write the unhandled updates to the memory and dump it now
+
+            The next fetch confirms the dispatched updates to Telegram.
+            """
+            memory = self.bot.memory
+            if pending:
+                memory.set_by_path(UNCONFIRMED_UPDATES_PATH,
+                                   [pending[key] for key in sorted(pending)])
+            elif memory.exists(UNCONFIRMED_UPDATES_PATH):
+                memory.pop_by_path(UNCONFIRMED_UPDATES_PATH)
+            else:
+                return
+            memory.save(delay=False)
+
+        async def _restore_pending():
+            """dispatch the updates that were not handled in the last run
+
+            Raises:
+                CancelledError: plugin unload in progress
+            """
+            memory = self.bot.memory
+            if not memory.exists(UNCONFIRMED_UPDATES_PATH):
+                return
+            # the entry is replaced with the next poll
+            updates = memory.get_by_path(UNCONFIRMED_UPDATES_PATH)
+            logger.info('handling %d updates of the last run', len(updates))
+            for update_ in updates:
+                await _dispatch(update_)
+
         hard_reset = 0
         delay = 0.
-        offset = None
-        while hard_reset < self.config('message_loop_retries'):
-            await asyncio.sleep(hard_reset * 10 + delay)
-            hard_reset += 1
+        pending = {}
+        dispatched = None
+        self.update_workers = OrderedWorkers(
+            _handle_update, self.config('message_loop_concurrency'),
+            name='telesync',
+            max_queued=self.config('message_loop_max_queued'))
+        try:
+            await _restore_pending()
+            while hard_reset < self.config('message_loop_retries'):
+                await asyncio.sleep(hard_reset * 10 + delay)
+                hard_reset += 1
 
-            try:
-                while True:
-                    updates = await self.getUpdates(offset=offset, timeout=120)
-                    logger.debug('incoming updates: %r', updates)
-                    delay = .2
-                    for update_ in updates:
-                        offset = update_['update_id'] + 1
-                        await _handle_update(update_)
+                try:
+                    while True:
+                        updates = await self.getUpdates(offset=_get_offset(),
+                                                        timeout=120)
+                        logger.debug('incoming updates: %r', updates)
+                        delay = .2
+                        new_updates = [
+                            update_ for update_ in updates
+                            if dispatched is None
+                            or update_['update_id'] > dispatched
+                        ]
+                        for update_ in new_updates:
+                            await _dispatch(update_)
+                        if new_updates:
+                            _store_pending()
+
+                        await asyncio.sleep(delay)
 
-                    await asyncio.sleep(delay)
+                except telepot.exception.TelegramError as err:
+                    if err.error_code == 409:
+                        logger.warning(
+                            'The API-KEY is in use of another service! '
+                            'Telegram allows only one longpolling instance.')
+                        delay += 120
+                        await asyncio.sleep(delay)
+                        continue
 
-            except telepot.exception.TelegramError as err:
-                if err.error_code == 409:
-                    logger.warning(
-                        'The API-KEY is in use of another service! '
-                        'Telegram allows only one longpolling instance.')
-                    delay += 120
-                    await asyncio.sleep(delay)
-                    continue
-
-        logger.critical('ran out of retries, closing the message loop')
+            logger.critical('ran out of retries, closing the message loop')
+        finally:
+            _store_pending()
+            await self.update_workers.close()
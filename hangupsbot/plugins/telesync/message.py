@@ -8,6 +8,7 @@ import telepot
 
 from hangupsbot.base_models import BotMixin
 from hangupsbot.sync.event import SyncReply
+from hangupsbot.sync.reply_tracker import ReplyTracker
 from hangupsbot.sync.user import SyncUser
 from hangupsbot.utils.cache import Cache
 from .exceptions import (
@@ -57,7 +58,7 @@ class Message(dict, BotMixin):
         IgnoreMessage: the message should not be synced
         NotSupportedMessageType: the message type is not supported
     """
-    _last_messages = {}
+    _last_messages = ReplyTracker('telesync')
 
     def __init__(self, tg_bot: 'TelegramBot', msg):
         super().__init__(msg)
@@ -95,6 +96,9 @@ class Message(dict, BotMixin):
         if self.user.usr_id != '0':
             # list valid users in the chats users only
             user_path = base_path + ['user', self.user.usr_id]
+            if not self.bot.memory.exists(user_path):
+                # a new member, the cached members are incomplete
+                self.tg_bot.clear_chat_users(self.chat_id)
             self.bot.memory.set_by_path(user_path, 1)
         else:
             self.bot.memory.ensure_path(base_path)
@@ -120,24 +124,15 @@ class Message(dict, BotMixin):
         return str(self['message_id'])
 
     @classmethod
-    def add_message(cls, bot, chat_id, msg_id):
+    def add_message(cls, dummy, chat_id, msg_id):
         """add a message id to the last message and delete old items
 
         Args:
-            bot (hangupsbot.core.HangupsBot): the running instance
+            dummy (hangupsbot.core.HangupsBot): the running instance
             chat_id (int): identifier for a chat
             msg_id (int): int or string, the unique id of the message
         """
-        if chat_id in cls._last_messages:
-            messages = cls._last_messages[chat_id]
-        else:
-            messages = cls._last_messages[chat_id] = []
-
-        messages.append(int(msg_id or 0))
-        messages.sort(reverse=True)
-        for i in range(2 * bot.config['sync_reply_spam_offset'],
-                       len(messages)):
-            messages.pop(i)
+        cls._last_messages.track(chat_id, int(msg_id or 0))
 
     def get_group_name(self):
         """get a configured chat title or the current title of the chat
@@ -184,11 +179,8 @@ class Message(dict, BotMixin):
         else:
             image = None
 
-        try:
-            offset = self._last_messages[int(self.chat_id)].index(
-                int(self.reply.msg_id))
-        except ValueError:
-            offset = None
+        offset = self._last_messages.get_offset(self.chat_id,
+                                                int(self.reply.msg_id))
 
         return SyncReply(identifier='telesync', user=user, text=text,
                          offset=offset, image=image)
@@ -19,6 +19,11 @@ from hangupsbot.commands import Help
 
 logger = logging.getLogger(__name__)
 
+_INTERNAL = {"http": None}
+
+# in seconds
+CACHE_TIMEOUT = 3600
+
 HELP = {
     'twittersecret': _('Set your Twitter API Secret.\n'
                        'Get one from https://apps.twitter.com/app'),
@@ -47,6 +52,7 @@ def pretty_date(date):
 
 
 def _initialise():
+    _INTERNAL["http"] = plugins.get_http_client()
     plugins.register_admin_command([
         'twitterkey',
         'twittersecret',
@@ -154,10 +160,8 @@ async def _watch_twitter_link(bot, event):
     except (TwitterConnectionError, aiohttp.ClientError, hangups.NetworkError):
         url = event.text.lower()
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url) as response:
-                    response.raise_for_status()
-                    body = await response.text()
+            body = await _INTERNAL["http"].get_text(
+                url, cache_ttl=CACHE_TIMEOUT)
         except aiohttp.ClientError as err:
             logger.info('get %s: %s', id(url), url)
             logger.error('get %s: failed with %r', id(url), err)
@@ -13,6 +13,11 @@ from hangupsbot import plugins
 
 logger = logging.getLogger(__name__)
 
+_INTERNAL = {"http": None}
+
+# in seconds
+CACHE_TIMEOUT = 3600
+
 HELP = {
     'urbandict': _('lookup a term on Urban Dictionary. supplying no parameters '
                    'will get you a random term.\n'
@@ -78,10 +83,9 @@ async def urbandict(dummy0, dummy1, *args):
 
     logger.debug('api call %s: url %r', id(url), url)
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                response.raise_for_status()
-                data = await response.text()
+        # random terms must not be cached
+        data = await _INTERNAL["http"].get_text(
+            url, cache_ttl=CACHE_TIMEOUT if term else 0)
     except aiohttp.ClientError as err:
         if not logger.isEnabledFor(logging.DEBUG):
             # add context
@@ -120,6 +124,7 @@ async def urbandict(dummy0, dummy1, *args):
 
 
 def _initialise():
+    _INTERNAL["http"] = plugins.get_http_client()
     plugins.register_user_command([
         "urbandict",
     ])
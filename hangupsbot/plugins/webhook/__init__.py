@@ -2,11 +2,26 @@
 
 Broadcast messages as serialized json payload to web hooks
 
+Messages are queued per web hook and are posted in the background, failed
+posts are retried with an exponential back off. Messages above `max_pending`
+are spilled to a file next to the memory file, unless `spill_to_disk` is off.
+A `batch_size` above 1 posts a json array of up to `batch_size` messages,
+waiting at most `linger` seconds for a batch to fill up.
+
 config:
     'webhook': {
         'key_for_logs_and_memory': {
             'url': 'URL',
         },
+        'batched_key_for_logs_and_memory': {
+            'url': 'URL',
+            'batch_size': 50,
+            'linger': 2,
+            'retries': 5,
+            'max_pending': 1000,
+            'spill_to_disk': True,
+            'concurrency': 5,
+        },
         'other_key_for_logs_and_memory': {
             'url': 'URL',
             'params': {
@@ -38,18 +53,34 @@ __author__ = 'Jakob Ackermann <das7pad@outlook.com>'
 
 import asyncio
 import logging
+import os
 
 import aiohttp
 
 from hangupsbot import plugins
 from hangupsbot.base_models import BotMixin
+from hangupsbot.utils.workers import OrderedWorkers
 from hangupsbot.version import __version__
 
+from .delivery import DeliveryQueue
+
 
 logger = logging.getLogger(__name__)
 DEFAULT_HEADER = {
     'X-Powered-By': 'hangupsbot (%s)' % __version__,
 }
+DEFAULT_OPTIONS = {
+    'batch_size': 1,
+    'linger': 0,
+    'retries': 5,
+    'max_pending': 1000,
+    'spill_to_disk': True,
+    'concurrency': 5,
+}
+# status codes of responses that are worth a retry
+RETRY_STATUS = frozenset((408, 429))
+# seconds to serialize the queued events on unload
+SERIALIZER_CLOSE_TIMEOUT = 5
 
 
 async def _initialize(bot):
@@ -70,6 +101,7 @@ async def _initialize(bot):
             name=name,
             target=config['url'],
             params=config['params'],
+            options={key: config[key] for key in DEFAULT_OPTIONS},
         )
         await handler.start()
 
@@ -88,6 +120,14 @@ def _check_config(config):
             "expected config item 'params' type of dict, got %s"
             % type(config['params'])
         )
+    for key, default in DEFAULT_OPTIONS.items():
+        if key in config and not isinstance(config[key], type(default)):
+            if isinstance(default, int) and isinstance(config[key], float):
+                continue
+            return (
+                'expected config item %r type of %s, got %s'
+                % (key, type(default), type(config[key]))
+            )
     return None
 
 
@@ -111,6 +151,7 @@ def _get_valid_web_hooks(web_hooks) -> dict:
         full_config = {
             'params': {},
         }
+        full_config.update(DEFAULT_OPTIONS)
         full_config.update(config)
         valid_web_hooks[name] = full_config
 
@@ -118,7 +159,7 @@ def _get_valid_web_hooks(web_hooks) -> dict:
 
 
 class Handler(BotMixin):
-    def __init__(self, name, target, params):
+    def __init__(self, name, target, params, options=None):
         self._logger = _get_logger(name)
         self._name = name
         self._target = target
@@ -127,6 +168,29 @@ class Handler(BotMixin):
 
         self.bot.memory.set_defaults({self._name: []}, ['webhook'])
 
+        options = dict(DEFAULT_OPTIONS, **(options or {}))
+        spill_path = None
+        if options['spill_to_disk']:
+            spill_path = os.path.join(
+                os.path.dirname(os.path.abspath(self.bot.memory.filename)),
+                'webhook_%s.spill' % name,
+            )
+        self.queue = DeliveryQueue(
+            name,
+            self.send,
+            batch_size=options['batch_size'],
+            linger=options['linger'],
+            retries=options['retries'],
+            max_pending=options['max_pending'],
+            spill_path=spill_path,
+        )
+        # serialize events concurrently, but keep the order per conversation
+        self._serializer = OrderedWorkers(
+            self._enqueue_event,
+            limit=options['concurrency'],
+            name='webhook.' + name,
+        )
+
     async def _set_session(self):
         headers = self._params.pop('headers', {})
         headers.update(DEFAULT_HEADER)
@@ -141,6 +205,17 @@ class Handler(BotMixin):
             self._handle_message,
             name='allmessages_once'
         )
+        plugins.start_asyncio_task(self._run)
+
+    async def _run(self):
+        """deliver queued messages and stop the serializer on unload"""
+        try:
+            await self.queue.run()
+        finally:
+            # serialize the backlog of events to spill them as well
+            await self._serializer.join(SERIALIZER_CLOSE_TIMEOUT)
+            await self._serializer.close()
+            await self.queue.spill_pending()
 
     async def _handle_message(self, bot, event):
         """process an event
@@ -218,19 +293,30 @@ class Handler(BotMixin):
         }
 
     async def send_message(self, event):
-        """send an event
+        """queue an event for the delivery, serialization runs in background
+
+        Args:
+            event (hangupsbot.sync.event.SyncEvent): an event
+        """
+        self._serializer.submit(event.conv_id, event)
+
+    async def _enqueue_event(self, event):
+        """serialize an event and add it to the delivery queue
 
         Args:
             event (hangupsbot.sync.event.SyncEvent): an event
         """
         message = await self.serialize_event(event)
-        await self.send(message)
+        await self.queue.put(message)
 
     async def send(self, message):
         """post the message to the web hook
 
         Args:
-            message (dict): json body
+            message (mixed): json body, a message or a list of messages
+
+        Returns:
+            bool: False if the post should be retried, otherwise True
 
         Raises:
             asyncio.CancelledError: message sending got cancelled
@@ -240,11 +326,13 @@ class Handler(BotMixin):
             id(message), message
         )
         try:
-            await self._session.post(
+            response = await self._session.post(
                 self._target,
                 json=message,
                 **self._params
             )
+            # release the connection
+            await response.read()
         except asyncio.CancelledError:
             self._logger.info(
                 'sending message %s: cancelled',
@@ -256,3 +344,18 @@ class Handler(BotMixin):
                 'send message %s: failed %r',
                 id(message), err
             )
+            return False
+
+        if response.status >= 500 or response.status in RETRY_STATUS:
+            self._logger.error(
+                'send message %s: failed with status %s',
+                id(message), response.status
+            )
+            return False
+        if response.status >= 400:
+            # a retry would fail again
+            self._logger.error(
+                'send message %s: rejected with status %s',
+                id(message), response.status
+            )
+        return True
@@ -0,0 +1,328 @@
+"""batched and retrying delivery of web hook messages"""
+__author__ = 'das7pad@outlook.com'
+
+import asyncio
+import collections
+import json
+import logging
+import os
+import shutil
+import time
+
+from hangupsbot.utils.workers import LatencyStats
+
+
+DEFAULT_BACK_OFF = 1  # seconds
+MAX_BACK_OFF = 300  # seconds
+
+# the spill file starts with the byte offset of the first unread line
+SPILL_HEADER = b'%020d\n'
+SPILL_HEADER_SIZE = len(SPILL_HEADER % 0)
+
+
+class DeliveryQueue:
+    """queue messages for a web hook and post them in batches
+
+    Failed batches are retried with an exponential back off. Messages above
+    `max_pending` are appended to a spill file and are read again once the
+    queue has room for them. On cancel the pending messages and the batch in
+    flight are spilled as well and are delivered after the next start, a
+    batch that was cancelled during its post may be delivered twice. Reading
+    the spill file advances an offset in its header, a rewrite replaces the
+    whole file with a new one. The file operations run in an executor.
+
+    Args:
+        name (str): identifier for the log entries
+        send (callable): coroutine function, called with the payload, a
+            message or a list of messages, returns False to retry the batch
+        batch_size (int): maximum number of messages per post, a batch size
+            of 1 posts a single message instead of a list
+        linger (float): time in seconds to wait for a full batch
+        retries (int): number of retries per batch before it gets dropped
+        max_pending (int): number of messages kept in memory
+        spill_path (str): file for the overflow, None to drop the oldest
+            messages instead
+        sleep (callable): coroutine function to wait for a given time
+    """
+    __slots__ = ('_logger', '_send', '_batch_size', '_linger', '_retries',
+                 '_max_pending', '_spill_path', '_sleep', '_items', '_spilled',
+                 '_ready', '_in_flight', '_file_lock', 'latency', 'delivered',
+                 'failed', 'dropped')
+
+    def __init__(self, name, send, *, batch_size=1, linger=0., retries=5,
+                 max_pending=1000, spill_path=None, sleep=None):
+        self._logger = logging.getLogger('%s.%s' % (__name__, name))
+        self._send = send
+        self._batch_size = max(1, batch_size)
+        self._linger = linger
+        self._retries = retries
+        self._max_pending = max(self._batch_size, max_pending)
+        self._spill_path = spill_path
+        self._sleep = sleep or asyncio.sleep
+        self._items = collections.deque()
+        self._spilled = 0
+        self._ready = asyncio.Event()
+        self._in_flight = []
+        self._file_lock = asyncio.Lock()
+        self.latency = LatencyStats()
+        self.delivered = 0
+        self.failed = 0
+        self.dropped = 0
+
+        if spill_path and os.path.isfile(spill_path):
+            with open(spill_path, 'rb') as file:
+                file.seek(_read_offset(file))
+                self._spilled = sum(1 for line in file if line.strip())
+            if self._spilled:
+                self._ready.set()
+
+    async def put(self, message):
+        """queue a message
+
+        Args:
+            message (dict): the json body
+        """
+        item = (time.time(), message)
+        if self._spilled or len(self._items) >= self._max_pending:
+            if self._spill_path:
+                # keep the order, newer messages follow the spilled ones
+                await self._spill([item])
+            else:
+                self._items.popleft()
+                self._items.append(item)
+                self.dropped += 1
+                self._logger.warning('queue full, dropped the oldest message')
+        else:
+            self._items.append(item)
+        self._ready.set()
+
+    def stats(self):
+        """get the delivery counters
+
+        Returns:
+            dict: `pending`, `spilled`, `delivered`, `failed` attempts,
+                `dropped` messages and the `latency` summary
+        """
+        return {
+            'pending': len(self._items),
+            'spilled': self._spilled,
+            'delivered': self.delivered,
+            'failed': self.failed,
+            'dropped': self.dropped,
+            'latency': self.latency.summary(),
+        }
+
+    async def run(self):
+        """deliver the queued messages until cancelled
+
+        Raises:
+            CancelledError: the queue got stopped, pending messages were
+                spilled to disk
+        """
+        try:
+            while True:
+                self._in_flight = await self._get_batch()
+                await self._deliver(self._in_flight)
+                self._in_flight = []
+        except asyncio.CancelledError:
+            self._items.extendleft(reversed(self._in_flight))
+            self._in_flight = []
+            await self.spill_pending()
+            raise
+
+    async def spill_pending(self):
+        """move the messages from memory into the spill file"""
+        if not self._spill_path or not self._items:
+            return
+        self._logger.info('spilling %s pending messages', len(self._items))
+        items = list(self._items)
+        self._items.clear()
+        # messages in memory are older than the spilled ones
+        await self._spill(items, prepend=True)
+
+    async def _get_batch(self):
+        """wait for messages and collect a batch
+
+        Returns:
+            list[tuple[float, dict]]: queued timestamp and message
+        """
+        while not self._items:
+            if self._spilled:
+                await self._load_spilled()
+                continue
+            self._ready.clear()
+            await self._ready.wait()
+
+        if self._linger and len(self._items) < self._batch_size:
+            deadline = time.monotonic() + self._linger
+            while len(self._items) + self._spilled < self._batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._ready.clear()
+                try:
+                    await asyncio.wait_for(self._ready.wait(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            if self._spilled and len(self._items) < self._batch_size:
+                await self._load_spilled()
+
+        count = min(self._batch_size, len(self._items))
+        return [self._items.popleft() for dummy in range(count)]
+
+    async def _deliver(self, batch):
+        """post a batch and retry it on failure
+
+        Args:
+            batch (list[tuple[float, dict]]): queued timestamp and message
+        """
+        messages = [message for dummy, message in batch]
+        payload = messages[0] if self._batch_size == 1 else messages
+        for attempt in range(self._retries + 1):
+            if await self._send(payload):
+                now = time.time()
+                for queued, dummy in batch:
+                    self.latency.add(now - queued)
+                self.delivered += len(batch)
+                return
+
+            self.failed += 1
+            if attempt < self._retries:
+                delay = min(MAX_BACK_OFF, DEFAULT_BACK_OFF * 2 ** attempt)
+                self._logger.info('retry %s/%s in %ss', attempt + 1,
+                                  self._retries, delay)
+                await self._sleep(delay)
+
+        self.dropped += len(batch)
+        self._logger.error('dropped %s messages after %s retries',
+                           len(batch), self._retries)
+
+    async def _spill(self, items, prepend=False):
+        """write items to the spill file
+
+        Args:
+            items (iterable[tuple[float, dict]]): queued timestamp and message
+            prepend (bool): toggle to insert the items before spilled items
+        """
+        lines = [json.dumps({'queued': queued, 'message': message}) + '\n'
+                 for queued, message in items]
+        loop = asyncio.get_event_loop()
+        async with self._file_lock:
+            mode = ('prepend' if prepend and self._spilled else
+                    'append' if self._spilled else 'replace')
+            await loop.run_in_executor(None, _write_lines, self._spill_path,
+                                       lines, mode)
+            self._spilled += len(lines)
+
+    async def _load_spilled(self):
+        """move spilled items from disk back into the queue"""
+        loop = asyncio.get_event_loop()
+        room = self._max_pending - len(self._items)
+        async with self._file_lock:
+            lines, drained = await loop.run_in_executor(
+                None, _pop_lines, self._spill_path, room)
+            self._spilled = (0 if drained else
+                             max(0, self._spilled - len(lines)))
+
+        for line in lines:
+            try:
+                data = json.loads(line)
+                self._items.append((data['queued'], data['message']))
+            except (ValueError, KeyError):
+                self.dropped += 1
+                self._logger.error('dropped a corrupt spilled message')
+
+
+def _read_offset(file):
+    """get the position of the first unread line in a spill file
+
+    Args:
+        file (io.BufferedIOBase): the spill file, opened in binary mode
+
+    Returns:
+        int: the byte offset, the start of the lines for a corrupt header
+    """
+    file.seek(0)
+    try:
+        return max(SPILL_HEADER_SIZE, int(file.read(SPILL_HEADER_SIZE)))
+    except ValueError:
+        return SPILL_HEADER_SIZE
+
+
+def _replace_file(path, data, source=None):
+    """write a new spill file and swap it in atomically
+
+    Args:
+        path (str): the file location
+        data (bytes): the first lines of the new file
+        source (io.BufferedIOBase): a file to copy the rest from, starting at
+            its current position
+    """
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as file:
+        file.write(SPILL_HEADER % 0)
+        file.write(data)
+        if source is not None:
+            shutil.copyfileobj(source, file)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, path)
+
+
+def _write_lines(path, lines, mode):
+    """add lines to a spill file
+
+    Args:
+        path (str): the file location
+        lines (list[str]): the new lines
+        mode (str): 'prepend', 'append' or 'replace' the present lines
+    """
+    data = ''.join(lines).encode()
+    if mode == 'append':
+        with open(path, 'ab') as file:
+            file.write(data)
+    elif mode == 'prepend':
+        with open(path, 'rb') as file:
+            file.seek(_read_offset(file))
+            _replace_file(path, data, file)
+    else:
+        _replace_file(path, data)
+
+
+def _pop_lines(path, count):
+    """read lines from the start of a spill file and mark them as read
+
+    The file is removed once all lines are read. It is compacted once the
+    read lines make up more than half of it.
+
+    Args:
+        path (str): the file location
+        count (int): the number of lines to read
+
+    Returns:
+        tuple[list[bytes], bool]: the read lines and whether the file is
+            drained
+    """
+    with open(path, 'r+b') as file:
+        offset = _read_offset(file)
+        file.seek(offset)
+        lines = []
+        while len(lines) < count:
+            line = file.readline()
+            if not line:
+                break
+            offset += len(line)
+            if line.strip():
+                lines.append(line)
+
+        size = os.fstat(file.fileno()).st_size
+        drained = offset >= size
+        if not drained and offset > size // 2:
+            _replace_file(path, b'', file)
+        elif not drained:
+            file.seek(0)
+            file.write(SPILL_HEADER % offset)
+
+    if drained:
+        os.remove(path)
+    return lines, drained
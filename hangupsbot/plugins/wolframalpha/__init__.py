@@ -21,6 +21,10 @@ from hangupsbot import plugins
 logger = logging.getLogger(__name__)
 
 API_URL = "https://api.wolframalpha.com/v2/query"
+# in seconds
+CACHE_TIMEOUT = 3600
+
+_INTERNAL = {"http": None}
 
 HELP = {
     'ask': _('solve a question with wolfram alpha'),
@@ -30,6 +34,7 @@ HELP = {
 def _initialise(bot):
     """register the user command"""
     if _api_token(bot):
+        _INTERNAL["http"] = plugins.get_http_client()
         plugins.register_user_command([
             "ask",
         ])
@@ -56,6 +61,19 @@ async def ask(bot, dummy, *args):
     return result
 
 
+def _is_success(body):
+    """check whether a reply can be cached
+
+    Args:
+        body (bytes): the raw reply of the api
+
+    Returns:
+        bool: True if the query succeeded and the reply has results
+    """
+    result = wolframalpha.Result(body)
+    return bool(result.get('@success') and result.get('pod'))
+
+
 async def _fetch(bot, args):
     """fetch data from wolframalpha and parse the response
 
@@ -72,9 +90,13 @@ async def _fetch(bot, args):
     query = ' '.join(args)
     parameters = {'appid': _api_token(bot), 'input': query}
 
-    async with aiohttp.ClientSession() as session:
-        async with session.get(API_URL, params=parameters) as resp:
-            body = await resp.read()
+    try:
+        body = await _INTERNAL["http"].get_bytes(
+            API_URL, params=parameters, cache_ttl=CACHE_TIMEOUT,
+            cacheable=_is_success)
+    except aiohttp.ClientError as err:
+        logger.error('query %s: request failed %r', id(parameters), err)
+        return _('Bad request!')
 
     result = wolframalpha.Result(body)
     if not result.get('@success'):
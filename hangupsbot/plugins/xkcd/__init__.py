@@ -1,7 +1,7 @@
 # vim: set ts=4 expandtab sw=4
 
 import io
-import json
+import logging
 import os.path
 import re
 import urllib.parse
@@ -12,10 +12,17 @@ from hangups import ChatMessageSegment
 from hangupsbot import plugins
 
 
+logger = logging.getLogger(__name__)
+
 _CACHE = {}
+_INTERNAL = {"http": None}
+
+# in seconds
+LATEST_COMIC_CACHE_TIMEOUT = 300
 
 
 def _initialise():
+    _INTERNAL["http"] = plugins.get_http_client()
     plugins.register_user_command([
         "xkcd",
     ])
@@ -85,19 +92,21 @@ async def _get_comic(bot, num=None):
     if num in _CACHE:
         return _CACHE[num]
 
-    async with aiohttp.ClientSession() as session:
-        async with session.request('get', url) as request:
-            raw = await request.read()
-    info = json.loads(raw.decode())
+    try:
+        # the latest comic changes, numbered ones are cached below
+        info = await _INTERNAL["http"].get_json(
+            url, cache_ttl=0 if num else LATEST_COMIC_CACHE_TIMEOUT)
+
+        if info['num'] in _CACHE:
+            # may happen when searching for the latest comic
+            return _CACHE[info['num']]
 
-    if info['num'] in _CACHE:
-        # may happen when searching for the latest comic
-        return _CACHE[info['num']]
+        filename = os.path.basename(info["img"])
+        raw = await _INTERNAL["http"].get_bytes(info["img"])
+    except aiohttp.ClientError as err:
+        logger.error('get comic %s: request failed: %r', num, err)
+        return None
 
-    filename = os.path.basename(info["img"])
-    async with aiohttp.ClientSession() as session:
-        async with session.request('get', info["img"]) as request:
-            raw = await request.read()
     image_data = io.BytesIO(raw)
     info['image_id'] = await bot.upload_image(image_data, filename=filename)
     _CACHE[info['num']] = info
@@ -106,6 +115,8 @@ async def _get_comic(bot, num=None):
 
 async def _print_comic(bot, event, num=None):
     info = await _get_comic(bot, num)
+    if info is None:
+        return
     image_id = info['image_id']
 
     context = {
@@ -140,9 +151,11 @@ async def _search_comic(bot, event, terms):
             }
         )
     )
-    async with aiohttp.ClientSession() as session:
-        async with session.request('get', url) as request:
-            raw = await request.read()
+    try:
+        raw = await _INTERNAL["http"].get_bytes(url)
+    except aiohttp.ClientError as err:
+        logger.error('search comic %r: request failed: %r', terms, err)
+        return
     values = [row.strip().split(" ")[0] for row in
               raw.decode().strip().split("\n")]
 
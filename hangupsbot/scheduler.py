@@ -0,0 +1,338 @@
+"""run delayed jobs of plugins, persistent jobs survive restarts"""
+__author__ = 'das7pad@outlook.com'
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+import uuid
+
+from hangupsbot import plugins
+from hangupsbot.base_models import BotMixin
+
+
+logger = logging.getLogger(__name__)
+
+# persistent jobs in the bot memory: job id -> job
+MEMORY_PATH = ['scheduler']
+
+# retry failed jobs, the delay doubles with each failed attempt
+RETRY_DELAY = 60  # seconds
+MAX_ATTEMPTS = 5
+
+
+class Scheduler(BotMixin):
+    """run jobs at a given time with a single timer for all jobs
+
+    Jobs are kept in a heap ordered by their due time. One timer handle of the
+    event loop wakes the scheduler for the earliest job, an entry of a
+    cancelled or rescheduled job is skipped once it reaches the top.
+
+    A job names a handler, registered by a plugin, and carries a json
+    serializable payload. The handler is a coroutine function and is called
+    with the bot and the payload: `handler(bot, payload)`.
+
+    Persistent jobs are stored in the bot memory and removed only after the
+    handler completed: jobs that were due during a downtime or got cancelled
+    by a plugin unload run again once the handler is registered again.
+    """
+    __slots__ = ('_handlers', '_jobs', '_heap', '_counter', '_parked',
+                 '_running', '_timer', '_timer_due', '_save_handle')
+
+    def __init__(self):
+        self._handlers = {}  # name -> (handler, plugin metadata)
+        self._jobs = {}  # job id -> job
+        self._heap = []  # (due, counter, job id)
+        self._counter = itertools.count()
+        self._parked = {}  # handler name -> set of job ids
+        self._running = {}  # job id -> (job, asyncio.Task)
+        self._timer = None
+        self._timer_due = None
+        self._save_handle = None
+
+    def setup(self):
+        """load the persistent jobs from memory"""
+        memory = self.bot.memory
+        if not memory.exists(MEMORY_PATH):
+            return
+
+        for job_id, job in memory.get_by_path(MEMORY_PATH).items():
+            job = dict(job, persistent=True)
+            self._jobs[job_id] = job
+            self._push(job_id, job)
+        logger.info('loaded %s persistent jobs', len(self._jobs))
+        self._arm()
+
+    async def close(self):
+        """stop the timer and cancel the running jobs
+
+        The persistent jobs stay in memory and run again after the next start.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = self._timer_due = None
+        if self._save_handle is not None:
+            self._save_handle.cancel()
+            self._save()
+
+        tasks = [task for dummy, task in self._running.values()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        self._jobs.clear()
+        self._heap.clear()
+        self._parked.clear()
+
+    def register_handler(self, name, handler):
+        """register a handler for jobs, pending jobs of the name get queued
+
+        Args:
+            name (str): a unique identifier for the handler, e.g. `plugin.job`
+            handler (callable): coroutine function, footprint: (bot, payload)
+
+        Raises:
+            ValueError: the handler is not a coroutine function
+        """
+        if not asyncio.iscoroutinefunction(handler):
+            raise ValueError('%s: handler must be a coroutine function' % name)
+
+        current_plugin = plugins.tracking.current
+        self._handlers[name] = (handler, current_plugin['metadata'])
+
+        for job_id in self._parked.pop(name, ()):
+            job = self._jobs.get(job_id)
+            if job is not None:
+                self._push(job_id, job)
+        self._arm()
+
+    def deregister_plugin(self, module_path):
+        """remove the handlers of a plugin and cancel their running jobs
+
+        Args:
+            module_path (str): identifier for a loaded module
+        """
+        for name, (dummy, metadata) in list(self._handlers.items()):
+            if metadata.get('module.path') != module_path:
+                continue
+            logger.debug('removing job handler %s', name)
+            del self._handlers[name]
+
+        for job, task in list(self._running.values()):
+            if job['handler'] not in self._handlers:
+                task.cancel()
+
+    def schedule(self, handler, delay=0, payload=None, *, due=None,
+                 job_id=None, persistent=True):
+        """add a job, an existing job with the same id gets replaced
+
+        Args:
+            handler (str): the name of a registered or future job handler
+            delay (float): time in seconds to wait until the job is due
+            payload (mixed): json serializable argument for the handler
+            due (float): optional, a unix timestamp, overrides the delay
+            job_id (str): optional, a custom unique identifier for the job
+            persistent (bool): set to False to keep the job in memory only
+
+        Returns:
+            str: the job id
+        """
+        if job_id is None:
+            job_id = uuid.uuid4().hex
+        else:
+            self.cancel(job_id)
+
+        job = {
+            'handler': handler,
+            'due': time.time() + delay if due is None else due,
+            'payload': payload,
+            'attempts': 0,
+            'persistent': persistent,
+        }
+        self._jobs[job_id] = job
+        self._persist(job_id, job)
+        self._push(job_id, job)
+        self._arm()
+        return job_id
+
+    def cancel(self, job_id):
+        """remove a job, a running job is not interrupted
+
+        Args:
+            job_id (str): the job identifier
+
+        Returns:
+            bool: True if the job was pending, otherwise False
+        """
+        job = self._jobs.pop(job_id, None)
+        if job is None:
+            return False
+        self._parked.get(job['handler'], set()).discard(job_id)
+        path = MEMORY_PATH + [job_id]
+        if job['persistent'] and self.bot.memory.exists(path):
+            self.bot.memory.pop_by_path(path)
+            self._save_soon()
+        return self._running.get(job_id, (None,))[0] is not job
+
+    def get_job(self, job_id):
+        """get the details of a pending job
+
+        Args:
+            job_id (str): the job identifier
+
+        Returns:
+            dict: a copy of the job with the keys 'handler', 'due', 'payload',
+                'attempts' and 'persistent' or None if the job is unknown
+        """
+        job = self._jobs.get(job_id)
+        return dict(job) if job is not None else None
+
+    def stats(self):
+        """get the current load of the scheduler
+
+        Returns:
+            dict: the number of `pending`, `parked` and `running` jobs
+        """
+        return {
+            'pending': len(self._jobs),
+            'parked': sum(len(job_ids) for job_ids in self._parked.values()),
+            'running': len(self._running),
+        }
+
+    def _persist(self, job_id, job):
+        """store the current state of a persistent job in memory
+
+        Args:
+            job_id (str): the job identifier
+            job (dict): the job
+        """
+        if not job['persistent']:
+            return
+        self.bot.memory.set_by_path(
+            MEMORY_PATH + [job_id],
+            {key: value for key, value in job.items() if key != 'persistent'})
+        self._save_soon()
+
+    def _save_soon(self):
+        """save the memory once for all changes of the current loop iteration
+
+        A save compares a dump of the full memory, changes of many jobs, e.g.
+        on startup or for jobs with the same due time, share a single save.
+        """
+        if self._save_handle is None:
+            self._save_handle = asyncio.get_event_loop().call_soon(self._save)
+
+    def _save(self):
+        """save the memory"""
+        self._save_handle = None
+        self.bot.memory.save()
+
+    def _push(self, job_id, job):
+        """queue a job for its due time
+
+        Args:
+            job_id (str): the job identifier
+            job (dict): the job
+        """
+        heapq.heappush(self._heap, (job['due'], next(self._counter), job_id))
+
+        if len(self._heap) > 2 * len(self._jobs) + 64:
+            # drop the entries of cancelled and rescheduled jobs
+            self._heap = [entry for entry in self._heap
+                          if self._is_current(entry)]
+            heapq.heapify(self._heap)
+
+    def _is_current(self, entry):
+        """check whether a heap entry belongs to a pending job
+
+        Args:
+            entry (tuple): due time, counter and job id
+
+        Returns:
+            bool: True if the job is pending with the due time of the entry
+        """
+        due, dummy, job_id = entry
+        job = self._jobs.get(job_id)
+        return job is not None and job['due'] == due
+
+    def _arm(self):
+        """set the timer for the earliest job"""
+        while self._heap and not self._is_current(self._heap[0]):
+            heapq.heappop(self._heap)
+        if not self._heap:
+            return
+
+        due = self._heap[0][0]
+        if self._timer is not None:
+            if self._timer_due <= due:
+                # the timer fires earlier
+                return
+            self._timer.cancel()
+
+        delay = max(0., due - time.time())
+        self._timer = asyncio.get_event_loop().call_later(delay, self._wake)
+        self._timer_due = due
+
+    def _wake(self):
+        """start all due jobs and set the timer for the next job"""
+        self._timer = self._timer_due = None
+        now = time.time()
+        while self._heap and self._heap[0][0] <= now:
+            entry = heapq.heappop(self._heap)
+            if not self._is_current(entry):
+                continue
+
+            job_id = entry[2]
+            job = self._jobs[job_id]
+            if job['handler'] not in self._handlers:
+                # wait for the plugin to register the handler
+                self._parked.setdefault(job['handler'], set()).add(job_id)
+                continue
+
+            self._running[job_id] = (
+                job, asyncio.ensure_future(self._run(job_id, job)))
+        self._arm()
+
+    async def _run(self, job_id, job):
+        """run the handler of a job, retry on failure
+
+        Args:
+            job_id (str): the job identifier
+            job (dict): the job
+        """
+        handler = self._handlers[job['handler']][0]
+        job['attempts'] += 1
+        self._persist(job_id, job)
+        failed = False
+        try:
+            await handler(self.bot, job['payload'])
+        except asyncio.CancelledError:
+            # the plugin got unloaded, wait for the next registration
+            logger.info('job %s %s: cancelled', job['handler'], job_id)
+            if self._jobs.get(job_id) is job:
+                self._parked.setdefault(job['handler'], set()).add(job_id)
+            return
+        except Exception:  # pylint:disable=broad-except
+            logger.exception('job %s %s: attempt %s failed',
+                             job['handler'], job_id, job['attempts'])
+            failed = True
+        finally:
+            if self._running.get(job_id, (None,))[0] is job:
+                del self._running[job_id]
+
+        if self._jobs.get(job_id) is not job:
+            # cancelled or replaced meanwhile
+            return
+
+        if not failed:
+            self.cancel(job_id)
+        elif job['attempts'] < MAX_ATTEMPTS:
+            job['due'] = time.time() + RETRY_DELAY * 2 ** (job['attempts'] - 1)
+            self._persist(job_id, job)
+            self._push(job_id, job)
+            self._arm()
+        else:
+            logger.error('job %s %s: dropped after %s attempts',
+                         job['handler'], job_id, job['attempts'])
+            self.cancel(job_id)
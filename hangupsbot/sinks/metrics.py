@@ -0,0 +1,141 @@
+"""serve the metrics of the bot in the Prometheus text format"""
+__author__ = 'das7pad@outlook.com'
+
+import asyncio
+import logging
+
+from aiohttp import web
+
+from hangupsbot import (
+    logs,
+    metrics,
+)
+from . import aiohttp_start
+from .base_bot_request_handler import AsyncRequestHandler
+
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+LOOP_LAG = metrics.gauge(
+    'hangupsbot_loop_lag_seconds',
+    'delay of the event loop in the last check').labels()
+LOOP_LAG_SECONDS = metrics.histogram(
+    'hangupsbot_loop_lag_check_seconds',
+    'delay of the event loop per check').labels()
+
+_STATE = {
+    'monitor': None,
+}
+
+
+class MetricsRequestHandler(AsyncRequestHandler):
+    """serve all metrics on GET /metrics"""
+
+    def addroutes(self, router):
+        router.add_route('GET', '/metrics', self.adapter_do_get)
+
+    async def adapter_do_get(self, request):
+        """render the current metrics
+
+        Args:
+            request (aiohttp.web.Request): the scrape request
+
+        Returns:
+            aiohttp.web.Response: the metrics as plain text
+        """
+        # pylint:disable=unused-argument
+        return web.Response(body=metrics.render().encode(),
+                            headers={'Content-Type': CONTENT_TYPE})
+
+
+async def _monitor_loop_lag(interval):
+    """measure the delay of the event loop
+
+    Args:
+        interval (float): seconds between the checks
+    """
+    loop = asyncio.get_event_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        lag = max(loop.time() - started - interval, 0.)
+        LOOP_LAG.set(lag)
+        LOOP_LAG_SECONDS.observe(lag)
+
+
+def _register_stats(bot):
+    """expose the counters of the scheduler and the logging queue
+
+    Args:
+        bot (hangupsbot.core.HangupsBot): the running instance
+    """
+    metrics.gauge_callback(
+        'hangupsbot_scheduler_jobs', 'jobs of the scheduler per state',
+        lambda: bot.scheduler.stats() if bot.scheduler is not None else {},
+        ('state',))
+    metrics.counter_callback(
+        'hangupsbot_log_records', 'records of the logging queue per state',
+        _get_log_totals, ('state',))
+    metrics.gauge_callback(
+        'hangupsbot_log_records_pending',
+        'records in the logging queue', _get_log_pending)
+
+
+def _get_log_totals():
+    """get the monotonic counters of the logging queue
+
+    Returns:
+        dict: the number of `queued` and `dropped` records, empty if the
+            logging queue is not active
+    """
+    stats = logs.get_stats()
+    return {state: stats[state] for state in ('queued', 'dropped')
+            if state in stats}
+
+
+def _get_log_pending():
+    """get the size of the logging queue
+
+    Returns:
+        dict: the number of pending records, empty if the logging queue is not
+            active
+    """
+    stats = logs.get_stats()
+    return {(): stats['pending']} if 'pending' in stats else {}
+
+
+def start(bot):
+    """enable the collection and serve the metrics if a port is configured
+
+    Args:
+        bot (hangupsbot.core.HangupsBot): the running instance
+    """
+    port = bot.config.get_option('metrics_port')
+    if not port:
+        metrics.set_enabled(False)
+        return
+
+    metrics.set_enabled(True)
+    _register_stats(bot)
+    aiohttp_start(
+        bot=bot,
+        name=bot.config.get_option('metrics_host'),
+        port=port,
+        requesthandlerclass=MetricsRequestHandler,
+        group='metrics',
+    )
+
+    close()
+    _STATE['monitor'] = asyncio.ensure_future(
+        _monitor_loop_lag(bot.config.get_option('metrics_lag_interval')))
+
+
+def close():
+    """stop the event loop monitor"""
+    monitor = _STATE['monitor']
+    if monitor is None:
+        return
+    _STATE['monitor'] = None
+    monitor.cancel()
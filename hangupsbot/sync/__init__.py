@@ -44,6 +44,15 @@ DEFAULT_CONFIG = {
     # Media with a size above this limit will be forwarded 1:1. Unit is KB
     "sync_process_animated_max_size": 4096,
 
+    # merge queued text messages into one message once more than n messages
+    # are pending for the same chat, this applies to all platforms that
+    # support merging. set to 0 to send every message on its own
+    'sync_coalesce_threshold': 0,
+
+    # keep the recent message ids per chat in memory to detect reply-spam
+    # across restarts
+    'sync_reply_tracking_persist': False,
+
     ############################################################################
     # the next entries are set global, to be then able to set them also per conv
     # as access is similar to bot.get_config_suboption(conv_id, key)
@@ -142,7 +151,8 @@ GLOBAL_KEYS = ('sync_cache_dump_image', 'sync_cache_timeout_conv_user',
                'sync_cache_timeout_gif', 'sync_cache_timeout_photo',
                'sync_cache_timeout_sending_queue', 'sync_cache_timeout_sticker',
                'sync_cache_timeout_video', 'sync_separator', 'autokick',
-               'sync_process_animated_max_size')
+               'sync_process_animated_max_size', 'sync_coalesce_threshold',
+               'sync_reply_tracking_persist')
 
 SYNC_CONFIG_KEYS = tuple(sorted(set(DEFAULT_CONFIG.keys()) - set(GLOBAL_KEYS)))
 
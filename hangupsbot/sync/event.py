@@ -143,6 +143,9 @@ class SyncEvent(FakeEvent):
 
         text = text or []
 
+        # the message segments in the internal style, see .get_internal_text
+        self._internal_text = None
+
         # build the base FakeEvent
         super().__init__(conv_id, user, text=text)
 
@@ -208,8 +211,8 @@ class SyncEvent(FakeEvent):
             video_as_gif (bool): toggle to get videos as gif
 
         Returns:
-            tuple[SyncImage, io.ByesIO, str]: the complete image data, the
-                resized image data and the filename
+            tuple[SyncImage, ImageData, str]: the complete image data, a
+                read-only view on the resized image data and the filename
             If no image is available return None, None, None
         """
         image, limit = self._get_image_raw(conv_id=conv_id)
@@ -251,6 +254,24 @@ class SyncEvent(FakeEvent):
 
         return self.conv_event.segments
 
+    def get_internal_text(self, text=None):
+        """get the message segments formatted in the internal style
+
+        Args:
+            text (mixed): string or list of hangups.ChatMessageSegments,
+                defaults to the segments of the event
+
+        Returns:
+            str: the formatted text, cached for the segments of the event
+        """
+        if text is not None:
+            return get_formatted(self.get_segments(text=text), 'internal')
+
+        if self._internal_text is None:
+            self._internal_text = get_formatted(self.conv_event.segments,
+                                                'internal')
+        return self._internal_text
+
     def get_formatted_text(self, *, style='hangouts', template=None, text=None,
                            title=None, name=None, add_photo_tag=None,
                            names_text_only=False, conv_id=None):
@@ -279,8 +300,6 @@ class SyncEvent(FakeEvent):
         if not isinstance(name, str):
             name = self.user.get_displayname(conv_id, text_only=names_text_only)
 
-        segments = self.get_segments(text=text)
-
         image_tag = ''
         if (add_photo_tag is True or
                 (self.image is not None and add_photo_tag is not False)):
@@ -318,8 +337,10 @@ class SyncEvent(FakeEvent):
                                name=name,
                                title=title,
                                image_tag=image_tag,
-                               text=get_formatted(segments, 'internal'),
+                               text=self.get_internal_text(text),
                                separator=bot.config['sync_separator'])
+        # the text carries the resolved config entries and names, targets
+        #  with the same config share the parsed and rendered result
         return get_formatted(text, style, internal_source=True)
 
     def get_reply_text(self, conv_id):
@@ -505,8 +526,6 @@ class SyncEventMembership(SyncEvent):
             name = self.user.get_displayname(conv_id,
                                              text_only=names_text_only)
 
-        text = self.get_segments(text=text)
-
         if not isinstance(template, str):
             if self.participant_user:
                 suffix = 'add' if self.type_ == 1 else 'kick'
@@ -532,7 +551,7 @@ class SyncEventMembership(SyncEvent):
              for user in self.participant_user))
 
         text = template.format(name=name, participants=participants,
-                               text=get_formatted(text, 'internal'),
+                               text=self.get_internal_text(text),
                                title=title)
         return get_formatted(text, style, internal_source=True)
 
@@ -32,9 +32,15 @@ from .exceptions import (
     ProfilesyncAlreadyCompleted,
     UnRegisteredProfilesync,
 )
-from .image import SyncImage
+from .image import (
+    ImageData,
+    SyncImage,
+)
 from .parser import MessageSegment
-from .sending_queue import AsyncQueueCache
+from .sending_queue import (
+    AsyncQueueCache,
+    TextMerger,
+)
 from .user import SyncUser
 
 
@@ -43,6 +49,9 @@ logger = logging.getLogger(__name__)
 # character used to generate tokens for the profile sync
 TOKEN_CHAR = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789'
 
+# maximum length of coalesced messages in the hangouts sending queues
+HANGOUTS_MESSAGE_LIMIT = 4096
+
 SYNC_PLUGGABLES = ('conv_sync', 'conv_user', 'user_kick', 'profilesync',
                    'allmessages_once', 'message_once', 'membership_once')
 
@@ -103,7 +112,8 @@ class SyncHandler(handlers.EventHandler):
 
         # sending queues
         self._cache_sending_queue = AsyncQueueCache(
-            'hangouts', self.bot.coro_send_message)
+            'hangouts', self.bot.coro_send_message, bot=self.bot,
+            merge=TextMerger(1, HANGOUTS_MESSAGE_LIMIT, exclusive=('image_id',)))
 
         self.profilesync_cmds = {}
         self.profilesync_provider = {}
@@ -327,7 +337,7 @@ class SyncHandler(handlers.EventHandler):
         """try to fetch a cached upload info or upload the image data to Google
 
         Args:
-            image_data (io.BytesIO): instance containing the raw image_data
+            image_data (mixed): `ImageData` or `io.BytesIO` with the raw data
             image_filename (str): including a valid image file extension
             image_cache (int): time in sec for the image info to remain in cache
 
@@ -335,7 +345,10 @@ class SyncHandler(handlers.EventHandler):
             mixed: a hangups.client.UploadedImage instance or None if the image
                 upload failed
         """
-        image_raw = image_data.getvalue()
+        if not isinstance(image_data, ImageData):
+            image_data = ImageData(image_data)
+        # the shared bytes are hashed and uploaded without further copies
+        image_raw = image_data.raw
         image_hash = hashlib.md5(image_raw).hexdigest()
         cache_entry = self._cache_image.get(image_hash, ignore_timeout=True)
         if cache_entry is not None:
@@ -401,7 +414,7 @@ class SyncHandler(handlers.EventHandler):
 
         Args:
             image (hangupsbot.sync.image.SyncImage): instance to validate
-            data (io.BytesIO): instance containing the raw image_data
+            data (mixed): `ImageData`, `io.BytesIO` or bytes-like raw data
             cache (int): time in sec for the upload info to remain in cache
             filename (str): including a valid image file extension
             type_ (str): 'photo', 'sticker', 'gif', 'video'
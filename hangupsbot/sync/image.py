@@ -9,11 +9,10 @@ import time
 import warnings
 
 import aiohttp
-import imageio
-from PIL import Image
-from moviepy.editor import VideoFileClip
 
+from hangupsbot import metrics
 from hangupsbot.base_models import BotMixin
+from hangupsbot.imports import LazyModule
 
 from .exceptions import MissingArgument
 
@@ -49,20 +48,148 @@ PATH = '/tmp/image_sync_RAW'
 
 logger = logging.getLogger(__name__)
 
+# heavy dependencies, imported on the first conversion
+Image = LazyModule('PIL.Image')
+imageio = LazyModule('imageio')
+moviepy_editor = LazyModule('moviepy.editor')
 
-class MovieConverter(VideoFileClip):
+_CLASSES = {}
+
+IMAGE_SECONDS = metrics.histogram(
+    'hangupsbot_image_seconds', 'duration of the image processing per step',
+    ('step',))
+DOWNLOAD_SECONDS = IMAGE_SECONDS.labels('download')
+MOVIE_SECONDS = IMAGE_SECONDS.labels('movie')
+RESIZE_SECONDS = IMAGE_SECONDS.labels('resize')
+
+
+class ImageData(io.BytesIO):
+    """read-only file-like view on immutable image bytes
+
+    The wrapper shares the underlying `bytes` object: new views are created
+    without copying the payload and the size is available without a copy.
+
+    Args:
+        raw (mixed): `bytes`, a bytes-like object or a file-like `io.BytesIO`
+    """
+
+    def __init__(self, raw=b''):
+        if isinstance(raw, ImageData):
+            raw = raw.raw
+        elif isinstance(raw, io.BytesIO):
+            raw = raw.getvalue()
+        elif not isinstance(raw, bytes):
+            raw = bytes(raw)
+
+        # `io.BytesIO` shares an initial `bytes` object until it is modified
+        super().__init__(raw)
+        self._raw = raw
+
+    @classmethod
+    def from_any(cls, data):
+        """wrap any supported image data source
+
+        Args:
+            data (mixed): None, `ImageData`, `io.BytesIO` or bytes-like
+
+        Returns:
+            ImageData: a wrapper or None if no data was given
+        """
+        if data is None:
+            return None
+        return cls(data)
+
+    @property
+    def raw(self):
+        """get the shared image bytes
+
+        Returns:
+            bytes: the image data
+        """
+        return self._raw
+
+    @property
+    def size(self):
+        """get the size of the image data without copying it
+
+        Returns:
+            int: the size in bytes
+        """
+        return len(self._raw)
+
+    def copy(self):
+        """get a new view with an independent cursor
+
+        Returns:
+            ImageData: a wrapper on the same bytes
+        """
+        return ImageData(self._raw)
+
+    def getvalue(self):
+        return self._raw
+
+    def getbuffer(self):
+        return memoryview(self._raw)
+
+    def writable(self):
+        return False
+
+    def write(self, data):
+        raise io.UnsupportedOperation('ImageData is read-only')
+
+    def truncate(self, size=None):
+        raise io.UnsupportedOperation('ImageData is read-only')
+
+
+def get_data_size(data):
+    """get the size of image data without copying it
+
+    Args:
+        data (mixed): `ImageData`, `io.BytesIO` or bytes-like
+
+    Returns:
+        int: the size in bytes
+    """
+    if isinstance(data, ImageData):
+        return data.size
+    if isinstance(data, io.IOBase):
+        # `.getbuffer()` would unshare and copy the buffer of an `io.BytesIO`
+        position = data.tell()
+        size = data.seek(0, io.SEEK_END)
+        data.seek(position)
+        return size
+    return len(data)
+
+
+def get_movie_converter():
+    """get the converter class, moviepy gets imported on the first call
+
+    Returns:
+        type: a subclass of `MovieConverterMixin` and `VideoFileClip`
+    """
+    converter = _CLASSES.get('MovieConverter')
+    if converter is None:
+        converter = _CLASSES['MovieConverter'] = type(
+            'MovieConverter',
+            (MovieConverterMixin, moviepy_editor.VideoFileClip),
+            {})
+    return converter
+
+
+class MovieConverterMixin:
     """Converter that saves one dump to file on gif convert of a video
 
+    see `get_movie_converter` for the class with the moviepy base
+
     Args:
-        raw (io.BytesIO): the raw video data
+        raw (ImageData): the raw video data
         file_format (str): file extension of the video
     """
 
     def __init__(self, raw, file_format):
         self._path = '{}-{}.{}'.format(PATH, time.time(), file_format)
-        raw.seek(0)
         with open(self._path, 'wb') as writer:
-            writer.write(raw.read())
+            writer.write(raw.getbuffer())
 
         super().__init__(self._path)
 
@@ -70,12 +197,13 @@ class MovieConverter(VideoFileClip):
         """save the video to a file-like object
 
         Returns:
-            io.BytesIO: the video
+            ImageData: the video
         """
         logger.debug('to_video')
         path = self._path + '.mp4'
         self.write_videofile(path, verbose=False, logger=None)
-        data = io.BytesIO(open(path, 'rb').read())
+        with open(path, 'rb') as reader:
+            data = ImageData(reader.read())
         self.cleanup(path)
         return data
 
@@ -89,7 +217,7 @@ class MovieConverter(VideoFileClip):
             fps (int): frames per second for the breakdown
 
         Returns:
-            io.BytesIO: the new image
+            ImageData: the new image
         """
         logger.debug('to_gif')
         data = io.BytesIO()
@@ -98,7 +226,7 @@ class MovieConverter(VideoFileClip):
             for frame in self.iter_frames(fps=fps, dtype='uint8'):
                 writer.append_data(frame)
             writer.close()
-        return data
+        return ImageData(data)
 
     def cleanup(self, path=None):
         """delete a created file
@@ -128,7 +256,7 @@ class SyncImage(BotMixin):
     provide either a public url or image data and a filename
 
     Args:
-        data (io.BytesIO): containing the raw image_data
+        data (mixed): `ImageData`, `io.BytesIO` or bytes-like raw image data
         cache (int): time in sec for the upload info to remain in cache
         filename (str): including a valid image file extension
         type_ (str): 'photo', 'sticker', 'gif', 'video'
@@ -153,7 +281,7 @@ class SyncImage(BotMixin):
         self._type = type_
         self.cache = cache
         self._size_cache = {}
-        self._data = data
+        self._data = ImageData.from_any(data)
         self._download_auth = {'cookies': cookies, 'headers': headers}
         self._filename = None
         self._size = (
@@ -216,8 +344,8 @@ class SyncImage(BotMixin):
             video_as_gif (bool): toggle to convert videos to gifs
 
         Returns:
-            tuple[io.BytesIO, str]: the image data and the filename;
-                if no data is available return None, <string with reason>
+            tuple[ImageData, str]: a read-only view on the image data and the
+                filename; if no data is available return None, <reason>
         """
         if self._data is None:
             return None, '[Image has no content]'
@@ -232,9 +360,10 @@ class SyncImage(BotMixin):
         cache_key = (limit, video_as_gif)
         if cache_key in self._size_cache:
             data, filename = self._size_cache[cache_key]
-            return io.BytesIO(data.getvalue()), filename
+            return data.copy(), filename
 
         filename = self._filename
+        start = time.monotonic()
 
         if extension in MOVIE_EXTENSIONS and self._meets_size_limit:
             filename_raw = filename.rsplit('.', 1)[0]
@@ -242,7 +371,7 @@ class SyncImage(BotMixin):
                 warnings.simplefilter("ignore")
                 if video_as_gif:
                     if not self._meets_size_limit:
-                        image_data_size = len(self._data.getvalue())
+                        image_data_size = self._data.size
                         return None, ('[%s is too big to convert to GIF: %dKB]'
                                       % (self._type, image_data_size / 1024))
                     data = self._movie.to_gif()
@@ -261,8 +390,10 @@ class SyncImage(BotMixin):
             data, filename = self._get_resized(limit=limit, data=data,
                                                filename=filename,
                                                video_as_gif=video_as_gif)
+        data = ImageData(data)
+        RESIZE_SECONDS.observe(time.monotonic() - start)
         self._size_cache[cache_key] = (data, filename)
-        return io.BytesIO(data.getvalue()), filename
+        return data.copy(), filename
 
     async def process(self):
         """fetch image data if not already done"""
@@ -273,11 +404,13 @@ class SyncImage(BotMixin):
 
         if (self._movie is None and extension in MOVIE_EXTENSIONS
                 and self._meets_size_limit):
+            start = time.monotonic()
             with warnings.catch_warnings():
                 warnings.simplefilter("ignore")
                 self._movie = await asyncio.get_event_loop().run_in_executor(
-                    None, MovieConverter, self._data, extension)
+                    None, get_movie_converter(), self._data, extension)
                 self._size = self._movie.size
+            MOVIE_SECONDS.observe(time.monotonic() - start)
 
     ############################################################################
     # PRIVATE METHODS
@@ -294,6 +427,7 @@ class SyncImage(BotMixin):
             return True
 
         url = self._url
+        start = time.monotonic()
         try:
             async with aiohttp.ClientSession(**self._download_auth) as session:
                 # validate the file extension first
@@ -320,8 +454,9 @@ class SyncImage(BotMixin):
                     if not self._filename.endswith(extension):
                         self.update_from_filename('%s.%s' % (time.time(),
                                                              extension))
-                    self._data = io.BytesIO(await resp.read())
+                    self._data = ImageData(await resp.read())
 
+            DOWNLOAD_SECONDS.observe(time.monotonic() - start)
             return True
         except (aiohttp.ClientError, AttributeError, TypeError) as err:
             logger.info('download %s: %r', id(url), url)
@@ -333,24 +468,24 @@ class SyncImage(BotMixin):
 
         Args:
             limit (int): in px the new size
-            data (io.BytesIO): initial instance
+            data (ImageData): initial instance
             filename (str): filename with extension
             video_as_gif (bool): toggle to get a video wrapped in a gif
             caller (mixed): set to a non value to block a loop
 
         Returns:
-            tuple[io.BytesIO, str]: the resized image data and the new filename
+            tuple[ImageData, str]: the resized image data and the new filename
         """
 
         def _remove_background(data, filename):
             """remove background in saving as PNG
 
             Args:
-                data (io.BytesIO): image data to override
+                data (ImageData): image data to override
                 filename (str): image file name to override
 
             Returns:
-                tuple[io.BytesIO, str]: image data as PNG and the new filename
+                tuple[ImageData, str]: image data as PNG and the new filename
             """
             if filename.rsplit('.', 1)[-1].lower() == 'png':
                 # already a png, no need to format again
@@ -365,7 +500,7 @@ class SyncImage(BotMixin):
                 return data, filename
 
             try:
-                container = io.BytesIO(data.getbuffer())
+                container = data.copy()
                 image = Image.open(container)
                 self._size = image.width, image.height
                 new_data = io.BytesIO()
@@ -375,7 +510,7 @@ class SyncImage(BotMixin):
             except (IOError, KeyError):
                 logger.exception('failed to save as png')
             else:
-                data = new_data
+                data = ImageData(new_data)
 
                 # update the filename to .png
                 filename = filename.rsplit('.', 1)[0] + '.png'
@@ -387,7 +522,7 @@ class SyncImage(BotMixin):
             """calculate the new size and resize the image
 
             Returns:
-                io.BytesIO: instance with the image data, it may not be resized
+                ImageData: instance with the image data, it may not be resized
                     if it already matches the required size or an error occutred
             """
             message = 'open %s'
@@ -398,7 +533,7 @@ class SyncImage(BotMixin):
                     resize_arg = None
 
                 else:
-                    image = Image.open(io.BytesIO(data.getvalue()))
+                    image = Image.open(data.copy())
                     self._size = image.size
                     resize_arg = Image.HAMMING
 
@@ -433,6 +568,7 @@ class SyncImage(BotMixin):
                     new_image_data = io.BytesIO()
                     new_image.save(new_image_data,
                                    FORMAT_MAPPING[filename.rsplit('.', 1)[-1]])
+                    new_image_data = ImageData(new_image_data)
 
             except (OSError, IOError, KeyError, AttributeError):
                 logger.exception('failed to %s', message % filename)
@@ -466,7 +602,7 @@ class SyncImage(BotMixin):
         Returns:
             bool: True if size is below the limit, otherwise False
         """
-        below = (len(self._data.getvalue())
+        below = (self._data.size
                  < (self.bot.config['sync_process_animated_max_size'] * 1024))
         if not below:
             logger.info("%s does not meet the video-to-gif process size limit",
@@ -477,7 +613,7 @@ class SyncImage(BotMixin):
         return ' | '.join(('SyncImage',
                            'type:%s' % self._type,
                            'name:%s' % self._filename,
-                           'size:%sKB' % ((len(self._data.getvalue()) / 1024)
+                           'size:%sKB' % ((self._data.size / 1024)
                                           if self._data is not None
                                           else 'empty'),
                            'movie:%s' % self._movie))
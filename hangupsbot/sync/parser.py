@@ -1,6 +1,7 @@
 """sync parser"""
 __author__ = 'das7pad@outlook.com'
 
+import functools
 import html as html_module
 import logging
 import re
@@ -12,6 +13,7 @@ from hangups.message_parser import (
     ChatMessageParser,
     Tokens,
 )
+from reparser import Segment
 
 
 logger = logging.getLogger(__name__)
@@ -133,15 +135,36 @@ MARKDOWN_START_CHAR_POOL = re.compile(r'[%s]' % MARKDOWN_START_CHAR)
 MARKDOWN_ESCAPE = re.compile(r'([%s])' % MARKDOWN_START_CHAR)
 MARKDOWN_UNESCAPE = re.compile(r'\\([%s])' % MARKDOWN_START_CHAR)
 
+# number of distinct texts per parser with cached tokens
+PARSE_CACHE_SIZE = 1024
+# number of distinct texts in the internal style with cached parse results
+RENDER_CACHE_SIZE = 1024
+
 
 class MessageParser(ChatMessageParser):
     """parser for markdown and html environments
 
     unescape markdown in parsed segments with .unescape_markdown
 
+    Texts without any char that starts a markup token can contain auto links
+    only, these are tokenized with the link regex alone. The tokens of
+    repeated texts are cached.
+
     Args:
-        tokens: list of reparser.Token instances
+        tokens (list[reparser.Token]): the tokens of the parser
     """
+    # token name prefix -> chars which can start a token of the group
+    TOKEN_CHARS = {
+        'md': '*_~`=[\\',
+        'html': '<',
+        'br': '\n',
+    }
+
+    def __init__(self, tokens=None):
+        super().__init__(tokens)
+        self._markup, self._auto_link = self._build_fast_path()
+        self._tokenize_cached = functools.lru_cache(
+            maxsize=PARSE_CACHE_SIZE)(self._tokenize)
 
     @staticmethod
     def postprocess(text):
@@ -150,24 +173,110 @@ class MessageParser(ChatMessageParser):
         return text
 
     def parse(self, text):
-        def _unescape_segment(segment):
-            """unescape markdown in the parsed segment
-
-            Args:
-                segment (reparser.Segment): formatting instance
+        """parse a text to segments
 
-            Returns:
-                reparser.Segment: with text and link target unescaped
-            """
-            segment.text = self.unescape_markdown(segment.text)
-            link_target = (self.unescape_markdown(segment.params['link_target'])
-                           if 'link_target' in segment.params else None)
-            segment.params['link_target'] = link_target
-            return segment
+        Args:
+            text (str): the text to parse
 
+        Returns:
+            generator[reparser.Segment]: parsed formatting segments
+        """
         logger.debug('%s.parse: %r', self.__class__.__name__, text)
 
-        return (_unescape_segment(segment) for segment in super().parse(text))
+        return (Segment(segment_text, **params)
+                for segment_text, params in self.tokenize(text))
+
+    def tokenize(self, text):
+        """parse a text to the text and params of each segment
+
+        Args:
+            text (str): the text to parse
+
+        Returns:
+            tuple[tuple[str, dict]]: the text and params of each segment, the
+                result is shared and must not be altered
+        """
+        return self._tokenize_cached(text)
+
+    def _tokenize(self, text):
+        """parse a text to the text and params of each segment, uncached
+
+        Args:
+            text (str): the text to parse
+
+        Returns:
+            tuple[tuple[str, dict]]: the text and params of each segment
+        """
+        segments = self._parse_plain(text)
+        if segments is None:
+            segments = super().parse(text)
+
+        tokens = []
+        for segment in segments:
+            params = segment.params
+            link_target = params.get('link_target')
+            params['link_target'] = (self.unescape_markdown(link_target)
+                                     if link_target is not None else None)
+            tokens.append((self.unescape_markdown(segment.text), params))
+        return tuple(tokens)
+
+    def _build_fast_path(self):
+        """get the chars which start a markup token and the auto link token
+
+        Returns:
+            tuple[_sre.SRE_Pattern, tuple]: the markup chars or None if a
+                token is unknown, the link token and its regex or None
+        """
+        chars = set()
+        auto_link = None
+        for token in self.tokens:
+            group = token.name.split('_', 1)[0]
+            if group == 'link':
+                # inline flags of other tokens apply to the full regex
+                auto_link = token, re.compile(token.pattern_start,
+                                              self.regex.flags)
+            elif group in self.TOKEN_CHARS:
+                chars.update(self.TOKEN_CHARS[group])
+            else:
+                # the start of the token is unknown, use the full parser only
+                return None, None
+
+        if not chars:
+            # never matches
+            return re.compile('(?!)'), auto_link
+        markup = re.compile('[%s]' % re.escape(''.join(sorted(chars))))
+        return markup, auto_link
+
+    def _parse_plain(self, text):
+        """parse a text without markup, only auto links are detected
+
+        Args:
+            text (str): the text to parse
+
+        Returns:
+            list[reparser.Segment]: parsed segments or None if the text may
+                contain markup
+        """
+        if self._markup is None or self._markup.search(text):
+            return None
+
+        text = self.preprocess(text)
+        segments = []
+        last_pos = 0
+        if self._auto_link is not None:
+            token, regex = self._auto_link
+            for match in regex.finditer(text):
+                start_pos = match.start()
+                if start_pos > last_pos:
+                    segments.append(
+                        Segment(self.postprocess(text[last_pos:start_pos])))
+                segments.append(Segment(match.group(), token=token,
+                                        match=match, **token.params))
+                last_pos = match.end()
+
+        if last_pos < len(text):
+            segments.append(Segment(self.postprocess(text[last_pos:])))
+        return segments
 
     @staticmethod
     def unescape_markdown(text):
@@ -245,8 +354,8 @@ class MessageSegmentHangups(hangups.ChatMessageSegment):
         Returns:
             list[MessageSegmentHangups]: parsed formatting segments
         """
-        return [cls(segment.text, **segment.params)
-                for segment in cls._parser.parse(text)]
+        return [cls(segment_text, **params)
+                for segment_text, params in cls._parser.tokenize(text)]
 
 
 class MessageSegmentInternal(MessageSegmentHangups):
@@ -301,6 +410,36 @@ class MessageSegment(MessageSegmentHangups):
                 for seg in segments]
 
 
+@functools.lru_cache(maxsize=RENDER_CACHE_SIZE)
+def _parse_internal(text):
+    """parse a text in the internal style, the segments are shared
+
+    Args:
+        text (str): html formatted text
+
+    Returns:
+        tuple[MessageSegmentInternal]: parsed formatting segments
+    """
+    return tuple(MessageSegmentInternal.from_str(text))
+
+
+@functools.lru_cache(maxsize=RENDER_CACHE_SIZE)
+def _render_internal(text, raw_style):
+    """format a text in the internal style with a named style
+
+    Args:
+        text (str): html formatted text
+        raw_style (str): target style key in .STYLE_MAPPING
+
+    Returns:
+        str: formatted segment text
+
+    Raises:
+        ValueError: invalid style provided
+    """
+    return get_formatted(list(_parse_internal(text)), raw_style)
+
+
 def get_formatted(segments, raw_style, *, internal_source=False):
     """parse a text input and format the segments with a given style
 
@@ -340,6 +479,13 @@ def get_formatted(segments, raw_style, *, internal_source=False):
             raise ValueError('not allowed style: %s' % raw_style)
         return style
 
+    if internal_source and isinstance(segments, str):
+        # a relayed message is rendered for each target and platform,
+        #  parse it once and render it once per named style
+        if isinstance(raw_style, str):
+            return _render_internal(segments, raw_style)
+        segments = list(_parse_internal(segments))
+
     style = _get_style()
     if not isinstance(segments, list):
         segments = (MessageSegmentInternal.from_str(segments)
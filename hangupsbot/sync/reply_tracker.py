@@ -0,0 +1,94 @@
+"""track recent message ids per chat to get the offset of replies"""
+__author__ = 'das7pad@outlook.com'
+
+import bisect
+import time
+
+from hangupsbot.base_models import BotMixin
+
+
+# minimum interval in seconds between memory dumps of the persisted ids
+SAVE_INTERVAL = 300
+
+
+class ReplyTracker(BotMixin):
+    """keep the last `2 * sync_reply_spam_offset` message ids per chat
+
+    The ids are kept in ascending order, lookups use a binary search.
+
+    Args:
+        name (str): the platform identifier, also used as the memory key
+    """
+    __slots__ = ('_name', '_chats', '_last_save')
+
+    def __init__(self, name):
+        self._name = name
+        self._chats = None
+        self._last_save = 0
+
+    def track(self, chat_id, msg_id):
+        """add a message id to the last messages of a chat
+
+        Args:
+            chat_id (mixed): chat identifier, int or string
+            msg_id (int): a numeric message identifier, which increases with
+                newer messages
+        """
+        chats = self._get_chats()
+        chat_id = str(chat_id)
+        ids = chats.get(chat_id)
+        if ids is None:
+            ids = chats[chat_id] = []
+
+        index = bisect.bisect_left(ids, msg_id)
+        if index < len(ids) and ids[index] == msg_id:
+            # edited message
+            return
+        ids.insert(index, msg_id)
+
+        overflow = len(ids) - 2 * self.bot.config['sync_reply_spam_offset']
+        if overflow > 0:
+            del ids[:overflow]
+
+        if not self.bot.config['sync_reply_tracking_persist']:
+            return
+        now = time.time()
+        if now - self._last_save > SAVE_INTERVAL:
+            self._last_save = now
+            self.bot.memory.save()
+
+    def get_offset(self, chat_id, msg_id):
+        """get the number of tracked messages that are newer than a message
+
+        Args:
+            chat_id (mixed): chat identifier, int or string
+            msg_id (int): the message identifier of the original message
+
+        Returns:
+            int: the offset or None if the message is not tracked
+        """
+        ids = self._get_chats().get(str(chat_id))
+        if not ids:
+            return None
+        index = bisect.bisect_left(ids, msg_id)
+        if index < len(ids) and ids[index] == msg_id:
+            return len(ids) - 1 - index
+        return None
+
+    def _get_chats(self):
+        """get the storage for the ids per chat, located in memory if enabled
+
+        The persisted storage is looked up on each call, a memory reload
+        replaces it.
+
+        Returns:
+            dict: chat id (str) -> message ids (list[int])
+        """
+        if self.bot.config['sync_reply_tracking_persist']:
+            path = ['cache', 'reply_tracking', self._name]
+            self.bot.memory.ensure_path(path)
+            return self.bot.memory.get_by_path(path)
+
+        if self._chats is None:
+            self._chats = {}
+        return self._chats
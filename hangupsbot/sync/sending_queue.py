@@ -2,9 +2,11 @@
 __author__ = 'das7pad@outlook.com'
 
 import asyncio
+import collections
 import functools
 import logging
 
+from hangupsbot import metrics
 from hangupsbot.utils.cache import Cache
 from . import DEFAULT_CONFIG
 
@@ -37,24 +39,117 @@ class Status:
         return self.wait().__await__()
 
 
-class Queue(list):
+class TextMerger:
+    """merge queue items which only differ in their text
+
+    Args:
+        text_arg (mixed): int, the position of the text in the args or
+            str, the key of the text in the kwargs
+        limit (int): maximum length of a merged text
+        exclusive (tuple[str]): kwargs which block merging if they are set,
+            e.g. an attached image
+        separator (str): inserted between the merged texts
+    """
+    __slots__ = ('_text_arg', '_limit', '_exclusive', '_separator')
+
+    def __init__(self, text_arg, limit, exclusive=(), separator='\n'):
+        self._text_arg = text_arg
+        self._limit = limit
+        self._exclusive = exclusive
+        self._separator = separator
+
+    def _get_text(self, args, kwargs):
+        """get the text of a queue item
+
+        Args:
+            args (tuple): queue function args
+            kwargs (dict): queue function kwargs
+
+        Returns:
+            mixed: the text or None if the item has no text
+        """
+        if isinstance(self._text_arg, int):
+            if len(args) <= self._text_arg:
+                return None
+            return args[self._text_arg]
+        return kwargs.get(self._text_arg)
+
+    def __call__(self, first, second):
+        """merge two queue items
+
+        Args:
+            first (tuple[tuple, dict]): args and kwargs of the earlier item
+            second (tuple[tuple, dict]): args and kwargs of the later item
+
+        Returns:
+            mixed: tuple of the merged args and kwargs or None if the items
+                can not be merged
+        """
+        (args, kwargs), (next_args, next_kwargs) = first, second
+        text = self._get_text(args, kwargs)
+        next_text = self._get_text(next_args, next_kwargs)
+        if not (isinstance(text, str) and isinstance(next_text, str)):
+            return None
+
+        if any(kwargs.get(key) or next_kwargs.get(key)
+               for key in self._exclusive):
+            return None
+
+        text = text + self._separator + next_text
+        if len(text) > self._limit:
+            return None
+
+        if isinstance(self._text_arg, int):
+            args, next_args = list(args), list(next_args)
+            args[self._text_arg] = next_args[self._text_arg] = None
+        else:
+            kwargs, next_kwargs = kwargs.copy(), next_kwargs.copy()
+            kwargs[self._text_arg] = next_kwargs[self._text_arg] = None
+
+        if args != next_args or kwargs != next_kwargs:
+            # different target, sender or options
+            return None
+
+        if isinstance(self._text_arg, int):
+            args[self._text_arg] = text
+            return tuple(args), kwargs
+        kwargs[self._text_arg] = text
+        return args, kwargs
+
+
+class Queue:
     """a queue to schedule synced calls and remain the sequence in processing
 
+    One consumer task per active queue processes the items in order, it exits
+    once the queue ran empty and gets restarted on the next schedule call.
+
+    Backlogged items may be coalesced: once more than `threshold` items are
+    pending, consecutive items are merged by `merge` and sent at once.
+
     Args:
         group (str): identifier for a platform
         func (callable): will be called with the scheduled args/kwargs
+        merge (callable): optional, see `TextMerger`
+        threshold (int): pending items that enable merging, 0 to disable
     """
-    __slots__ = ('_logger', '_func', '_group', '_lock', '_instance_block')
+    __slots__ = ('_logger', '_func', '_group', '_items', '_consumer', '_idle',
+                 '_instance_block', '_merge', '_threshold')
     _loop = asyncio.get_event_loop()
     _blocks = {'__global__': False}
     _pending_tasks = {}
+    _drained = {}
+    _released = None
 
-    def __init__(self, group, func=None):
-        super().__init__()
+    def __init__(self, group, func=None, merge=None, threshold=0):
         self._logger = logging.getLogger('%s.%s' % (__name__, group))
         self._func = func
         self._group = group
-        self._lock = asyncio.Lock(loop=self._loop)
+        self._merge = merge
+        self._threshold = threshold
+        self._items = collections.deque()
+        self._consumer = None
+        self._idle = asyncio.Event()
+        self._idle.set()
         self._instance_block = False
 
         # do not overwrite an active block
@@ -62,6 +157,9 @@ class Queue(list):
         # do not reset the counter
         self._pending_tasks.setdefault(group, 0)
 
+    def __len__(self):
+        return len(self._items)
+
     @property
     def _blocked(self):
         """check for a global, local or instance sending block
@@ -80,7 +178,7 @@ class Queue(list):
         Returns:
             bool: True if a queue processor is running, otherwise False
         """
-        return self._lock.locked()
+        return self._consumer is not None and not self._consumer.done()
 
     def schedule(self, *args, **kwargs):
         """queue an item with the given args/kwargs for the coroutine
@@ -90,10 +188,13 @@ class Queue(list):
             being processed in the Status
             `await queue.schedule(...)` returns True on success otherwise False
         """
-        self._pending_tasks[self._group] += 1
+        self._update_pending(1)
         status = Status()
-        self.append((status, self._blocked, args, kwargs))
-        asyncio.ensure_future(self._process(), loop=self._loop)
+        self._items.append((status, self._blocked, args, kwargs))
+        self._idle.clear()
+        if not self._running:
+            self._consumer = asyncio.ensure_future(self._consume(),
+                                                   loop=self._loop)
 
         self._logger.debug('%s: scheduled args=%r kwargs=%r',
                            id(status), args, kwargs)
@@ -108,12 +209,9 @@ class Queue(list):
             timeout (int): time in seconds to wait for pending tasks to complete
         """
         self._instance_block = True
-        while timeout > 0:
-            if not self and not self._running:
-                break
-            timeout -= 0.1
-            await asyncio.sleep(0.1)
-        else:
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+        except asyncio.TimeoutError:
             self._logger.warning('%s task%s did not finished',
                                  len(self),
                                  ('s' if self._pending_tasks[self._group] > 1
@@ -132,12 +230,10 @@ class Queue(list):
         if self._pending_tasks[self._group] > 0:
             self._logger.info('waiting for %s tasks',
                               self._pending_tasks[self._group])
-        while timeout > 0:
-            if self._pending_tasks[self._group] <= 0:
-                break
-            timeout -= 0.1
-            await asyncio.sleep(0.1)
-        else:
+        try:
+            await asyncio.wait_for(
+                self._get_drained_event(self._group).wait(), timeout)
+        except asyncio.TimeoutError:
             self._logger.warning('%s task%s did not finished',
                                  self._pending_tasks[self._group],
                                  ('s' if self._pending_tasks[self._group] > 1
@@ -173,59 +269,161 @@ class Queue(list):
             cls._blocks.clear()
             cls._blocks['__global__'] = False
             cls._pending_tasks.clear()
+            for drained in cls._drained.values():
+                drained.set()
+            cls._drained.clear()
         else:
             cls._blocks[group] = False
             cls._pending_tasks[group] = 0
+            if group in cls._drained:
+                cls._drained[group].set()
 
-    async def _process(self):
-        """process the queue and await the result on each call"""
-        if not self:
-            # all tasks are handled
-            return
+        # wake up all consumers which are waiting for a release
+        released = Queue._released
+        Queue._released = None
+        if released is not None:
+            released.set()
 
-        if self._running:
-            # only one queue processor is allowed
-            return
+    @classmethod
+    def _get_drained_event(cls, group):
+        """get the event which is set while a group has no pending tasks
+
+        Args:
+            group (str): platform identifier
 
-        async with self._lock:
+        Returns:
+            asyncio.Event: the shared instance for the group
+        """
+        drained = cls._drained.get(group)
+        if drained is None:
+            drained = cls._drained[group] = asyncio.Event()
+            if cls._pending_tasks.get(group, 0) <= 0:
+                drained.set()
+        return drained
+
+    @classmethod
+    def _get_released_event(cls):
+        """get the event which is set on the next block release
+
+        Returns:
+            asyncio.Event: a shared instance, it is replaced on each release
+        """
+        if Queue._released is None:
+            Queue._released = asyncio.Event()
+        return Queue._released
+
+    def _update_pending(self, delta):
+        """update the counter of pending tasks for the group
+
+        Args:
+            delta (int): the number of added or processed tasks
+        """
+        # the counter may got reset by a global release in the meantime
+        pending = self._pending_tasks.get(self._group, 0) + delta
+        self._pending_tasks[self._group] = pending
+        drained = self._get_drained_event(self._group)
+        if pending > 0:
+            drained.clear()
+        else:
+            drained.set()
+
+    async def _wait_for_release(self):
+        """wait for the release of all applied blocks
+
+        Returns:
+            bool: True if the blocks got released in time, otherwise False
+        """
+        deadline = self._loop.time() + SENDING_BLOCK_RETRY_DELAY
+        while self._blocked:
+            remaining = deadline - self._loop.time()
+            if remaining <= 0:
+                return False
             try:
-                status, blocked, args, kwargs = self.pop(0)
-                if blocked:
-                    delay = 0
-                    while delay < SENDING_BLOCK_RETRY_DELAY:
-                        if not self._blocked:
-                            # block got released
-                            break
-                        await asyncio.sleep(.1)
-                        delay += .1
-                    else:
-                        status.set(Status.FAILED)
-                        self._log_context(status, args, kwargs)
-                        self._logger.warning('%s: block timeout reached',
-                                             id(status))
-                        return
-
-                self._logger.debug('%s: sending', id(status))
+                await asyncio.wait_for(self._get_released_event().wait(),
+                                       remaining)
+            except asyncio.TimeoutError:
+                return not self._blocked
+        return True
+
+    async def _consume(self):
+        """process the queue until it ran empty"""
+        try:
+            while self._items:
+                statuses, blocked, args, kwargs = self._pop()
                 try:
-                    result = await asyncio.shield(self._send(args, kwargs))
-
-                except asyncio.CancelledError:
-                    self._logger.debug('%s: cancelled', id(status))
-                except Exception:  # pylint: disable=broad-except
-                    status.set(Status.FAILED)
-                    self._log_context(status, args, kwargs)
-                    self._logger.exception('%s: sending failed',
-                                           id(status))
-
-                else:
-                    # ignore the return value in case it was not set
-                    success = True if result is None else result
-                    status.set(Status.SUCCESS if success else Status.FAILED)
-
-                self._logger.debug('%s: sent', id(status))
-            finally:
-                self._pending_tasks[self._group] -= 1
-                asyncio.ensure_future(self._process(), loop=self._loop)
+                    result = await self._process(statuses[0], blocked,
+                                                 args, kwargs)
+                    if result is not None:
+                        for status in statuses:
+                            status.set(result)
+                finally:
+                    self._update_pending(-len(statuses))
+        finally:
+            if not self._items:
+                self._idle.set()
+
+    def _pop(self):
+        """get the next item and merge following ones into it if backlogged
+
+        Returns:
+            tuple[list[Status], bool, tuple, dict]: the statuses of all merged
+                items, the block state, the merged args and kwargs
+        """
+        status, blocked, args, kwargs = self._items.popleft()
+        statuses = [status]
+        if (self._merge is None or self._threshold < 1
+                or len(self._items) < self._threshold):
+            return statuses, blocked, args, kwargs
+
+        while self._items:
+            next_status, next_blocked, next_args, next_kwargs = self._items[0]
+            if next_blocked != blocked:
+                break
+            merged = self._merge((args, kwargs), (next_args, next_kwargs))
+            if merged is None:
+                break
+            args, kwargs = merged
+            statuses.append(next_status)
+            self._items.popleft()
+
+        if len(statuses) > 1:
+            self._logger.debug('%s: merged %d items', id(status), len(statuses))
+        return statuses, blocked, args, kwargs
+
+    async def _process(self, status, blocked, args, kwargs):
+        """process a single item
+
+        Args:
+            status (Status): the status of the queue item
+            blocked (bool): the item got scheduled during a sending block
+            args (list): queue function args
+            kwargs (dict): queue function kwargs
+
+        Returns:
+            mixed: the new status, `Status.SUCCESS` or `Status.FAILED` or None
+                if the sending got cancelled
+        """
+        if blocked and not await self._wait_for_release():
+            self._log_context(status, args, kwargs)
+            self._logger.warning('%s: block timeout reached', id(status))
+            return Status.FAILED
+
+        self._logger.debug('%s: sending', id(status))
+        try:
+            result = await asyncio.shield(self._send(args, kwargs))
+
+        except asyncio.CancelledError:
+            self._logger.debug('%s: cancelled', id(status))
+            return None
+        except Exception:  # pylint: disable=broad-except
+            self._log_context(status, args, kwargs)
+            self._logger.exception('%s: sending failed', id(status))
+            return Status.FAILED
+
+        self._logger.debug('%s: sent', id(status))
+        # ignore the return value in case it was not set
+        success = True if result is None else result
+        return Status.SUCCESS if success else Status.FAILED
 
     def _log_context(self, status, args, kwargs):
         """Add context to another logging message
@@ -284,26 +482,34 @@ class QueueCache(Cache):
     for a custom timeout: specify either `timeout` or provide the `bot` instance
     otherwise the sync.DEFAULT_CONFIG entry for queue caches is used
 
+    coalescing of backlogged items requires a `merge` function and the `bot`
+    instance to read the threshold from the config entry
+    `sync_coalesce_threshold`
+
     Args:
         group (str): identifier for a platform to separate queues for
         func (callable): non-coroutine function, will be called with scheduled
             args/kwargs
         timeout (int): optional, time in seconds for a queue to live in cache
         bot (hangupsbot.core.HangupsBot): the running instance, optional
+        merge (callable): optional, see `TextMerger`
     """
-    __slots__ = ('_default_args',)
+    __slots__ = ('_default_args', '_default_kwargs')
     _queue = Queue
     DEFAULT_TIMEOUT = DEFAULT_CONFIG['sync_cache_timeout_sending_queue']
 
-    def __init__(self, group, func, timeout=None, bot=None):
+    def __init__(self, group, func, timeout=None, bot=None, *, merge=None):
         timeout = timeout or (bot.config['sync_cache_timeout_sending_queue']
                               if bot is not None else self.DEFAULT_TIMEOUT)
         super().__init__(timeout, name='Sending Queues@%s' % group)
         self._default_args = (group, func)
+        threshold = (bot.config['sync_coalesce_threshold']
+                     if bot is not None and merge is not None else 0)
+        self._default_kwargs = dict(merge=merge, threshold=threshold)
         self._queue.release_block(group)
 
     def __missing__(self, identifier):
-        queue = self._queue(*self._default_args)
+        queue = self._queue(*self._default_args, **self._default_kwargs)
         self.add(identifier, queue)
         return queue
 
@@ -336,6 +542,13 @@ class AsyncQueueCache(QueueCache):
         func: coroutine function, will be called with the scheduled args/kwargs
         timeout: integer, optional, time in seconds for a queue to live in cache
         bot (hangupsbot.core.HangupsBot): the running instance, optional
+        merge (callable): optional, see `TextMerger`
     """
     __slots__ = ()
     _queue = AsyncQueue
+
+
+metrics.gauge_callback(
+    'hangupsbot_sending_queue_pending', 'pending tasks per sending group',
+    lambda: dict(Queue._pending_tasks),  # pylint:disable=protected-access
+    ('group',))
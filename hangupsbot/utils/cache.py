@@ -5,8 +5,10 @@ import asyncio
 import functools
 import logging
 import time
+import weakref
 from collections import namedtuple
 
+from hangupsbot import metrics
 from hangupsbot.base_models import (
     BotMixin,
     TrackingMixin,
@@ -15,6 +17,30 @@ from hangupsbot.base_models import (
 
 logger = logging.getLogger(__name__)
 
+REQUESTS = metrics.counter(
+    'hangupsbot_cache_requests', 'cache lookups per cache and result',
+    ('cache', 'result'))
+
+# id -> Cache, caches are dicts and not hashable
+_CACHES = weakref.WeakValueDictionary()
+
+
+def _count_entries():
+    """get the number of entries per cache name
+
+    Returns:
+        dict: cache name -> number of entries
+    """
+    entries = {}
+    for cache in list(_CACHES.values()):
+        label = cache.metrics_label
+        entries[label] = entries.get(label, 0) + len(cache)
+    return entries
+
+
+metrics.gauge_callback('hangupsbot_cache_entries',
+                       'entries per cache name', _count_entries, ('cache',))
+
 CacheItemBase = namedtuple('CacheItemBase',
                            ('value', 'timeout', 'destroy_timeout'))
 
@@ -57,7 +83,8 @@ class Cache(dict, BotMixin, TrackingMixin):
             path (list[str]): path in memory to the location to dump into
     """
     __slots__ = ('_name', '_default_timeout', '_increase_on_access',
-                 '_dump_config', '_reload_listener')
+                 '_dump_config', '_reload_listener', '_hits', '_misses',
+                 '_outdated', '__weakref__')
 
     def __init__(self, default_timeout, name=None, increase_on_access=True,
                  dump_config=None):
@@ -68,6 +95,21 @@ class Cache(dict, BotMixin, TrackingMixin):
         self._dump_config = dump_config
         self._reload_listener = None
 
+        label = self.metrics_label
+        self._hits = REQUESTS.labels(label, 'hit')
+        self._misses = REQUESTS.labels(label, 'miss')
+        self._outdated = REQUESTS.labels(label, 'outdated')
+        _CACHES[id(self)] = self
+
+    @property
+    def metrics_label(self):
+        """get the label value for the cache metrics
+
+        Returns:
+            str: the name of the cache or 'unnamed'
+        """
+        return self._name or 'unnamed'
+
     ############################################################################
     # PUBLIC METHODS
     ############################################################################
@@ -101,15 +143,18 @@ class Cache(dict, BotMixin, TrackingMixin):
         item = super().get(identifier)
         if item is None:
             logger.debug('[%s] MISS for %s', self._name, identifier)
+            self._misses.inc()
             return self.__missing__(identifier)
 
         if item.destroy_timeout < time.time():
             logger.debug('[%s] OUTDATED-HIT for %s', self._name, identifier)
+            self._outdated.inc()
             if not ignore_timeout:
                 self.pop(identifier, None)
                 return self.__missing__(identifier)
         else:
             logger.debug('[%s] HIT for %s', self._name, identifier)
+            self._hits.inc()
 
         if pop:
             # explicit cleanup
@@ -0,0 +1,266 @@
+"""shared http connection pool with an optional response cache"""
+__author__ = 'das7pad@outlook.com'
+
+import asyncio
+import collections
+import copy
+import logging
+import time
+
+import aiohttp
+
+from hangupsbot.base_models import BotMixin
+
+
+logger = logging.getLogger(__name__)
+
+# in seconds
+DNS_CACHE_TIMEOUT = 300
+
+READERS = {
+    'bytes': lambda response: response.read(),
+    'json': lambda response: response.json(content_type=None),
+    'text': lambda response: response.text(),
+}
+
+
+class HttpPool(BotMixin):
+    """connection pool, response cache and pending requests of the bot
+
+    Responses are cached per request for the given ttl, the number of cached
+    responses is bound by the config entry `http_cache_size`.
+    Concurrent requests for a cachable resource share one request. Callers
+    get a copy of parsed json bodies, changes do not alter the cache.
+    """
+    __slots__ = ('_connector', '_cache', '_pending', 'hits', 'misses',
+                 'coalesced')
+
+    def __init__(self):
+        self._connector = None
+        self._cache = collections.OrderedDict()
+        self._pending = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    @property
+    def connector(self):
+        """get the shared connector, create one on first access
+
+        Returns:
+            aiohttp.TCPConnector: the connection pool
+        """
+        if self._connector is None or self._connector.closed:
+            self._connector = aiohttp.TCPConnector(
+                limit=self.bot.config['http_connection_limit'],
+                limit_per_host=self.bot.config[
+                    'http_connection_limit_per_host'],
+                ttl_dns_cache=DNS_CACHE_TIMEOUT,
+            )
+        return self._connector
+
+    def get_cached(self, key):
+        """get a cached response body
+
+        Args:
+            key (tuple): the request identifier
+
+        Returns:
+            tuple[bool, mixed]: the hit state and the body
+        """
+        entry = self._cache.get(key)
+        if entry is None:
+            return False, None
+        expires, body = entry
+        if expires < time.monotonic():
+            del self._cache[key]
+            return False, None
+        self._cache.move_to_end(key)
+        return True, body
+
+    def add_cached(self, key, body, ttl):
+        """store a response body, drop the least recent entries on overflow
+
+        Args:
+            key (tuple): the request identifier
+            body (mixed): the parsed response body
+            ttl (int): time in seconds to keep the entry
+        """
+        self._cache[key] = (time.monotonic() + ttl, body)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.bot.config['http_cache_size']:
+            self._cache.popitem(last=False)
+
+    async def coalesce(self, key, request):
+        """share the result of one request with concurrent callers
+
+        Args:
+            key (tuple): the request identifier
+            request (callable): a coroutine function to perform the request
+
+        Returns:
+            mixed: the result of the request
+
+        Raises:
+            Exception: the request failed
+        """
+        pending = self._pending.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            return await asyncio.shield(pending)
+
+        pending = self._pending[key] = asyncio.ensure_future(request())
+        try:
+            return await asyncio.shield(pending)
+        finally:
+            if pending.done():
+                self._pending.pop(key, None)
+            else:
+                # the caller got cancelled, others may wait for the result
+                pending.add_done_callback(
+                    lambda dummy: self._pending.pop(key, None))
+
+    def stats(self):
+        """get the cache counters
+
+        Returns:
+            dict: `cached` entries, cache `hits`, `misses` and `coalesced`
+                requests
+        """
+        return {
+            'cached': len(self._cache),
+            'hits': self.hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+        }
+
+    async def close(self):
+        """close the pool and drop the cached responses"""
+        self._cache.clear()
+        if self._connector is not None:
+            await self._connector.close()
+            self._connector = None
+
+
+POOL = HttpPool()
+
+
+class HttpClient(BotMixin):
+    """client for the shared connection pool of the bot
+
+    Use `plugins.get_http_client()` inside a plugin to close the client on
+    plugin unload.
+
+    Args:
+        headers (dict): default headers for each request
+    """
+    __slots__ = ('_headers', '_session')
+
+    def __init__(self, headers=None):
+        self._headers = headers
+        self._session = None
+
+    @property
+    def session(self):
+        """get the session, create one on first access
+
+        Returns:
+            aiohttp.ClientSession: a session that uses the shared connector
+        """
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=POOL.connector,
+                connector_owner=False,
+                headers=self._headers,
+                timeout=aiohttp.ClientTimeout(
+                    total=self.bot.config['http_timeout']),
+            )
+        return self._session
+
+    async def fetch(self, url, *, method='GET', read='json', cache_ttl=0,
+                    params=None, headers=None, cacheable=None):
+        """request a resource and read the body
+
+        Args:
+            url (str): the target
+            method (str): the http method
+            read (str): body format, one of 'json', 'text' or 'bytes'
+            cache_ttl (int): time in seconds to cache the body, a ttl of 0
+                disables the cache and the sharing of concurrent requests
+            params (dict): query arguments
+            headers (dict): additional request headers
+            cacheable (callable): optional, called with the body, return
+                False to skip the caching of an error reply
+
+        Returns:
+            mixed: the parsed body
+
+        Raises:
+            aiohttp.ClientError: request failed or the status is not 2xx
+            asyncio.TimeoutError: the request timed out
+        """
+        async def _request():
+            async with self.session.request(method, url, params=params,
+                                            headers=headers) as response:
+                response.raise_for_status()
+                return await READERS[read](response)
+
+        if not cache_ttl:
+            return await _request()
+
+        all_headers = dict(self._headers or {}, **(headers or {}))
+        key = (method.upper(), url, read,
+               tuple(sorted((params or {}).items())),
+               tuple(sorted(all_headers.items())))
+        hit, body = POOL.get_cached(key)
+        if hit:
+            POOL.hits += 1
+        else:
+            POOL.misses += 1
+            body = await POOL.coalesce(key, _request)
+            if cacheable is None or cacheable(body):
+                POOL.add_cached(key, body, cache_ttl)
+
+        # the body is shared with concurrent callers and the cache
+        return copy.deepcopy(body) if read == 'json' else body
+
+    async def get_json(self, url, **kwargs):
+        """get a json resource
+
+        Args:
+            url (str): the target
+            kwargs (dict): see `.fetch()`
+
+        Returns:
+            mixed: the parsed body
+        """
+        return await self.fetch(url, read='json', **kwargs)
+
+    async def get_text(self, url, **kwargs):
+        """get a text resource
+
+        Args:
+            url (str): the target
+            kwargs (dict): see `.fetch()`
+
+        Returns:
+            str: the decoded body
+        """
+        return await self.fetch(url, read='text', **kwargs)
+
+    async def get_bytes(self, url, **kwargs):
+        """get a binary resource
+
+        Args:
+            url (str): the target
+            kwargs (dict): see `.fetch()`
+
+        Returns:
+            bytes: the raw body
+        """
+        return await self.fetch(url, read='bytes', **kwargs)
+
+    async def close(self):
+        """close the session, the shared connector stays open"""
+        if self._session is not None:
+            await self._session.close()
@@ -0,0 +1,245 @@
+"""match many keywords at once with an Aho-Corasick automaton"""
+__author__ = 'das7pad@outlook.com'
+
+import collections
+
+
+# number of keywords that are matched without automaton before a rebuild
+PENDING_LIMIT = 64
+
+
+def _is_word_char(char):
+    """check whether a char counts as word char for a `\\b` in a regex
+
+    Args:
+        char (str): a single char
+
+    Returns:
+        bool: True if the char is alphanumeric or an underscore
+    """
+    return char.isalnum() or char == '_'
+
+
+def is_boundary(text, index):
+    """check for a word boundary like `\\b` in a regex
+
+    Args:
+        text (str): the full text
+        index (int): the position in the text
+
+    Returns:
+        bool: True if exactly one of the surrounding chars is a word char
+    """
+    before = index > 0 and _is_word_char(text[index - 1])
+    after = index < len(text) and _is_word_char(text[index])
+    return before != after
+
+
+class KeywordMatcher:
+    """map keywords to subscribers and find all of them in a single text scan
+
+    Keywords are either plain substrings or, with `boundary` set, require a
+    word boundary on both ends like `\\bkeyword\\b` in a regex.
+
+    New keywords are matched with a substring search until `PENDING_LIMIT`
+    keywords are pending, then the automaton is rebuilt. Removed keywords are
+    ignored in the automaton until the next rebuild.
+    """
+    __slots__ = ('_subscribers', '_by_subscriber', '_pending', '_dead',
+                 '_goto', '_fail', '_out', '_link')
+
+    def __init__(self):
+        # (keyword, boundary) -> set of subscribers
+        self._subscribers = {}
+        # subscriber -> set of (keyword, boundary)
+        self._by_subscriber = collections.defaultdict(set)
+        self._pending = set()
+        self._dead = 0
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+        self._link = [0]
+
+    def __len__(self):
+        return len(self._subscribers)
+
+    def __contains__(self, subscriber):
+        return subscriber in self._by_subscriber
+
+    def add(self, keyword, subscriber, boundary=False):
+        """subscribe to a keyword
+
+        Args:
+            keyword (str): the text to match
+            subscriber (hashable): the receiver of matches
+            boundary (bool): toggle to match only whole words
+        """
+        if not keyword:
+            return
+        key = (keyword, boundary)
+        subscribers = self._subscribers.get(key)
+        if subscribers is None:
+            subscribers = self._subscribers[key] = set()
+            if not self._in_automaton(key):
+                self._pending.add(key)
+            elif self._dead:
+                # revived
+                self._dead -= 1
+        subscribers.add(subscriber)
+        self._by_subscriber[subscriber].add(key)
+
+    def remove(self, keyword, subscriber, boundary=False):
+        """unsubscribe from a keyword
+
+        Args:
+            keyword (str): the text to match
+            subscriber (hashable): the receiver of matches
+            boundary (bool): toggle to match only whole words
+        """
+        key = (keyword, boundary)
+        subscribers = self._subscribers.get(key)
+        if subscribers is None or subscriber not in subscribers:
+            return
+        subscribers.discard(subscriber)
+        keys = self._by_subscriber[subscriber]
+        keys.discard(key)
+        if not keys:
+            del self._by_subscriber[subscriber]
+        if subscribers:
+            return
+
+        del self._subscribers[key]
+        if key in self._pending:
+            self._pending.discard(key)
+        else:
+            self._dead += 1
+
+    def remove_subscriber(self, subscriber):
+        """unsubscribe from all keywords
+
+        Args:
+            subscriber (hashable): the receiver of matches
+        """
+        for keyword, boundary in tuple(self._by_subscriber.get(subscriber,
+                                                               ())):
+            self.remove(keyword, subscriber, boundary)
+
+    def get_keywords(self, subscriber):
+        """get the subscribed keywords
+
+        Args:
+            subscriber (hashable): the receiver of matches
+
+        Returns:
+            set[tuple[str, bool]]: keyword and boundary flag
+        """
+        return set(self._by_subscriber.get(subscriber, ()))
+
+    def match(self, text):
+        """find all subscribed keywords in a text
+
+        Args:
+            text (str): the text to scan
+
+        Returns:
+            dict: subscriber -> set of matched keywords
+        """
+        if len(self._pending) > PENDING_LIMIT or (
+                self._dead and self._dead > len(self._subscribers)):
+            self.rebuild()
+
+        matches = {}
+        for key in self._scan(text):
+            for subscriber in self._subscribers.get(key, ()):
+                matches.setdefault(subscriber, set()).add(key[0])
+        return matches
+
+    def rebuild(self):
+        """build the automaton from all subscribed keywords"""
+        goto = [{}]
+        out = [[]]
+        for key in self._subscribers:
+            state = 0
+            for char in key[0]:
+                following = goto[state].get(char)
+                if following is None:
+                    following = goto[state][char] = len(goto)
+                    goto.append({})
+                    out.append([])
+                state = following
+            out[state].append(key)
+
+        fail = [0] * len(goto)
+        link = [0] * len(goto)
+        queue = collections.deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, following in goto[state].items():
+                queue.append(following)
+                fallback = fail[state]
+                while fallback and char not in goto[fallback]:
+                    fallback = fail[fallback]
+                fallback = goto[fallback].get(char, 0)
+                fail[following] = fallback
+                # the next state in the fail chain that completes a keyword
+                link[following] = fallback if out[fallback] else link[fallback]
+
+        self._goto = goto
+        self._fail = fail
+        self._out = [tuple(keys) for keys in out]
+        self._link = link
+        self._pending.clear()
+        self._dead = 0
+
+    def _in_automaton(self, key):
+        """check whether a keyword is part of the current automaton
+
+        Args:
+            key (tuple[str, bool]): keyword and boundary flag
+
+        Returns:
+            bool: True if the automaton reports the keyword
+        """
+        state = 0
+        for char in key[0]:
+            state = self._goto[state].get(char)
+            if state is None:
+                return False
+        return key in self._out[state]
+
+    def _scan(self, text):
+        """get the keywords in the text, includes removed keywords
+
+        Args:
+            text (str): the text to scan
+
+        Yields:
+            tuple[str, bool]: keyword and boundary flag
+        """
+        goto, fail, out, link = self._goto, self._fail, self._out, self._link
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+
+            node = state if out[state] else link[state]
+            while node:
+                for key in out[node]:
+                    keyword, boundary = key
+                    if not boundary or (
+                            is_boundary(text, index + 1 - len(keyword))
+                            and is_boundary(text, index + 1)):
+                        yield key
+                node = link[node]
+
+        for key in tuple(self._pending):
+            keyword, boundary = key
+            start = text.find(keyword)
+            while start != -1:
+                if not boundary or (
+                        is_boundary(text, start)
+                        and is_boundary(text, start + len(keyword))):
+                    yield key
+                    break
+                start = text.find(keyword, start + 1)
@@ -0,0 +1,185 @@
+"""measure the duration of event handlers and commands"""
+__author__ = 'das7pad@outlook.com'
+
+import asyncio
+import cProfile
+import io
+import logging
+import pstats
+
+from hangupsbot.utils.workers import LatencyStats
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SLOW_THRESHOLD = 1.  # seconds
+DEFAULT_WINDOW = 200  # recent durations per handler for the percentiles
+
+
+class Profiler:
+    """collect rolling durations per handler and command
+
+    A handler is identified by the tuple (kind, module path, name), kind is
+    the pluggable name or 'command'. The timing is disabled by default.
+
+    Args:
+        slow_threshold (float): log calls that took longer, time in seconds
+        window (int): number of recent durations used for the percentiles
+    """
+    __slots__ = ('enabled', 'slow_threshold', '_window', '_stats', '_plugins',
+                 '_capture', '_capture_timer', 'capture_report')
+
+    def __init__(self, slow_threshold=DEFAULT_SLOW_THRESHOLD,
+                 window=DEFAULT_WINDOW):
+        self.enabled = False
+        self.slow_threshold = slow_threshold
+        self._window = window
+        self._stats = {}
+        self._plugins = {}
+        self._capture = None
+        self._capture_timer = None
+        self.capture_report = None
+
+    def configure(self, config):
+        """apply the profiler settings of the bot config
+
+        Args:
+            config (hangupsbot.config.Config): the bot config
+        """
+        self.enabled = bool(config.get_option('profiler_enabled'))
+        self.slow_threshold = config.get_option('profiler_slow_threshold')
+
+    def record(self, kind, module_path, name, duration, *, args=()):
+        """add the duration of a call, log it if it exceeded the threshold
+
+        Args:
+            kind (str): the pluggable name or 'command'
+            module_path (str): the plugin that registered the handler, e.g.
+                'plugins.mentions' or 'commands.basic'
+            name (str): the function or command name
+            duration (float): time in seconds
+            args (tuple): optional, the arguments of the call, the event id is
+                looked up in there for slow calls only
+        """
+        key = (kind, module_path, name)
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = LatencyStats(self._window)
+        stats.add(duration)
+
+        stats = self._plugins.get(module_path)
+        if stats is None:
+            stats = self._plugins[module_path] = LatencyStats(self._window)
+        stats.add(duration)
+
+        if duration > self.slow_threshold:
+            logger.warning('%s: %s.%s took %.2fs for event %s',
+                           kind, module_path, name, duration,
+                           get_event_id(args))
+
+    def slowest(self, limit=10):
+        """get the handlers with the highest 95th percentile
+
+        Args:
+            limit (int): the maximum number of entries
+
+        Returns:
+            list[tuple[tuple[str, str, str], dict]]: the key of the handler and
+                its summary, see `LatencyStats.summary()`
+        """
+        entries = [(key, stats.summary())
+                   for key, stats in list(self._stats.items())]
+        entries.sort(key=lambda entry: entry[1]['p95'], reverse=True)
+        return entries[:limit]
+
+    def by_plugin(self):
+        """get the summary of all handlers and commands per plugin
+
+        Returns:
+            dict: module path -> summary, see `LatencyStats.summary()`
+        """
+        return {module_path: stats.summary()
+                for module_path, stats in list(self._plugins.items())}
+
+    def reset(self):
+        """drop the recorded durations"""
+        self._stats.clear()
+        self._plugins.clear()
+
+    @property
+    def capturing(self):
+        """check whether a cProfile capture is running
+
+        Returns:
+            bool: True if a capture is running
+        """
+        return self._capture is not None
+
+    def start_capture(self, duration, limit=20):
+        """profile the event loop thread for a time window
+
+        Args:
+            duration (float): time in seconds until the capture is stopped
+            limit (int): number of functions in the report
+
+        Returns:
+            bool: False if a capture is already running, otherwise True
+        """
+        if self._capture is not None:
+            return False
+        self._capture = cProfile.Profile()
+        self._capture.enable()
+        self._capture_timer = asyncio.get_event_loop().call_later(
+            duration, self.stop_capture, limit)
+        logger.info('capture started for %ss', duration)
+        return True
+
+    def stop_capture(self, limit=20):
+        """stop a running capture and store the report
+
+        Args:
+            limit (int): number of functions in the report
+
+        Returns:
+            str: the report, functions sorted by their cumulative time, or
+                None if no capture was running
+        """
+        capture = self._capture
+        if capture is None:
+            return None
+        capture.disable()
+        self._capture = None
+        if self._capture_timer is not None:
+            self._capture_timer.cancel()
+            self._capture_timer = None
+
+        with io.StringIO() as writer:
+            pstats.Stats(capture, stream=writer).sort_stats(
+                'cumulative').print_stats(limit)
+            self.capture_report = writer.getvalue()
+        logger.info('capture stopped')
+        return self.capture_report
+
+
+def get_event_id(args):
+    """find the id of the event in the arguments of a handler
+
+    Args:
+        args (tuple): the positional arguments of the handler
+
+    Returns:
+        str: the event id or None if no argument is an event
+    """
+    for arg in args:
+        try:
+            event_id = getattr(arg, 'event_id', None)
+        except NotImplementedError:
+            # the bot forwards unknown attributes to the hangups client
+            continue
+        if event_id is not None:
+            return event_id
+    return None
+
+
+# Profiler singleton
+PROFILER = Profiler()
@@ -0,0 +1,280 @@
+"""token buckets to limit the request rate against platform apis"""
+__author__ = 'das7pad@outlook.com'
+
+import asyncio
+import logging
+import time
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BACK_OFF = 1  # seconds
+MAX_BACK_OFF = 300  # seconds
+EVICT_INTERVAL = 600  # seconds between the checks for idle buckets
+
+
+class TokenBucket:
+    """a bucket that refills with a constant rate up to its capacity
+
+    Tokens are reserved in advance: a request that finds the bucket empty
+    books a future token and waits for it. This keeps the order of requests
+    and requires no lock.
+
+    Args:
+        rate (float): tokens per second
+        capacity (float): maximum number of tokens, the burst size
+        clock (callable): returns the current time in seconds
+    """
+    __slots__ = ('rate', 'capacity', '_clock', '_tokens', '_updated',
+                 '_blocked_until', 'failures', 'acquired', 'waited')
+
+    def __init__(self, rate, capacity, clock):
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = capacity
+        self._updated = clock()
+        self._blocked_until = 0
+        self.failures = 0
+        self.acquired = 0
+        self.waited = 0.
+
+    def _refill(self, now):
+        """add the tokens that accumulated since the last update
+
+        Args:
+            now (float): the current time
+        """
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.capacity,
+                               self._tokens + elapsed * self.rate)
+            self._updated = now
+
+    @property
+    def tokens(self):
+        """get the number of available tokens
+
+        Returns:
+            float: the current tokens, negative if tokens are reserved
+        """
+        self._refill(self._clock())
+        return self._tokens
+
+    @property
+    def blocked_for(self):
+        """get the remaining time of an applied back off
+
+        Returns:
+            float: time in seconds, 0 if the bucket is not blocked
+        """
+        return max(0., self._blocked_until - self._clock())
+
+    def reserve(self, tokens=1):
+        """take tokens from the bucket
+
+        Args:
+            tokens (float): the number of tokens to take
+
+        Returns:
+            float: time in seconds to wait until the tokens are available
+        """
+        now = self._clock()
+        self._refill(now)
+        self._tokens -= tokens
+        # the refill starts at the end of a block
+        delay = max(self._updated - now, 0.)
+        if self._tokens < 0:
+            delay += -self._tokens / self.rate
+        self.acquired += tokens
+        self.waited += delay
+        return delay
+
+    @property
+    def idle(self):
+        """check whether the bucket is in the state of a new one
+
+        Returns:
+            bool: True if the bucket is full, not blocked and has no failures
+        """
+        return (not self.failures and not self.blocked_for
+                and self.tokens >= self.capacity)
+
+    def block(self, delay):
+        """block the bucket for a given time
+
+        The refill pauses until the block ends, the bucket holds at most one
+        token then. Pending requests are not released in a burst.
+
+        Args:
+            delay (float): time in seconds
+        """
+        now = self._clock()
+        self._refill(now)
+        self._tokens = min(self._tokens, 1)
+        self._blocked_until = max(self._blocked_until, now + delay)
+        self._updated = max(self._updated, self._blocked_until)
+
+    def unblock(self):
+        """release an applied block, the refill continues from now on"""
+        now = self._clock()
+        self._blocked_until = 0
+        self._updated = min(self._updated, now)
+
+
+class RateLimiter:
+    """token buckets per key with adaptive back off
+
+    Keys are arbitrary hashable objects, for example an api method, a chat
+    or a global key. Buckets are created on demand with the limits of the
+    key or the default limits. Tuple keys like `('chat', chat_id)` fall back
+    to the limits of their first item, `'chat'`.
+
+    Args:
+        rate (float): default tokens per second
+        capacity (float): default burst size
+        limits (dict): custom `(rate, capacity)` per key
+        name (str): a custom identifier for the log entries
+        clock (callable): returns the current time in seconds
+        sleep (callable): coroutine function to wait for a given time
+    """
+    __slots__ = ('_rate', '_capacity', '_limits', '_name', '_clock', '_sleep',
+                 '_buckets', '_next_eviction')
+
+    def __init__(self, rate, capacity=1, limits=None, *, name=None,
+                 clock=None, sleep=None):
+        self._rate = rate
+        self._capacity = capacity
+        self._limits = limits or {}
+        self._name = name
+        self._clock = clock or time.monotonic
+        self._sleep = sleep or asyncio.sleep
+        self._buckets = {}
+        self._next_eviction = self._clock() + EVICT_INTERVAL
+
+    def bucket(self, key):
+        """get the bucket of a key
+
+        Args:
+            key (mixed): hashable identifier
+
+        Returns:
+            TokenBucket: an existing or a new instance
+        """
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            self._evict()
+            limits = self._limits.get(key)
+            if limits is None and isinstance(key, tuple) and key:
+                limits = self._limits.get(key[0])
+            rate, capacity = limits or (self._rate, self._capacity)
+            bucket = self._buckets[key] = TokenBucket(rate, capacity,
+                                                      self._clock)
+        return bucket
+
+    def reserve(self, *keys, tokens=1):
+        """take tokens from the buckets of all given keys
+
+        Args:
+            keys (mixed): hashable identifiers
+            tokens (float): the number of tokens per bucket
+
+        Returns:
+            float: time in seconds to wait until the request may be performed
+        """
+        return max([self.bucket(key).reserve(tokens) for key in keys] or [0.])
+
+    async def acquire(self, *keys, tokens=1):
+        """wait until the request rate allows a request for all keys
+
+        Args:
+            keys (mixed): hashable identifiers
+            tokens (float): the number of tokens per bucket
+
+        Returns:
+            float: the waited time in seconds
+        """
+        delay = self.reserve(*keys, tokens=tokens)
+        if delay > 0:
+            logger.debug('[%s] %r: delayed by %.2fs', self._name, keys, delay)
+            await self._sleep(delay)
+        return delay
+
+    def _evict(self):
+        """drop idle buckets, a new bucket replaces them without a change"""
+        now = self._clock()
+        if now < self._next_eviction:
+            return
+        self._next_eviction = now + EVICT_INTERVAL
+        idle = [key for key, bucket in self._buckets.items() if bucket.idle]
+        for key in idle:
+            self._buckets.pop(key)
+        if idle:
+            logger.debug('[%s] evicted %d idle buckets', self._name, len(idle))
+
+    def back_off(self, key, delay=None):
+        """block a bucket after a rate limit or failure
+
+        Without a server provided delay the back off grows exponentially with
+        each failure until `.succeeded(key)` is called.
+
+        Args:
+            key (mixed): hashable identifier
+            delay (float): a server provided delay, e.g. a `Retry-After` value
+
+        Returns:
+            float: the applied delay in seconds
+        """
+        bucket = self.bucket(key)
+        bucket.failures += 1
+        if delay is None:
+            delay = min(MAX_BACK_OFF,
+                        DEFAULT_BACK_OFF * 2 ** (bucket.failures - 1))
+        logger.info('[%s] %r: back off for %ss', self._name, key, delay)
+        bucket.block(delay)
+        return delay
+
+    def succeeded(self, key):
+        """reset the back off of a key after a successful request
+
+        Args:
+            key (mixed): hashable identifier
+        """
+        bucket = self._buckets.get(key)
+        if bucket is not None:
+            bucket.failures = 0
+
+    def reset(self, key):
+        """drop the failures and an applied block of a key
+
+        Args:
+            key (mixed): hashable identifier
+        """
+        bucket = self._buckets.get(key)
+        if bucket is not None:
+            bucket.failures = 0
+            bucket.unblock()
+
+    def stats(self):
+        """get the state of all buckets
+
+        Returns:
+            dict: key -> dict with `rate`, `capacity`, `tokens`, `blocked_for`,
+                `failures`, `acquired` and `waited`
+        """
+        return {
+            key: {
+                'rate': bucket.rate,
+                'capacity': bucket.capacity,
+                'tokens': bucket.tokens,
+                'blocked_for': bucket.blocked_for,
+                'failures': bucket.failures,
+                'acquired': bucket.acquired,
+                'waited': bucket.waited,
+            }
+            for key, bucket in self._buckets.items()
+        }
+
+    def clear(self):
+        """drop all buckets"""
+        self._buckets.clear()
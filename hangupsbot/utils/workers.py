@@ -0,0 +1,281 @@
+"""process items concurrently across keys and in order per key"""
+__author__ = 'das7pad@outlook.com'
+
+import asyncio
+import collections
+import concurrent.futures
+import logging
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyStats:
+    """track latencies with a rolling window for percentiles
+
+    Args:
+        window (int): number of recent values used for the percentiles
+    """
+    __slots__ = ('count', 'total', 'max', '_window')
+
+    def __init__(self, window=1000):
+        self.count = 0
+        self.total = 0.
+        self.max = 0.
+        self._window = collections.deque(maxlen=window)
+
+    def add(self, value):
+        """record a latency
+
+        Args:
+            value (float): time in seconds
+        """
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+        self._window.append(value)
+
+    def percentile(self, fraction):
+        """get a percentile of the recent values
+
+        Args:
+            fraction (float): between 0 and 1, e.g. .95
+
+        Returns:
+            float: the percentile or 0 if no value was recorded yet
+        """
+        if not self._window:
+            return 0.
+        values = sorted(self._window)
+        index = min(len(values) - 1, int(fraction * len(values)))
+        return values[index]
+
+    def summary(self):
+        """get an overview of the recorded latencies
+
+        Returns:
+            dict: `count`, `mean`, `max`, `p50` and `p95`, times in seconds
+        """
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else 0.,
+            'max': self.max,
+            'p50': self.percentile(.5),
+            'p95': self.percentile(.95),
+        }
+
+
+class OrderedWorkers:
+    """process items in order per key and concurrently across keys
+
+    Each key with pending items has one worker task, which exits once the
+    backlog of the key is processed. A semaphore caps the number of items
+    that are processed at the same time.
+
+    Args:
+        handler (callable): coroutine function, called with each item
+        limit (int): maximum number of keys processed concurrently
+        name (str): a custom identifier for the log entries
+        slow_threshold (float): log items that took longer, time in seconds
+        max_queued (int): number of queued items across all keys until `.put`
+            waits for a free slot, `None` for no limit
+    """
+    __slots__ = ('_handler', '_name', '_slow_threshold', '_semaphore',
+                 '_queues', '_workers', '_max_queued', '_queued',
+                 '_capacity', 'latency')
+
+    def __init__(self, handler, limit, *, name=None, slow_threshold=5,
+                 max_queued=None):
+        self._handler = handler
+        self._name = name
+        self._slow_threshold = slow_threshold
+        self._semaphore = asyncio.Semaphore(limit)
+        self._queues = {}
+        self._workers = {}
+        self._max_queued = max_queued
+        self._queued = 0
+        self._capacity = asyncio.Event()
+        self._capacity.set()
+        self.latency = LatencyStats()
+
+    def submit(self, key, item):
+        """queue an item for processing
+
+        Args:
+            key (mixed): hashable identifier, items of a key stay in order
+            item (mixed): argument for the handler
+
+        Returns:
+            asyncio.Future: done once the item got processed, the result is
+                False if the handler raised an error, otherwise True
+        """
+        future = asyncio.get_event_loop().create_future()
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = self._queues[key] = collections.deque()
+        queue.append((item, future, time.monotonic()))
+        self._update_queued(1)
+
+        if key not in self._workers:
+            self._workers[key] = asyncio.ensure_future(self._work(key))
+        return future
+
+    async def put(self, key, item):
+        """wait for a free slot in the backlog and queue an item
+
+        Args:
+            key (mixed): hashable identifier, items of a key stay in order
+            item (mixed): argument for the handler
+
+        Returns:
+            asyncio.Future: see `.submit()`
+        """
+        if not self._capacity.is_set():
+            logger.info('[%s] backlog is full, waiting', self._name)
+            await self._capacity.wait()
+        return self.submit(key, item)
+
+    def _update_queued(self, delta):
+        """update the counter of queued items and the free slot state
+
+        Args:
+            delta (int): the number of added or removed items
+        """
+        self._queued += delta
+        if self._max_queued is None or self._queued < self._max_queued:
+            self._capacity.set()
+        else:
+            self._capacity.clear()
+
+    def stats(self):
+        """get the current load and the latencies
+
+        Returns:
+            dict: `active` keys, `queued` items and the `latency` summary
+        """
+        return {
+            'active': len(self._workers),
+            'queued': self._queued,
+            'latency': self.latency.summary(),
+        }
+
+    async def join(self, timeout=None):
+        """wait until the queued items are processed
+
+        Args:
+            timeout (float): maximum time in seconds to wait
+        """
+        futures = [future
+                   for queue in self._queues.values()
+                   for dummy, future, dummy in queue]
+        if futures:
+            await asyncio.wait(futures, timeout=timeout)
+
+    async def close(self):
+        """cancel all workers and drop the queued items"""
+        workers = list(self._workers.values())
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+        for queue in self._queues.values():
+            for dummy, future, dummy in queue:
+                future.cancel()
+        self._queues.clear()
+        self._update_queued(-self._queued)
+
+    async def _work(self, key):
+        """process the backlog of a key
+
+        Args:
+            key (mixed): hashable identifier
+        """
+        queue = self._queues[key]
+        try:
+            while queue:
+                item, future, queued = queue[0]
+                async with self._semaphore:
+                    try:
+                        await self._handler(item)
+                    except asyncio.CancelledError:
+                        future.cancel()
+                        raise
+                    except Exception:  # pylint: disable=broad-except
+                        logger.exception('[%s] %r: failed to process %r',
+                                         self._name, key, item)
+                        future.set_result(False)
+                    else:
+                        future.set_result(True)
+                    finally:
+                        queue.popleft()
+                        self._update_queued(-1)
+
+                latency = time.monotonic() - queued
+                self.latency.add(latency)
+                if latency > self._slow_threshold:
+                    logger.warning('[%s] %r: slow item %s took %.2fs',
+                                   self._name, key, id(item), latency)
+        finally:
+            self._workers.pop(key, None)
+            if not queue:
+                self._queues.pop(key, None)
+
+
+class BatchWorker:
+    """collect items on the event loop and flush them in a worker thread
+
+    The single worker thread keeps the order of the batches. Subclasses
+    implement `._take_pending()` and `._flush()`.
+
+    Args:
+        flush_interval (float): time in seconds between two flushes
+    """
+    __slots__ = ('_flush_interval', '_pending', '_executor')
+
+    def __init__(self, flush_interval):
+        self._flush_interval = flush_interval
+        self._pending = None
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+
+    async def run(self):
+        """flush the queued items periodically until cancelled
+
+        Raises:
+            CancelledError: the worker got stopped, all items were flushed
+        """
+        loop = asyncio.get_event_loop()
+        try:
+            while True:
+                await asyncio.sleep(self._flush_interval)
+                if self._pending:
+                    await loop.run_in_executor(self._executor, self._flush,
+                                               self._take_pending())
+        except asyncio.CancelledError:
+            self.close()
+            raise
+
+    def close(self):
+        """flush the queued items, blocks until done"""
+        self._executor.shutdown(wait=True)
+        self._flush(self._take_pending())
+
+    def _take_pending(self):
+        """swap the queued items
+
+        Raises:
+            NotImplementedError: implement in a subclass
+        """
+        raise NotImplementedError()
+
+    def _flush(self, pending):
+        """process a batch, runs in the worker thread
+
+        Args:
+            pending (mixed): the result of `._take_pending()`
+
+        Raises:
+            NotImplementedError: implement in a subclass
+        """
+        raise NotImplementedError()
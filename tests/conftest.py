@@ -1,13 +1,30 @@
 """setup the test-env"""
 
+import pytest
+
 from . import fixtures
 
 # noinspection PyUnresolvedReferences
 from .fixtures import (
     bot,
+    endpoint,
     event,
     module_wrapper,
 )
 
 
 __all__ = fixtures.__all__
+
+
+def pytest_addoption(parser):
+    parser.addoption('--benchmark', action='store_true', default=False,
+                     help='run the tests marked as benchmark')
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption('--benchmark'):
+        return
+    skip = pytest.mark.skip(reason='benchmark, run with --benchmark')
+    for item in items:
+        if 'benchmark' in item.keywords:
+            item.add_marker(skip)
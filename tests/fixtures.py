@@ -2,6 +2,7 @@
 
 __all__ = (
     'bot',
+    'endpoint',
     'event',
     'module_wrapper',
 )
@@ -15,6 +16,8 @@ import hangups
 import hangups.http_utils
 import hangups.user
 import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
 from hangups import hangouts_pb2
 from hangups.conversation_event import (
     ChatMessageEvent,
@@ -26,6 +29,7 @@ import hangupsbot.core
 import hangupsbot.handlers
 import hangupsbot.permamem
 import hangupsbot.plugins
+import hangupsbot.scheduler
 import hangupsbot.sinks
 import hangupsbot.sync.handler
 import hangupsbot.tagging
@@ -211,6 +215,8 @@ class TestHangupsBot(hangupsbot.core.HangupsBot):
         EVENT_LOOP.run_until_complete(self._handlers.setup(self._conv_list))
         EVENT_LOOP.run_until_complete(self.sync.setup())
         EVENT_LOOP.run_until_complete(hangupsbot.permamem.initialise(self))
+        self.scheduler = hangupsbot.scheduler.Scheduler()
+        self.scheduler.setup()
 
     async def coro_send_message(self, conversation, message, context=None,
                                 image_id=None):
@@ -231,3 +237,68 @@ class TestHangupsBot(hangupsbot.core.HangupsBot):
 def bot():
     """get a fresh TestHangupsBot instance per module"""
     return TestHangupsBot()
+
+
+class Endpoint:
+    """local web server that records the requests
+
+    GET requests are answered with the path and the query, POST requests
+    with `OK` after the json body got recorded. The path `/missing` answers
+    with a 404.
+    """
+
+    def __init__(self):
+        self.requests = {}
+        self.received = []
+        self.arrived = asyncio.Event()
+        self.release = asyncio.Event()
+        self.release.set()
+        self.fail = 0
+        self.server = None
+
+    async def handle(self, request):
+        path = request.path
+        self.requests[path] = self.requests.get(path, 0) + 1
+        await self.release.wait()
+        if self.fail:
+            self.fail -= 1
+            return web.Response(status=503)
+        if path == '/missing':
+            return web.Response(status=404)
+        if request.method == 'POST':
+            self.received.append(await request.json())
+            self.arrived.set()
+            return web.Response(text='OK')
+        return web.json_response({'path': path,
+                                  'query': dict(request.query)})
+
+    def url(self, path):
+        return str(self.server.make_url(path))
+
+    async def wait_for(self, count):
+        """wait until a number of POST requests got recorded
+
+        Args:
+            count (int): the number of requests
+        """
+        while len(self.received) < count:
+            self.arrived.clear()
+            await asyncio.wait_for(self.arrived.wait(), 5)
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_route('*', '/{path:.*}', self.handle)
+        self.server = TestServer(app)
+        await self.server.start_server()
+
+    async def close(self):
+        await self.server.close()
+
+
+@pytest.fixture
+async def endpoint():
+    """get a running local web server"""
+    server = Endpoint()
+    await server.start()
+    yield server
+    await server.close()
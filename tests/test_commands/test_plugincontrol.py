@@ -3,6 +3,8 @@
 import pytest
 
 from hangupsbot import plugins
+from hangupsbot.commands import Help
+from hangupsbot.utils.profiler import PROFILER
 
 from tests import run_cmd
 
@@ -36,3 +38,43 @@ async def test_pluginload(bot, event):
     event = event.with_text('/bot pluginload plugins.<invalid>')
     await run_cmd(bot, event)
     assert 'failed' in bot.last_message.text
+
+
+@pytest.mark.asyncio
+async def test_pluginstartup(bot, event):
+    event = event.with_text('/bot pluginstartup 3')
+    result = await run_cmd(bot, event)
+    assert 'commands.plugincontrol' in result
+    assert 'spent loading' in result
+    assert 'waiting for requirements' in result
+
+
+@pytest.mark.asyncio
+async def test_profile(bot, event, monkeypatch):
+    monkeypatch.setattr(PROFILER, 'enabled', False)
+    PROFILER.reset()
+
+    result = await run_cmd(bot, event.with_text('/bot profile on'))
+    assert result == 'profiler is on'
+    assert PROFILER.enabled
+
+    PROFILER.record('message', 'plugins.slow', 'on_message', .2)
+    result = await run_cmd(bot, event.with_text('/bot profile 5'))
+    assert 'profiler is on' in result
+    assert '<b>message</b> plugins.slow.on_message: p50 200ms' in result
+
+    result = await run_cmd(bot, event.with_text('/bot profile plugins'))
+    assert '<b>plugins.slow</b>: p50 200ms' in result
+
+    result = await run_cmd(bot, event.with_text('/bot profile report'))
+    assert result == 'no capture available'
+
+    monkeypatch.setattr(PROFILER, 'capture_report',
+                        '1 0.0 {method <lambda>} & <listcomp>\n')
+    result = await run_cmd(bot, event.with_text('/bot profile report'))
+    assert result == ('<pre>1 0.0 {method &lt;lambda&gt;} &amp; '
+                      '&lt;listcomp&gt;</pre>')
+
+    with pytest.raises(Help):
+        await run_cmd(bot, event.with_text('/bot profile invalid'))
+    PROFILER.reset()
@@ -0,0 +1,131 @@
+"""test the shared http pool and benchmark it against a session per request"""
+
+import asyncio
+import logging
+import time
+
+import aiohttp
+import pytest
+
+from hangupsbot.utils import http
+
+
+# run all tests in an event loop
+pytestmark = pytest.mark.asyncio
+
+logger = logging.getLogger('tests')
+
+BENCHMARK_REQUESTS = 500
+
+
+@pytest.fixture
+async def client(bot):
+    bot.config.set_by_path(['http_connection_limit'], 100)
+    bot.config.set_by_path(['http_connection_limit_per_host'], 10)
+    bot.config.set_by_path(['http_timeout'], 5)
+    bot.config.set_by_path(['http_cache_size'], 2)
+    yield http.HttpClient()
+    await http.POOL.close()
+
+
+async def test_fetch(client, endpoint):
+    body = await client.get_json(endpoint.url('/a'), params={'q': '1'})
+    text = await client.get_text(endpoint.url('/a'))
+    with pytest.raises(aiohttp.ClientResponseError):
+        await client.get_bytes(endpoint.url('/missing'))
+    await client.close()
+
+    assert body == {'path': '/a', 'query': {'q': '1'}}
+    assert '"path": "/a"' in text
+    # not cached without a ttl
+    assert endpoint.requests['/a'] == 2
+
+
+async def test_cache(client, endpoint):
+    for dummy in range(3):
+        await client.get_json(endpoint.url('/a'), cache_ttl=60)
+    await client.get_json(endpoint.url('/a'), params={'q': '1'},
+                          cache_ttl=60)
+    assert http.POOL.stats()['hits'] >= 2
+
+    # the least recent entry gets dropped on overflow
+    await client.get_json(endpoint.url('/b'), cache_ttl=60)
+    await client.get_json(endpoint.url('/a'), cache_ttl=60)
+    await client.close()
+
+    assert endpoint.requests['/a'] == 3
+    assert endpoint.requests['/b'] == 1
+
+
+async def test_coalesce(client, endpoint):
+    endpoint.release.clear()
+    requests = [client.get_json(endpoint.url('/slow'), cache_ttl=60)
+                for dummy in range(5)]
+    pending = asyncio.gather(*requests)
+    await asyncio.sleep(.1)
+    endpoint.release.set()
+    results = await pending
+    await client.close()
+
+    assert endpoint.requests['/slow'] == 1
+    assert all(result == results[0] for result in results)
+
+
+async def test_cacheable(client, endpoint):
+    def _is_b(body):
+        return body['path'] == '/b'
+
+    for dummy in range(2):
+        await client.get_json(endpoint.url('/a'), cache_ttl=60,
+                              cacheable=_is_b)
+        await client.get_json(endpoint.url('/b'), cache_ttl=60,
+                              cacheable=_is_b)
+    await client.close()
+
+    assert endpoint.requests['/a'] == 2
+    assert endpoint.requests['/b'] == 1
+
+
+async def test_cached_copies(client, endpoint):
+    body = await client.get_json(endpoint.url('/a'), cache_ttl=60)
+    body['changed'] = True
+    assert 'changed' not in await client.get_json(endpoint.url('/a'),
+                                                  cache_ttl=60)
+    await client.close()
+
+
+async def test_default_headers_in_key(client, endpoint):
+    other = http.HttpClient(headers={'Accept-Language': 'de'})
+    await client.get_json(endpoint.url('/a'), cache_ttl=60)
+    await other.get_json(endpoint.url('/a'), cache_ttl=60)
+    await client.close()
+    await other.close()
+
+    assert endpoint.requests['/a'] == 2
+
+
+@pytest.mark.benchmark
+async def test_benchmark(client, endpoint):
+    url = endpoint.url('/bench')
+
+    start = time.time()
+    for dummy in range(BENCHMARK_REQUESTS):
+        async with aiohttp.ClientSession() as session:
+            async with session.get(url) as response:
+                await response.json()
+    per_request = BENCHMARK_REQUESTS / (time.time() - start)
+
+    start = time.time()
+    for dummy in range(BENCHMARK_REQUESTS):
+        await client.get_json(url)
+    pooled = BENCHMARK_REQUESTS / (time.time() - start)
+
+    start = time.time()
+    for dummy in range(BENCHMARK_REQUESTS):
+        await client.get_json(url, cache_ttl=60)
+    cached = BENCHMARK_REQUESTS / (time.time() - start)
+    await client.close()
+
+    logger.info('session per request: %d requests/s, pooled: %d requests/s, '
+                'cached: %d requests/s', per_request, pooled, cached)
+    assert endpoint.requests['/bench'] == 2 * BENCHMARK_REQUESTS + 1
@@ -0,0 +1,117 @@
+"""test the lazy imports and benchmark the startup of the bot"""
+
+import json
+import logging
+import os
+import subprocess
+import sys
+
+import pytest
+
+import hangupsbot
+from hangupsbot.imports import (
+    ImportTimer,
+    LazyModule,
+)
+
+
+logger = logging.getLogger('tests')
+
+HEAVY_MODULES = ('moviepy', 'imageio', 'PIL')
+MAX_STARTUP_TIME = 10  # seconds, a generous limit for slow test runners
+
+STARTUP_SCRIPT = '''
+import json
+import sys
+import time
+
+start = time.monotonic()
+from hangupsbot.core import HangupsBot
+imported = time.monotonic()
+HangupsBot('cookies.json', 'config.json', 'memory.json', 5)
+done = time.monotonic()
+
+json.dump({
+    'import': imported - start,
+    'total': done - start,
+    'loaded': [name for name in %r if name in sys.modules],
+}, sys.stdout)
+''' % (HEAVY_MODULES,)
+
+
+@pytest.fixture
+def modules(tmp_path, monkeypatch):
+    """create the modules `lazy_parent` and `lazy_child` in a new path"""
+    (tmp_path / 'lazy_parent.py').write_text(
+        'import lazy_child\nVALUE = lazy_child.VALUE + 1\n')
+    (tmp_path / 'lazy_child.py').write_text('VALUE = 1\n')
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield
+    for name in ('lazy_parent', 'lazy_child'):
+        sys.modules.pop(name, None)
+
+
+def test_lazy_module(modules):
+    module = LazyModule('lazy_parent')
+    assert not module.loaded
+    assert 'lazy_parent' not in sys.modules
+
+    assert module.VALUE == 2
+    assert module.loaded
+    assert module.load() is sys.modules['lazy_parent']
+
+    missing = LazyModule('lazy_missing')
+    with pytest.raises(ImportError):
+        missing.load()
+
+
+def test_import_timer(modules):
+    with ImportTimer() as timer:
+        import lazy_parent  # pylint:disable=import-error,unused-import
+    assert timer not in sys.meta_path
+
+    assert set(timer.timings) == {'lazy_parent', 'lazy_child'}
+    parent_self, parent_cumulative = timer.timings['lazy_parent']
+    child_self, child_cumulative = timer.timings['lazy_child']
+    assert child_self == child_cumulative
+    assert parent_cumulative == pytest.approx(parent_self + child_cumulative)
+
+    # the original loader is restored
+    assert type(sys.modules['lazy_parent'].__loader__).__name__ == (
+        'SourceFileLoader')
+
+    summary = timer.summary()
+    assert {name for name, dummy, dummy in summary} == {'lazy_parent',
+                                                        'lazy_child'}
+
+
+def _run_startup(tmp_path):
+    """start the bot in a new interpreter
+
+    Args:
+        tmp_path (pathlib.Path): the working directory of the bot
+
+    Returns:
+        dict: the timings in seconds and the loaded heavy modules
+    """
+    (tmp_path / 'config.json').write_text('{}')
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        filter(None, (os.path.dirname(os.path.dirname(hangupsbot.__file__)),
+                      env.get('PYTHONPATH'))))
+    output = subprocess.check_output((sys.executable, '-c', STARTUP_SCRIPT),
+                                     cwd=str(tmp_path), env=env)
+    return json.loads(output.decode())
+
+
+def test_lazy_startup(tmp_path):
+    result = _run_startup(tmp_path)
+    assert result['loaded'] == []
+
+
+@pytest.mark.benchmark
+def test_benchmark_startup(tmp_path):
+    result = _run_startup(tmp_path)
+    assert result['total'] < MAX_STARTUP_TIME
+    logger.info('startup: import of the core %.3fs, HangupsBot ready after '
+                '%.3fs', result['import'], result['total'])
@@ -0,0 +1,147 @@
+"""test the keyword matcher and benchmark it against a regex per subscriber"""
+
+import logging
+import random
+import re
+import string
+import time
+
+import pytest
+
+from hangupsbot.utils import keywords
+from hangupsbot.utils.keywords import KeywordMatcher
+
+
+logger = logging.getLogger('tests')
+
+BENCHMARK_SUBSCRIBERS = 10000
+BENCHMARK_KEYWORDS = 50000
+BENCHMARK_MESSAGES = 100
+
+
+def _regex_matches(subscriptions, text):
+    """the previous implementation: one alternation regex per subscriber"""
+    matches = {}
+    for subscriber, regex in subscriptions.items():
+        found = set(regex.findall(text))
+        if found:
+            matches[subscriber] = found
+    return matches
+
+
+def test_substring_and_overlap():
+    matcher = KeywordMatcher()
+    matcher.add('he', 'a')
+    matcher.add('she', 'b')
+    matcher.add('hers', 'b')
+    matcher.add('his', 'c')
+    matcher.rebuild()
+
+    assert matcher.match('ushers') == {'a': {'he'}, 'b': {'she', 'hers'}}
+    assert matcher.match('nothing') == {}
+
+
+def test_boundary():
+    matcher = KeywordMatcher()
+    matcher.add('cat', 'a', boundary=True)
+    matcher.add('#tag', 'b', boundary=True)
+    matcher.add('cat', 'c')
+    matcher.rebuild()
+
+    assert matcher.match('concatenate') == {'c': {'cat'}}
+    assert matcher.match('the cat.') == {'a': {'cat'}, 'c': {'cat'}}
+    # same as `\b#tag\b`: a word char is required in front of the `#`
+    assert matcher.match('a #tag') == {}
+    assert matcher.match('a#tag') == {'b': {'#tag'}}
+
+
+def test_incremental_updates():
+    matcher = KeywordMatcher()
+    matcher.add('alpha', 'a')
+    matcher.rebuild()
+
+    # pending keywords are matched before the next rebuild
+    matcher.add('beta', 'b')
+    assert matcher.match('alpha beta') == {'a': {'alpha'}, 'b': {'beta'}}
+
+    matcher.remove('alpha', 'a')
+    assert matcher.match('alpha beta') == {'b': {'beta'}}
+    assert 'a' not in matcher
+
+    matcher.add('alpha', 'c')
+    matcher.add('gamma', 'c')
+    matcher.remove_subscriber('b')
+    assert matcher.match('alpha beta gamma') == {'c': {'alpha', 'gamma'}}
+    assert matcher.get_keywords('c') == {('alpha', False), ('gamma', False)}
+
+    for index in range(keywords.PENDING_LIMIT + 1):
+        matcher.add('word%s' % index, 'd')
+    assert matcher.match('word3') == {'d': {'word3'}}
+    assert not matcher._pending
+
+
+def test_same_as_regex():
+    rnd = random.Random(1)
+    subscriptions = {}
+    matcher = KeywordMatcher()
+    for subscriber in range(50):
+        entries = []
+        for dummy in range(5):
+            keyword = ''.join(rnd.choice('abc ') for dummy in range(3))
+            boundary = rnd.random() < .3 and keyword.strip() == keyword
+            matcher.add(keyword, subscriber, boundary)
+            escaped = re.escape(keyword)
+            entries.append(r'\b%s\b' % escaped if boundary else escaped)
+        subscriptions[subscriber] = re.compile('|'.join(entries))
+
+    for dummy in range(200):
+        text = ''.join(rnd.choice('abc .') for dummy in range(40))
+        expected = _regex_matches(subscriptions, text)
+        actual = matcher.match(text)
+        # the regex reports one match per position, the matcher all of them
+        assert set(expected) <= set(actual)
+        for subscriber, found in expected.items():
+            assert found <= actual[subscriber]
+        for subscriber in actual:
+            assert subscriptions[subscriber].search(text)
+
+
+@pytest.mark.benchmark
+def test_benchmark():
+    rnd = random.Random(2)
+    vocabulary = [''.join(rnd.choice(string.ascii_lowercase)
+                          for dummy in range(rnd.randint(4, 10)))
+                  for dummy in range(BENCHMARK_KEYWORDS)]
+    messages = [' '.join(rnd.choice(vocabulary) for dummy in range(20))
+                for dummy in range(BENCHMARK_MESSAGES)]
+
+    subscriptions = {}
+    matcher = KeywordMatcher()
+    start = time.time()
+    for index, keyword in enumerate(vocabulary):
+        subscriber = index % BENCHMARK_SUBSCRIBERS
+        matcher.add(keyword, subscriber, boundary=bool(index % 2))
+        subscriptions.setdefault(subscriber, []).append(keyword)
+    matcher.rebuild()
+    build = time.time() - start
+
+    compiled = {subscriber: re.compile('|'.join(entries))
+                for subscriber, entries in subscriptions.items()}
+
+    start = time.time()
+    for text in messages:
+        _regex_matches(compiled, text)
+    regex_duration = time.time() - start
+
+    start = time.time()
+    results = [matcher.match(text) for text in messages]
+    matcher_duration = time.time() - start
+
+    logger.info('%d keywords of %d subscribers: build %.2fs, regex per '
+                'subscriber %.1f messages/s, automaton %.1f messages/s',
+                BENCHMARK_KEYWORDS, BENCHMARK_SUBSCRIBERS, build,
+                BENCHMARK_MESSAGES / regex_duration,
+                BENCHMARK_MESSAGES / matcher_duration)
+
+    # every message is built from subscribed keywords
+    assert all(results)
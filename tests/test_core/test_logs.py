@@ -0,0 +1,193 @@
+"""test the queue based logging and benchmark the logging thread"""
+
+import json
+import logging
+import queue
+import sys
+import time
+
+import pytest
+
+from hangupsbot import logs
+from hangupsbot.logs import (
+    BlockingQueueListener,
+    BoundedQueueHandler,
+    JsonFormatter,
+)
+
+
+logger = logging.getLogger('tests')
+
+BENCHMARK_RECORDS = 2000
+WRITE_LATENCY = 0.0002  # seconds per record
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+class SlowFileHandler(logging.FileHandler):
+    """simulate a busy disk or a network file system"""
+
+    def flush(self):
+        super().flush()
+        time.sleep(WRITE_LATENCY)
+
+
+def _make_logger(name, handler):
+    """get a logger that does not pass records to the root logger"""
+    logger_ = logging.getLogger(name)
+    logger_.propagate = False
+    logger_.setLevel(logging.DEBUG)
+    logger_.handlers = [handler]
+    return logger_
+
+
+def test_drop_accounting():
+    queue_ = queue.Queue(3)
+    handler = BoundedQueueHandler(queue_)
+    logger_ = _make_logger('tests.logs.drop', handler)
+
+    for index in range(5):
+        logger_.info('record %s', index)
+    assert (handler.queued, handler.dropped) == (3, 2)
+
+    # the drops are reported with the first record that fits into the queue
+    queue_.get_nowait()
+    queue_.get_nowait()
+    logger_.info('after drop')
+    messages = [queue_.get_nowait().msg for dummy in range(queue_.qsize())]
+    assert messages == ['record 2', 'logging queue was full, dropped 2 records',
+                        'after drop']
+    assert handler.dropped == 2
+
+
+def test_listener():
+    target = ListHandler()
+    target.setLevel(logging.INFO)
+    queue_ = queue.Queue()
+    listener = BlockingQueueListener(queue_, target,
+                                     respect_handler_level=True)
+    logger_ = _make_logger('tests.logs.listener', BoundedQueueHandler(queue_))
+    listener.start()
+
+    logger_.debug('filtered by the handler level')
+    logger_.info('%s %s', 'merged', {'args': 1})
+    try:
+        raise RuntimeError('failed')
+    except RuntimeError:
+        logger_.exception('with traceback')
+    listener.stop()
+
+    assert [record.getMessage() for record in target.records] == [
+        "merged {'args': 1}", 'with traceback']
+    record = target.records[1]
+    assert record.exc_info is None
+    assert 'RuntimeError: failed' in record.exc_text
+
+
+def test_shared_record():
+    queue_ = queue.Queue()
+    other = ListHandler()
+    logger_ = _make_logger('tests.logs.shared', BoundedQueueHandler(queue_))
+    logger_.addHandler(other)
+
+    try:
+        raise RuntimeError('failed')
+    except RuntimeError:
+        logger_.exception('%s traceback', 'with')
+
+    # handlers after the queue handler receive the original record
+    record = other.records[0]
+    assert (record.msg, record.args) == ('%s traceback', ('with',))
+    assert record.exc_info[0] is RuntimeError
+    queued = queue_.get_nowait()
+    assert queued is not record
+    assert (queued.msg, queued.args, queued.exc_info) == (
+        'with traceback', None, None)
+
+
+def test_json_formatter():
+    formatter = JsonFormatter()
+    try:
+        raise ValueError('broken')
+    except ValueError:
+        record = logging.LogRecord('tests.logs', logging.ERROR, __file__, 1,
+                                   'value %s', ('x',), sys.exc_info())
+
+    entry = json.loads(formatter.format(record))
+    assert entry['level'] == 'ERROR'
+    assert entry['logger'] == 'tests.logs'
+    assert entry['message'] == 'value x'
+    assert 'ValueError: broken' in entry['exception']
+    assert '\n' not in formatter.format(record)
+
+
+def test_setup_queue(monkeypatch):
+    target = ListHandler()
+    target.setLevel(logging.INFO)
+    root = logging.getLogger()
+    monkeypatch.setattr(root, 'handlers', [target])
+    monkeypatch.setattr(logs, '_STATE', {'handler': None, 'listener': None})
+
+    handler = logs.setup_queue(10)
+    assert root.handlers == [handler]
+    root.warning('via the queue')
+    logs.stop_queue()
+
+    assert [record.getMessage() for record in target.records] == [
+        'via the queue']
+    stats = logs.get_stats()
+    assert (stats['dropped'], stats['pending']) == (0, 0)
+    assert stats['queued'] >= 1
+
+    # no handlers to move
+    monkeypatch.setattr(root, 'handlers', [])
+    assert logs.setup_queue() is None
+
+
+@pytest.mark.benchmark
+def test_benchmark(tmp_path):
+    formatter = logging.Formatter(
+        '%(asctime)s %(levelname)s %(name)s: %(message)s')
+
+    def _log_all(name, target, use_queue):
+        target.setFormatter(formatter)
+        handler, listener = target, None
+        if use_queue:
+            queue_ = queue.Queue(logs.DEFAULT_QUEUE_SIZE)
+            handler = BoundedQueueHandler(queue_)
+            listener = BlockingQueueListener(queue_, target)
+            listener.start()
+        logger_ = _make_logger(name, handler)
+
+        start = time.time()
+        for index in range(BENCHMARK_RECORDS):
+            logger_.info('record %s with some %s', index, 'arguments')
+        duration = time.time() - start
+
+        if listener is not None:
+            listener.stop()
+            assert handler.dropped == 0
+        target.close()
+        return duration
+
+    results = []
+    for handler_class in (logging.FileHandler, SlowFileHandler):
+        for use_queue in (False, True):
+            path = tmp_path / ('%s_%s.log' % (handler_class.__name__,
+                                              use_queue))
+            results.append(BENCHMARK_RECORDS / _log_all(
+                'tests.logs.%s' % path.stem, handler_class(str(path)),
+                use_queue))
+            with open(str(path)) as file:
+                assert sum(1 for dummy in file) == BENCHMARK_RECORDS
+
+    logger.info('%d records, caller thread: local file %.1f records/s, '
+                'queued %.1f records/s; slow disk %.1f records/s, '
+                'queued %.1f records/s', BENCHMARK_RECORDS, *results)
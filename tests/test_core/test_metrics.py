@@ -0,0 +1,206 @@
+"""test the metrics registry and benchmark the collection on the hot path"""
+
+import logging
+import time
+
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from hangupsbot import (
+    logs,
+    metrics,
+)
+from hangupsbot.sinks import metrics as metrics_sink
+from hangupsbot.utils.cache import Cache
+
+
+logger = logging.getLogger('tests')
+
+BENCHMARK_CALLS = 100000
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """collect into a new registry"""
+    monkeypatch.setattr(metrics, '_REGISTRY', {})
+    monkeypatch.setattr(metrics._Child, 'enabled', True)
+    return metrics._REGISTRY
+
+
+def test_render(registry):
+    requests = metrics.counter('tests_requests', 'requests per path',
+                               ('path',))
+    requests.labels('/').inc()
+    requests.labels('/').inc(2)
+    requests.labels('a"b\\c\nd').inc()
+    metrics.gauge('tests_queue', 'pending items').labels().set(3.5)
+
+    assert metrics.render().splitlines() == [
+        '# HELP tests_queue pending items',
+        '# TYPE tests_queue gauge',
+        'tests_queue 3.5',
+        '# HELP tests_requests_total requests per path',
+        '# TYPE tests_requests_total counter',
+        'tests_requests_total{path="/"} 3',
+        r'tests_requests_total{path="a\"b\\c\nd"} 1',
+    ]
+
+
+def test_histogram(registry):
+    duration = metrics.histogram('tests_seconds', 'durations',
+                                 buckets=(1, .5)).labels()
+    for value in (.25, .5, .75, 20):
+        duration.observe(value)
+
+    # the upper bounds are inclusive
+    assert metrics.render().splitlines()[2:] == [
+        'tests_seconds_bucket{le="0.5"} 2',
+        'tests_seconds_bucket{le="1.0"} 3',
+        'tests_seconds_bucket{le="+Inf"} 4',
+        'tests_seconds_sum 21.5',
+        'tests_seconds_count 4',
+    ]
+
+
+def test_toggle(registry):
+    counter = metrics.counter('tests_toggle', 'toggled').labels()
+    metrics.set_enabled(False)
+    counter.inc()
+    assert not metrics.is_enabled()
+    metrics.set_enabled(True)
+    counter.inc()
+    assert counter.value == 1
+
+
+def test_registration(registry):
+    family = metrics.counter('tests_reload', 'reloaded', ('name',))
+    assert metrics.counter('tests_reload', 'reloaded', ('name',)) is family
+    with pytest.raises(ValueError):
+        metrics.gauge('tests_reload', 'reloaded', ('name',))
+    with pytest.raises(ValueError):
+        family.labels('a', 'b')
+
+    # the latest callback is used after a reload
+    metrics.gauge_callback('tests_callback', 'callback', lambda: {'a': 1},
+                           ('name',))
+    metrics.gauge_callback('tests_callback', 'callback',
+                           lambda: {'a': 2, 'b': 3}, ('name',))
+    assert 'tests_callback{name="b"} 3' in metrics.render()
+
+    def _broken():
+        raise RuntimeError()
+
+    # a failing callback does not break the other metrics
+    metrics.gauge_callback('tests_broken', 'broken callback', _broken)
+    assert metrics.render().splitlines()[:3] == [
+        '# HELP tests_broken broken callback',
+        '# TYPE tests_broken gauge',
+        '# HELP tests_callback callback',
+    ]
+
+
+def test_cache_metrics(monkeypatch):
+    monkeypatch.setattr(metrics._Child, 'enabled', True)
+    cache = Cache(60, name='tests metrics')
+    cache.add('a', 1)
+    cache.get('a')
+    cache.get('b')
+    cache.add('c', 1, destroy_timeout=time.time() - 1)
+    cache.get('c')
+
+    output = metrics.render()
+    assert 'hangupsbot_cache_entries{cache="tests metrics"} 1' in output
+    for result in ('hit', 'miss', 'outdated'):
+        assert ('hangupsbot_cache_requests_total{cache="tests metrics",'
+                'result="%s"} 1' % result) in output
+
+
+@pytest.mark.asyncio
+async def test_pluggable_metrics(bot, monkeypatch):
+    monkeypatch.setattr(metrics._Child, 'enabled', True)
+    counter = bot._handlers._metrics.get('typing', (None,))[0]
+    before = counter.value if counter is not None else 0
+
+    await bot._handlers.run_pluggable_omnibus('typing', bot, None, 'typing')
+
+    counter, histogram = bot._handlers._metrics['typing']
+    assert counter.value == before + 1
+    assert histogram.count >= 1
+
+
+@pytest.mark.asyncio
+async def test_scrape(bot, registry):
+    metrics.counter('tests_scraped', 'scraped').labels().inc()
+
+    app = web.Application()
+    metrics_sink.MetricsRequestHandler(bot).addroutes(app.router)
+    server = TestServer(app)
+    await server.start_server()
+    try:
+        async with aiohttp.ClientSession() as session:
+            async with session.get(server.make_url('/metrics')) as resp:
+                assert resp.status == 200
+                assert resp.headers['Content-Type'] == metrics_sink.CONTENT_TYPE
+                body = await resp.text()
+    finally:
+        await server.close()
+
+    assert 'tests_scraped_total 1' in body
+
+
+def test_log_stats(bot, registry, monkeypatch):
+    monkeypatch.setattr(logs, 'get_stats', lambda: {
+        'queued': 5, 'dropped': 1, 'pending': 2})
+    metrics_sink._register_stats(bot)
+
+    output = metrics.render().splitlines()
+    assert output[output.index(
+        '# TYPE hangupsbot_log_records_total counter') + 1:][:2] == [
+            'hangupsbot_log_records_total{state="queued"} 5',
+            'hangupsbot_log_records_total{state="dropped"} 1',
+        ]
+    assert output[output.index(
+        '# TYPE hangupsbot_log_records_pending gauge') + 1] == (
+            'hangupsbot_log_records_pending 2')
+
+    # the logging queue is not active
+    monkeypatch.setattr(logs, 'get_stats', dict)
+    assert 'hangupsbot_log_records_total{' not in metrics.render()
+
+
+def test_disabled_sink(bot, monkeypatch):
+    monkeypatch.setattr(metrics._Child, 'enabled', True)
+    metrics_sink.start(bot)
+    assert not metrics.is_enabled()
+    assert metrics_sink._STATE['monitor'] is None
+
+
+@pytest.mark.benchmark
+def test_benchmark(registry):
+    counter = metrics.counter('tests_benchmark', 'calls',
+                              ('name',)).labels('bound')
+    histogram = metrics.histogram('tests_benchmark_seconds',
+                                  'durations').labels()
+
+    def _run(enabled):
+        metrics.set_enabled(enabled)
+        start = time.time()
+        for dummy in range(BENCHMARK_CALLS):
+            counter.inc()
+            histogram.observe(.003)
+        return (time.time() - start) / BENCHMARK_CALLS
+
+    disabled = _run(False)
+    enabled = _run(True)
+    assert counter.value == BENCHMARK_CALLS
+
+    start = time.time()
+    for dummy in range(BENCHMARK_CALLS):
+        pass
+    baseline = (time.time() - start) / BENCHMARK_CALLS
+
+    logger.info('counter and histogram per call: disabled %.3fus, enabled '
+                '%.3fus, empty loop %.3fus', disabled * 1e6, enabled * 1e6,
+                baseline * 1e6)
@@ -0,0 +1,139 @@
+"""test the handler profiler and benchmark its overhead"""
+
+import asyncio
+import logging
+import time
+
+import pytest
+
+from hangupsbot import plugins
+from hangupsbot.commands import command
+from hangupsbot.utils import profiler
+from hangupsbot.utils.profiler import Profiler
+
+from tests import run_cmd
+
+
+# run all tests in an event loop
+pytestmark = pytest.mark.asyncio
+
+logger = logging.getLogger('tests')
+
+BENCHMARK_EVENTS = 2000
+MODULE_PATH = 'tests.profiler'
+
+
+class FakeEvent:
+    def __init__(self, event_id):
+        self.event_id = event_id
+
+
+@pytest.fixture
+def handlers(bot, monkeypatch):
+    """register handlers for the typing pluggable in a new list"""
+    monkeypatch.setitem(bot._handlers.pluggables, 'typing', [])
+    monkeypatch.setattr(profiler.PROFILER, 'enabled', True)
+    monkeypatch.setattr(profiler.PROFILER, 'slow_threshold', .05)
+    profiler.PROFILER.reset()
+
+    async def _register(*functions):
+        await plugins.tracking.start({'module.path': MODULE_PATH})
+        for function in functions:
+            bot._handlers.register_handler(function, 'typing')
+        plugins.tracking.end()
+
+    yield _register
+    profiler.PROFILER.reset()
+
+
+async def test_record(caplog):
+    profiler_ = Profiler(slow_threshold=.5)
+    for duration in (.1, .2, .3):
+        profiler_.record('message', 'plugins.fast', 'on_message', duration)
+    profiler_.record('message', 'plugins.slow', 'on_message', 1,
+                     args=(None, FakeEvent('EVENT_ID')))
+    profiler_.record('command', 'plugins.slow', 'slow', .4)
+
+    assert [key for key, dummy in profiler_.slowest(2)] == [
+        ('message', 'plugins.slow', 'on_message'),
+        ('command', 'plugins.slow', 'slow')]
+    summary = profiler_.by_plugin()['plugins.slow']
+    assert (summary['count'], summary['max']) == (2, 1)
+    assert profiler_.by_plugin()['plugins.fast']['p50'] == .2
+
+    assert ['took 1.00s for event EVENT_ID' in record.getMessage()
+            for record in caplog.records
+            if record.name == profiler.__name__] == [True]
+
+    profiler_.reset()
+    assert profiler_.slowest() == [] and profiler_.by_plugin() == {}
+
+
+async def test_handler_timing(bot, handlers):
+    async def slow_handler(bot_, event):
+        await asyncio.sleep(.1)
+
+    def fast_handler(bot_, event):
+        pass
+
+    await handlers(slow_handler, fast_handler)
+    await bot._handlers.run_pluggable_omnibus('typing', bot,
+                                              FakeEvent('TYPING'))
+
+    timings = dict(profiler.PROFILER.slowest())
+    slow = timings[('typing', MODULE_PATH, 'slow_handler')]
+    fast = timings[('typing', MODULE_PATH, 'fast_handler')]
+    assert slow['count'] == fast['count'] == 1
+    assert slow['max'] >= .1 > fast['max']
+
+
+async def test_load_plugin(bot):
+    await plugins.load(bot, 'commands.plugincontrol')
+
+
+async def test_command_timing(bot, event, monkeypatch):
+    profiler_ = Profiler()
+    profiler_.enabled = True
+    monkeypatch.setattr(command, 'profiler', profiler_)
+
+    await run_cmd(bot, event.with_text('/bot pluginstartup'))
+
+    ((key, summary),) = profiler_.slowest()
+    # the same module path as in the plugin tracking
+    assert key == ('command', 'commands.plugincontrol', 'pluginstartup')
+    assert key[1] in plugins.tracking.list
+    assert summary['count'] == 1
+
+
+async def test_capture():
+    profiler_ = Profiler()
+    assert profiler_.start_capture(.05)
+    assert profiler_.capturing
+    assert not profiler_.start_capture(.05)
+
+    await asyncio.sleep(.1)
+    assert not profiler_.capturing
+    assert 'function calls' in profiler_.capture_report
+    assert profiler_.stop_capture() is None
+
+
+@pytest.mark.benchmark
+async def test_benchmark(bot, handlers, monkeypatch):
+    def handler(bot_, event):
+        pass
+
+    await handlers(*[handler] * 5)
+    event = FakeEvent('BENCHMARK')
+
+    async def _run(enabled):
+        monkeypatch.setattr(profiler.PROFILER, 'enabled', enabled)
+        start = time.time()
+        for dummy in range(BENCHMARK_EVENTS):
+            await bot._handlers.run_pluggable_omnibus('typing', bot, event)
+        return (time.time() - start) / BENCHMARK_EVENTS
+
+    disabled = await _run(False)
+    enabled = await _run(True)
+
+    logger.info('5 handlers per event: profiler off %.1fus, on %.1fus per '
+                'event', disabled * 1e6, enabled * 1e6)
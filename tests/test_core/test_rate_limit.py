@@ -0,0 +1,110 @@
+"""test the token bucket rate limiter with a fake clock"""
+
+import pytest
+
+from hangupsbot.utils import rate_limit
+from hangupsbot.utils.rate_limit import RateLimiter
+
+
+# run all tests in an event loop
+pytestmark = pytest.mark.asyncio
+
+
+class FakeClock:
+    """a clock that only advances on sleep calls"""
+
+    def __init__(self):
+        self.now = 1000.
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, delay):
+        self.now += delay
+
+
+def _get_limiter(clock, **kwargs):
+    return RateLimiter(clock=clock, sleep=clock.sleep, name='test', **kwargs)
+
+
+async def test_throughput():
+    clock = FakeClock()
+    limiter = _get_limiter(clock, rate=5, capacity=10)
+
+    start = clock.now
+    for dummy in range(110):
+        await limiter.acquire('global')
+
+    # the burst is free, the remaining 100 requests run at 5/s
+    assert clock.now - start == pytest.approx(20)
+
+    stats = limiter.stats()['global']
+    assert stats['acquired'] == 110
+    assert stats['waited'] > 0
+
+
+async def test_per_key_limits():
+    clock = FakeClock()
+    limiter = _get_limiter(clock, rate=100, capacity=1,
+                           limits={'chat': (1, 1)})
+
+    for dummy in range(11):
+        await limiter.acquire('global', ('chat', 'A'))
+
+    # the chat limit is the bottleneck
+    assert clock.now - 1000 == pytest.approx(10)
+
+    # another chat starts with a full bucket
+    assert await limiter.acquire('global', ('chat', 'B')) == 0
+
+
+async def test_back_off():
+    clock = FakeClock()
+    limiter = _get_limiter(clock, rate=10, capacity=10)
+
+    # server provided delay
+    assert limiter.back_off('method', 30) == 30
+    assert limiter.stats()['method']['blocked_for'] == 30
+    assert await limiter.acquire('method') == pytest.approx(30)
+
+    # adaptive delay
+    assert limiter.back_off('other') == 1
+    assert limiter.back_off('other') == 2
+    assert limiter.back_off('other') == 4
+    limiter.succeeded('other')
+    assert limiter.back_off('other') == 1
+
+
+async def test_no_refill_while_blocked():
+    clock = FakeClock()
+    limiter = _get_limiter(clock, rate=1, capacity=10)
+
+    limiter.back_off('method', 30)
+    await clock.sleep(30)
+
+    # one request at the end of the block, then the rate applies again
+    assert limiter.reserve('method') == 0
+    assert limiter.reserve('method') == pytest.approx(1)
+
+
+async def test_reset():
+    clock = FakeClock()
+    limiter = _get_limiter(clock, rate=1, capacity=1)
+
+    limiter.back_off('method')
+    limiter.reset('method')
+    assert limiter.stats()['method']['blocked_for'] == 0
+    assert limiter.stats()['method']['failures'] == 0
+
+
+async def test_evict_idle_buckets():
+    clock = FakeClock()
+    limiter = _get_limiter(clock, rate=1, capacity=1)
+
+    await limiter.acquire(('chat', 'A'))
+    limiter.back_off(('chat', 'B'))
+    await clock.sleep(rate_limit.EVICT_INTERVAL)
+
+    # the next new bucket triggers the eviction
+    await limiter.acquire(('chat', 'C'))
+    assert set(limiter.stats()) == {('chat', 'B'), ('chat', 'C')}
@@ -0,0 +1,152 @@
+"""test the scheduler for delayed and persistent jobs"""
+
+import asyncio
+import time
+
+import pytest
+
+from hangupsbot import (
+    plugins,
+    scheduler as scheduler_module,
+)
+from hangupsbot.scheduler import (
+    MEMORY_PATH,
+    Scheduler,
+)
+
+
+# run all tests in an event loop
+pytestmark = pytest.mark.asyncio
+
+MODULE_PATH = 'tests.test_core.test_scheduler'
+
+
+@pytest.fixture
+def scheduler(bot):
+    instance = Scheduler()
+    yield instance
+    asyncio.get_event_loop().run_until_complete(instance.close())
+    if bot.memory.exists(MEMORY_PATH):
+        bot.memory.pop_by_path(MEMORY_PATH)
+
+
+async def _register(scheduler, name, handler):
+    """register a handler for the plugin of this module"""
+    await plugins.tracking.start({'module': 'test_scheduler',
+                                  'module.path': MODULE_PATH})
+    scheduler.register_handler(name, handler)
+    plugins.tracking.end()
+
+
+async def test_order(scheduler):
+    done = []
+
+    async def _handler(bot, payload):
+        done.append(payload)
+
+    await _register(scheduler, 'test.order', _handler)
+    for delay in (.03, .01, .02):
+        scheduler.schedule('test.order', delay, delay, persistent=False)
+    scheduler.schedule('test.order', payload='past', due=time.time() - 10,
+                       persistent=False)
+
+    await asyncio.sleep(.06)
+    assert done == ['past', .01, .02, .03]
+    assert scheduler.stats() == {'pending': 0, 'parked': 0, 'running': 0}
+
+
+async def test_cancel_and_replace(scheduler):
+    done = []
+
+    async def _handler(bot, payload):
+        done.append(payload)
+
+    await _register(scheduler, 'test.cancel', _handler)
+    job_id = scheduler.schedule('test.cancel', .01, 'cancelled')
+    assert scheduler.cancel(job_id)
+    assert not scheduler.cancel(job_id)
+
+    scheduler.schedule('test.cancel', .01, 'first', job_id='custom')
+    scheduler.schedule('test.cancel', .02, 'second', job_id='custom')
+
+    await asyncio.sleep(.04)
+    assert done == ['second']
+
+
+async def test_persistent_after_restart(bot, scheduler):
+    done = []
+
+    async def _handler(bot_, payload):
+        done.append(payload)
+
+    job_id = scheduler.schedule('test.persistent', payload={'key': 'value'})
+    assert bot.memory.get_by_path(MEMORY_PATH + [job_id])['payload'] == {
+        'key': 'value'}
+
+    # the job is parked until a handler is registered
+    await asyncio.sleep(.01)
+    assert scheduler.stats()['parked'] == 1
+    await scheduler.close()
+
+    restarted = Scheduler()
+    restarted.setup()
+    await _register(restarted, 'test.persistent', _handler)
+    await asyncio.sleep(.01)
+
+    assert done == [{'key': 'value'}]
+    assert bot.memory.get_by_path(MEMORY_PATH) == {}
+    await restarted.close()
+
+
+async def test_retry(scheduler, monkeypatch):
+    monkeypatch.setattr(scheduler_module, 'RETRY_DELAY', .01)
+    attempts = []
+
+    async def _handler(bot, payload):
+        attempts.append(payload)
+        if len(attempts) < 3:
+            raise RuntimeError('failed attempt')
+
+    await _register(scheduler, 'test.retry', _handler)
+    job_id = scheduler.schedule('test.retry', payload='retry')
+    await asyncio.sleep(.01)
+    assert scheduler.get_job(job_id)['attempts'] == 1
+
+    await asyncio.sleep(.06)
+    assert attempts == ['retry'] * 3
+    assert scheduler.get_job(job_id) is None
+
+
+async def test_plugin_unload(scheduler):
+    started = asyncio.Event()
+    done = []
+
+    async def _slow_handler(bot, payload):
+        started.set()
+        await asyncio.sleep(1)
+
+    async def _handler(bot, payload):
+        done.append(payload)
+
+    await _register(scheduler, 'test.unload', _slow_handler)
+    job_id = scheduler.schedule('test.unload', payload='unload')
+    await started.wait()
+
+    # the running job gets cancelled and runs again after the next load
+    scheduler.deregister_plugin(MODULE_PATH)
+    await asyncio.sleep(.01)
+    assert scheduler.stats() == {'pending': 1, 'parked': 1, 'running': 0}
+
+    await _register(scheduler, 'test.unload', _handler)
+    await asyncio.sleep(.01)
+    assert done == ['unload']
+    assert scheduler.get_job(job_id) is None
+
+
+async def test_invalid_handler(scheduler):
+    def _handler(bot, payload):
+        pass
+
+    with pytest.raises(ValueError):
+        await _register(scheduler, 'test.invalid', _handler)
+    plugins.tracking.end()
@@ -0,0 +1,131 @@
+"""test the ordered processing of items per key"""
+
+import asyncio
+
+import pytest
+
+from hangupsbot.utils.workers import (
+    LatencyStats,
+    OrderedWorkers,
+)
+
+
+# run all tests in an event loop
+pytestmark = pytest.mark.asyncio
+
+
+async def test_order_per_key():
+    processed = []
+
+    async def _handler(item):
+        key, index = item
+        # later items of other keys finish earlier
+        await asyncio.sleep(.01 * (3 - index))
+        processed.append(item)
+
+    workers = OrderedWorkers(_handler, limit=10, name='test')
+    futures = [workers.submit(key, (key, index))
+               for index in range(3)
+               for key in ('a', 'b')]
+    assert all(await asyncio.gather(*futures))
+
+    for key in ('a', 'b'):
+        assert [item for item in processed if item[0] == key] == [
+            (key, 0), (key, 1), (key, 2)]
+    assert workers.stats()['active'] == 0
+    assert workers.stats()['queued'] == 0
+    assert workers.latency.count == 6
+
+
+async def test_concurrency_limit():
+    running = 0
+    peak = 0
+
+    async def _handler(dummy):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(.01)
+        running -= 1
+
+    workers = OrderedWorkers(_handler, limit=3, name='test')
+    futures = [workers.submit(key, key) for key in range(10)]
+    await asyncio.gather(*futures)
+
+    assert peak == 3
+
+
+async def test_slow_key_does_not_block_others():
+    release = asyncio.Event()
+    processed = []
+
+    async def _handler(item):
+        if item == 'slow':
+            await release.wait()
+        processed.append(item)
+
+    workers = OrderedWorkers(_handler, limit=2, name='test')
+    slow = workers.submit('a', 'slow')
+    blocked = workers.submit('a', 'after slow')
+    fast = workers.submit('b', 'fast')
+
+    await asyncio.wait_for(fast, 1)
+    assert processed == ['fast']
+    assert not blocked.done()
+
+    release.set()
+    await asyncio.gather(slow, blocked)
+    assert processed == ['fast', 'slow', 'after slow']
+
+
+async def test_failure_and_close():
+    async def _handler(item):
+        if item == 'fail':
+            raise ValueError(item)
+        await asyncio.sleep(10)
+
+    workers = OrderedWorkers(_handler, limit=1, name='test')
+    failed = workers.submit('a', 'fail')
+    hanging = workers.submit('a', 'hang')
+    queued = workers.submit('b', 'queued')
+
+    assert await failed is False
+    await asyncio.sleep(0)
+    await workers.close()
+
+    assert hanging.cancelled()
+    assert queued.cancelled()
+    assert workers.stats()['active'] == 0
+
+
+async def test_bounded_backlog():
+    release = asyncio.Event()
+
+    async def _handler(dummy):
+        await release.wait()
+
+    workers = OrderedWorkers(_handler, limit=1, name='test', max_queued=2)
+    futures = [await workers.put('a', 'first'), await workers.put('b', 'two')]
+
+    blocked = asyncio.ensure_future(workers.put('a', 'third'))
+    await asyncio.sleep(.01)
+    assert not blocked.done()
+
+    release.set()
+    futures.append(await asyncio.wait_for(blocked, 1))
+    assert all(await asyncio.gather(*futures))
+    assert workers.stats()['queued'] == 0
+
+
+def test_latency_stats():
+    stats = LatencyStats(window=10)
+    for value in range(20):
+        stats.add(value)
+
+    summary = stats.summary()
+    assert summary['count'] == 20
+    assert summary['max'] == 19
+    assert summary['mean'] == 9.5
+    # only the last ten values are in the window
+    assert summary['p50'] == 15
+    assert summary['p95'] == 19
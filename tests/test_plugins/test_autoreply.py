@@ -0,0 +1,79 @@
+"""test the compiled autoreply rules"""
+
+import re
+
+import pytest
+
+from hangupsbot.plugins import autoreply
+from hangupsbot.plugins.autoreply import RuleSet
+from tests.constants import CONV_ID_1
+
+
+# run all tests in an event loop
+pytestmark = pytest.mark.asyncio
+
+RULES = [
+    [['hi', 'hello'], 'greeting'],
+    [['hi there'], 'long greeting'],
+    [['regex:b[ae]d'], ['bad', 'bed']],
+    [['regex:(ab)\\1'], 'backreference'],
+    ['JOIN', 'welcome'],
+    [['*'], 'wildcard'],
+]
+
+
+async def test_rules():
+    rules = RuleSet(RULES)
+
+    assert rules.match('Hi there', 'MESSAGE') == [
+        'greeting', 'long greeting', 'wildcard']
+    assert rules.match('this', 'MESSAGE') == ['wildcard']
+    assert rules.match('a bed', 'MESSAGE') == [['bad', 'bed'], 'wildcard']
+    assert rules.match('abab', 'MESSAGE') == ['backreference', 'wildcard']
+    assert rules.match('', 'JOIN') == ['welcome', 'wildcard']
+
+
+async def test_same_as_single_triggers():
+    rules = RuleSet(RULES[:4])
+    for text in ('hi', 'hit', 'oh hi there!', 'bad bed', 'ab ab', 'xababx',
+                 'hello abab'):
+        expected = [
+            replies for triggers, replies in RULES[:4]
+            if any(re.search(autoreply._get_expression(trigger), text,
+                             re.IGNORECASE)
+                   for trigger in triggers)]
+        assert rules.match(text, 'MESSAGE') == expected
+
+
+async def test_invalid_trigger():
+    rules = RuleSet([[['regex:('], 'broken'], [['ok'], 'fine']])
+    assert rules.match('ok', 'MESSAGE') == ['fine']
+
+
+async def test_merge():
+    rules_local = [[['hi'], 'local']]
+    rules_global = [[['hi', 'hey'], 'global'], [['bye'], 'global bye']]
+    assert autoreply._merge_rules(rules_local, rules_global) == [
+        [['hi'], 'local'], [['bye'], 'global bye']]
+    # the config entries are not modified
+    assert rules_local == [[['hi'], 'local']]
+    assert autoreply._merge_rules(rules_global, rules_global) == rules_global
+
+
+async def test_cache(bot):
+    bot.config.set_by_path(['autoreplies'], [[['hi'], 'one']])
+    rules = autoreply._get_rules(bot, CONV_ID_1)
+    assert autoreply._get_rules(bot, CONV_ID_1) is rules
+
+    bot.config['autoreplies'].append([['hey'], 'two'])
+    rules = autoreply._get_rules(bot, CONV_ID_1)
+    assert rules.match('hey', 'MESSAGE') == ['two']
+
+    # a config reload swaps the content in place
+    bot.config['autoreplies'][:] = [[['hey'], 'three'], [['hi'], 'four']]
+    autoreply._clear_cache()
+    assert autoreply._get_rules(bot, CONV_ID_1).match('hey', 'MESSAGE') == [
+        'three']
+
+    autoreply._clear_cache()
+    del bot.config['autoreplies']
@@ -0,0 +1,77 @@
+"""test the buffered log writer of the chatlogger"""
+
+import asyncio
+import datetime
+import gzip
+import os
+
+import pytest
+
+from hangupsbot.plugins.chatlogger.writer import LogWriter
+
+
+def _read(tmpdir, filename):
+    with open(os.path.join(str(tmpdir), filename)) as file:
+        return file.read()
+
+
+@pytest.mark.asyncio
+async def test_periodic_flush(tmpdir):
+    writer = LogWriter(str(tmpdir), flush_interval=.01)
+    task = asyncio.ensure_future(writer.run())
+    writer.write('conv.txt', 'first\n')
+    writer.write('other.txt', 'other\n')
+    writer.write('conv.txt', 'second\n')
+
+    await asyncio.sleep(.1)
+    assert _read(tmpdir, 'conv.txt') == 'first\nsecond\n'
+
+    # pending text is written on stop
+    writer.write('conv.txt', 'third\n')
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert _read(tmpdir, 'conv.txt') == 'first\nsecond\nthird\n'
+    assert _read(tmpdir, 'other.txt') == 'other\n'
+
+
+def test_open_files_limit(tmpdir):
+    writer = LogWriter(str(tmpdir), max_open=2)
+    for index in range(5):
+        writer.write('%s.txt' % index, 'text')
+        writer._flush(writer._take_pending())
+
+    assert list(writer._handles) == ['3.txt', '4.txt']
+    writer.close()
+    assert _read(tmpdir, '0.txt') == 'text'
+
+
+def test_rotate_size(tmpdir):
+    writer = LogWriter(str(tmpdir), max_size=10, compress=True)
+    for text in ('12345\n', '67890\n', 'abc\n'):
+        writer.write('conv.txt', text)
+        writer._flush(writer._take_pending())
+    writer.close()
+
+    assert _read(tmpdir, 'conv.txt') == '67890\nabc\n'
+    segments = [name for name in os.listdir(str(tmpdir))
+                if name.endswith('.txt.gz')]
+    assert len(segments) == 1
+    with gzip.open(os.path.join(str(tmpdir), segments[0]), 'rt') as file:
+        assert file.read() == '12345\n'
+
+
+def test_rotate_daily(tmpdir):
+    writer = LogWriter(str(tmpdir), daily=True)
+    writer.write('conv.txt', 'yesterday\n')
+    writer._flush(writer._take_pending())
+    file, dummy = writer._handles['conv.txt']
+    writer._handles['conv.txt'] = (
+        file, datetime.date.today() - datetime.timedelta(days=1))
+
+    writer.write('conv.txt', 'today\n')
+    writer._flush(writer._take_pending())
+    writer.close()
+
+    assert _read(tmpdir, 'conv.txt') == 'today\n'
+    assert len(os.listdir(str(tmpdir))) == 2
@@ -0,0 +1,115 @@
+"""test the DND index and benchmark the bulk check"""
+
+import asyncio
+import logging
+import time
+
+import pytest
+
+from hangupsbot import plugins
+from hangupsbot.plugins import dnd
+
+
+# run all tests in an event loop
+pytestmark = pytest.mark.asyncio
+
+logger = logging.getLogger('tests')
+
+BENCHMARK_ENTRIES = 2000
+BENCHMARK_USERS = 500
+
+
+class FakeUserID:
+    def __init__(self, chat_id):
+        self.chat_id = chat_id
+
+
+class FakeUser:
+    def __init__(self, chat_id):
+        self.id_ = FakeUserID(chat_id)
+        self.full_name = chat_id
+
+
+class FakeEvent:
+    def __init__(self, chat_id):
+        self.user = FakeUser(chat_id)
+
+
+@pytest.fixture
+def dnd_plugin(bot, monkeypatch):
+    """register the expiry job and the shared functions of the plugin"""
+    asyncio.get_event_loop().run_until_complete(plugins.tracking.start(
+        {'module': 'dnd', 'module.path': 'plugins.dnd'}))
+    bot.scheduler.register_handler('dnd.expire', dnd._expire_dnd)
+    plugins.tracking.end()
+    monkeypatch.setitem(bot.shared, 'dnd.user_check',
+                        lambda chat_id: dnd._user_has_dnd(bot, chat_id))
+    yield
+    bot.scheduler.deregister_plugin('plugins.dnd')
+    for chat_id in list(dnd._EXPIRIES):
+        bot.scheduler.cancel(dnd._get_job_id(chat_id))
+    dnd._EXPIRIES.clear()
+    bot.memory.pop_by_path(['donotdisturb'])
+
+
+def _old_check(bot, user_id):
+    """the previous implementation, expire all entries before each check"""
+    _dict = {}
+    donotdisturb = bot.memory.get('donotdisturb')
+    for chat_id in donotdisturb:
+        metadata = donotdisturb[chat_id]
+        time_expiry = metadata["created"] + metadata["expiry"]
+        if time.time() < time_expiry:
+            _dict[chat_id] = metadata
+    if len(_dict) < len(donotdisturb):
+        bot.memory.set_by_path(["donotdisturb"], _dict)
+    return user_id in bot.memory.get('donotdisturb')
+
+
+async def test_toggle(bot, dnd_plugin):
+    assert 'toggled ON' in dnd.dnd(bot, FakeEvent('USER_1'), '1')
+    assert dnd._user_has_dnd(bot, 'USER_1')
+    assert bot.scheduler.get_job(dnd._get_job_id('USER_1')) is not None
+
+    assert 'toggled OFF' in dnd.dnd(bot, FakeEvent('USER_1'))
+    assert not dnd._user_has_dnd(bot, 'USER_1')
+    assert bot.scheduler.get_job(dnd._get_job_id('USER_1')) is None
+
+
+async def test_expiry(bot, dnd_plugin):
+    now = time.time()
+    bot.memory['donotdisturb'] = {
+        'EXPIRED': {'created': now - 10, 'expiry': 5},
+        'ACTIVE': {'created': now, 'expiry': 3600},
+    }
+    dnd._load_expiries(bot)
+    assert dnd._users_have_dnd(bot, ['EXPIRED', 'ACTIVE', 'OTHER']) == {
+        'ACTIVE'}
+
+    # the expiry job of the old entry runs right away
+    await asyncio.sleep(.01)
+    assert list(bot.memory['donotdisturb']) == ['ACTIVE']
+    assert list(dnd._EXPIRIES) == ['ACTIVE']
+
+
+@pytest.mark.benchmark
+async def test_benchmark(bot, dnd_plugin):
+    now = time.time()
+    bot.memory['donotdisturb'] = {
+        'USER_%d' % index: {'created': now, 'expiry': 3600}
+        for index in range(0, 2 * BENCHMARK_ENTRIES, 2)}
+    dnd._load_expiries(bot)
+    users = ['USER_%d' % index for index in range(BENCHMARK_USERS)]
+
+    start = time.time()
+    expected = {user for user in users if _old_check(bot, user)}
+    old_duration = time.time() - start
+
+    start = time.time()
+    users_with_dnd = dnd._users_have_dnd(bot, users)
+    bulk_duration = time.time() - start
+
+    assert users_with_dnd == expected
+    logger.info('%d users against %d DND entries: scan per user %.4fs, '
+                'bulk check %.4fs', BENCHMARK_USERS, BENCHMARK_ENTRIES,
+                old_duration, bulk_duration)
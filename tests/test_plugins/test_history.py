@@ -0,0 +1,107 @@
+"""test the message history store and the search query parsing"""
+
+import datetime
+
+import pytest
+
+from hangupsbot.plugins import history
+from hangupsbot.plugins.history import store as history_store
+from hangupsbot.plugins.history.store import (
+    HistoryStore,
+    Message,
+)
+
+
+# run all tests in an event loop
+pytestmark = pytest.mark.asyncio
+
+MESSAGES = (
+    Message('conv1', 'user1', 'One', 100, 'lunch at noon'),
+    Message('conv1', 'user2', 'Two', 200, 'no lunch today'),
+    Message('conv2', 'user1', 'One', 300, 'Lunch "special" menu'),
+    Message('conv2', 'user2', 'Two', 400, 'dinner'),
+)
+
+
+@pytest.fixture
+def store(tmpdir):
+    store = HistoryStore(str(tmpdir.join('history.db')))
+    for message in MESSAGES:
+        store.add(message)
+    yield store
+    store.close()
+
+
+async def test_keywords(store):
+    results = await store.search(keywords=['lunch'])
+    # newest first, pending messages are included
+    assert results == [MESSAGES[2], MESSAGES[1], MESSAGES[0]]
+
+    assert await store.search(keywords=['lunch', 'today']) == [MESSAGES[1]]
+    assert await store.search(keywords=['"special"']) == [MESSAGES[2]]
+    assert await store.search(keywords=['breakfast']) == []
+
+
+async def test_partitions(store):
+    assert await store.search(conv_id='conv2') == [MESSAGES[3], MESSAGES[2]]
+    assert await store.search(chat_id='user1', keywords=['lunch']) == [
+        MESSAGES[2], MESSAGES[0]]
+
+
+async def test_time_range(store):
+    assert await store.search(since=150, until=350) == [
+        MESSAGES[2], MESSAGES[1]]
+    assert await store.search(limit=1) == [MESSAGES[3]]
+
+
+async def test_like_wildcards(tmpdir, monkeypatch):
+    monkeypatch.setattr(history_store, 'FTS_MODULES', ())
+    store = HistoryStore(str(tmpdir.join('history.db')))
+    for text in ('100% sure', '100 percent sure', 'snake_case', 'snakeCase',
+                 'C:\\temp'):
+        store.add(Message('conv1', 'user1', 'One', 100, text))
+
+    async def _search(keyword):
+        return [message.text
+                for message in await store.search(keywords=[keyword])]
+
+    assert await _search('0%') == ['100% sure']
+    assert await _search('e_c') == ['snake_case']
+    assert await _search('C:\\') == ['C:\\temp']
+    assert await _search('sure') == ['100% sure', '100 percent sure']
+    store.close()
+
+
+async def test_reopen(tmpdir):
+    path = str(tmpdir.join('history.db'))
+    store = HistoryStore(path)
+    store.add(MESSAGES[0])
+    store.close()
+
+    store = HistoryStore(path)
+    assert await store.search(keywords=['noon']) == [MESSAGES[0]]
+    store.close()
+
+
+async def test_parse_query(event):
+    query = history._parse_query(
+        event, ('conv:here', 'user:123', 'since:2018-01-31',
+                'until:2018-01-31', 'limit:500', 'lunch', 'time:12'))
+
+    assert query['conv_id'] == event.conv_id
+    assert query['chat_id'] == '123'
+    start = datetime.datetime(2018, 1, 31).timestamp()
+    assert query['since'] == start
+    assert start + 86399 < query['until'] < start + 86400
+    assert query['limit'] == history.MAX_LIMIT
+    assert query['keywords'] == ['lunch', 'time:12']
+
+    with pytest.raises(ValueError):
+        history._parse_query(event, ('since:yesterday',))
+
+
+async def test_off_the_record(bot):
+    bot.conversations['OTR'] = {'history': False}
+    assert not history._history_enabled(bot, 'OTR')
+    assert history._history_enabled(bot, 'UNKNOWN')
+    del bot.conversations['OTR']
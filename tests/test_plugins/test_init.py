@@ -1,5 +1,9 @@
 """test the module `hangupsbot.plugins`"""
 
+import asyncio
+import sys
+import time
+
 import pytest
 
 from hangupsbot import plugins
@@ -15,3 +19,122 @@ async def test_load_protected_module_0(bot):
 async def test_load_protected_module_1(bot):
     with pytest.raises(plugins.Protected):
         await plugins.load(bot, 'commands')
+
+
+PLAN_PLUGINS = {
+    '_plan_slow': '''
+import asyncio
+from hangupsbot import plugins
+
+async def _initialise(bot):
+    await asyncio.sleep(DELAY)
+    plugins.register_shared('plan.value', 42)
+    bot.shared['plan.order'].append('slow')
+''',
+    '_plan_user': '''
+REQUIRED_PLUGINS = ('plugins._plan_slow',)
+REQUIRED_SHARED = ('plan.value',)
+
+def _initialise(bot):
+    bot.shared['plan.order'].append(('user', bot.shared['plan.value']))
+''',
+    '_plan_parallel': '''
+import asyncio
+from hangupsbot import plugins
+
+async def _initialise(bot):
+    await asyncio.sleep(DELAY)
+    plugins.register_user_command(['plan_parallel'])
+    bot.shared['plan.order'].append('parallel')
+
+def plan_parallel(*dummys):
+    pass
+''',
+    '_plan_handler_late': '''
+import asyncio
+from hangupsbot import plugins
+
+def on_typing(bot, event):
+    pass
+
+async def _initialise(bot):
+    await asyncio.sleep(DELAY)
+    plugins.register_handler(on_typing, 'typing')
+''',
+    '_plan_handler_early': '''
+from hangupsbot import plugins
+
+def on_typing(bot, event):
+    pass
+
+def _initialise(bot):
+    plugins.register_handler(on_typing, 'typing')
+''',
+    '_plan_cycle_a': '''
+REQUIRED_PLUGINS = ('plugins._plan_cycle_b',)
+
+def _initialise(bot):
+    bot.shared['plan.order'].append('cycle_a')
+''',
+    '_plan_cycle_b': '''
+REQUIRED_PLUGINS = ('plugins._plan_cycle_a',)
+
+def _initialise(bot):
+    bot.shared['plan.order'].append('cycle_b')
+''',
+}
+PLAN_DELAY = 0.1
+
+
+@pytest.fixture
+def plan_plugins(bot, tmp_path, monkeypatch):
+    """create the test plugins in a new search path of the plugins package"""
+    for name, source in PLAN_PLUGINS.items():
+        (tmp_path / (name + '.py')).write_text(
+            'DELAY = %s\n' % PLAN_DELAY + source)
+    monkeypatch.setattr(plugins, '__path__',
+                        list(plugins.__path__) + [str(tmp_path)])
+    monkeypatch.setitem(bot.shared, 'plan.order', [])
+
+    yield ['plugins.' + name for name in PLAN_PLUGINS]
+
+    loop = asyncio.get_event_loop()
+    for name in PLAN_PLUGINS:
+        module_path = 'plugins.' + name
+        if module_path in plugins.tracking.list:
+            loop.run_until_complete(plugins.unload(bot, module_path))
+        sys.modules.pop('hangupsbot.' + module_path, None)
+
+
+@pytest.mark.asyncio
+async def test_load_plan(bot, plan_plugins):
+    start = time.monotonic()
+    await plugins.LoadPlan(bot, plan_plugins).run()
+    duration = time.monotonic() - start
+
+    # independent plugins load concurrently
+    assert duration < 2 * PLAN_DELAY
+    order = bot.shared['plan.order']
+    assert order.index('slow') < order.index(('user', 42))
+    assert {'parallel', 'cycle_a', 'cycle_b'} <= set(order)
+
+    # the registrations of concurrent plugins stay separated
+    tracked = plugins.tracking.list
+    assert tracked['plugins._plan_parallel']['commands']['user'] == [
+        'plan_parallel']
+    assert tracked['plugins._plan_slow']['commands']['user'] == []
+    assert [identifier for identifier, dummy
+            in tracked['plugins._plan_slow']['shared']] == ['plan.value']
+
+    timings = tracked['plugins._plan_user']['timings']
+    assert set(timings) == {'import', 'wait', 'initialise'}
+    assert timings['wait'] >= PLAN_DELAY / 2
+    assert tracked['plugins._plan_slow']['timings']['initialise'] >= (
+        PLAN_DELAY / 2)
+
+    # handlers with the same priority keep the order of the plan
+    assert [metadata['module.path']
+            for dummy, dummy, metadata, *dummys
+            in bot._handlers.pluggables['typing']
+            if metadata['module.path'].startswith('plugins._plan_')] == [
+                'plugins._plan_handler_late', 'plugins._plan_handler_early']
@@ -0,0 +1,206 @@
+"""test the name index of mentions and benchmark the @all fan-out"""
+
+import asyncio
+import functools
+import logging
+import time
+
+import pytest
+
+from hangupsbot.plugins import (
+    dnd,
+    mentions,
+)
+from hangupsbot.plugins.mentions import NameIndex
+from hangupsbot.utils import remove_accents
+from tests.constants import CONV_ID_1
+
+
+# run all tests in an event loop
+pytestmark = pytest.mark.asyncio
+
+logger = logging.getLogger('tests')
+
+BENCHMARK_USERS = 500
+FAKE_LATENCY = 0.002  # seconds per api call
+
+NAMES = [
+    'Alice Smith',
+    'Bob  Smith',
+    'Chloé Dupont',
+    'Zoë van der Berg',
+    'alice',
+    'Ümit Özdemir',
+    '张 伟',
+    '',
+]
+TERMS = ['alice', 'smith', 'alicesmith', 'alice_smith', 'bob__smith', 'chloe',
+         'chloé', 'dupont', 'zoevander', 'van_der', 'umit', 'özdemir', '张',
+         'x', 'e', 'all', '']
+
+
+class FakeUserID:
+    def __init__(self, chat_id):
+        self.chat_id = chat_id
+
+
+class FakeUser:
+    def __init__(self, chat_id, full_name, is_self=False):
+        self.id_ = FakeUserID(chat_id)
+        self.full_name = full_name
+        self.is_self = is_self
+
+    def get_displayname(self, *dummys, **dummy):
+        return self.full_name
+
+
+class FakeConversation:
+    def __init__(self, conv_id):
+        self.id_ = conv_id
+
+
+class FakeEvent:
+    """the parts of a `SyncEvent` that are used for mentions"""
+
+    def __init__(self, user, user_list, text):
+        self.conv_id = CONV_ID_1
+        self.conv = FakeConversation(CONV_ID_1)
+        self.user = user
+        self.user_id = user.id_
+        self.user_list = user_list
+        self.notified_users = {user.id_.chat_id}
+        self.display_title = 'TITLE'
+        self.text = text
+
+
+def _scan(users, term):
+    """the matching of the previous implementation, a check per user"""
+    matches = []
+    for position, user in enumerate(users):
+        u_full = user.full_name
+        _normalised_full_lower = remove_accents(u_full.upper()).lower()
+        if (term in u_full.replace(" ", "").lower() or
+                term in _normalised_full_lower.replace(" ", "") or
+                term in u_full.replace(" ", "_").lower() or
+                term in _normalised_full_lower.replace(" ", "_")):
+            matches.append(position)
+    return matches
+
+
+def _build_users(count):
+    users = [FakeUser('BOT', 'The Bot', is_self=True)]
+    users.extend(FakeUser('USER_%d' % index, 'First%d Last%d' % (index, index))
+                 for index in range(count))
+    return users
+
+
+@pytest.fixture
+def fake_client(bot, monkeypatch):
+    """delay the 1on1 lookup and the sending of messages"""
+    sent = []
+
+    async def get_1to1(chat_id, context=None):
+        await asyncio.sleep(FAKE_LATENCY)
+        return FakeConversation('1on1 %s' % chat_id)
+
+    async def coro_send_message(conversation, message, context=None):
+        await asyncio.sleep(FAKE_LATENCY)
+        sent.append((conversation.id_, message))
+
+    monkeypatch.setattr(bot, 'get_1to1', get_1to1)
+    monkeypatch.setattr(bot, 'coro_send_message', coro_send_message)
+    bot.config.set_by_path(['mentionall'], True)
+    yield sent
+    bot.config.pop_by_path(['mentionall'])
+    mentions._INDEXES.clear()
+
+
+async def test_same_as_scan():
+    users = [FakeUser('USER_%d' % index, name)
+             for index, name in enumerate(NAMES)]
+    index = NameIndex(users)
+    for term in TERMS:
+        assert index.find(term) == _scan(users, term), term
+
+    assert index.is_fragment(1, 'smith')
+    assert not index.is_fragment(0, 'ali')
+    assert index.is_fragment(2, 'chloe')
+    assert 'USER_3' in index
+    assert NameIndex([]).find('') == []
+
+
+async def test_index_cache():
+    users = _build_users(3)
+    index = mentions._get_index(CONV_ID_1, users)
+    assert mentions._get_index(CONV_ID_1, users) is index
+    assert mentions._get_index(CONV_ID_1, list(users)) is not index
+    mentions._INDEXES.clear()
+
+
+async def test_mention_all(bot, fake_client, monkeypatch):
+    users = _build_users(5)
+    event = FakeEvent(users[1], users, '@all hello')
+
+    bot.memory['donotdisturb'] = {}
+    monkeypatch.setitem(dnd._EXPIRIES, 'USER_2', time.time() + 3600)
+    monkeypatch.setitem(bot.shared, 'dnd.user_check_many',
+                        functools.partial(dnd._users_have_dnd, bot))
+
+    await mentions.mention(bot, event, 'all')
+
+    assert sorted(conv_id for conv_id, dummy in fake_client) == [
+        '1on1 USER_1', '1on1 USER_3', '1on1 USER_4']
+    assert event.notified_users == {'USER_0', 'USER_1', 'USER_3', 'USER_4'}
+    del bot.memory['donotdisturb']
+
+
+async def test_mention_fragment(bot, fake_client):
+    users = _build_users(20)
+    event = FakeEvent(users[1], users, '@last12 hello')
+
+    await mentions.mention(bot, event, 'last12')
+    assert [conv_id for conv_id, dummy in fake_client] == ['1on1 USER_12']
+
+    # multiple matches without a full name part, the initiator gets a hint
+    fake_client.clear()
+    await mentions.mention(bot, event, 'ast1')
+    assert [conv_id for conv_id, dummy in fake_client] == ['1on1 USER_0']
+    assert 'Be more specific' in fake_client[0][1]
+
+
+@pytest.mark.benchmark
+async def test_benchmark(bot, fake_client, monkeypatch):
+    users = _build_users(BENCHMARK_USERS)
+
+    async def _mention_all():
+        fake_client.clear()
+        event = FakeEvent(users[1], users, '@all hello')
+        start = time.time()
+        await mentions.mention(bot, event, 'all')
+        duration = time.time() - start
+        assert len(fake_client) == BENCHMARK_USERS - 1
+        return duration
+
+    # the previous implementation alerted one user after another
+    concurrency = mentions.ALERT_CONCURRENCY
+    monkeypatch.setattr(mentions, 'ALERT_CONCURRENCY', 1)
+    sequential_duration = await _mention_all()
+    monkeypatch.setattr(mentions, 'ALERT_CONCURRENCY', concurrency)
+    concurrent_duration = await _mention_all()
+
+    start = time.time()
+    for user in users:
+        _scan(users, user.full_name.split()[-1].lower())
+    scan_duration = time.time() - start
+
+    index = NameIndex(users)
+    start = time.time()
+    for user in users:
+        index.find(user.full_name.split()[-1].lower())
+    index_duration = time.time() - start
+
+    logger.info('@all in a %d user room: sequential %.2fs, concurrent %.2fs',
+                BENCHMARK_USERS, sequential_duration, concurrent_duration)
+    logger.info('%d name lookups: scan %.1f lookups/s, index %.1f lookups/s',
+                len(users), len(users) / scan_duration,
+                len(users) / index_duration)
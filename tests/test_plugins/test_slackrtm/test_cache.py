@@ -0,0 +1,169 @@
+"""test the incremental updates of the cached slack directory"""
+__author__ = 'das7pad@outlook.com'
+
+import time
+
+import pytest
+
+from hangupsbot.plugins.slackrtm.core import SlackRTM
+
+
+# run all tests in an event loop
+pytestmark = pytest.mark.asyncio
+
+
+class CachedSlackRTM(SlackRTM):
+    """count full cache updates instead of calling the api"""
+
+    def __init__(self):
+        super().__init__({'key': 'xoxb-test', 'domain': 'test'})
+        self.full_updates = []
+        self.conversations['C1'] = {'id': 'C1', 'name': 'general',
+                                    'members': ['U1']}
+        self.users['U1'] = {'id': 'U1', 'name': 'one'}
+        self.test_syncs = []
+
+    @property
+    def syncs(self):
+        return self.test_syncs
+
+    async def update_cache(self, type_):
+        self.full_updates.append(type_)
+
+
+async def test_user_change():
+    slackrtm = CachedSlackRTM()
+    await slackrtm._apply_cache_event(
+        'user_change', {'user': {'id': 'U1', 'name': 'renamed'}})
+    await slackrtm._apply_cache_event(
+        'team_join', {'user': {'id': 'U2', 'name': 'two'}})
+
+    assert slackrtm.get_username('U1') == 'renamed'
+    assert slackrtm.get_username('U2') == 'two'
+    assert slackrtm.full_updates == []
+
+
+async def test_membership():
+    slackrtm = CachedSlackRTM()
+    await slackrtm._apply_cache_event(
+        'member_joined_channel', {'channel': 'C1', 'user': 'U2'})
+    assert slackrtm.conversations['C1']['members'] == ['U1', 'U2']
+
+    await slackrtm._apply_cache_event(
+        'channel_leave', {'channel': 'C1', 'user': 'U1'})
+    assert slackrtm.conversations['C1']['members'] == ['U2']
+    assert slackrtm.full_updates == []
+
+
+async def test_channel_changes():
+    slackrtm = CachedSlackRTM()
+    await slackrtm._apply_cache_event(
+        'channel_rename', {'channel': {'id': 'C1', 'name': 'renamed'}})
+    assert slackrtm.get_chatname('C1') == 'renamed'
+
+    await slackrtm._apply_cache_event('channel_archive', {'channel': 'C1'})
+    assert slackrtm.conversations['C1']['is_archived'] is True
+
+    await slackrtm._apply_cache_event('channel_deleted', {'channel': 'C1'})
+    assert 'C1' not in slackrtm.conversations
+    assert slackrtm.full_updates == []
+
+
+async def test_incomplete_event():
+    slackrtm = CachedSlackRTM()
+    assert await slackrtm._apply_cache_event('group_join', {})
+    assert await slackrtm._apply_cache_event('user_change', {})
+    assert not await slackrtm._apply_cache_event('message', {})
+
+    assert slackrtm.full_updates == ['groups', 'users']
+
+
+async def test_sync_index():
+    slackrtm = CachedSlackRTM()
+    syncs = slackrtm.test_syncs
+    syncs.extend((
+        {'channelid': 'C1', 'hangoutid': 'conv1'},
+        {'channelid': 'C2', 'hangoutid': 'conv1'},
+        {'channelid': 'C1', 'hangoutid': 'conv2'},
+    ))
+    assert slackrtm.get_syncs(channelid='C1') == [syncs[0], syncs[2]]
+    assert slackrtm.get_syncs(hangoutid='conv1') == syncs[:2]
+    assert slackrtm.get_syncs(channelid='C2', hangoutid='conv2') == [
+        syncs[1], syncs[2]]
+
+    # the index follows changes to the memory entry
+    syncs.append({'channelid': 'C3', 'hangoutid': 'conv2'})
+    assert slackrtm.get_syncs(hangoutid='conv2') == [syncs[2], syncs[3]]
+    assert slackrtm.get_syncs(channelid='C4') == []
+
+    # and to single syncs
+    syncs[3]['channelid'] = 'C4'
+    assert slackrtm.get_syncs(channelid='C4') == [syncs[3]]
+    assert slackrtm.get_syncs(channelid='C3') == []
+
+
+async def test_directory_snapshot(bot, monkeypatch):
+    monkeypatch.setitem(bot.config.defaults, 'slackrtm.directory_max_age', 24)
+    monkeypatch.setitem(bot.memory, 'slackrtm', {'test': {}})
+    slackrtm = CachedSlackRTM()
+    slackrtm.team = {'id': 'T1', 'domain': 'test'}
+    slackrtm._directory_updated = 1
+    slackrtm._save_directory()
+
+    # the snapshot is too old for a new connect
+    restored = CachedSlackRTM()
+    restored.team = {'id': 'T1', 'domain': 'test'}
+    assert not restored._load_directory()
+
+    slackrtm._directory_updated = time.time()
+    slackrtm._save_directory()
+    assert restored._load_directory()
+    assert restored.get_username('U1') == 'one'
+
+
+class DirectorySlackRTM(CachedSlackRTM):
+    """serve the `*.list` api-calls from a fixed directory"""
+
+    def __init__(self, directory):
+        super().__init__()
+        self.directory = directory
+
+    async def update_cache(self, type_):
+        return await SlackRTM.update_cache(self, type_)
+
+    async def api_call(self, method, **kwargs):
+        data_key = {'users.list': 'members', 'im.list': 'ims'}.get(
+            method, method.split('.')[0])
+        return {data_key: self.directory[data_key]}
+
+
+async def test_revalidate_directory(bot, monkeypatch):
+    monkeypatch.setitem(bot.config.defaults, 'slackrtm.directory_max_age', 24)
+    monkeypatch.setitem(bot.memory, 'slackrtm', {'test': {}})
+    slackrtm = CachedSlackRTM()
+    slackrtm.team = {'id': 'T1', 'domain': 'test'}
+    slackrtm._directory_updated = time.time() - 60
+    slackrtm._save_directory()
+
+    restored = DirectorySlackRTM({
+        'members': [{'id': 'U1', 'name': 'renamed'}, {'id': 'U2'}],
+        'channels': [{'id': 'C2', 'name': 'random'}],
+        'groups': [],
+        'ims': [{'id': 'D1', 'user': 'U1'}],
+    })
+    restored.team = {'id': 'T1', 'domain': 'test'}
+    assert restored._load_directory()
+    snapshot_updated = restored._directory_updated
+
+    # the changes of the offline period are applied to the served snapshot
+    await restored._refresh_directory()
+    assert restored.get_username('U1') == 'renamed'
+    assert restored.users['U1']['1on1'] == 'D1'
+    assert 'U2' in restored.users
+    assert 'C1' not in restored.conversations
+    assert restored.get_chatname('C2') == 'random'
+
+    directory = bot.memory.get_by_path(['slackrtm', 'test', 'directory'])
+    assert directory['updated'] == restored._directory_updated
+    assert directory['updated'] > snapshot_updated
+    assert set(directory['conversations']) == {'C2', 'D1'}
@@ -0,0 +1,59 @@
+"""test the ordered dispatching of rtm events per channel"""
+__author__ = 'das7pad@outlook.com'
+
+import asyncio
+
+import pytest
+
+from hangupsbot.plugins.slackrtm.core import SlackRTM
+from hangupsbot.utils.workers import OrderedWorkers
+
+
+# run all tests in an event loop
+pytestmark = pytest.mark.asyncio
+
+
+class DispatchingSlackRTM(SlackRTM):
+    """record the handled events instead of parsing them"""
+
+    def __init__(self):
+        super().__init__({'key': 'xoxb-test', 'domain': 'test'})
+        self.handled = []
+        self.event_workers = OrderedWorkers(self._handle_slack_message,
+                                            limit=10, name='test')
+
+    async def _handle_slack_message(self, reply):
+        if reply['type'] == 'channel_rename':
+            # a slow cache update must not be overtaken by later messages
+            await asyncio.sleep(.01)
+        self.handled.append(reply)
+
+    async def dispatch(self, *replies):
+        futures = [await self.event_workers.put(self._get_event_lane(reply),
+                                                reply)
+                   for reply in replies]
+        return await asyncio.gather(*futures)
+
+
+@pytest.mark.parametrize('reply, lane', (
+    ({'type': 'message', 'channel': 'C1'}, 'C1'),
+    ({'type': 'member_joined_channel', 'channel': 'C1'}, 'C1'),
+    ({'type': 'channel_rename', 'channel': {'id': 'C1'}}, 'C1'),
+    ({'type': 'user_change', 'user': {'id': 'U1'}}, None),
+    ({'type': 'message', 'channel': None}, None),
+))
+async def test_event_lane(reply, lane):
+    assert SlackRTM._get_event_lane(reply) == lane
+
+
+async def test_cache_update_before_message():
+    slackrtm = DispatchingSlackRTM()
+    rename = {'type': 'channel_rename',
+              'channel': {'id': 'C1', 'name': 'renamed'}}
+    message = {'type': 'message', 'channel': 'C1', 'text': 'after rename'}
+    other = {'type': 'message', 'channel': 'C2', 'text': 'other channel'}
+
+    assert all(await slackrtm.dispatch(rename, message, other))
+
+    # the other channel is not blocked by the rename
+    assert slackrtm.handled == [other, rename, message]
@@ -0,0 +1,127 @@
+"""test the polling of telegram updates"""
+__author__ = 'das7pad@outlook.com'
+
+import asyncio
+
+import pytest
+
+from hangupsbot.plugins.telesync.core import (
+    UNCONFIRMED_UPDATES_PATH,
+    TelegramBot,
+)
+
+
+# run all tests in an event loop
+pytestmark = pytest.mark.asyncio
+
+CONFIG = {
+    'message_loop_concurrency': 10,
+    'message_loop_max_queued': 3,
+    'message_loop_retries': 1,
+}
+
+
+def _update(update_id, chat_id=1):
+    return {'update_id': update_id,
+            'message': {'message_id': update_id, 'chat': {'id': chat_id}}}
+
+
+class PollingTelegramBot(TelegramBot):
+    """serve batches of updates and block their handling until released"""
+
+    def __init__(self, *batches):
+        # pylint:disable=super-init-not-called
+        self.update_workers = None
+        self.batches = list(batches)
+        self.offsets = []
+        self.stored = []
+        self.handled = []
+        self.release = asyncio.Event()
+
+    def config(self, key=None, fallback=True):
+        return CONFIG[key]
+
+    async def getUpdates(self, offset=None, timeout=None):
+        # the updates that are confirmed by this fetch
+        self.offsets.append(offset)
+        self.stored.append(self._get_stored())
+        if self.batches:
+            return self.batches.pop(0)
+        await asyncio.sleep(3600)
+        return []
+
+    def _get_stored(self):
+        memory = self.bot.memory
+        if not memory.exists(UNCONFIRMED_UPDATES_PATH):
+            return []
+        return [update['update_id']
+                for update in memory.get_by_path(UNCONFIRMED_UPDATES_PATH)]
+
+    async def _handle(self, response):
+        await self.release.wait()
+        self.handled.append(response['message_id'])
+
+
+@pytest.fixture
+def memory(bot):
+    yield bot.memory
+    if bot.memory.exists(UNCONFIRMED_UPDATES_PATH):
+        bot.memory.pop_by_path(UNCONFIRMED_UPDATES_PATH)
+
+
+async def _wait_for(condition):
+    while not condition():
+        await asyncio.sleep(.01)
+
+
+async def _poll(telegram_bot, polls):
+    task = asyncio.ensure_future(telegram_bot._message_loop())
+    await _wait_for(lambda: len(telegram_bot.offsets) >= polls)
+    return task
+
+
+async def test_write_ahead(bot, memory):
+    telegram_bot = PollingTelegramBot([_update(1), _update(2, chat_id=2)])
+    task = await _poll(telegram_bot, 2)
+
+    # the unhandled updates are in the memory before their confirmation
+    assert telegram_bot.offsets == [None, 3]
+    assert telegram_bot.stored == [[], [1, 2]]
+
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    # finish the shielded handling of the stopped run
+    telegram_bot.release.set()
+    await asyncio.sleep(.01)
+
+    # the next run handles them before it confirms new updates
+    telegram_bot = PollingTelegramBot([_update(3)])
+    telegram_bot.release.set()
+    task = await _poll(telegram_bot, 2)
+    assert telegram_bot.offsets == [3, 4]
+    await _wait_for(lambda: len(telegram_bot.handled) == 3)
+    assert sorted(telegram_bot.handled) == [1, 2, 3]
+
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    assert not memory.exists(UNCONFIRMED_UPDATES_PATH)
+
+
+async def test_bounded_backlog(bot, memory):
+    telegram_bot = PollingTelegramBot([_update(update_id)
+                                       for update_id in range(1, 6)])
+    task = await _poll(telegram_bot, 1)
+    # longer than the delay between two polls
+    await asyncio.sleep(.3)
+
+    # the polling waits for a free slot in the backlog
+    assert telegram_bot.offsets == [None]
+
+    telegram_bot.release.set()
+    await _wait_for(lambda: len(telegram_bot.offsets) == 2)
+    assert telegram_bot.offsets == [None, 6]
+    await _wait_for(lambda: len(telegram_bot.handled) == 5)
+    assert telegram_bot.handled == [1, 2, 3, 4, 5]
+
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
@@ -0,0 +1,238 @@
+"""test the batched and retrying delivery of web hook messages"""
+
+import asyncio
+import json
+
+import pytest
+
+from hangupsbot.plugins import webhook
+from hangupsbot.plugins.webhook.delivery import (
+    DeliveryQueue,
+    _read_offset,
+)
+
+
+# run all tests in an event loop
+pytestmark = pytest.mark.asyncio
+
+
+async def _no_sleep(dummy):
+    pass
+
+
+def _read_spilled(path):
+    with open(path, 'rb') as file:
+        file.seek(_read_offset(file))
+        return [json.loads(line)['message'] for line in file]
+
+
+async def _start_handler(endpoint, **options):
+    handler = webhook.Handler(
+        name='test',
+        target=endpoint.url('/hook'),
+        params={},
+        options=dict(spill_to_disk=False, **options),
+    )
+    handler.queue._sleep = _no_sleep
+    await handler._set_session()
+    task = asyncio.ensure_future(handler._run())
+    return handler, task
+
+
+async def _stop_handler(handler, task):
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    await handler._session.close()
+
+
+async def test_batch(bot, endpoint):
+    handler, task = await _start_handler(endpoint, batch_size=3, linger=.5)
+    for index in range(5):
+        await handler.queue.put({'index': index})
+
+    await endpoint.wait_for(2)
+    await _stop_handler(handler, task)
+
+    assert endpoint.received == [
+        [{'index': 0}, {'index': 1}, {'index': 2}],
+        [{'index': 3}, {'index': 4}],
+    ]
+    assert handler.queue.stats()['delivered'] == 5
+    assert handler.queue.latency.count == 5
+
+
+async def test_single_message(bot, endpoint):
+    handler, task = await _start_handler(endpoint)
+    await handler.queue.put({'index': 0})
+
+    await endpoint.wait_for(1)
+    await _stop_handler(handler, task)
+
+    # no list wrapping without batching
+    assert endpoint.received == [{'index': 0}]
+
+
+async def test_retry(bot, endpoint):
+    endpoint.fail = 2
+    handler, task = await _start_handler(endpoint, retries=2)
+    await handler.queue.put({'index': 0})
+
+    await endpoint.wait_for(1)
+    await _stop_handler(handler, task)
+
+    assert endpoint.received == [{'index': 0}]
+    stats = handler.queue.stats()
+    assert stats['failed'] == 2
+    assert stats['delivered'] == 1
+    assert stats['dropped'] == 0
+
+
+async def test_retry_exhausted():
+    attempts = []
+
+    async def _send(payload):
+        attempts.append(payload)
+        return False
+
+    queue = DeliveryQueue('test', _send, retries=3, sleep=_no_sleep)
+    await queue._deliver([(0, {'index': 0})])
+
+    assert len(attempts) == 4
+    assert queue.failed == 4
+    assert queue.dropped == 1
+
+
+async def test_drop_oldest_without_spill():
+    queue = DeliveryQueue('test', None, max_pending=2)
+    for index in range(3):
+        await queue.put({'index': index})
+
+    assert [message for dummy, message in queue._items] == [
+        {'index': 1}, {'index': 2}]
+    assert queue.dropped == 1
+
+
+async def test_spill(tmpdir):
+    delivered = []
+
+    async def _send(payload):
+        delivered.append(payload)
+        return True
+
+    path = str(tmpdir.join('spill'))
+    queue = DeliveryQueue('test', _send, max_pending=2, spill_path=path)
+    for index in range(5):
+        await queue.put({'index': index})
+
+    assert queue.stats()['pending'] == 2
+    assert queue.stats()['spilled'] == 3
+    assert [message['index'] for message in _read_spilled(path)] == [2, 3, 4]
+
+    for dummy in range(5):
+        await queue._deliver(await queue._get_batch())
+
+    assert delivered == [{'index': index} for index in range(5)]
+    assert queue.stats()['spilled'] == 0
+
+
+async def test_spill_read_offset(tmpdir):
+    async def _send(dummy):
+        return True
+
+    path = str(tmpdir.join('spill'))
+    queue = DeliveryQueue('test', _send, max_pending=2, spill_path=path)
+    for index in range(8):
+        await queue.put({'index': index})
+    queue._items.clear()
+    size = tmpdir.join('spill').size()
+
+    # reading advances the offset and leaves the lines in place
+    await queue._load_spilled()
+    assert tmpdir.join('spill').size() == size
+    assert queue.stats()['spilled'] == 4
+    restarted = DeliveryQueue('test', _send, spill_path=path)
+    assert restarted.stats()['spilled'] == 4
+
+    # the file shrinks once more than half of it is read
+    queue._items.clear()
+    await queue._load_spilled()
+    assert tmpdir.join('spill').size() < size
+    assert [message['index'] for message in _read_spilled(path)] == [6, 7]
+
+    queue._items.clear()
+    await queue._load_spilled()
+    assert not tmpdir.join('spill').exists()
+    assert queue.stats()['spilled'] == 0
+
+
+async def test_spill_on_cancel(tmpdir):
+    release = asyncio.Event()
+
+    async def _send(dummy):
+        await release.wait()
+        return True
+
+    path = str(tmpdir.join('spill'))
+    queue = DeliveryQueue('test', _send, spill_path=path)
+    task = asyncio.ensure_future(queue.run())
+    for index in range(3):
+        await queue.put({'index': index})
+    await asyncio.sleep(0)
+
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    # the message in flight is spilled first
+    restarted = DeliveryQueue('test', _send, spill_path=path)
+    assert restarted.stats()['spilled'] == 3
+    batch = await restarted._get_batch()
+    assert batch[0][1] == {'index': 0}
+
+
+async def test_spill_during_back_off(tmpdir):
+    async def _send(dummy):
+        return False
+
+    async def _sleep(dummy):
+        await asyncio.sleep(10)
+
+    path = str(tmpdir.join('spill'))
+    queue = DeliveryQueue('test', _send, batch_size=2, spill_path=path,
+                          sleep=_sleep)
+    task = asyncio.ensure_future(queue.run())
+    for index in range(3):
+        await queue.put({'index': index})
+    await asyncio.sleep(.01)
+    assert queue.stats()['failed'] == 1
+
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert [message['index'] for message in _read_spilled(path)] == [0, 1, 2]
+
+
+async def test_spill_serializer_backlog(bot, endpoint, tmpdir, monkeypatch):
+    release = asyncio.Event()
+    handler, task = await _start_handler(endpoint)
+    handler.queue._spill_path = str(tmpdir.join('spill'))
+
+    async def _enqueue_event(event):
+        await release.wait()
+        await handler.queue.put(event)
+
+    monkeypatch.setattr(handler._serializer, '_handler', _enqueue_event)
+    handler._serializer.submit('conv', {'index': 0})
+    await asyncio.sleep(0)
+
+    task.cancel()
+    await asyncio.sleep(0)
+    release.set()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    await handler._session.close()
+
+    assert endpoint.received == []
+    assert _read_spilled(handler.queue._spill_path) == [{'index': 0}]
@@ -16,6 +16,14 @@ from hangupsbot.sync.user import SyncUser
 pytestmark = pytest.mark.asyncio
 
 
+class FakeResponse:
+    def __init__(self, status):
+        self.status = status
+
+    async def read(self):
+        return b''
+
+
 async def test_config_check():
     assert 'config type' in webhook._check_config('INVALID')
 
@@ -371,12 +379,12 @@ async def test_send(bot):
     handler._session.post = post
 
     return_value = asyncio.Future()
-    return_value.set_result(None)
+    return_value.set_result(FakeResponse(200))
     handler._session.post.return_value = return_value
 
     message = {}
 
-    await handler.send(message)
+    assert await handler.send(message) is True
 
     post.assert_called_with(
         target, json=message, **params
@@ -400,7 +408,28 @@ async def test_send_error_handling(bot):
 
     message = {}
 
-    await handler.send(message)
+    assert await handler.send(message) is False
+
+
+@pytest.mark.parametrize('status,expected', (
+    (201, True),
+    (400, True),
+    (429, False),
+    (503, False),
+))
+async def test_send_status_handling(bot, status, expected):
+    handler = webhook.Handler(
+        name='NAME',
+        target='http://example.com/target',
+        params={},
+    )
+
+    handler._session = mock.MagicMock()
+    return_value = asyncio.Future()
+    return_value.set_result(FakeResponse(status))
+    handler._session.post.return_value = return_value
+
+    assert await handler.send({}) is expected
 
 
 async def test_send_cancelled(bot):
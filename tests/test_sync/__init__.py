@@ -0,0 +1 @@
+"""sync tests"""
@@ -0,0 +1,96 @@
+"""test the image wrapper and benchmark the memory usage of a relay"""
+
+import hashlib
+import io
+import logging
+import resource
+import tracemalloc
+
+import pytest
+
+from hangupsbot.sync.image import (
+    ImageData,
+    SyncImage,
+    get_data_size,
+)
+
+
+logger = logging.getLogger('tests')
+
+PAYLOAD_SIZE = 20 * 1024 * 1024
+RELAY_TARGETS = 5
+
+
+def test_image_data_shares_bytes():
+    raw = b'IMAGE DATA'
+    data = ImageData(raw)
+    assert data.raw is raw
+    assert data.getvalue() is raw
+    assert data.size == len(raw)
+    assert data.read() == raw
+
+    view = data.copy()
+    assert view.raw is raw
+    assert view.tell() == 0
+
+    with pytest.raises(io.UnsupportedOperation):
+        data.write(b'X')
+
+    assert get_data_size(data) == len(raw)
+    assert get_data_size(io.BytesIO(raw)) == len(raw)
+    assert get_data_size(raw) == len(raw)
+
+
+def _legacy_relay(buffer):
+    """copy the image data per target like the previous implementation"""
+    for dummy in range(RELAY_TARGETS):
+        data = io.BytesIO(buffer.getvalue())
+        len(data.getbuffer())
+        hashlib.md5(data.getvalue()).hexdigest()
+        data.close()
+
+
+def _relay(image):
+    """fetch, measure and hash the image data per target"""
+    for dummy in range(RELAY_TARGETS):
+        data, dummy = image.get_data()
+        get_data_size(data)
+        hashlib.md5(data.getvalue()).hexdigest()
+        data.close()
+
+
+def _measure(func, *args):
+    """get the peak of traced memory allocations during a call
+
+    Returns:
+        int: peak allocation in bytes
+    """
+    tracemalloc.start()
+    try:
+        func(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+@pytest.mark.benchmark
+def test_relay_memory_benchmark(bot):
+    # pylint:disable=unused-argument
+    payload = bytes(PAYLOAD_SIZE)
+
+    buffer = io.BytesIO()
+    buffer.write(payload)
+    legacy_peak = _measure(_legacy_relay, buffer)
+    buffer.close()
+
+    image = SyncImage(data=payload, filename='image.jpg', type_='photo')
+    peak = _measure(_relay, image)
+
+    logger.info(
+        'relay of %dKB to %d targets: peak legacy %dKB, current %dKB, '
+        'max RSS %dKB',
+        PAYLOAD_SIZE / 1024, RELAY_TARGETS, legacy_peak / 1024, peak / 1024,
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    )
+    assert legacy_peak >= PAYLOAD_SIZE
+    assert peak < PAYLOAD_SIZE / 2
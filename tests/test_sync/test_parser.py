@@ -0,0 +1,136 @@
+"""compare the message parser with the reparser tokenization and benchmark it"""
+
+import logging
+import time
+
+import pytest
+from hangups.message_parser import Tokens
+
+from hangupsbot.plugins.slackrtm import parsers as slack_parsers
+from hangupsbot.plugins.telesync import parsers as telegram_parsers
+from hangupsbot.sync.parser import (
+    STYLE_MAPPING,
+    MessageParser,
+    MessageSegment,
+    MessageSegmentHangups,
+    MessageSegmentInternal,
+    get_formatted,
+)
+from tests.test_plugins.test_slackrtm.test_parsers import (
+    SEGMENTS,
+    SLACK_MRKDWN_IN,
+    SLACK_MRKDWN_OUT,
+)
+
+
+# run all tests in an event loop
+pytestmark = pytest.mark.asyncio
+
+logger = logging.getLogger('tests')
+
+BENCHMARK_MESSAGES = 500
+
+TEXTS = [
+    '',
+    ' ',
+    'plain text',
+    'double  spaces  and\ttabs',
+    'line\nbreaks\r\nhere\n',
+    'a link https://example.com/path?q=1&b=2 and more',
+    'HTTP://EXAMPLE.COM/UPPER and www.Example.org',
+    'example.com/ domain.tld sub.domain.tld 127.0.0.1/path 1.2.3.4',
+    'wrapped (inner.link/path_with_(parens)) and me.you/(nope))',
+    'mail@example.com is no link',
+    'ends with a dot: example.com.',
+    'unicode äöü \U0001f600 example.com',
+    '*bold* _italic_ **strong** __under__ ***both*** ~~strike~~ ==u==',
+    '`code *not bold*` and ```pre```',
+    'escaped \\*not bold\\* and \\_not italic\\_',
+    '[markdown link](https://example.com) [broken link](',
+    '<b>bold</b> <i>italic</i> <b><i>both</i></b> <B>upper</B>',
+    '<a href="https://example.com">html link</a> <a href=\'x.y\'>q</a>',
+    '<br>html<br/>breaks<BR />',
+    '<img src="https://example.com/image.png">',
+    '<b>unclosed',
+    '5 < 6 > 4 & a=b',
+    'url with %2A escaped %5F markdown example.com/%2A',
+]
+
+
+def _corpus():
+    """texts from the test fixtures, the style mappings and edge cases"""
+    texts = list(TEXTS)
+    texts.extend((SLACK_MRKDWN_IN, SLACK_MRKDWN_OUT))
+    for style in STYLE_MAPPING:
+        texts.append(get_formatted(SEGMENTS, style))
+        for text in TEXTS:
+            texts.append(get_formatted(text, style))
+            texts.append(get_formatted(text, style, internal_source=True))
+    texts.extend(text.splitlines()[0] for text in list(texts) if text)
+    return texts
+
+
+def _reference(parser):
+    """get a parser of the same type without the fast path and cache"""
+    reference = type(parser).__new__(type(parser))
+    MessageParser.__init__(reference, parser.tokens)
+    reference._markup = None
+    return reference
+
+
+@pytest.mark.parametrize('parser', (
+    MessageSegmentHangups._parser,
+    MessageSegmentInternal._parser,
+    MessageParser(Tokens.basic),
+    slack_parsers.SlackMessageSegment._parser,
+    telegram_parsers.TelegramMessageSegment._parser,
+))
+async def test_same_as_reparser(parser):
+    reference = _reference(parser)
+    for text in _corpus():
+        assert parser.tokenize(text) == reference.tokenize(text), text
+
+
+async def test_cached_segments():
+    text = '<b>bold</b> example.com'
+    first = MessageSegmentHangups.from_str(text)
+    second = MessageSegmentHangups.from_str(text)
+    assert first is not second
+    assert first[0] is not second[0]
+
+    first[0].text = 'changed'
+    assert MessageSegmentHangups.from_str(text)[0].text == 'bold'
+
+
+@pytest.mark.benchmark
+async def test_benchmark():
+    texts = ['message %d with a link example.com/%d and some more words'
+             % (index, index) for index in range(BENCHMARK_MESSAGES)]
+    texts += ['<b>Name %d</b> : formatted *message* %d'
+              % (index, index) for index in range(BENCHMARK_MESSAGES)]
+    parser = MessageSegment._parser
+    reference = _reference(parser)
+
+    start = time.time()
+    for text in texts:
+        reference._tokenize(text)
+    reference_duration = time.time() - start
+
+    start = time.time()
+    for text in texts:
+        parser._tokenize(text)
+    uncached_duration = time.time() - start
+
+    # a text relayed to several targets is parsed once
+    for text in texts:
+        parser.tokenize(text)
+    start = time.time()
+    for text in texts:
+        parser.tokenize(text)
+    cached_duration = time.time() - start
+
+    logger.info('%d texts: reparser %.1f texts/s, fast path %.1f texts/s, '
+                'cached %.1f texts/s', len(texts),
+                len(texts) / reference_duration,
+                len(texts) / uncached_duration,
+                len(texts) / cached_duration)
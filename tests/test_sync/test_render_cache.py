@@ -0,0 +1,118 @@
+"""test the shared rendering of relayed messages and benchmark it"""
+
+import logging
+import time
+
+import pytest
+
+from hangupsbot.sync import parser
+from hangupsbot.sync.event import (
+    SyncEvent,
+    SyncReply,
+)
+from hangupsbot.sync.parser import (
+    STYLE_MAPPING,
+    MessageSegmentInternal,
+    get_formatted,
+)
+from hangupsbot.sync.user import SyncUser
+from tests.constants import CONV_ID_1
+
+
+# run all tests in an event loop
+pytestmark = pytest.mark.asyncio
+
+logger = logging.getLogger('tests')
+
+BENCHMARK_MESSAGES = 200
+BENCHMARK_TARGETS = 10
+BENCHMARK_STYLES = ('hangouts', 'html_flat', 'markdown')
+
+INTERNAL_TEXTS = (
+    '',
+    'plain text',
+    '<b>bold</b> and <i>italic</i> and <b><i>both</i></b>',
+    'line\nbreaks\n\nhere',
+    '<a href="https://example.com/?a=1&b=2">a link</a> after',
+    '<b><a href="https://example.com">bold link</a></b>',
+    'https://example.com/plain',
+    'escaped %2Amarkdown%2A and %5Funder%5F',
+    '&lt;b&gt;not bold&lt;/b&gt; &amp; more',
+    '| <i><b>Reply</b></i> :\n| <i>quoted</i>\n<b>Name</b> : text',
+)
+
+CUSTOM_STYLE = dict(STYLE_MAPPING['html'], line_break='<br>')
+
+
+def _uncached(text, style):
+    return get_formatted(MessageSegmentInternal.from_str(text), style)
+
+
+async def test_same_as_uncached():
+    styles = list(STYLE_MAPPING) + [CUSTOM_STYLE]
+    for text in INTERNAL_TEXTS:
+        for style in styles:
+            expected = _uncached(text, style)
+            # twice to cover the cached results
+            assert get_formatted(text, style, internal_source=True) == expected
+            assert get_formatted(text, style, internal_source=True) == expected
+
+
+async def test_invalid_style():
+    with pytest.raises(ValueError):
+        get_formatted('text', 'unknown', internal_source=True)
+
+
+def _build_events(text):
+    """one event per target, as created by the sync handler"""
+    user = SyncUser(identifier='platform:USER', user_name='FULL NAME')
+    reply = SyncReply(identifier='platform:CHAT', user=user,
+                      text='earlier message', offset=30)
+    return [SyncEvent(identifier='platform:CHAT', conv_id=CONV_ID_1,
+                      user=user, text=text, reply=reply, title='CHAT')
+            for dummy in range(BENCHMARK_TARGETS)]
+
+
+def _relay(messages):
+    results = []
+    for text in messages:
+        for event in _build_events(text):
+            for style in BENCHMARK_STYLES:
+                results.append(event.get_formatted_text(style=style))
+    return results
+
+
+async def test_event_text(bot):
+    event = _build_events('<b>bold</b> message\nnext line')[0]
+    text = event.get_formatted_text(style='internal')
+    assert 'FULL NAME' in text
+    assert event.get_internal_text() is event.get_internal_text()
+
+    for style in BENCHMARK_STYLES:
+        assert event.get_formatted_text(style=style) == _uncached(text, style)
+
+
+@pytest.mark.benchmark
+async def test_benchmark(bot, monkeypatch):
+    messages = ['message %d with <b>bold</b> and *markdown*\n'
+                'https://example.com/%d' % (index, index)
+                for index in range(BENCHMARK_MESSAGES)]
+
+    start = time.time()
+    cached = _relay(messages)
+    cached_duration = time.time() - start
+
+    # the previous implementation: parse and render on each call
+    monkeypatch.setattr(parser, '_render_internal', _uncached)
+    monkeypatch.setattr(parser, '_parse_internal',
+                        MessageSegmentInternal.from_str)
+    start = time.time()
+    uncached = _relay(messages)
+    uncached_duration = time.time() - start
+
+    assert cached == uncached
+    renders = BENCHMARK_MESSAGES * BENCHMARK_TARGETS * len(BENCHMARK_STYLES)
+    logger.info('%d messages to %d targets in %d styles: uncached %.1f '
+                'renders/s, cached %.1f renders/s',
+                BENCHMARK_MESSAGES, BENCHMARK_TARGETS, len(BENCHMARK_STYLES),
+                renders / uncached_duration, renders / cached_duration)
@@ -0,0 +1,67 @@
+"""test the tracking of recent message ids for the reply offset"""
+
+from hangupsbot.sync.reply_tracker import ReplyTracker
+
+
+def _set_options(bot, spam_offset, persist=False):
+    bot.config.set_by_path(['sync_reply_spam_offset'], spam_offset)
+    bot.config.set_by_path(['sync_reply_tracking_persist'], persist)
+
+
+def test_offset(bot):
+    _set_options(bot, 5)
+    tracker = ReplyTracker('test_offset')
+    # out of order delivery
+    for msg_id in (1, 3, 2, 4, 5):
+        tracker.track('chat', msg_id)
+
+    assert tracker.get_offset('chat', 5) == 0
+    assert tracker.get_offset('chat', 3) == 2
+    assert tracker.get_offset('chat', 1) == 4
+    assert tracker.get_offset('chat', 6) is None
+    assert tracker.get_offset('other', 1) is None
+
+    # edits do not count as new message
+    tracker.track('chat', 3)
+    assert tracker.get_offset('chat', 1) == 4
+
+
+def test_bounded(bot):
+    _set_options(bot, 5)
+    tracker = ReplyTracker('test_bounded')
+    for msg_id in range(1000):
+        tracker.track(123, msg_id)
+
+    # the chat id is stored as string
+    assert tracker.get_offset('123', 999) == 0
+    assert tracker.get_offset(123, 990) == 9
+    assert tracker.get_offset(123, 989) is None
+    assert len(tracker._get_chats()['123']) == 10
+
+
+def test_persist(bot):
+    _set_options(bot, 5, persist=True)
+    tracker = ReplyTracker('test_persist')
+    tracker.track('chat', 1)
+    tracker.track('chat', 2)
+
+    assert bot.memory.get_by_path(
+        ['cache', 'reply_tracking', 'test_persist', 'chat']) == [1, 2]
+
+    # restart
+    tracker = ReplyTracker('test_persist')
+    assert tracker.get_offset('chat', 1) == 1
+    _set_options(bot, 10)
+
+
+def test_memory_reload(bot):
+    _set_options(bot, 5, persist=True)
+    tracker = ReplyTracker('test_memory_reload')
+    tracker.track('chat', 1)
+
+    # a reload replaces the dicts in memory
+    bot.memory.set_by_path(['cache', 'reply_tracking', 'test_memory_reload'],
+                           {'chat': [5, 6]})
+    assert tracker.get_offset('chat', 1) is None
+    assert tracker.get_offset('chat', 5) == 1
+    _set_options(bot, 10)
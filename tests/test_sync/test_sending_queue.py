@@ -0,0 +1,154 @@
+"""test the sending queues and benchmark the scheduling"""
+
+import asyncio
+import logging
+import time
+
+import pytest
+
+from hangupsbot.sync import sending_queue
+from hangupsbot.sync.sending_queue import (
+    AsyncQueue,
+    Queue,
+    Status,
+    TextMerger,
+)
+
+
+# run all tests in an event loop
+pytestmark = pytest.mark.asyncio
+
+logger = logging.getLogger('tests')
+
+BENCHMARK_ITEMS = 100000
+BENCHMARK_QUEUES = 1000
+
+
+@pytest.fixture(autouse=True)
+def queue_loop(event_loop, monkeypatch):
+    # the queues schedule their consumers on the loop of the import time
+    monkeypatch.setattr(Queue, '_loop', event_loop)
+
+
+async def _echo(*args):
+    return bool(args)
+
+
+async def test_sequence():
+    results = []
+
+    async def _collect(item):
+        await asyncio.sleep(0)
+        results.append(item)
+
+    queue = AsyncQueue('test_sequence', _collect)
+    statuses = [queue.schedule(item) for item in range(10)]
+    assert queue._running
+
+    for status in statuses:
+        assert await status is Status.SUCCESS
+    assert results == list(range(10))
+    assert not queue
+    Queue.release_block('test_sequence')
+
+
+async def test_block_release():
+    queue = AsyncQueue('test_block', _echo)
+    Queue._blocks['test_block'] = True
+    status = queue.schedule('item')
+
+    asyncio.get_event_loop().call_later(0.1, Queue.release_block, 'test_block')
+    assert await asyncio.wait_for(status.wait(), 1) is Status.SUCCESS
+
+
+async def test_block_timeout(monkeypatch):
+    monkeypatch.setattr(sending_queue, 'SENDING_BLOCK_RETRY_DELAY', 0.1)
+    queue = AsyncQueue('test_block_timeout', _echo)
+    Queue._blocks['test_block_timeout'] = True
+    status = queue.schedule('item')
+
+    assert await asyncio.wait_for(status.wait(), 1) is Status.FAILED
+    Queue.release_block('test_block_timeout')
+
+
+async def test_local_stop():
+    async def _slow(item):
+        await asyncio.sleep(0.01)
+        return item
+
+    queue = AsyncQueue('test_local_stop', _slow)
+    statuses = [queue.schedule(True) for dummy in range(5)]
+    await Queue('test_local_stop').local_stop(1)
+
+    assert Queue._pending_tasks['test_local_stop'] == 0
+    assert all([status._event.is_set() for status in statuses])
+    Queue.release_block('test_local_stop')
+
+
+@pytest.mark.benchmark
+async def test_schedule_benchmark():
+    queues = [AsyncQueue('test_benchmark', _echo)
+              for dummy in range(BENCHMARK_QUEUES)]
+
+    start = time.time()
+    statuses = [queues[index % BENCHMARK_QUEUES].schedule(index)
+                for index in range(BENCHMARK_ITEMS)]
+
+    # one consumer per active queue
+    assert sum(queue._running for queue in queues) == BENCHMARK_QUEUES
+
+    results = [await status for status in statuses]
+    duration = time.time() - start
+    logger.info('processed %d items in %d queues within %.2fs: %d items/s',
+                BENCHMARK_ITEMS, BENCHMARK_QUEUES, duration,
+                BENCHMARK_ITEMS / duration)
+
+    assert all(results)
+    assert Queue._pending_tasks['test_benchmark'] == 0
+    Queue.release_block('test_benchmark')
+
+
+async def test_coalesce_backlog():
+    sent = []
+
+    async def _collect(target, text, image_id=None):
+        await asyncio.sleep(0)
+        sent.append((target, text, image_id))
+
+    merge = TextMerger(1, 20, exclusive=('image_id',))
+    queue = AsyncQueue('test_coalesce', _collect, merge=merge, threshold=2)
+    statuses = [
+        queue.schedule('CHAT', 'first'),
+        queue.schedule('CHAT', 'second'),
+        queue.schedule('CHAT', 'third'),
+        queue.schedule('CHAT', 'image', image_id=1),
+        queue.schedule('CHAT', 'fourth'),
+        queue.schedule('CHAT', 'a text that exceeds the limit'),
+    ]
+
+    for status in statuses:
+        assert await status is Status.SUCCESS
+
+    assert sent == [
+        ('CHAT', 'first\nsecond\nthird', None),
+        ('CHAT', 'image', 1),
+        ('CHAT', 'fourth', None),
+        ('CHAT', 'a text that exceeds the limit', None),
+    ]
+    assert Queue._pending_tasks['test_coalesce'] == 0
+    Queue.release_block('test_coalesce')
+
+
+async def test_text_merger():
+    merge = TextMerger('text', 100, exclusive=('attachments',))
+    assert merge(((), {'channel': 'A', 'text': 'one'}),
+                 ((), {'channel': 'A', 'text': 'two'})) == (
+                     (), {'channel': 'A', 'text': 'one\ntwo'})
+
+    # different target
+    assert merge(((), {'channel': 'A', 'text': 'one'}),
+                 ((), {'channel': 'B', 'text': 'two'})) is None
+
+    # attachments are not merged
+    assert merge(((), {'channel': 'A', 'text': 'one', 'attachments': [{}]}),
+                 ((), {'channel': 'A', 'text': 'two'})) is None